@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Monitoramento ao Vivo Hermes Reply
+Leituras novas do log serial aplicadas como delta em janelas circulares por dispositivo e contadores incrementais
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from enquadramento import LeitorIncremental, decodificar_payloads
+from esbocos import SENSORES
+from esquemas import REGISTRO_PADRAO
+
+CAPACIDADE_PADRAO = 720  # leituras por dispositivo (1h a cada 5s)
+INTERVALO_MIN_SONDAGEM = 0.5  # segundos entre leituras do log, independente do número de sessões
+LEITURAS_TENDENCIA = 3
+
+
+class BufferCircular:
+    """Últimas ``capacidade`` leituras de um dispositivo em arrays de tamanho fixo"""
+
+    def __init__(self, capacidade):
+        self.capacidade = capacidade
+        self.tempos = np.zeros(capacidade, dtype='int64')
+        self.sensores = np.zeros((capacidade, len(SENSORES)), dtype='float32')
+        self.status = np.empty(capacidade, dtype=object)
+        self.proximo = 0
+        self.tamanho = 0
+
+    def acrescentar(self, tempos, sensores, status):
+        """Grava o delta sobre as posições mais antigas (só as últimas ``capacidade`` contam)"""
+        n = len(tempos)
+        if n > self.capacidade:
+            tempos, sensores, status = tempos[-self.capacidade:], sensores[-self.capacidade:], status[-self.capacidade:]
+            n = self.capacidade
+        posicoes = (self.proximo + np.arange(n)) % self.capacidade
+        self.tempos[posicoes] = tempos
+        self.sensores[posicoes] = sensores
+        self.status[posicoes] = status
+        self.proximo = (self.proximo + n) % self.capacidade
+        self.tamanho = min(self.capacidade, self.tamanho + n)
+
+    def ordem(self):
+        """Posições em ordem de chegada (mais antiga primeiro)"""
+        inicio = (self.proximo - self.tamanho) % self.capacidade
+        return (inicio + np.arange(self.tamanho)) % self.capacidade
+
+
+class JanelaDispositivos:
+    """Buffers circulares por dispositivo e estatísticas acumuladas atualizadas só com o delta"""
+
+    def __init__(self, capacidade=CAPACIDADE_PADRAO):
+        self.capacidade = capacidade
+        self.buffers = {}
+        self.total = 0
+        self.contagem_status = Counter()
+        self.soma = dict.fromkeys(SENSORES, 0.0)
+        self.minimo = dict.fromkeys(SENSORES, np.inf)
+        self.maximo = dict.fromkeys(SENSORES, -np.inf)
+        self.temperaturas_iniciais = []
+        self.temperaturas_finais = deque(maxlen=LEITURAS_TENDENCIA)
+
+    def aplicar(self, delta):
+        """Incorpora um DataFrame canônico com as leituras novas"""
+        if not len(delta):
+            return
+        delta = delta.sort_values('timestamp_simulacao', kind='stable')
+        valores = delta[SENSORES].to_numpy(dtype='float64')
+
+        self.total += len(delta)
+        self.contagem_status.update(delta['system_status'].tolist())
+        for i, sensor in enumerate(SENSORES):
+            coluna = valores[:, i]
+            if np.isnan(coluna).all():
+                continue
+            self.soma[sensor] += float(np.nansum(coluna))
+            self.minimo[sensor] = min(self.minimo[sensor], float(np.nanmin(coluna)))
+            self.maximo[sensor] = max(self.maximo[sensor], float(np.nanmax(coluna)))
+        temperaturas = valores[:, 0].tolist()
+        faltam = LEITURAS_TENDENCIA - len(self.temperaturas_iniciais)
+        if faltam > 0:
+            self.temperaturas_iniciais.extend(temperaturas[:faltam])
+        self.temperaturas_finais.extend(temperaturas[-LEITURAS_TENDENCIA:])
+
+        dispositivos = delta['device_id'].fillna('DESCONHECIDO').to_numpy()
+        tempos = delta['timestamp_simulacao'].to_numpy(dtype='int64', na_value=0)
+        status = delta['system_status'].to_numpy(dtype=object)
+        for dispositivo, posicoes in pd.Series(dispositivos).groupby(dispositivos).indices.items():
+            buffer = self.buffers.get(dispositivo)
+            if buffer is None:
+                buffer = self.buffers[dispositivo] = BufferCircular(self.capacidade)
+            buffer.acrescentar(tempos[posicoes], valores[posicoes], status[posicoes])
+
+    def dataframe(self):
+        """Conteúdo das janelas (no máximo ``capacidade`` linhas por dispositivo)"""
+        partes = []
+        for dispositivo, buffer in self.buffers.items():
+            ordem = buffer.ordem()
+            parte = pd.DataFrame(buffer.sensores[ordem], columns=SENSORES)
+            parte.insert(0, 'timestamp_simulacao', pd.to_datetime(buffer.tempos[ordem], unit='ms'))
+            parte.insert(1, 'device_id', dispositivo)
+            parte['system_status'] = buffer.status[ordem]
+            partes.append(parte)
+        if not partes:
+            return pd.DataFrame(columns=['timestamp_simulacao', 'device_id', *SENSORES, 'system_status'])
+        return pd.concat(partes, ignore_index=True)
+
+    def metricas_principais(self):
+        """Entradas de ``exibir_metricas_principais`` sobre todas as leituras recebidas"""
+        media = {sensor: self.soma[sensor] / self.total if self.total else float('nan') for sensor in SENSORES}
+        return {
+            'total_registros': self.total,
+            'execucoes': 1,
+            'temp_media': media['temperatura'],
+            'temp_min': self.minimo['temperatura'],
+            'temp_max': self.maximo['temperatura'],
+            'umidade_media': media['umidade'],
+            'umidade_min': self.minimo['umidade'],
+            'umidade_max': self.maximo['umidade']
+        }
+
+    def resumo_inteligente(self):
+        """Entradas de ``exibir_resumo_inteligente`` sobre todas as leituras recebidas"""
+        return {
+            'status_counts': pd.Series(dict(self.contagem_status.most_common()), dtype='int64'),
+            'total_registros': self.total,
+            'temp_inicial': float(np.mean(self.temperaturas_iniciais)) if self.temperaturas_iniciais else float('nan'),
+            'temp_final': float(np.mean(self.temperaturas_finais)) if self.temperaturas_finais else float('nan')
+        }
+
+
+class FeedAoVivo:
+    """Assinatura das leituras novas do log serial, compartilhada por todas as sessões do processo.
+
+    ``sondar`` lê e decodifica apenas o delta do log (no máximo uma vez a
+    cada ``intervalo_min`` segundos, quantas sessões houver) e o aplica às
+    janelas. ``seq`` conta as leituras recebidas; cada sessão compara com o
+    último ``seq`` que exibiu para saber quantas são novas. ``epoca`` muda
+    quando a simulação reinicia o log.
+    """
+
+    def __init__(self, caminho_log, capacidade=CAPACIDADE_PADRAO, intervalo_min=INTERVALO_MIN_SONDAGEM):
+        self.leitor = LeitorIncremental(caminho_log)
+        self.capacidade = capacidade
+        self.intervalo_min = intervalo_min
+        self.janela = JanelaDispositivos(capacidade)
+        self.seq = 0
+        self.epoca = 0
+        self.erros = 0
+        self.ultima_sondagem = 0.0
+        self.ultima_leitura = None
+        self._derivados = {}
+        self._trava = threading.Lock()
+
+    def sondar(self):
+        """Aplica as leituras novas do log; retorna (epoca, seq)"""
+        with self._trava:
+            agora = time.monotonic()
+            if agora - self.ultima_sondagem < self.intervalo_min:
+                return self.epoca, self.seq
+            self.ultima_sondagem = agora
+
+            brutos, reiniciado = self.leitor.ler_novos()
+            if reiniciado:
+                self.janela = JanelaDispositivos(self.capacidade)
+                self.seq = 0
+                self.epoca += 1
+            if brutos:
+                payloads, erros, _ = decodificar_payloads(brutos)
+                delta, incompletos = REGISTRO_PADRAO.decodificar(payloads, 'ao_vivo', datetime.now().isoformat())
+                self.erros += erros + incompletos
+                self.janela.aplicar(delta)
+                self.seq += len(delta)
+                if len(delta):
+                    self.ultima_leitura = datetime.now()
+            return self.epoca, self.seq
+
+    def derivado(self, chave, construir):
+        """Resultado de ``construir(janela)`` calculado uma vez por atualização do feed"""
+        with self._trava:
+            versao = (self.epoca, self.seq)
+            existente = self._derivados.get(chave)
+            if existente is None or existente[0] != versao:
+                existente = self._derivados[chave] = (versao, construir(self.janela))
+            return existente[1]
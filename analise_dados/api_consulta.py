@@ -0,0 +1,823 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API de Consulta Hermes Reply
+Serviço HTTP local e somente leitura sobre o histórico, as execuções e os resumos, para ferramentas de BI e alertas
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from armazem_colunar import CacheDatasets, assinatura_arquivo
+from consulta_dados import ConsultaTelemetria
+from esbocos import SENSORES
+from hermes_analytics import HermesAnalytics
+from instrumentacao import METRICAS
+from reamostragem import AGREGACOES, LACUNA_MAXIMA_MS, PREENCHIMENTOS, reamostrar
+from retencao import ARQUIVO_CATALOGO, STATUS_AGREGADOS, assinatura_execucao, diretorio_arquivo, ler_catalogo
+
+try:
+    import pyarrow as pa
+except ImportError:  # sem pyarrow, formato=arrow responde 406
+    pa = None
+
+HOST_PADRAO = '127.0.0.1'
+PORTA_PADRAO = 8765
+VERSAO_API = 1
+FORMATOS = {
+    'json': 'application/json; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'arrow': 'application/vnd.apache.arrow.stream'
+}
+TAMANHO_PAGINA_PADRAO = 1000
+# JSON monta a página inteira em memória; NDJSON e Arrow aceitam tamanho=0 (tudo, em fluxo)
+TAMANHO_PAGINA_MAXIMO = 50_000
+LINHAS_POR_LOTE = 20_000
+JANELA_PADRAO = '1h'
+PASSO_FROTA_PADRAO = '1min'
+# Sem inicio, /frota alinha só o último dia (até fim ou até a última leitura), não o histórico inteiro
+PERIODO_FROTA_PADRAO = '1d'
+TABELAS_FROTA_ABERTAS = 8
+# Respostas prontas guardadas por ETag (as versões antigas saem pelo LRU)
+CACHE_RESPOSTAS_BYTES = 64 * 1024 * 1024
+RESPOSTA_CACHEAVEL_BYTES = 4 * 1024 * 1024
+EXECUCOES_ABERTAS = 16
+# Conexões aguardando aceite (listen) e tempo máximo de uma conexão keep-alive ociosa
+FILA_CONEXOES = 1024
+TEMPO_OCIOSO_S = 30
+ROTA_EXECUCAO = re.compile(r'^/execucoes/([^/]+)/(leituras|agregados)$')
+
+
+class ErroConsulta(ValueError):
+    """Requisição inválida ou dado inexistente; ``status`` é o código HTTP da resposta"""
+
+    def __init__(self, mensagem, status=400):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class Resposta:
+    """Resposta pronta para o transporte: corpo inteiro (``corpo``) ou em fluxo (``partes``)"""
+
+    def __init__(self, status=200, tipo=FORMATOS['json'], corpo=b'', partes=None, cabecalhos=None):
+        self.status = status
+        self.corpo = corpo
+        self.partes = partes
+        self.cabecalhos = dict(cabecalhos or {})
+        if tipo:
+            self.cabecalhos['Content-Type'] = tipo
+
+    @property
+    def tamanho(self):
+        return len(self.corpo)
+
+
+class Fotografia:
+    """Dados de uma fonte numa versão fixa: DataFrame, motor de consulta e a versão que entra no ETag.
+
+    Quem recebe uma fotografia a usa até o fim da requisição (inclusive em
+    respostas em fluxo), mesmo que a ingestão publique outra versão nesse
+    meio tempo. ``arrendamento`` mantém a versão colunar aberta e é liberado
+    quando a última referência à fotografia desaparece.
+    """
+
+    def __init__(self, versao, df, origem=None, indice_tempo=None, arrendamento=None):
+        self.versao = versao
+        self.df = df
+        self.origem = origem
+        self.arrendamento = arrendamento
+        self.consulta = ConsultaTelemetria(df, assinatura=versao, indice_tempo=indice_tempo) if df is not None else None
+
+
+def assinatura_prefixo(dados_path, prefixo):
+    """Versão dos CSVs ``<prefixo>*.csv`` e do catálogo da retenção (chave de cache e de ETag)"""
+    arquivos = []
+    if os.path.isdir(dados_path):
+        with os.scandir(dados_path) as entradas:
+            for entrada in entradas:
+                if entrada.name.startswith(prefixo) and entrada.name.endswith('.csv'):
+                    stat = entrada.stat()
+                    arquivos.append((entrada.name, stat.st_mtime_ns, stat.st_size))
+    catalogo = assinatura_arquivo(os.path.join(diretorio_arquivo(dados_path), ARQUIVO_CATALOGO))
+    conteudo = repr((sorted(arquivos), catalogo)).encode('utf-8')
+    return hashlib.sha1(conteudo).hexdigest()[:16]
+
+
+def decimal_float32(valores):
+    """float32 como o decimal gravado (23.2, não 23.200000762939453), em float64"""
+    return np.asarray(valores).astype(str).astype('float64')
+
+
+def agregar_janelas(df, janela):
+    """Uma linha por dispositivo e janela de tempo: leituras, média/mín/máx dos sensores e contagem de status.
+
+    Linhas que já são agregados da retenção (coluna ``leituras``) pesam
+    pelo total de leituras que representam; nelas, mín/máx são os das
+    médias de cada hora agregada.
+    """
+    pesos = df['leituras'].to_numpy(dtype='float64') if 'leituras' in df.columns else np.ones(len(df))
+    base = {
+        'device_id': df['device_id'].to_numpy(),
+        'inicio_janela': df['timestamp_simulacao'].dt.floor(janela).to_numpy(),
+        'leituras': pesos
+    }
+    agregacoes = {'leituras': ('leituras', 'sum')}
+    for sensor in SENSORES:
+        valores = pd.to_numeric(df[sensor], errors='coerce').to_numpy()
+        valores = decimal_float32(valores) if valores.dtype == np.float32 else valores.astype('float64')
+        presente = ~np.isnan(valores)
+        base[sensor] = valores
+        base[f'_{sensor}_soma'] = np.where(presente, valores * pesos, 0.0)
+        base[f'_{sensor}_peso'] = np.where(presente, pesos, 0.0)
+        agregacoes.update({
+            f'_{sensor}_soma': (f'_{sensor}_soma', 'sum'), f'_{sensor}_peso': (f'_{sensor}_peso', 'sum'),
+            f'{sensor}_min': (sensor, 'min'), f'{sensor}_max': (sensor, 'max')
+        })
+    status = df['system_status'].to_numpy(dtype=object)
+    for valor, coluna in STATUS_AGREGADOS.items():
+        base[coluna] = np.where(status == valor, pesos, 0.0)
+        agregacoes[coluna] = (coluna, 'sum')
+
+    agregado = pd.DataFrame(base).groupby(['device_id', 'inicio_janela'], sort=True).agg(**agregacoes)
+    colunas = ['leituras']
+    for sensor in SENSORES:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            agregado[f'{sensor}_media'] = agregado.pop(f'_{sensor}_soma') / agregado.pop(f'_{sensor}_peso')
+        colunas += [f'{sensor}_media', f'{sensor}_min', f'{sensor}_max']
+    colunas += list(STATUS_AGREGADOS.values())
+    agregado = agregado[colunas].reset_index()
+    for coluna in ['leituras', *STATUS_AGREGADOS.values()]:
+        agregado[coluna] = agregado[coluna].astype('int64')
+    return agregado
+
+
+class FonteTelemetria:
+    """Acesso ao armazém compartilhado por todas as threads do servidor.
+
+    Faz o papel de um pool de conexões: o histórico é arrendado uma vez do
+    armazém colunar (mapeado em memória, sem cópia por requisição) ou lido
+    do CSV, e servido a todas as requisições até a ingestão gravar outra
+    versão; a verificação por requisição é um ``stat`` do CSV. Execuções e
+    tabelas por execução ficam num cache pequeno, por assinatura.
+    """
+
+    def __init__(self, dados_path=None):
+        self.analytics = HermesAnalytics(dados_path=dados_path)
+        self.dados_path = self.analytics.dados_path
+        self.datasets = CacheDatasets(self.dados_path)
+        self._historico = None
+        self._execucoes = OrderedDict()
+        self._tabelas = {}
+        self._trava = threading.Lock()
+
+    def historico(self):
+        """Fotografia da versão atual do histórico"""
+        origem = assinatura_arquivo(os.path.join(self.dados_path, 'hermes_historico_completo.csv'))
+        atual = self._historico
+        if atual is not None and atual.origem == origem:
+            return atual
+        with self._trava:
+            atual = self._historico
+            if atual is None or atual.origem != origem:
+                arrendamento = self.datasets.adquirir('historico', origem)
+                if arrendamento is not None:
+                    atual = Fotografia(f'colunar-{arrendamento.versao}', arrendamento.df, origem,
+                                       arrendamento.indice_tempo, arrendamento)
+                else:
+                    atual = Fotografia(f'csv-{origem[0]}-{origem[1]}', self.analytics.carregar_dados_historicos(agregados=False), origem)
+                # A versão anterior continua válida para quem já a recebeu
+                self._historico = atual
+        return atual
+
+    def execucao(self, execucao_id):
+        """Fotografia de uma execução em qualquer camada da retenção (None se não existir)"""
+        assinatura = assinatura_execucao(self.dados_path, execucao_id)
+        if assinatura[-1] is None:
+            return None
+        with self._trava:
+            atual = self._execucoes.get(execucao_id)
+            if atual is not None and atual.origem == assinatura:
+                self._execucoes.move_to_end(execucao_id)
+                return atual
+        df = self.analytics.carregar_execucao_especifica(execucao_id)
+        if df is None:
+            return None
+        versao = hashlib.sha1(repr(assinatura).encode('utf-8')).hexdigest()[:16]
+        atual = Fotografia(f'{execucao_id}-{versao}', df, assinatura)
+        with self._trava:
+            self._execucoes[execucao_id] = atual
+            while len(self._execucoes) > EXECUCOES_ABERTAS:
+                self._execucoes.popitem(last=False)
+        return atual
+
+    def tabela(self, prefixo):
+        """Fotografia de uma tabela de uma linha por execução (resumos, qualidade ou a lista de execuções)"""
+        assinatura = assinatura_prefixo(self.dados_path, prefixo)
+        atual = self._tabelas.get(prefixo)
+        if atual is not None and atual.origem == assinatura:
+            return atual
+        if prefixo == 'hermes_data_':
+            df = self.listar_execucoes()
+        else:
+            df = self.analytics.carregar_linhas_por_execucao(prefixo)
+            df = pd.DataFrame() if df is None else df
+        atual = Fotografia(assinatura, df, assinatura)
+        self._tabelas[prefixo] = atual
+        return atual
+
+    def listar_execucoes(self):
+        """Execuções disponíveis com a camada em que estão (quente, compactada ou agregada)"""
+        catalogo = ler_catalogo(self.dados_path)
+        execucoes = self.analytics.listar_execucoes_disponiveis()
+        return pd.DataFrame({
+            'execucao_id': execucoes,
+            'camada': [catalogo.get(e, {}).get('camada', 'quente') for e in execucoes],
+            'registros': [catalogo.get(e, {}).get('registros') for e in execucoes]
+        }, columns=['execucao_id', 'camada', 'registros'])
+
+
+class CacheRespostas:
+    """Respostas serializadas por ETag, em LRU limitado por bytes.
+
+    Requisições simultâneas pelo mesmo ETag montam a resposta uma única
+    vez: a primeira monta e as demais esperam e a recebem pronta.
+    """
+
+    def __init__(self, limite_bytes=CACHE_RESPOSTAS_BYTES):
+        self.limite_bytes = limite_bytes
+        self.bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self._respostas = OrderedDict()
+        self._montando = {}
+        self._trava = threading.Lock()
+
+    def _obter(self, etag):
+        with self._trava:
+            resposta = self._respostas.get(etag)
+            if resposta is not None:
+                self._respostas.move_to_end(etag)
+                self.acertos += 1
+            return resposta
+
+    def obter_ou_montar(self, etag, montar):
+        """Resposta do cache ou ``montar()``, guardada quando cabe no cache"""
+        resposta = self._obter(etag)
+        if resposta is not None:
+            return resposta
+        with self._trava:
+            trava_etag = self._montando.setdefault(etag, threading.Lock())
+        with trava_etag:
+            resposta = self._obter(etag)  # montada por quem segurava a trava
+            if resposta is not None:
+                return resposta
+            try:
+                resposta = montar()
+            finally:
+                with self._trava:
+                    self._montando.pop(etag, None)
+                    self.falhas += 1
+            self._guardar(etag, resposta)
+            return resposta
+
+    def _guardar(self, etag, resposta):
+        if resposta.partes is not None or resposta.tamanho > RESPOSTA_CACHEAVEL_BYTES:
+            return
+        with self._trava:
+            if etag in self._respostas:
+                return
+            self._respostas[etag] = resposta
+            self.bytes += resposta.tamanho
+            while self.bytes > self.limite_bytes:
+                _, antiga = self._respostas.popitem(last=False)
+                self.bytes -= antiga.tamanho
+
+    def estado(self):
+        with self._trava:
+            return {'respostas': len(self._respostas), 'bytes': self.bytes,
+                    'acertos': self.acertos, 'falhas': self.falhas}
+
+
+class CacheTabelas:
+    """Tabelas derivadas por chave (versão dos dados e parâmetros), em LRU limitado pelo número de tabelas.
+
+    As páginas de uma mesma consulta têm ETags diferentes, mas saem da mesma
+    tabela: ela é montada uma vez, como em ``CacheRespostas``.
+    """
+
+    def __init__(self, limite=TABELAS_FROTA_ABERTAS):
+        self.limite = limite
+        self._tabelas = OrderedDict()
+        self._montando = {}
+        self._trava = threading.Lock()
+
+    def _obter(self, chave):
+        with self._trava:
+            tabela = self._tabelas.get(chave)
+            if tabela is not None:
+                self._tabelas.move_to_end(chave)
+            return tabela
+
+    def obter_ou_montar(self, chave, montar):
+        tabela = self._obter(chave)
+        if tabela is not None:
+            return tabela
+        with self._trava:
+            trava_chave = self._montando.setdefault(chave, threading.Lock())
+        with trava_chave:
+            tabela = self._obter(chave)
+            if tabela is not None:
+                return tabela
+            try:
+                tabela = montar()
+            finally:
+                with self._trava:
+                    self._montando.pop(chave, None)
+            with self._trava:
+                self._tabelas[chave] = tabela
+                while len(self._tabelas) > self.limite:
+                    self._tabelas.popitem(last=False)
+            return tabela
+
+
+# === PARÂMETROS ===
+def _lista(parametros, nome):
+    """Valores de um parâmetro repetido ou separado por vírgulas"""
+    return [valor for bruto in parametros.get(nome, []) for valor in bruto.split(',') if valor]
+
+
+def _unico(parametros, nome, padrao=None):
+    valores = parametros.get(nome)
+    return valores[-1] if valores else padrao
+
+
+def _inteiro(parametros, nome, padrao, minimo=0, maximo=None):
+    bruto = _unico(parametros, nome)
+    if bruto is None:
+        return padrao
+    try:
+        valor = int(bruto)
+    except ValueError:
+        raise ErroConsulta(f"'{nome}' deve ser um inteiro: {bruto}")
+    if valor < minimo or (maximo is not None and valor > maximo):
+        raise ErroConsulta(f"'{nome}' fora do intervalo [{minimo}, {maximo if maximo is not None else '∞'}]: {valor}")
+    return valor
+
+
+def _duracao(parametros, nome, padrao):
+    """Duração positiva no formato do pandas (5s, 1min, 1h)"""
+    bruto = _unico(parametros, nome, padrao)
+    try:
+        duracao = pd.Timedelta(bruto)
+    except ValueError:
+        raise ErroConsulta(f"'{nome}' não é uma duração válida: {bruto} (ex.: 30s, 5min, 1h)")
+    if duracao is pd.NaT or duracao < pd.Timedelta(milliseconds=1):
+        raise ErroConsulta(f"'{nome}' deve ser positivo: {bruto}")
+    return duracao
+
+
+def _instante(parametros, nome):
+    """Data/hora ISO 8601 ou milissegundos desde a época; com fuso é convertida para UTC sem fuso"""
+    bruto = _unico(parametros, nome)
+    if bruto is None:
+        return None
+    try:
+        instante = pd.Timestamp(int(bruto), unit='ms') if bruto.lstrip('-').isdigit() else pd.Timestamp(bruto)
+    except ValueError:
+        raise ErroConsulta(f"'{nome}' não é uma data/hora válida: {bruto}")
+    if instante is pd.NaT:
+        raise ErroConsulta(f"'{nome}' não é uma data/hora válida: {bruto}")
+    return instante.tz_convert(None) if instante.tzinfo is not None else instante
+
+
+def _formato(parametros, aceita):
+    """Formato pelo parâmetro ``formato`` ou, na falta dele, pelo cabeçalho Accept"""
+    formato = _unico(parametros, 'formato')
+    if formato is None:
+        aceita = aceita or ''
+        formato = next((nome for nome, tipo in FORMATOS.items()
+                        if nome != 'json' and tipo.split(';')[0] in aceita), 'json')
+    if formato not in FORMATOS:
+        raise ErroConsulta(f"formato desconhecido: {formato} (use {', '.join(FORMATOS)})")
+    if formato == 'arrow' and pa is None:
+        raise ErroConsulta("formato arrow requer o pacote 'pyarrow'", 406)
+    return formato
+
+
+def _etag(*partes):
+    return '"' + hashlib.sha1(repr(partes).encode('utf-8')).hexdigest()[:24] + '"'
+
+
+def _corresponde(etag, se_nao_corresponder):
+    """If-None-Match: lista de ETags (fracos ou fortes) ou ``*``"""
+    if not se_nao_corresponder:
+        return False
+    candidatos = [c.strip().removeprefix('W/') for c in se_nao_corresponder.split(',')]
+    return '*' in candidatos or etag in candidatos
+
+
+# === SERIALIZAÇÃO ===
+def _para_texto(df):
+    """DataFrame pronto para JSON: float32 pelo decimal gravado, datas ISO 8601 em milissegundos"""
+    flutuantes = [c for c in df.columns if df[c].dtype == np.float32]
+    if flutuantes:
+        df = df.assign(**{c: decimal_float32(df[c].to_numpy()) for c in flutuantes})
+    return df
+
+
+def _json_registros(df):
+    return _para_texto(df).to_json(orient='records', date_format='iso', date_unit='ms', force_ascii=False)
+
+
+def _ndjson(df):
+    if not len(df):
+        return b''
+    texto = _para_texto(df).to_json(orient='records', lines=True, date_format='iso', date_unit='ms', force_ascii=False)
+    return (texto if texto.endswith('\n') else texto + '\n').encode('utf-8')
+
+
+def _partes_arrow(lotes):
+    """Fluxo IPC do Arrow: o esquema e um record batch por lote, cada um enviado assim que fica pronto"""
+    saida = io.BytesIO()
+    escritor = esquema = None
+    for lote in lotes:
+        tabela = pa.Table.from_pandas(lote, schema=esquema, preserve_index=False)
+        if escritor is None:
+            esquema = tabela.schema
+            escritor = pa.ipc.new_stream(saida, esquema)
+        escritor.write_table(tabela)
+        yield saida.getvalue()
+        saida.seek(0)
+        saida.truncate()
+    if escritor is not None:
+        escritor.close()
+        yield saida.getvalue()
+
+
+class ApiConsulta:
+    """Rotas da API, independentes do transporte HTTP.
+
+    ``responder`` recebe o caminho com a query string e os cabeçalhos
+    ``Accept`` e ``If-None-Match`` e devolve uma ``Resposta``. O ETag de
+    cada resposta é derivado da versão dos dados e dos parâmetros, então é
+    calculado antes de qualquer consulta: revalidações respondem 304 sem
+    tocar nos dados e respostas repetidas saem prontas do cache.
+    """
+
+    def __init__(self, fonte):
+        self.fonte = fonte
+        self.respostas = CacheRespostas()
+        self.tabelas_frota = CacheTabelas()
+        self.rotas = {
+            '/saude': self.saude,
+            '/execucoes': self.execucoes,
+            '/leituras': self.leituras,
+            '/agregados': self.agregados,
+            '/resumos': self.resumos,
+            '/qualidade': self.qualidade,
+            '/frota': self.frota,
+            '/metrics': self.metricas
+        }
+
+    def responder(self, caminho, aceita=None, se_nao_corresponder=None):
+        inicio = time.perf_counter()
+        url = urlsplit(caminho)
+        parametros = parse_qs(url.query)
+        rota = url.path.rstrip('/') or '/'
+        try:
+            execucao = ROTA_EXECUCAO.match(rota)
+            if execucao:
+                resposta = self.execucao(execucao.group(1), execucao.group(2), parametros, aceita, se_nao_corresponder)
+            elif rota in self.rotas:
+                resposta = self.rotas[rota](parametros, aceita, se_nao_corresponder)
+            else:
+                raise ErroConsulta(f"rota desconhecida: {rota} (disponíveis: {', '.join(self.rotas)}, "
+                                   f"/execucoes/<id>/leituras, /execucoes/<id>/agregados)", 404)
+        except ErroConsulta as e:
+            resposta = self._erro(e.status, str(e))
+        except Exception as e:
+            print(f"[ERRO] Falha ao responder {caminho}: {e}")
+            resposta = self._erro(500, 'erro interno')
+        METRICAS.contar(f'api_respostas_{resposta.status}')
+        METRICAS.observar('api_requisicao_segundos', time.perf_counter() - inicio)
+        return resposta
+
+    def _erro(self, status, mensagem):
+        corpo = json.dumps({'erro': mensagem, 'status': status}, ensure_ascii=False).encode('utf-8')
+        return Resposta(status, corpo=corpo)
+
+    def _versionada(self, versao, rota, parametros, formato, se_nao_corresponder, montar):
+        """ETag, revalidação (304) e cache de respostas em volta de ``montar()``"""
+        etag = _etag(VERSAO_API, rota, versao, sorted(parametros.items()), formato)
+        cabecalhos = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept'}
+        if _corresponde(etag, se_nao_corresponder):
+            return Resposta(304, tipo=None, cabecalhos=cabecalhos)
+        def montar_versionada():
+            resposta = montar()
+            resposta.cabecalhos.update(cabecalhos)
+            return resposta
+
+        return self.respostas.obter_ou_montar(etag, montar_versionada)
+
+    # === ROTAS ===
+    def saude(self, parametros, aceita, se_nao_corresponder):
+        historico = self.fonte.historico()
+        corpo = {
+            'status': 'ok' if historico.df is not None else 'sem_historico',
+            'versao_api': VERSAO_API,
+            'historico': {'versao': historico.versao, 'linhas': 0 if historico.df is None else len(historico.df)},
+            'versoes_abertas': {f'{nome}@{versao}': referencias
+                                for (nome, versao), referencias in self.fonte.datasets.versoes_abertas().items()},
+            'cache_respostas': self.respostas.estado()
+        }
+        return Resposta(corpo=json.dumps(corpo, ensure_ascii=False).encode('utf-8'),
+                        cabecalhos={'Cache-Control': 'no-store'})
+
+    def metricas(self, parametros, aceita, se_nao_corresponder):
+        if not METRICAS.ativo:
+            raise ErroConsulta("métricas desligadas (inicie com --metricas ou HERMES_METRICAS=1)", 404)
+        return Resposta(tipo='text/plain; version=0.0.4; charset=utf-8', corpo=METRICAS.para_prometheus().encode('utf-8'),
+                        cabecalhos={'Cache-Control': 'no-store'})
+
+    def leituras(self, parametros, aceita, se_nao_corresponder):
+        return self._consultar(self.fonte.historico(), '/leituras', parametros, aceita, se_nao_corresponder)
+
+    def agregados(self, parametros, aceita, se_nao_corresponder):
+        return self._consultar(self.fonte.historico(), '/agregados', parametros, aceita, se_nao_corresponder,
+                               agregar=True)
+
+    def execucao(self, execucao_id, tipo, parametros, aceita, se_nao_corresponder):
+        fotografia = self.fonte.execucao(execucao_id)
+        if fotografia is None:
+            raise ErroConsulta(f"execução não encontrada: {execucao_id}", 404)
+        return self._consultar(fotografia, f'/execucoes/{execucao_id}/{tipo}', parametros, aceita,
+                               se_nao_corresponder, agregar=tipo == 'agregados')
+
+    def execucoes(self, parametros, aceita, se_nao_corresponder):
+        return self._tabela('hermes_data_', '/execucoes', parametros, aceita, se_nao_corresponder)
+
+    def resumos(self, parametros, aceita, se_nao_corresponder):
+        return self._tabela('hermes_resumo_', '/resumos', parametros, aceita, se_nao_corresponder)
+
+    def qualidade(self, parametros, aceita, se_nao_corresponder):
+        return self._tabela('hermes_qualidade_', '/qualidade', parametros, aceita, se_nao_corresponder)
+
+    def frota(self, parametros, aceita, se_nao_corresponder):
+        return self._frota(self.fonte.historico(), '/frota', parametros, aceita, se_nao_corresponder)
+
+    # === CONSULTAS ===
+    def _consultar(self, fotografia, rota, parametros, aceita, se_nao_corresponder, agregar=False):
+        """Leituras (ou agregados por janela) filtradas por tempo, dispositivo, status e execução"""
+        if fotografia.df is None:
+            raise ErroConsulta("histórico não encontrado: execute uma simulação primeiro", 404)
+        formato = _formato(parametros, aceita)
+
+        def montar():
+            df, consulta = fotografia.df, fotografia.consulta
+            colunas = _lista(parametros, 'colunas') or None
+            desconhecidas = [c for c in colunas or [] if c not in df.columns]
+            if desconhecidas and not agregar:
+                raise ErroConsulta(f"colunas desconhecidas: {', '.join(desconhecidas)}")
+            inicio, fim = _instante(parametros, 'inicio'), _instante(parametros, 'fim')
+            status = _lista(parametros, 'status')
+            mascara = consulta.criar_mascara(
+                execucoes=_lista(parametros, 'execucao'),
+                status=status or None,
+                dispositivos=_lista(parametros, 'dispositivo'),
+                intervalo=(inicio, fim) if inicio is not None or fim is not None else None
+            )
+            ascendente = _unico(parametros, 'ordem', 'asc') != 'desc'
+            posicoes = consulta.posicoes_ordenadas(mascara, ascendente)
+
+            if not agregar:
+                return self._paginar(len(posicoes), lambda a, b: df.iloc[posicoes[a:b]][colunas or list(df.columns)],
+                                     rota, parametros, formato, fotografia.versao)
+
+            try:
+                janela = pd.Timedelta(_unico(parametros, 'janela', JANELA_PADRAO))
+            except ValueError:
+                raise ErroConsulta(f"janela inválida: {_unico(parametros, 'janela')} (ex.: 5min, 1h, 1d)")
+            if janela <= pd.Timedelta(0):
+                raise ErroConsulta("a janela deve ser positiva")
+            agregado = agregar_janelas(df.iloc[np.sort(posicoes)], janela)
+            if not ascendente:
+                agregado = agregado.sort_values(['inicio_janela', 'device_id'], ascending=False, ignore_index=True)
+            if colunas:
+                desconhecidas = [c for c in colunas if c not in agregado.columns]
+                if desconhecidas:
+                    raise ErroConsulta(f"colunas desconhecidas: {', '.join(desconhecidas)}")
+                agregado = agregado[colunas]
+            return self._paginar(len(agregado), lambda a, b: agregado.iloc[a:b], rota, parametros, formato,
+                                 fotografia.versao)
+
+        return self._versionada(fotografia.versao, rota, parametros, formato, se_nao_corresponder, montar)
+
+    def _frota(self, fotografia, rota, parametros, aceita, se_nao_corresponder):
+        """Frota alinhada numa grade comum: estatísticas entre dispositivos por instante (ou uma linha por dispositivo)
+
+        ``inicio``/``fim`` se aplicam ao relógio comum, depois do alinhamento,
+        e não ao ``timestamp_simulacao`` bruto de cada dispositivo. Sem
+        ``inicio``, a grade cobre só ``periodo`` (padrão 1d) até o fim. A
+        tabela alinhada fica em cache por versão dos dados e parâmetros de
+        alinhamento; as páginas saem dela.
+        """
+        if fotografia.df is None:
+            raise ErroConsulta("histórico não encontrado: execute uma simulação primeiro", 404)
+        formato = _formato(parametros, aceita)
+
+        def montar():
+            passo = _duracao(parametros, 'passo', PASSO_FROTA_PADRAO)
+            lacuna = _duracao(parametros, 'lacuna', f'{LACUNA_MAXIMA_MS}ms')
+            agregacao = _unico(parametros, 'agregacao', 'media')
+            if agregacao not in AGREGACOES:
+                raise ErroConsulta(f"agregação inválida: {agregacao} (use {', '.join(AGREGACOES)})")
+            preenchimento = _unico(parametros, 'preenchimento', 'nenhum')
+            if preenchimento not in PREENCHIMENTOS:
+                raise ErroConsulta(f"preenchimento inválido: {preenchimento} (use {', '.join(PREENCHIMENTOS)})")
+            visao = _unico(parametros, 'visao', 'frota')
+            if visao not in ('frota', 'dispositivos'):
+                raise ErroConsulta(f"visão inválida: {visao} (use frota ou dispositivos)")
+            sensores = _lista(parametros, 'sensor') or SENSORES
+            desconhecidos = [s for s in sensores if s not in SENSORES]
+            if desconhecidos:
+                raise ErroConsulta(f"sensores desconhecidos: {', '.join(desconhecidos)} (use {', '.join(SENSORES)})")
+
+            periodo = _duracao(parametros, 'periodo', PERIODO_FROTA_PADRAO)
+            inicio, fim = _instante(parametros, 'inicio'), _instante(parametros, 'fim')
+            execucoes, dispositivos = _lista(parametros, 'execucao'), _lista(parametros, 'dispositivo')
+            milissegundos = pd.Timedelta(milliseconds=1)
+            passo_ms, lacuna_ms, periodo_ms = passo // milissegundos, lacuna // milissegundos, periodo // milissegundos
+            inicio_ms = None if inicio is None else inicio.value // 10 ** 6
+            fim_ms = None if fim is None else fim.value // 10 ** 6
+
+            def alinhar():
+                # Só filtros que não cortam a sequência de um dispositivo: o alinhamento precisa de todos os boots
+                mascara = fotografia.consulta.criar_mascara(execucoes=execucoes, dispositivos=dispositivos)
+                try:
+                    alinhada = reamostrar(fotografia.df[mascara], passo_ms, agregacao, preenchimento, lacuna_ms,
+                                          sensores, inicio_ms, fim_ms, periodo_ms)
+                except ValueError as e:
+                    raise ErroConsulta(str(e))
+                return alinhada.caracteristicas_frota() if visao == 'frota' else alinhada.para_dataframe()
+
+            chave = (fotografia.versao, visao, passo_ms, agregacao, preenchimento, lacuna_ms, tuple(sensores),
+                     tuple(sorted(execucoes)), tuple(sorted(dispositivos)), inicio_ms, fim_ms, periodo_ms)
+            tabela = self.tabelas_frota.obter_ou_montar(chave, alinhar)
+            total = len(tabela)
+            descendente = _unico(parametros, 'ordem', 'asc') == 'desc'
+            return self._paginar(total, lambda a, b: tabela.iloc[total - b:total - a].iloc[::-1] if descendente
+                                 else tabela.iloc[a:b], rota, parametros, formato, fotografia.versao)
+
+        return self._versionada(fotografia.versao, rota, parametros, formato, se_nao_corresponder, montar)
+
+    def _tabela(self, prefixo, rota, parametros, aceita, se_nao_corresponder):
+        fotografia = self.fonte.tabela(prefixo)
+        formato = _formato(parametros, aceita)
+        df = fotografia.df
+        return self._versionada(fotografia.versao, rota, parametros, formato, se_nao_corresponder,
+                                lambda: self._paginar(len(df), lambda a, b: df.iloc[a:b], rota, parametros,
+                                                      formato, fotografia.versao))
+
+    def _paginar(self, total, obter, rota, parametros, formato, versao):
+        """Serializa uma página (ou tudo, com tamanho=0 em NDJSON/Arrow) de ``obter(inicio, fim)``.
+
+        Páginas até ``LINHAS_POR_LOTE`` linhas saem num corpo único (e vão
+        para o cache de respostas); maiores são enviadas em fluxo, um lote
+        por vez, sem montar a resposta inteira em memória.
+        """
+        fluxo = formato != 'json'
+        tamanho = _inteiro(parametros, 'tamanho', TAMANHO_PAGINA_PADRAO, 0 if fluxo else 1,
+                           None if fluxo else TAMANHO_PAGINA_MAXIMO)
+        pagina = _inteiro(parametros, 'pagina', 1, 1)
+        if tamanho == 0:
+            inicio, fim, paginas = 0, total, 1
+        else:
+            inicio, fim = (pagina - 1) * tamanho, min(total, pagina * tamanho)
+            paginas = max(1, -(-total // tamanho))
+        fim = max(inicio, fim)
+
+        cabecalhos = {'X-Total-Registros': str(total), 'X-Pagina': str(pagina), 'X-Total-Paginas': str(paginas),
+                      'X-Versao-Dados': versao}
+        if tamanho and pagina < paginas:
+            proxima = {nome: valores for nome, valores in parametros.items() if nome != 'pagina'}
+            proxima['pagina'] = [str(pagina + 1)]
+            cabecalhos['Link'] = f'<{rota}?{urlencode(proxima, doseq=True)}>; rel="next"'
+
+        if formato == 'json':
+            meta = json.dumps({'pagina': pagina, 'tamanho_pagina': tamanho, 'total_registros': total,
+                               'total_paginas': paginas, 'versao_dados': versao}, ensure_ascii=False)
+            corpo = meta[:-1] + ', "dados": ' + _json_registros(obter(inicio, fim)) + '}'
+            return Resposta(corpo=corpo.encode('utf-8'), cabecalhos=cabecalhos)
+
+        lotes = (obter(a, min(fim, a + LINHAS_POR_LOTE)) for a in range(inicio, max(fim, inicio + 1), LINHAS_POR_LOTE))
+        if formato == 'ndjson':
+            partes = (_ndjson(lote) for lote in lotes)
+        else:
+            partes = _partes_arrow(lotes)
+        if fim - inicio <= LINHAS_POR_LOTE:
+            return Resposta(tipo=FORMATOS[formato], corpo=b''.join(partes), cabecalhos=cabecalhos)
+        return Resposta(tipo=FORMATOS[formato], partes=partes, cabecalhos=cabecalhos)
+
+
+# === TRANSPORTE HTTP ===
+class ManipuladorConsulta(BaseHTTPRequestHandler):
+    """Requisições GET/HEAD; conexões keep-alive (HTTP/1.1) e corpo em partes para respostas em fluxo"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = f'HermesConsulta/{VERSAO_API}'
+    timeout = TEMPO_OCIOSO_S
+
+    def do_GET(self):
+        self._atender(enviar_corpo=True)
+
+    def do_HEAD(self):
+        self._atender(enviar_corpo=False)
+
+    def _atender(self, enviar_corpo):
+        resposta = self.server.api.responder(self.path, self.headers.get('Accept'), self.headers.get('If-None-Match'))
+        self.send_response(resposta.status)
+        for nome, valor in resposta.cabecalhos.items():
+            self.send_header(nome, valor)
+
+        if resposta.partes is None:
+            if resposta.status != 304:
+                self.send_header('Content-Length', str(resposta.tamanho))
+            self.end_headers()
+            if enviar_corpo and resposta.corpo:
+                self.wfile.write(resposta.corpo)
+            return
+
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        if not enviar_corpo:
+            return
+        try:
+            for parte in resposta.partes:
+                if parte:
+                    self.wfile.write(b'%X\r\n%s\r\n' % (len(parte), parte))
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        except Exception as e:
+            # Cabeçalhos já enviados: encerra a conexão sem o bloco final, o cliente vê a resposta incompleta
+            print(f"[ERRO] Falha durante a resposta em fluxo de {self.path}: {e}")
+            self.close_connection = True
+
+    def log_message(self, formato, *args):
+        if self.server.verboso:
+            super().log_message(formato, *args)
+
+
+class ServidorConsulta(ThreadingHTTPServer):
+    """Uma thread por conexão, todas sobre a mesma ``FonteTelemetria``"""
+
+    request_queue_size = FILA_CONEXOES
+
+    def __init__(self, endereco, api, verboso=False):
+        super().__init__(endereco, ManipuladorConsulta)
+        self.api = api
+        self.verboso = verboso
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API HTTP local e somente leitura sobre os dados Hermes Reply')
+    parser.add_argument('--host', default=HOST_PADRAO, help='endereço de escuta (padrão: só a máquina local)')
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--dados', default=None, help='diretório dados_simulacao (padrão: o do repositório)')
+    parser.add_argument('--metricas', action='store_true', help='expõe /metrics (Prometheus) com latências e respostas')
+    parser.add_argument('--verboso', action='store_true', help='registra cada requisição no terminal')
+    args = parser.parse_args()
+
+    if args.metricas:
+        METRICAS.ativar()
+    fonte = FonteTelemetria(args.dados)
+    servidor = ServidorConsulta((args.host, args.porta), ApiConsulta(fonte), args.verboso)
+    historico = fonte.historico()
+    versao, linhas = historico.versao, 0 if historico.df is None else len(historico.df)
+    del historico  # uma referência aqui prenderia a versão inicial durante todo o serve_forever
+    print(f"[HERMES] API de consulta em http://{args.host}:{servidor.server_port} "
+          f"(histórico {versao}, {linhas:,} leituras)")
+    print("[INFO] Rotas: /leituras, /agregados, /execucoes, /execucoes/<id>/leituras, "
+          "/execucoes/<id>/agregados, /frota, /resumos, /qualidade, /saude")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[INFO] API encerrada")
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
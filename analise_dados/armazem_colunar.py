@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Armazém Colunar Versionado Hermes Reply
+Datasets publicados pela ingestão como colunas .npy mapeadas em memória, compartilhados entre sessões e processos
+"""
+
+import json
+import os
+import shutil
+import threading
+import weakref
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DIRETORIO_COLUNAR = 'colunar'
+ARQUIVO_MANIFESTO = 'manifesto.json'
+ARQUIVO_INDICE_TEMPO = '_indice_tempo.npy'
+VERSAO_FORMATO = 1
+# Versões mantidas em disco além da atual (leitores de outros processos ainda podem estar nelas)
+MANTER_VERSOES = 2
+
+
+def assinatura_arquivo(caminho):
+    """Versão do arquivo em disco (mtime, tamanho); muda a cada gravação da ingestão"""
+    stat = os.stat(caminho) if os.path.exists(caminho) else None
+    return (stat.st_mtime_ns, stat.st_size) if stat else (None, None)
+
+
+def diretorio_dataset(dados_path, nome):
+    """Diretório com as versões publicadas de um dataset"""
+    return os.path.join(dados_path, DIRETORIO_COLUNAR, nome)
+
+
+def ler_manifesto(base):
+    """Manifesto da versão atual do dataset (None quando nada foi publicado)"""
+    try:
+        with open(os.path.join(base, ARQUIVO_MANIFESTO), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# === PUBLICAÇÃO (INGESTÃO) ===
+def _gravar_coluna(diretorio, coluna, serie):
+    """Grava uma coluna como .npy e retorna seus metadados"""
+    caminho = os.path.join(diretorio, f'{coluna}.npy')
+    if isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(serie) or serie.dtype == object:
+        serie = serie.astype('category')
+        np.save(caminho, serie.cat.codes.to_numpy())
+        return {'tipo': 'categoria', 'categorias': serie.cat.categories.tolist()}
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        unidade = np.datetime_data(serie.dtype)[0]
+        np.save(caminho, serie.to_numpy().view('int64'))
+        return {'tipo': 'datahora', 'unidade': unidade}
+    if isinstance(serie.dtype, pd.api.extensions.ExtensionDtype):
+        # Inteiros anuláveis (Int64): valores + máscara de ausentes
+        np.save(caminho, serie.to_numpy(dtype='int64', na_value=0))
+        np.save(os.path.join(diretorio, f'{coluna}.nulos.npy'), serie.isna().to_numpy())
+        return {'tipo': 'inteiro_anulavel'}
+    np.save(caminho, serie.to_numpy())
+    return {'tipo': 'numerico'}
+
+
+def publicar_dataset(dados_path, nome, df, origem=None, coluna_tempo='timestamp_simulacao'):
+    """Publica uma nova versão do dataset no armazém colunar.
+
+    As colunas são gravadas em um diretório temporário, que é renomeado para
+    ``v<versao>``; só então o manifesto é substituído de forma atômica.
+    Leitores veem a versão anterior completa ou a nova completa, nunca uma
+    mistura. ``origem`` é a assinatura do CSV de onde os dados vieram, usada
+    pelos leitores para detectar um armazém desatualizado.
+    """
+    base = diretorio_dataset(dados_path, nome)
+    os.makedirs(base, exist_ok=True)
+
+    atual = ler_manifesto(base)
+    versao = atual['versao'] + 1 if atual else 1
+    while os.path.exists(os.path.join(base, f'v{versao}')):
+        versao += 1
+
+    temporario = os.path.join(base, f'.v{versao}.{os.getpid()}.tmp')
+    os.makedirs(temporario)
+    try:
+        colunas = {coluna: _gravar_coluna(temporario, coluna, df[coluna]) for coluna in df.columns}
+        if coluna_tempo in df.columns:
+            chaves = df[coluna_tempo]
+            chaves = chaves.to_numpy().view('int64') if pd.api.types.is_datetime64_any_dtype(chaves) else chaves.to_numpy()
+            np.save(os.path.join(temporario, ARQUIVO_INDICE_TEMPO), np.argsort(chaves, kind='stable'))
+        os.replace(temporario, os.path.join(base, f'v{versao}'))
+    except BaseException:
+        shutil.rmtree(temporario, ignore_errors=True)
+        raise
+
+    manifesto = {
+        'formato': VERSAO_FORMATO,
+        'versao': versao,
+        'diretorio': f'v{versao}',
+        'linhas': len(df),
+        'origem': list(origem) if origem is not None else None,
+        'publicado_em': datetime.now().isoformat(),
+        'colunas': colunas
+    }
+    caminho_manifesto = os.path.join(base, ARQUIVO_MANIFESTO)
+    with open(caminho_manifesto + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False)
+    os.replace(caminho_manifesto + '.tmp', caminho_manifesto)
+
+    remover_versoes_antigas(base, versao)
+    return manifesto
+
+
+def remover_versoes_antigas(base, versao_atual, manter=MANTER_VERSOES):
+    """Apaga versões antigas do disco, preservando as ``manter`` anteriores à atual.
+
+    No Linux/macOS um arquivo apagado continua acessível para quem já o
+    mapeou; no Windows a remoção de uma versão ainda mapeada falha e é
+    tentada de novo na próxima publicação.
+    """
+    for entrada in os.listdir(base):
+        if entrada.startswith('v') and entrada[1:].isdigit() and int(entrada[1:]) < versao_atual - manter:
+            shutil.rmtree(os.path.join(base, entrada), ignore_errors=True)
+
+
+# === LEITURA (DASHBOARD) ===
+def abrir_versao(base, manifesto):
+    """Abre uma versão publicada sem copiar dados: cada coluna é um memmap somente leitura"""
+    diretorio = os.path.join(base, manifesto['diretorio'])
+    colunas = {}
+    for coluna, meta in manifesto['colunas'].items():
+        valores = np.load(os.path.join(diretorio, f'{coluna}.npy'), mmap_mode='r')
+        if meta['tipo'] == 'categoria':
+            colunas[coluna] = pd.Categorical.from_codes(valores, categories=meta['categorias'], validate=False)
+        elif meta['tipo'] == 'datahora':
+            colunas[coluna] = valores.view(f"datetime64[{meta['unidade']}]")
+        elif meta['tipo'] == 'inteiro_anulavel':
+            nulos = np.load(os.path.join(diretorio, f'{coluna}.nulos.npy'), mmap_mode='r')
+            colunas[coluna] = pd.arrays.IntegerArray(valores, nulos)
+        else:
+            colunas[coluna] = valores
+
+    caminho_indice = os.path.join(diretorio, ARQUIVO_INDICE_TEMPO)
+    indice_tempo = np.load(caminho_indice, mmap_mode='r') if os.path.exists(caminho_indice) else None
+    return pd.DataFrame(colunas, copy=False), indice_tempo
+
+
+class VersaoAberta:
+    """Versão de um dataset aberta no processo, com o número de arrendamentos ativos.
+
+    ``derivados`` guarda estruturas calculadas sobre a versão (índices de
+    consulta, agregados), descartadas junto com ela.
+    """
+
+    def __init__(self, versao, df, indice_tempo):
+        self.versao = versao
+        self.df = df
+        self.indice_tempo = indice_tempo
+        self.referencias = 0
+        self.derivados = {}
+        self.trava = threading.Lock()
+
+
+class Arrendamento:
+    """Uso de uma versão do dataset por uma sessão.
+
+    Enquanto o arrendamento existir, a versão permanece aberta mesmo que a
+    ingestão publique outra. ``liberar`` é idempotente e também é chamado
+    quando o objeto é coletado (por exemplo, ao expirar a sessão).
+    """
+
+    def __init__(self, cache, nome, aberta):
+        self.nome = nome
+        self.versao = aberta.versao
+        self.df = aberta.df
+        self.indice_tempo = aberta.indice_tempo
+        self._aberta = aberta
+        self._finalizador = weakref.finalize(self, cache.liberar, nome, aberta.versao)
+
+    def derivado(self, chave, construir):
+        """Estrutura calculada uma vez por versão e compartilhada pelas sessões"""
+        with self._aberta.trava:
+            if chave not in self._aberta.derivados:
+                self._aberta.derivados[chave] = construir()
+            return self._aberta.derivados[chave]
+
+    def liberar(self):
+        self._finalizador()
+
+
+class CacheDatasets:
+    """Datasets publicados, abertos uma vez por processo e compartilhados por referência.
+
+    Cada versão é mapeada em memória uma única vez; todas as sessões recebem
+    o mesmo DataFrame (somente leitura) e o sistema operacional compartilha
+    as páginas entre processos. Quando a ingestão publica uma versão nova, as
+    próximas aquisições passam a usá-la e a anterior é descartada assim que o
+    último arrendamento é liberado.
+    """
+
+    def __init__(self, dados_path):
+        self.dados_path = dados_path
+        self.abertas = {}
+        self.atuais = {}
+        self._trava = threading.RLock()
+
+    def adquirir(self, nome, origem=None):
+        """Arrenda a versão atual do dataset; None se não publicada ou mais antiga que ``origem``"""
+        base = diretorio_dataset(self.dados_path, nome)
+        manifesto = ler_manifesto(base)
+        if manifesto is None or manifesto.get('formato') != VERSAO_FORMATO:
+            return None
+        if origem is not None and tuple(manifesto.get('origem') or ()) != tuple(origem):
+            return None
+
+        chave = (nome, manifesto['versao'])
+        with self._trava:
+            aberta = self.abertas.get(chave)
+            if aberta is None:
+                try:
+                    aberta = VersaoAberta(manifesto['versao'], *abrir_versao(base, manifesto))
+                except (OSError, ValueError, KeyError):
+                    return None  # versão removida entre a leitura do manifesto e a abertura
+                self.abertas[chave] = aberta
+            self.atuais[nome] = aberta.versao
+            aberta.referencias += 1
+            self._descartar_sem_uso(nome)
+        return Arrendamento(self, nome, aberta)
+
+    def liberar(self, nome, versao):
+        """Devolve um arrendamento (chamado por ``Arrendamento.liberar``)"""
+        with self._trava:
+            aberta = self.abertas.get((nome, versao))
+            if aberta is not None:
+                aberta.referencias -= 1
+            self._descartar_sem_uso(nome)
+
+    def _descartar_sem_uso(self, nome):
+        for chave in [c for c in self.abertas if c[0] == nome and c[1] != self.atuais.get(nome)]:
+            if self.abertas[chave].referencias <= 0:
+                del self.abertas[chave]
+
+    def versoes_abertas(self):
+        """{(nome, versao): arrendamentos ativos}, para diagnóstico"""
+        with self._trava:
+            return {chave: aberta.referencias for chave, aberta in self.abertas.items()}
+
+
+if __name__ == "__main__":
+    from esquemas import ler_csv_tipado
+
+    dados_path = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dados_simulacao'))
+    arquivo_historico = os.path.join(dados_path, 'hermes_historico_completo.csv')
+    if not os.path.exists(arquivo_historico):
+        print(f"[ERRO] Histórico não encontrado: {arquivo_historico}")
+    else:
+        manifesto = publicar_dataset(dados_path, 'historico', ler_csv_tipado(arquivo_historico),
+                                     origem=assinatura_arquivo(arquivo_historico))
+        print(f"[SUCESSO] Histórico publicado no armazém colunar: versão {manifesto['versao']} ({manifesto['linhas']:,} linhas)")
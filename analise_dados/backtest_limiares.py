@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backtest de Limiares Hermes Reply
+Reproduz o analyzeSystemHealth do firmware sobre o histórico e varre grades de limiares candidatos
+"""
+
+import argparse
+import itertools
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Limites de arduino/src/main.cpp (mesmos nomes das constantes do firmware)
+LIMIARES_FIRMWARE = {
+    'TEMP_MIN_NORMAL': 15.0,
+    'TEMP_MAX_NORMAL': 35.0,
+    'HUMIDITY_MIN_NORMAL': 30.0,
+    'HUMIDITY_MAX_NORMAL': 70.0,
+    'LIGHT_MIN_NORMAL': 200,
+    'LIGHT_MAX_NORMAL': 800,
+    'VIBRATION_MAX_NORMAL': 500
+}
+
+# Sensor -> (coluna do histórico, limite inferior, limite superior, tipo C do valor no firmware)
+SENSORES_FIRMWARE = {
+    'temperatura': ('temperatura', 'TEMP_MIN_NORMAL', 'TEMP_MAX_NORMAL', 'float32'),
+    'umidade': ('umidade', 'HUMIDITY_MIN_NORMAL', 'HUMIDITY_MAX_NORMAL', 'float32'),
+    'luminosidade': ('luminosidade', 'LIGHT_MIN_NORMAL', 'LIGHT_MAX_NORMAL', 'float64'),
+    'vibracao': ('vibracao', None, 'VIBRATION_MAX_NORMAL', 'float64')
+}
+
+# Bits de alerta e códigos de status do TelemetryFrameV1
+ALERTA_BITS = {'temperatura': 0x01, 'umidade': 0x02, 'luminosidade': 0x04, 'vibracao': 0x08}
+STATUS_FIRMWARE = np.array(['NORMAL', 'ATENÇÃO', 'CRÍTICO'], dtype=object)
+MAX_ALERTAS_ATENCAO = 2  # "alertCount <= 2" -> ATENÇÃO
+
+# Elementos por matriz intermediária de um bloco de células (limita a memória por trabalhador)
+ELEMENTOS_POR_BLOCO = 1 << 22
+
+
+def ler_limiares_firmware(caminho=None):
+    """Lê as constantes *_NORMAL do main.cpp; usa LIMIARES_FIRMWARE para o que não encontrar"""
+    if caminho is None:
+        caminho = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'arduino', 'src', 'main.cpp')
+    limiares = dict(LIMIARES_FIRMWARE)
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as f:
+            for tipo, nome, valor in re.findall(r'const\s+(float|int)\s+(\w+_NORMAL)\s*=\s*([-\d.]+)\s*;', f.read()):
+                if nome in limiares:
+                    limiares[nome] = float(valor) if tipo == 'float' else int(valor)
+    return limiares
+
+
+def valores_sensores(df):
+    """Colunas dos sensores nos tipos do firmware (float para temperatura/umidade)"""
+    return {sensor: pd.to_numeric(df[coluna], errors='coerce').to_numpy(dtype=tipo, na_value=np.nan)
+            for sensor, (coluna, _, _, tipo) in SENSORES_FIRMWARE.items()}
+
+
+def _alerta(valores, tipo, minimo, maximo):
+    """Condição de alerta de um sensor (NaN nunca alerta, como nas comparações em C)"""
+    alerta = valores > np.dtype(tipo).type(maximo)
+    if minimo is not None:
+        alerta |= valores < np.dtype(tipo).type(minimo)
+    return alerta
+
+
+def classificar(df, limiares=None):
+    """Réplica vetorizada de analyzeSystemHealth: (status, máscara de alertas, contagem de alertas).
+
+    Temperatura e umidade são comparadas em float32, como as variáveis
+    ``float`` do ESP32; luminosidade e vibração, em float64 (exato para os
+    inteiros do firmware 1.0.0 e para a vibração fracionária do v2.1.0).
+    """
+    limiares = dict(LIMIARES_FIRMWARE, **(limiares or {}))
+    valores = valores_sensores(df)
+    mascara = np.zeros(len(df), dtype='uint8')
+    for sensor, (_, chave_min, chave_max, tipo) in SENSORES_FIRMWARE.items():
+        alerta = _alerta(valores[sensor], tipo, limiares.get(chave_min), limiares[chave_max])
+        mascara |= alerta.astype('uint8') * ALERTA_BITS[sensor]
+    alertas = np.unpackbits(mascara[:, None], axis=1).sum(axis=1)
+    codigos = np.where(alertas == 0, 0, np.where(alertas <= MAX_ALERTAS_ATENCAO, 1, 2))
+    return STATUS_FIRMWARE[codigos], mascara, alertas
+
+
+# === VARREDURA DE GRADES ===
+class _EstadosSensor:
+    """Opções de limiares de um sensor e o padrão de alertas de cada leitura sobre elas.
+
+    Leituras entre os mesmos pares de limiares consecutivos alertam nas
+    mesmas opções; cada leitura vira um código de estado (posição em relação
+    aos limites inferiores e superiores), e a matriz ``alertas`` dá o
+    resultado de cada estado em cada opção.
+    """
+
+    def __init__(self, valores, tipo, minimos, maximos):
+        escalar = np.dtype(tipo).type
+        self.opcoes = list(itertools.product(minimos, maximos))
+        minimos_ord = np.unique(np.array([escalar(m) for m in minimos if m is not None], dtype=tipo))
+        maximos_ord = np.unique(np.array([escalar(m) for m in maximos], dtype=tipo))
+
+        # x < min  <=>  posição do min >= quantidade de mínimos <= x
+        abaixo = np.searchsorted(minimos_ord, valores, side='right')
+        # x > max  <=>  posição do max < quantidade de máximos < x
+        acima = np.searchsorted(maximos_ord, valores, side='left')
+        nulos = np.isnan(valores)
+        abaixo[nulos] = len(minimos_ord)
+        acima[nulos] = 0
+        self.codigos, estados = np.unique(abaixo * (len(maximos_ord) + 1) + acima, return_inverse=True)
+        self.estado = estados.ravel()
+
+        abaixo_estado, acima_estado = np.divmod(self.codigos, len(maximos_ord) + 1)
+        self.alertas = np.zeros((len(self.codigos), len(self.opcoes)), dtype=bool)
+        for j, (minimo, maximo) in enumerate(self.opcoes):
+            alerta = acima_estado > np.searchsorted(maximos_ord, escalar(maximo))
+            if minimo is not None:
+                alerta |= abaixo_estado <= np.searchsorted(minimos_ord, escalar(minimo))
+            self.alertas[:, j] = alerta
+
+
+def _produto_linhas(a, b):
+    """Produto externo linha a linha: (n x p), (n x q) -> (n x p*q)"""
+    return (a[:, :, None] * b[:, None, :]).reshape(len(a), -1)
+
+
+def _contar_bloco(alertas_bloco, pesos):
+    """Contagens NORMAL e CRÍTICO de um bloco de células para todas as combinações.
+
+    Com indicadores de OK (O) e de alerta (A) por sensor, NORMAL é a soma
+    ponderada de O_t O_u O_l O_v e CRÍTICO (3 ou 4 alertas) se fatora em
+    (A_t A_u)(A_l O_v + O_l A_v + A_l A_v) + (A_t O_u + O_t A_u)(A_l A_v):
+    três multiplicações de matrizes sobre os pares (temperatura, umidade) x
+    (luminosidade, vibração).
+    """
+    at, au, al, av = (a.astype('float64') for a in alertas_bloco)
+    ot, ou, ol, ov = 1.0 - at, 1.0 - au, 1.0 - al, 1.0 - av
+    at = at * pesos[:, None]
+    ot = ot * pesos[:, None]
+
+    normal = _produto_linhas(ot, ou).T @ _produto_linhas(ol, ov)
+    critico = (_produto_linhas(at, au).T @ (_produto_linhas(al, ov) + _produto_linhas(ol, av) + _produto_linhas(al, av))
+               + (_produto_linhas(at, ou) + _produto_linhas(ot, au)).T @ _produto_linhas(al, av))
+    return normal, critico
+
+
+def varrer_grade(df, grade=None, limiares_base=None, trabalhadores=None):
+    """Avalia todas as combinações de uma grade de limiares sobre o histórico.
+
+    ``grade`` mapeia constantes do firmware para listas de valores candidatos
+    (as ausentes ficam com o valor de ``limiares_base``). O resultado tem uma
+    linha por combinação com as contagens NORMAL/ATENÇÃO/CRÍTICO, a taxa de
+    alerta do sistema e por sensor e a variação em relação à base.
+
+    As leituras são reduzidas a células (combinações distintas de estados dos
+    quatro sensores) com peso, e as contagens de todas as combinações saem de
+    multiplicações de matrizes por bloco de células, executadas em paralelo.
+    """
+    base = dict(LIMIARES_FIRMWARE, **(limiares_base or {}))
+    grade = {chave: list(valores) for chave, valores in (grade or {}).items()}
+    desconhecidas = set(grade) - set(base)
+    if desconhecidas:
+        raise ValueError(f"Limiares desconhecidos: {', '.join(sorted(desconhecidas))}")
+    opcoes = {chave: grade.get(chave, [base[chave]]) for chave in base}
+
+    valores = valores_sensores(df)
+    estados = {}
+    for sensor, (_, chave_min, chave_max, tipo) in SENSORES_FIRMWARE.items():
+        minimos = opcoes[chave_min] if chave_min else [None]
+        estados[sensor] = _EstadosSensor(valores[sensor], tipo, minimos, opcoes[chave_max])
+    t, u, l, v = (estados[sensor] for sensor in SENSORES_FIRMWARE)
+
+    # Células: combinações distintas de estados, com o número de leituras de cada uma
+    chave_celula = ((t.estado * len(u.codigos) + u.estado) * len(l.codigos) + l.estado) * len(v.codigos) + v.estado
+    celulas, pesos = np.unique(chave_celula, return_counts=True)
+    resto, ev = np.divmod(celulas, len(v.codigos))
+    resto, el = np.divmod(resto, len(l.codigos))
+    et, eu = np.divmod(resto, len(u.codigos))
+
+    forma = (len(t.opcoes) * len(u.opcoes), len(l.opcoes) * len(v.opcoes))
+    por_bloco = max(64, ELEMENTOS_POR_BLOCO // max(forma))
+    blocos = [slice(i, i + por_bloco) for i in range(0, len(celulas), por_bloco)]
+
+    def contar(bloco):
+        alertas = (t.alertas[et[bloco]], u.alertas[eu[bloco]], l.alertas[el[bloco]], v.alertas[ev[bloco]])
+        return _contar_bloco(alertas, pesos[bloco].astype('float64'))
+
+    normal, critico = np.zeros(forma), np.zeros(forma)
+    trabalhadores = trabalhadores or min(len(blocos), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max(trabalhadores, 1)) as executor:
+        for n, c in executor.map(contar, blocos):
+            normal += n
+            critico += c
+
+    # Linhas na ordem (temperatura, umidade, luminosidade, vibração), opções de cada sensor em ordem de produto
+    total = len(df)
+    indices = np.indices((len(t.opcoes), len(u.opcoes), len(l.opcoes), len(v.opcoes))).reshape(4, -1)
+    resultado = pd.DataFrame({
+        'TEMP_MIN_NORMAL': [o[0] for o in t.opcoes], 'TEMP_MAX_NORMAL': [o[1] for o in t.opcoes]
+    }).iloc[indices[0]].reset_index(drop=True)
+    resultado['HUMIDITY_MIN_NORMAL'] = [u.opcoes[i][0] for i in indices[1]]
+    resultado['HUMIDITY_MAX_NORMAL'] = [u.opcoes[i][1] for i in indices[1]]
+    resultado['LIGHT_MIN_NORMAL'] = [l.opcoes[i][0] for i in indices[2]]
+    resultado['LIGHT_MAX_NORMAL'] = [l.opcoes[i][1] for i in indices[2]]
+    resultado['VIBRATION_MAX_NORMAL'] = [v.opcoes[i][1] for i in indices[3]]
+
+    resultado['normal'] = np.rint(normal.ravel()).astype('int64')
+    resultado['critico'] = np.rint(critico.ravel()).astype('int64')
+    resultado['atencao'] = total - resultado['normal'] - resultado['critico']
+    resultado = resultado[list(base) + ['normal', 'atencao', 'critico']]
+    resultado['taxa_alerta'] = 1 - resultado['normal'] / total if total else np.nan
+    for (sensor, estado), indice in zip(estados.items(), indices):
+        alertas_opcao = np.bincount(estado.estado, minlength=len(estado.codigos)) @ estado.alertas
+        resultado[f'taxa_alerta_{sensor}'] = alertas_opcao[indice] / total if total else np.nan
+
+    status_base, _, _ = classificar(df, base)
+    for status, coluna in zip(STATUS_FIRMWARE, ['normal', 'atencao', 'critico']):
+        resultado[f'delta_{coluna}'] = resultado[coluna] - int((status_base == status).sum())
+    return resultado
+
+
+def grade_de_texto(especificacoes):
+    """Grade a partir de 'NOME=v1,v2,...' ou 'NOME=inicio:fim:passo' (fim incluso)"""
+    grade = {}
+    for especificacao in especificacoes:
+        nome, _, valores = especificacao.partition('=')
+        nome = nome.strip().upper()
+        if ':' in valores:
+            inicio, fim, passo = (float(p) for p in valores.split(':'))
+            grade[nome] = np.round(np.arange(inicio, fim + passo / 2, passo), 6).tolist()
+        else:
+            grade[nome] = [float(p) for p in valores.split(',') if p.strip()]
+    return grade
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest de limiares do analyzeSystemHealth sobre o histórico Hermes')
+    parser.add_argument('--grade', action='append', default=[],
+                        help="Valores candidatos: NOME=v1,v2 ou NOME=inicio:fim:passo (ex.: TEMP_MAX_NORMAL=30:40:0.5)")
+    parser.add_argument('--arquivo', default=None, help='CSV do histórico (padrão: dados_simulacao/hermes_historico_completo.csv)')
+    parser.add_argument('--saida', default=None, help='CSV com o resultado de todas as combinações')
+    parser.add_argument('--top', type=int, default=10, help='Combinações exibidas (menor taxa de alerta)')
+    parser.add_argument('--trabalhadores', type=int, default=None)
+    args = parser.parse_args()
+
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    arquivo = args.arquivo or os.path.normpath(os.path.join(base_path, '..', 'dados_simulacao', 'hermes_historico_completo.csv'))
+    if not os.path.exists(arquivo):
+        print(f"[ERRO] Histórico não encontrado: {arquivo}")
+        return
+    colunas = [coluna for coluna, _, _, _ in SENSORES_FIRMWARE.values()] + ['system_status', 'firmware_version']
+    df = pd.read_csv(arquivo, usecols=colunas)
+    limiares = ler_limiares_firmware()
+
+    # A réplica segue o main.cpp atual; leituras de outras versões de firmware podem ter outra regra
+    status, _, _ = classificar(df, limiares)
+    concorda = pd.Series(status == df['system_status'].to_numpy(dtype=object)).groupby(df['firmware_version'].to_numpy()).mean()
+    print(f"[HERMES] {len(df):,} leituras; concordância da réplica com o system_status gravado por firmware:")
+    for versao, taxa in concorda.items():
+        print(f"  {versao}: {taxa:.1%}")
+
+    inicio = time.perf_counter()
+    resultado = varrer_grade(df, grade_de_texto(args.grade), limiares, args.trabalhadores)
+    print(f"[SUCESSO] {len(resultado):,} combinações avaliadas em {time.perf_counter() - inicio:.2f}s")
+    print(resultado.sort_values(['taxa_alerta', 'critico']).head(args.top).to_string(index=False))
+    if args.saida:
+        resultado.to_csv(args.saida, index=False, encoding='utf-8')
+        print(f"[SUCESSO] Resultado salvo: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
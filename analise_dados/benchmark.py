@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do Pipeline Hermes Reply
+Gerador sintético determinístico de telemetria e medição de cada etapa da ingestão à visualização
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from consulta_dados import ConsultaTelemetria
+from correlacao_sensores import MotorCorrelacao
+from esquemas import COLUNAS_CANONICAS
+from gerar_relatorio import GeradorRelatorio
+from explicabilidade_modelo import explicar_modelo
+from hermes_analytics import FEATURES_MODELO, HermesAnalytics
+from monitor_deriva import ReferenciaModelo
+from processar_dados_simulacao import ProcessadorDadosSimulacao
+from reamostragem import reamostrar
+
+VERSAO_RESULTADO = 1
+LEITURAS_POR_BLOCO = 100_000
+INTERVALO_LEITURA_MS = 5000
+JANELA_MEDIA_MOVEL = 12
+
+# Regras de analyzeSystemHealth (arduino/src/main.cpp): status pelo número de alertas
+STATUS_SISTEMA = np.array(['NORMAL', 'ATENÇÃO', 'ATENÇÃO', 'CRÍTICO', 'CRÍTICO'], dtype=object)
+RISCO = {'NORMAL': 'BAIXO', 'ATENÇÃO': 'MÉDIO', 'CRÍTICO': 'ALTO'}
+MANUTENCAO = {'NORMAL': 'AGENDADA', 'ATENÇÃO': '24H', 'CRÍTICO': 'IMEDIATA'}
+ROTULOS_DETALHE = ['TEMP', 'HUMID', 'LIGHT', 'VIB']
+
+# Payload JSON_DATA do firmware 1.0.0 (buildTelemetryJson), na mesma ordem de campos
+MODELO_PAYLOAD = (
+    '{"deviceId":"%s","timestamp":%d,"readingId":%d,"firmwareVersion":"1.0.0",'
+    '"sensors":{"temperature":{"value":%.2f,"movingAverage":%.2f,"unit":"°C","status":"%s"},'
+    '"humidity":{"value":%.2f,"movingAverage":%.2f,"unit":"%%","status":"%s"},'
+    '"lightLevel":{"value":%d,"unit":"lux","status":"%s"},'
+    '"vibration":{"value":%d,"unit":"intensidade","status":"%s"}},'
+    '"analysis":{"systemStatus":"%s","riskLevel":"%s","nextMaintenance":"%s","statusDetail":"%s"},'
+    '"operationalStats":{"uptime":%d,"totalReadings":%d,"avgTemperature":%.6f,"avgHumidity":%.6f}}'
+)
+MOLDURA_SUPERIOR = (
+    "┌─────────────────────────────────────────────────────────────┐\n"
+    "│ LEITURA #%d | %ds de funcionamento                               │\n"
+    "├─────────────────────────────────────────────────────────────┤\n"
+)
+MOLDURA_INFERIOR = (
+    "│ Temp: %.1f°C | Umidade: %.1f%% | Luz: %d | Vib: %d │\n"
+    "│ STATUS: %s | RISCO: %s | MANUTENÇÃO: %s     │\n"
+    "└─────────────────────────────────────────────────────────────┘\n\n"
+)
+# Colunas de cada modelo, na ordem dos campos; 'uptime_s' é o uptime em segundos
+COLUNAS_PAYLOAD = [
+    'device_id', 'timestamp_simulacao', 'reading_id',
+    'temperatura', 'temperatura_media_movel', 'temperatura_status',
+    'umidade', 'umidade_media_movel', 'umidade_status',
+    'luminosidade', 'luminosidade_status', 'vibracao', 'vibracao_status',
+    'system_status', 'risk_level', 'next_maintenance', 'status_detail',
+    'uptime', 'total_readings', 'avg_temperature', 'avg_humidity'
+]
+MODELO_MISTO = MOLDURA_SUPERIOR + 'JSON_DATA: ' + MODELO_PAYLOAD + '\n' + MOLDURA_INFERIOR
+COLUNAS_MISTO = [
+    'reading_id', 'uptime_s', *COLUNAS_PAYLOAD, 'temperatura', 'umidade', 'luminosidade', 'vibracao',
+    'system_status', 'risk_level', 'next_maintenance'
+]
+
+
+class GeradorTelemetriaSintetica:
+    """Gera leituras determinísticas no formato real do firmware.
+
+    As leituras são organizadas em ciclos: a cada ciclo de 5s todos os
+    dispositivos fazem uma leitura. Os blocos são gerados de forma
+    vetorizada e independente da memória total, então 10^8 leituras são
+    escritas em partes de ``LEITURAS_POR_BLOCO``. A mesma semente produz
+    sempre os mesmos dados.
+    """
+
+    def __init__(self, leituras, dispositivos=1, semente=42):
+        self.leituras = int(leituras)
+        self.dispositivos = int(dispositivos)
+        self.semente = semente
+        self.ids_dispositivos = np.array([f'HERMES_ESP32_{i:04d}' for i in range(1, self.dispositivos + 1)], dtype=object)
+
+    def blocos(self, execucao_id='sintetico', timestamp_processamento=None):
+        """Gera DataFrames canônicos (hermes_data) em blocos de ciclos completos"""
+        timestamp_processamento = timestamp_processamento or datetime.now().isoformat()
+        ciclos_por_bloco = max(1, LEITURAS_POR_BLOCO // self.dispositivos)
+        total_ciclos = -(-self.leituras // self.dispositivos)
+        anteriores = None  # últimas leituras de cada dispositivo para a média móvel
+
+        for indice_bloco, inicio in enumerate(range(0, total_ciclos, ciclos_por_bloco)):
+            ciclos = np.arange(inicio, min(inicio + ciclos_por_bloco, total_ciclos))
+            rng = np.random.default_rng([self.semente, indice_bloco])
+            forma = (len(ciclos), self.dispositivos)
+
+            # Sinais com deriva lenta por dispositivo, ruído e picos ocasionais
+            fase = ciclos[:, None] / 720.0 + np.arange(self.dispositivos)[None, :]
+            temperatura = 25 + 6 * np.sin(fase) + rng.normal(0, 3, forma)
+            umidade = 55 + 12 * np.cos(fase * 0.7) + rng.normal(0, 6, forma)
+            luminosidade = np.clip(rng.normal(500, 220, forma), 0, 1023).astype(np.int64)
+            vibracao = np.clip(rng.gamma(2.0, 120, forma), 0, 1023).astype(np.int64)
+
+            media_temp, media_umid, anteriores = self._medias_moveis(ciclos, temperatura, umidade, anteriores)
+
+            df = self._montar_bloco(ciclos, temperatura, umidade, luminosidade, vibracao,
+                                    media_temp, media_umid, execucao_id, timestamp_processamento)
+            restante = self.leituras - int(ciclos[0]) * self.dispositivos
+            yield df.iloc[:restante] if restante < len(df) else df
+
+    def _medias_moveis(self, ciclos, temperatura, umidade, anteriores):
+        """Média móvel de 12 leituras por dispositivo, como o firmware (soma corrente)"""
+        janela = JANELA_MEDIA_MOVEL
+        if anteriores is None:
+            anteriores = (np.zeros((0, self.dispositivos)), np.zeros((0, self.dispositivos)))
+
+        medias = []
+        novos = []
+        for valores, previos in zip((temperatura, umidade), anteriores):
+            serie = np.vstack([previos, valores])
+            acumulado = np.vstack([np.zeros((1, self.dispositivos)), np.cumsum(serie, axis=0)])
+            fim = np.arange(len(previos), len(serie)) + 1
+            inicio = np.maximum(fim - janela, 0)
+            amostras = np.minimum(ciclos + 1, janela)[:, None]
+            medias.append((acumulado[fim] - acumulado[inicio]) / amostras)
+            novos.append(serie[-(janela - 1):])
+        return medias[0], medias[1], tuple(novos)
+
+    def _montar_bloco(self, ciclos, temperatura, umidade, luminosidade, vibracao,
+                      media_temp, media_umid, execucao_id, timestamp_processamento):
+        """Achata o bloco (ciclo x dispositivo) no esquema canônico"""
+        timestamp = np.repeat((ciclos + 1) * INTERVALO_LEITURA_MS, self.dispositivos)
+        alertas = {
+            'temperatura': (temperatura < 15) | (temperatura > 35),
+            'umidade': (umidade < 30) | (umidade > 70),
+            'luminosidade': (luminosidade < 200) | (luminosidade > 800),
+            'vibracao': vibracao > 500
+        }
+        contagem = sum(a.ravel().astype(np.int64) for a in alertas.values())
+        status = STATUS_SISTEMA[contagem]
+        status_serie = pd.Series(status)
+
+        mascara = sum(a.ravel().astype(np.int64) << bit for bit, a in enumerate(alertas.values()))
+        detalhes = np.array([','.join(r for bit, r in enumerate(ROTULOS_DETALHE) if m >> bit & 1) for m in range(16)],
+                            dtype=object)
+
+        df = pd.DataFrame({
+            'timestamp_simulacao': timestamp,
+            'timestamp_processamento': timestamp_processamento,
+            'execucao_id': execucao_id,
+            'device_id': np.tile(self.ids_dispositivos, len(ciclos)),
+            'reading_id': np.repeat(ciclos + 1, self.dispositivos),
+            'firmware_version': '1.0.0',
+            'temperatura': np.round(temperatura.ravel(), 2),
+            'temperatura_media_movel': np.round(media_temp.ravel(), 2),
+            'temperatura_status': np.where(alertas['temperatura'].ravel(), 'ALERTA', 'OK'),
+            'umidade': np.round(umidade.ravel(), 2),
+            'umidade_media_movel': np.round(media_umid.ravel(), 2),
+            'umidade_status': np.where(alertas['umidade'].ravel(), 'ALERTA', 'OK'),
+            'luminosidade': luminosidade.ravel(),
+            'luminosidade_status': np.where(alertas['luminosidade'].ravel(), 'ALERTA', 'OK'),
+            'vibracao': vibracao.ravel(),
+            'vibracao_status': np.where(alertas['vibracao'].ravel(), 'ALERTA', 'OK'),
+            'system_status': status,
+            'risk_level': status_serie.map(RISCO).to_numpy(),
+            'next_maintenance': status_serie.map(MANUTENCAO).to_numpy(),
+            'status_detail': detalhes[mascara],
+            'uptime': timestamp,
+            'total_readings': np.repeat(ciclos + 1, self.dispositivos),
+            'avg_temperature': media_temp.ravel(),
+            'avg_humidity': media_umid.ravel(),
+            'risk_score': np.nan
+        })
+        return df[COLUNAS_CANONICAS]
+
+    def escrever_log(self, caminho, canal='misto'):
+        """Escreve um log serial: 'misto' (molduras + JSON_DATA) ou 'maquina' (@LLLL:).
+
+        Cada bloco é formatado de uma vez: cada coluna vira lista uma única
+        vez e um só modelo por leitura (moldura e JSON juntos) é aplicado sobre
+        elas com zip, sem itertuples nem concatenação por campo.
+        """
+        total_bytes = 0
+        with open(caminho, 'wb') as f:
+            for df in self.blocos():
+                if canal == 'maquina':
+                    colunas = [df[coluna].tolist() for coluna in COLUNAS_PAYLOAD]
+                    payloads = [(MODELO_PAYLOAD % campos).encode('utf-8') for campos in zip(*colunas)]
+                    bloco = b''.join([b'@%04X:%s\r\n' % (len(bruto), bruto) for bruto in payloads])
+                else:
+                    df = df.assign(uptime_s=df['uptime'] // 1000)
+                    colunas = [df[coluna].tolist() for coluna in COLUNAS_MISTO]
+                    bloco = ''.join([MODELO_MISTO % campos for campos in zip(*colunas)]).encode('utf-8')
+                f.write(bloco)
+                total_bytes += len(bloco)
+        return total_bytes
+
+    def escrever_dataset(self, diretorio, execucao_id):
+        """Escreve um hermes_data_<id>.csv sintético diretamente (sem passar pelo log)"""
+        caminho = os.path.join(diretorio, f'hermes_data_{execucao_id}.csv')
+        for indice, df in enumerate(self.blocos(execucao_id)):
+            df.to_csv(caminho, mode='w' if indice == 0 else 'a', header=indice == 0, index=False, encoding='utf-8')
+        return caminho
+
+
+# === MEDIÇÃO DAS ETAPAS ===
+class MedidorEtapas:
+    """Cronometra etapas (menor tempo entre repetições) e silencia os prints do pipeline"""
+
+    def __init__(self, repeticoes=1, verboso=False):
+        self.repeticoes = repeticoes
+        self.verboso = verboso
+        self.etapas = {}
+
+    def medir(self, nome, funcao, registros=None, repetir=True):
+        """Executa a etapa e registra o tempo; retorna o resultado da última execução"""
+        tempos = []
+        resultado = None
+        for _ in range(self.repeticoes if repetir else 1):
+            saida = contextlib.nullcontext() if self.verboso else contextlib.redirect_stdout(io.StringIO())
+            with saida:
+                inicio = time.perf_counter()
+                resultado = funcao()
+                tempos.append(time.perf_counter() - inicio)
+
+        segundos = min(tempos)
+        etapa = {'segundos': round(segundos, 6), 'repeticoes': len(tempos)}
+        if registros:
+            etapa['registros'] = int(registros)
+            etapa['registros_por_segundo'] = round(registros / segundos, 1) if segundos > 0 else None
+        self.etapas[nome] = etapa
+        print(f"[BENCHMARK]   {nome:<34} {segundos:9.3f}s")
+        return resultado
+
+
+def executar_cenario(leituras, dispositivos, diretorio, canal='misto', repeticoes=1, semente=42,
+                     limite_modelo=None, verboso=False):
+    """Executa todas as etapas do pipeline para um volume de leituras e dispositivos"""
+    print(f"[BENCHMARK] Cenário: {leituras:,} leituras, {dispositivos} dispositivos, canal {canal}")
+    dados_path = os.path.join(diretorio, 'dados_simulacao')
+    os.makedirs(dados_path, exist_ok=True)
+
+    gerador = GeradorTelemetriaSintetica(leituras, dispositivos, semente)
+    medidor = MedidorEtapas(repeticoes, verboso)
+
+    log = os.path.join(dados_path, 'serial_output.log')
+    bytes_log = medidor.medir('gerar_log_sintetico', lambda: gerador.escrever_log(log, canal), leituras, repetir=False)
+
+    processador = ProcessadorDadosSimulacao()
+    processador.dados_simulacao_dir = dados_path
+    processador.log_file = log
+    processador.espera_log = 0
+    processador.timestamp_execucao = 'benchmark'
+
+    df = medidor.medir('extrair_dados_json', processador.extrair_dados_json, leituras)
+    medidor.medir('extrair_quadros_binarios', processador.extrair_quadros_binarios, leituras)
+    medidor.medir('extrair_entradas', processador.extrair_entradas, leituras)
+    medidor.medir('gerar_resumo_estatistico', lambda: processador.gerar_resumo_estatistico(df), len(df))
+    medidor.medir('gerar_esboco_execucao', lambda: processador.gerar_esboco_execucao(df), len(df))
+    medidor.medir('gerar_esbocos_por_balde', lambda: processador.gerar_esbocos_por_balde(df), len(df))
+
+    def salvar():
+        # Sem histórico prévio, para medir sempre a mesma quantidade de trabalho
+        historico = os.path.join(dados_path, 'hermes_historico_completo.csv')
+        if os.path.exists(historico):
+            os.remove(historico)
+        return processador.salvar_dados_estruturados(df)
+    medidor.medir('salvar_dados_estruturados', salvar, len(df))
+
+    analytics = HermesAnalytics(dados_path=dados_path)
+    df_historico = medidor.medir('carregar_dados_historicos', analytics.carregar_dados_historicos, len(df))
+    medidor.medir('carregar_execucao_especifica', lambda: analytics.carregar_execucao_especifica('benchmark'), len(df))
+    medidor.medir('carregar_resumos_estatisticos', analytics.carregar_resumos_estatisticos)
+
+    consulta = medidor.medir('indexar_consulta', lambda: ConsultaTelemetria(df_historico), len(df_historico))
+
+    def filtrar_e_paginar():
+        mascara = consulta.criar_mascara(status=['ATENÇÃO', 'CRÍTICO'])
+        return consulta.obter_pagina(1, 100, mascara)
+    medidor.medir('filtrar_paginar_tabela', filtrar_e_paginar, len(df_historico))
+
+    # Motor novo a cada repetição: mede a grade e o cálculo, não a memorização
+    medidor.medir('correlacao_defasada', lambda: MotorCorrelacao(df_historico).defasada(120), len(df_historico))
+
+    def correlacao_movel():
+        motor = MotorCorrelacao(df_historico)
+        return [motor.movel(dispositivo, 120) for dispositivo in motor.dispositivos]
+    medidor.medir('correlacao_movel', correlacao_movel, len(df_historico))
+
+    def reamostrar_frota():
+        return reamostrar(df_historico, 60_000, preenchimento='anterior').caracteristicas_frota()
+    medidor.medir('reamostrar_frota', reamostrar_frota, len(df_historico))
+
+    df_modelo = df_historico
+    if limite_modelo and len(df_modelo) > limite_modelo:
+        df_modelo = df_modelo.sample(limite_modelo, random_state=semente)
+    medidor.medir('criar_modelo_ml', lambda: analytics.criar_modelo_ml(df_modelo, salvar_modelo=False), len(df_modelo))
+
+    classes = sorted(df_modelo['system_status'].astype(str).unique())
+    referencia = medidor.medir('resumir_referencia_deriva', lambda: ReferenciaModelo.de_treino(
+        df_modelo, FEATURES_MODELO, classes, df_modelo['system_status'].astype(str), 1.0), len(df_modelo))
+    medidor.medir('comparar_deriva', lambda: referencia.comparar(df_historico), len(df_historico))
+
+    modelo, codificador = analytics.estado['modelo'], analytics.estado['label_encoder']
+    medidor.medir('explicar_modelo', lambda: explicar_modelo(modelo, codificador.classes_, df_historico, FEATURES_MODELO),
+                  len(df_historico))
+
+    relatorio = GeradorRelatorio(analytics, raiz=diretorio)
+    metricas = analytics.estado['metricas_modelo']
+    medidor.medir('preparar_graficos', lambda: relatorio.preparar_entradas(df_historico, metricas), len(df_historico))
+
+    return {
+        'leituras': leituras,
+        'dispositivos': dispositivos,
+        'canal': canal,
+        'bytes_log': int(bytes_log),
+        'registros_extraidos': int(len(df)),
+        'etapas': medidor.etapas
+    }
+
+
+def commit_atual():
+    """Hash do commit atual (para comparar resultados entre commits)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline Hermes Reply com telemetria sintética')
+    parser.add_argument('--leituras', default='1e3,1e4,1e5',
+                        help='volumes separados por vírgula (ex.: 1e3,1e6,1e8)')
+    parser.add_argument('--dispositivos', default='1,10',
+                        help='quantidades de dispositivos separadas por vírgula (1 a 1000)')
+    parser.add_argument('--canal', choices=['misto', 'maquina'], default='misto')
+    parser.add_argument('--repeticoes', type=int, default=1, help='repetições por etapa (vale o menor tempo)')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--limite-modelo', type=int, default=None,
+                        help='amostra no máximo N linhas para criar_modelo_ml')
+    parser.add_argument('--saida', default=None, help='arquivo JSON de resultados')
+    parser.add_argument('--diretorio', default=None, help='diretório de trabalho (padrão: temporário)')
+    parser.add_argument('--verboso', action='store_true', help='mostra os prints do pipeline')
+    args = parser.parse_args()
+
+    volumes = [int(float(v)) for v in args.leituras.split(',')]
+    dispositivos = [int(d) for d in args.dispositivos.split(',')]
+
+    resultado = {
+        'versao': VERSAO_RESULTADO,
+        'commit': commit_atual(),
+        'data': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'processadores': os.cpu_count(),
+        'cenarios': []
+    }
+
+    diretorio_base = args.diretorio or tempfile.mkdtemp(prefix='hermes_benchmark_')
+    try:
+        for leituras in volumes:
+            for quantidade in dispositivos:
+                diretorio = os.path.join(diretorio_base, f'{leituras}_{quantidade}')
+                resultado['cenarios'].append(executar_cenario(
+                    leituras, quantidade, diretorio, args.canal, args.repeticoes, args.semente,
+                    args.limite_modelo, args.verboso
+                ))
+                if not args.diretorio:
+                    shutil.rmtree(diretorio, ignore_errors=True)
+    finally:
+        if not args.diretorio:
+            shutil.rmtree(diretorio_base, ignore_errors=True)
+
+    saida = args.saida or f"benchmark_{resultado['commit'] or 'local'}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"[SUCESSO] Resultados salvos em: {saida}")
+
+
+if __name__ == "__main__":
+    main()
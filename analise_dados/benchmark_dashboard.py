@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de Partida do Dashboard Hermes Reply
+Primeira pintura a frio e tempo por rerun de cada modo do app.py, com orçamento de tempo
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+VERSAO_RESULTADO = 1
+APP_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+MODOS = {
+    'historico': "📈 Dados Históricos Completos",
+    'execucao': "🔍 Execução Específica",
+    'resumos': "📋 Resumos Estatísticos",
+    'ao_vivo': "📡 Ao Vivo"
+}
+# Dependências pesadas que a primeira pintura não deveria importar sem necessidade (o próprio
+# streamlit já importa plotly.graph_objects para o tema; plotly.express só entra com os gráficos)
+MODULOS_PESADOS = ['sklearn', 'joblib', 'plotly.express']
+
+
+def medir_modo(app, modo, reruns, timeout):
+    """Mede um modo neste processo (chamado num subprocesso novo, para a medida ser a frio)"""
+    inicio = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    importacao_ms = (time.perf_counter() - inicio) * 1000
+
+    at = AppTest.from_file(app, default_timeout=timeout)
+    at.session_state['modo_visualizacao'] = MODOS[modo]
+    inicio = time.perf_counter()
+    at.run()
+    primeira_pintura_ms = (time.perf_counter() - inicio) * 1000
+    carregados = {nome: nome in sys.modules for nome in MODULOS_PESADOS}
+
+    tempos = []
+    for _ in range(reruns):
+        inicio = time.perf_counter()
+        at.run()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    return {
+        'modo': modo,
+        'importacao_streamlit_ms': round(importacao_ms, 1),
+        'primeira_pintura_ms': round(primeira_pintura_ms, 1),
+        'rerun_ms': round(statistics.median(tempos), 1) if tempos else None,
+        'modulos_carregados': carregados,
+        'excecoes': [str(e.value) for e in at.exception]
+    }
+
+
+def medir_a_frio(app, modo, reruns, timeout):
+    """Roda ``medir_modo`` num interpretador novo (sem módulos nem caches do processo atual)"""
+    comando = [sys.executable, os.path.abspath(__file__), '--medir-modo', modo, '--app', app,
+               '--reruns', str(reruns), '--timeout', str(timeout)]
+    processo = subprocess.run(comando, capture_output=True, text=True, cwd=os.path.dirname(app),
+                              env=dict(os.environ, HERMES_PERFIL='0'))
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao medir o modo {modo}: {processo.stderr.strip()[-500:]}")
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de partida a frio e reruns do dashboard Hermes Reply')
+    parser.add_argument('--modos', default=','.join(MODOS),
+                        help=f"modos separados por vírgula ({', '.join(MODOS)})")
+    parser.add_argument('--repeticoes', type=int, default=3,
+                        help='processos novos por modo (vale o menor tempo)')
+    parser.add_argument('--reruns', type=int, default=5, help='reruns por processo (vale a mediana)')
+    parser.add_argument('--orcamento-ms', type=float, default=None,
+                        help='limite da primeira pintura a frio; acima dele o script termina com código 1')
+    parser.add_argument('--orcamento-rerun-ms', type=float, default=None,
+                        help='limite da mediana por rerun; acima dele o script termina com código 1')
+    parser.add_argument('--app', default=APP_PADRAO)
+    parser.add_argument('--timeout', type=float, default=180, help='tempo máximo de cada execução do script (s)')
+    parser.add_argument('--saida', default=None, help='arquivo JSON de resultados')
+    parser.add_argument('--medir-modo', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    app = os.path.abspath(args.app)
+    if args.medir_modo:
+        print(json.dumps(medir_modo(app, args.medir_modo, args.reruns, args.timeout), ensure_ascii=False))
+        return
+
+    # Importados só aqui: o subprocesso de medida não pode carregar módulos que o app não carregaria
+    import streamlit
+    from benchmark import commit_atual
+    resultado = {
+        'versao': VERSAO_RESULTADO,
+        'commit': commit_atual(),
+        'data': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'streamlit': streamlit.__version__,
+        'plataforma': platform.platform(),
+        'orcamento_ms': args.orcamento_ms,
+        'orcamento_rerun_ms': args.orcamento_rerun_ms,
+        'modos': []
+    }
+
+    estourados = []
+    for modo in args.modos.split(','):
+        if modo not in MODOS:
+            parser.error(f"modo desconhecido: {modo}")
+        medidas = [medir_a_frio(app, modo, args.reruns, args.timeout) for _ in range(max(1, args.repeticoes))]
+        melhor = min(medidas, key=lambda m: m['primeira_pintura_ms'])
+        reruns = [m['rerun_ms'] for m in medidas if m['rerun_ms'] is not None]
+        melhor['rerun_ms'] = min(reruns) if reruns else None
+        resultado['modos'].append(melhor)
+
+        pesados = ', '.join(nome for nome, carregado in melhor['modulos_carregados'].items() if carregado) or 'nenhum'
+        print(f"[INFO] {modo}: primeira pintura {melhor['primeira_pintura_ms']:,.0f} ms · "
+              f"rerun {melhor['rerun_ms'] or 0:,.0f} ms · pesados carregados: {pesados}")
+        if melhor['excecoes']:
+            print(f"[ERRO] {modo}: {melhor['excecoes']}")
+            estourados.append(modo)
+        if args.orcamento_ms is not None and melhor['primeira_pintura_ms'] > args.orcamento_ms:
+            print(f"[AVISO] {modo}: primeira pintura acima do orçamento de {args.orcamento_ms:,.0f} ms")
+            estourados.append(modo)
+        if (args.orcamento_rerun_ms is not None and melhor['rerun_ms'] is not None
+                and melhor['rerun_ms'] > args.orcamento_rerun_ms):
+            print(f"[AVISO] {modo}: rerun acima do orçamento de {args.orcamento_rerun_ms:,.0f} ms")
+            estourados.append(modo)
+
+    resultado['dentro_do_orcamento'] = not estourados
+    saida = args.saida or f"benchmark_dashboard_{resultado['commit'] or 'local'}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"[SUCESSO] Resultados salvos em: {saida}")
+    if estourados:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparação entre Execuções Hermes Reply
+Compara distribuições, percentis e taxas de alerta entre execuções a partir de esboços compactos
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from esbocos import SENSORES, EsbocoExecucao
+
+PREFIXO_ESBOCO = 'hermes_esboco_'
+
+
+def caminho_esboco(dados_path, execucao_id):
+    """Caminho do arquivo de esboço de uma execução"""
+    return os.path.join(dados_path, f'{PREFIXO_ESBOCO}{execucao_id}.json')
+
+
+def salvar_esboco(esboco, caminho):
+    """Grava o esboço em JSON de forma atômica"""
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(esboco.para_dict(), f, separators=(',', ':'))
+    os.replace(temporario, caminho)
+
+
+def carregar_esboco(caminho):
+    """Lê um esboço salvo em JSON"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return EsbocoExecucao.de_dict(json.load(f))
+
+
+class ComparadorExecucoes:
+    """Motor de comparação entre execuções baseado em esboços mescláveis.
+
+    Cada execução tem um ``hermes_esboco_<id>.json`` gerado na ingestão.
+    Execuções antigas, sem esboço, são resumidas uma única vez a partir do
+    ``hermes_data_<id>.csv`` e o esboço é persistido para as próximas consultas.
+    Execuções compactadas pela retenção têm o esboço no JSON mensal de
+    ``arquivo/esbocos/``.
+    """
+
+    def __init__(self, dados_path):
+        self.dados_path = dados_path
+        self._esbocos = {}
+
+    def listar_execucoes(self):
+        """Lista execuções que possuem dados ou esboço, em dados_simulacao/ ou no arquivo da retenção"""
+        from retencao import ler_catalogo  # retencao importa este módulo
+        execucoes = set(ler_catalogo(self.dados_path))
+        if os.path.exists(self.dados_path):
+            for arquivo in os.listdir(self.dados_path):
+                if arquivo.startswith(PREFIXO_ESBOCO) and arquivo.endswith('.json'):
+                    execucoes.add(arquivo[len(PREFIXO_ESBOCO):-len('.json')])
+                elif arquivo.startswith('hermes_data_') and arquivo.endswith('.csv'):
+                    execucoes.add(arquivo[len('hermes_data_'):-len('.csv')])
+        return sorted(execucoes)
+
+    def obter_esboco(self, execucao_id):
+        """Retorna o esboço da execução, gerando-o a partir dos dados brutos se necessário"""
+        if execucao_id in self._esbocos:
+            return self._esbocos[execucao_id]
+
+        caminho = caminho_esboco(self.dados_path, execucao_id)
+        esboco = None
+        if os.path.exists(caminho):
+            try:
+                esboco = carregar_esboco(caminho)
+            except (ValueError, KeyError) as e:
+                print(f"[AVISO] Esboço inválido para {execucao_id}, será regenerado: {e}")
+
+        if esboco is None:
+            arquivo_dados = os.path.join(self.dados_path, f'hermes_data_{execucao_id}.csv')
+            if not os.path.exists(arquivo_dados):
+                return self._carregar_arquivados([execucao_id]).get(execucao_id)
+            esboco = EsbocoExecucao.de_dataframe(pd.read_csv(arquivo_dados), execucao_id)
+            salvar_esboco(esboco, caminho)
+
+        self._esbocos[execucao_id] = esboco
+        return esboco
+
+    def _carregar_arquivados(self, execucoes):
+        """Lê os esboços das execuções já arquivadas pela retenção (cada JSON mensal uma vez)"""
+        from retencao import ler_esbocos_arquivados  # retencao importa este módulo
+        faltantes = [e for e in execucoes
+                     if e not in self._esbocos and not os.path.exists(caminho_esboco(self.dados_path, e))]
+        for execucao_id, conteudo in ler_esbocos_arquivados(self.dados_path, PREFIXO_ESBOCO, faltantes).items():
+            try:
+                self._esbocos[execucao_id] = EsbocoExecucao.de_dict(conteudo)
+            except (ValueError, KeyError) as e:
+                print(f"[AVISO] Esboço arquivado inválido para {execucao_id}: {e}")
+        return self._esbocos
+
+    def obter_esbocos(self, execucoes=None):
+        """Retorna os esboços das execuções informadas (ou de todas)"""
+        execucoes = self.listar_execucoes() if execucoes is None else execucoes
+        self._carregar_arquivados(execucoes)
+        esbocos = {}
+        for execucao_id in execucoes:
+            esboco = self.obter_esboco(execucao_id)
+            if esboco is not None:
+                esbocos[execucao_id] = esboco
+        return esbocos
+
+    def mesclar(self, execucoes):
+        """Mescla as execuções informadas em um único esboço agregado"""
+        agregado = EsbocoExecucao('+'.join(execucoes))
+        for esboco in self.obter_esbocos(execucoes).values():
+            agregado.mesclar(esboco)
+        return agregado
+
+    def tabela_percentis(self, sensor, execucoes=None, quantis=(0.5, 0.95, 0.99)):
+        """Percentis do sensor por execução (uma linha por execução)"""
+        linhas = []
+        for execucao_id, esboco in self.obter_esbocos(execucoes).items():
+            valores = esboco.quantis[sensor].quantil(np.asarray(quantis))
+            linha = {'execucao_id': execucao_id, 'registros': esboco.registros}
+            linha.update({f'p{q * 100:g}': v for q, v in zip(quantis, valores)})
+            linha['media'] = esboco.media(sensor)
+            linha['desvio_padrao'] = esboco.desvio_padrao(sensor)
+            linhas.append(linha)
+        return pd.DataFrame(linhas)
+
+    def distribuicoes(self, sensor, execucoes=None):
+        """Densidade do histograma do sensor por execução, em formato longo"""
+        quadros = []
+        for execucao_id, esboco in self.obter_esbocos(execucoes).items():
+            histograma = esboco.histogramas[sensor]
+            limites = histograma.limites
+            quadros.append(pd.DataFrame({
+                'execucao_id': execucao_id,
+                'faixa_inicio': limites[:-1],
+                'faixa_centro': (limites[:-1] + limites[1:]) / 2,
+                'densidade': histograma.densidade()
+            }))
+        return pd.concat(quadros, ignore_index=True) if quadros else pd.DataFrame()
+
+    def taxas_alerta(self, execucoes=None):
+        """Taxas de status não-normal e de alertas por sensor, por execução"""
+        linhas = []
+        for execucao_id, esboco in self.obter_esbocos(execucoes).items():
+            total = max(esboco.registros, 1)
+            nao_normal = sum(c for s, c in esboco.contagem_status.items() if s != 'NORMAL')
+            linha = {
+                'execucao_id': execucao_id,
+                'taxa_nao_normal': nao_normal / total,
+                'dispositivos_distintos': round(esboco.dispositivos.estimar())
+            }
+            linha.update({f'taxa_alerta_{s}': esboco.alertas_sensores[s] / total for s in SENSORES})
+            linhas.append(linha)
+        return pd.DataFrame(linhas)
+
+    def perfil_sensores(self, execucoes=None):
+        """Média e desvio padrão de todos os sensores por execução"""
+        linhas = []
+        for execucao_id, esboco in self.obter_esbocos(execucoes).items():
+            linha = {'execucao_id': execucao_id}
+            for sensor in SENSORES:
+                linha[f'{sensor}_media'] = esboco.media(sensor)
+                linha[f'{sensor}_desvio'] = esboco.desvio_padrao(sensor)
+            linhas.append(linha)
+        return pd.DataFrame(linhas)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de Consulta de Telemetria Hermes Reply
+Consultas filtradas e paginadas sobre os dados carregados, com índice temporal pré-computado
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class ConsultaTelemetria:
+    """Consulta paginada sobre um DataFrame de telemetria.
+
+    O índice de ordenação por timestamp é calculado uma única vez na criação;
+    filtros são máscaras booleanas vetorizadas e cada página é obtida apenas
+    com as posições visíveis, sem reordenar nem copiar o conjunto completo.
+    """
+
+    def __init__(self, df, coluna_tempo='timestamp_simulacao', assinatura=None, indice_tempo=None):
+        self.df = df
+        self.coluna_tempo = coluna_tempo
+        self.assinatura = assinatura
+        # Índice já calculado (ex.: publicado no armazém colunar) evita o argsort na criação
+        self.indice_tempo = indice_tempo if indice_tempo is not None else self._construir_indice_tempo()
+        self._tempos_ordenados = None
+
+    def _chaves_tempo(self):
+        """Coluna de tempo como números comparáveis (nanossegundos para datas, NaT como o menor int64)"""
+        valores = self.df[self.coluna_tempo]
+        if pd.api.types.is_datetime64_any_dtype(valores):
+            return valores.to_numpy(dtype='datetime64[ns]').view('int64')
+        return pd.to_numeric(valores, errors='coerce').to_numpy(dtype='float64')
+
+    def _construir_indice_tempo(self):
+        """Pré-computa as posições das linhas em ordem cronológica crescente"""
+        if self.coluna_tempo not in self.df.columns:
+            return np.arange(len(self.df))
+        return np.argsort(self._chaves_tempo(), kind='stable')
+
+    def tempos_ordenados(self):
+        """Chaves de tempo já na ordem do índice (calculadas uma vez, para buscas binárias)"""
+        if self._tempos_ordenados is None:
+            self._tempos_ordenados = self._chaves_tempo()[self.indice_tempo]
+        return self._tempos_ordenados
+
+    def mascara_intervalo(self, inicio=None, fim=None):
+        """Máscara de [inicio, fim) por busca binária no índice temporal, sem comparar todas as linhas"""
+        chaves = self.tempos_ordenados()
+        datas = chaves.dtype == np.int64
+
+        def chave(instante):
+            return pd.Timestamp(instante).value if datas else float(instante)
+
+        # NaT fica no início do índice e nunca entra num intervalo
+        primeira = np.searchsorted(chaves, np.iinfo(np.int64).min, 'right') if datas else 0
+        if inicio is not None:
+            primeira = max(primeira, np.searchsorted(chaves, chave(inicio), 'left'))
+        ultima = len(chaves) if fim is None else np.searchsorted(chaves, chave(fim), 'left')
+        if not datas and fim is None:
+            ultima = np.searchsorted(chaves, np.inf, 'right')  # NaN fica no fim do índice
+
+        mascara = np.zeros(len(self.df), dtype=bool)
+        mascara[self.indice_tempo[primeira:ultima]] = True
+        return mascara
+
+    def criar_mascara(self, execucoes=None, status=None, periodo=None, dispositivos=None, intervalo=None):
+        """Cria máscara booleana vetorizada para os filtros do dashboard e da API.
+
+        ``periodo`` são datas (fim inclusivo, como no seletor do dashboard);
+        ``intervalo`` são instantes exatos ``(inicio, fim)``, fim exclusivo e
+        qualquer um dos dois podendo ser None.
+        """
+        mascara = np.ones(len(self.df), dtype=bool)
+
+        if execucoes:
+            mascara &= self.df['execucao_id'].isin(execucoes).to_numpy()
+
+        if dispositivos:
+            mascara &= self.df['device_id'].isin(dispositivos).to_numpy()
+
+        if status is not None:
+            mascara &= self.df['system_status'].isin(status).to_numpy()
+
+        if periodo is not None and len(periodo) == 2:
+            inicio = pd.Timestamp(periodo[0])
+            fim = pd.Timestamp(periodo[1]) + pd.Timedelta(days=1)
+            tempos = self.df[self.coluna_tempo]
+            mascara &= ((tempos >= inicio) & (tempos < fim)).to_numpy()
+
+        if intervalo is not None and self.coluna_tempo in self.df.columns:
+            mascara &= self.mascara_intervalo(*intervalo)
+
+        return mascara
+
+    def posicoes_ordenadas(self, mascara=None, ascendente=True):
+        """Retorna as posições filtradas já na ordem temporal pedida"""
+        ordem = self.indice_tempo
+        if mascara is not None:
+            ordem = ordem[mascara[ordem]]
+        return ordem if ascendente else ordem[::-1]
+
+    def contar(self, mascara=None):
+        """Conta os registros que satisfazem a máscara"""
+        return len(self.df) if mascara is None else int(np.count_nonzero(mascara))
+
+    def total_paginas(self, tamanho_pagina, mascara=None):
+        """Número de páginas para o tamanho de página informado"""
+        return max(1, -(-self.contar(mascara) // tamanho_pagina))
+
+    def obter_pagina(self, pagina, tamanho_pagina, mascara=None, ascendente=False, colunas=None):
+        """Retorna somente as linhas da página solicitada (páginas começam em 1)"""
+        ordem = self.posicoes_ordenadas(mascara, ascendente)
+        inicio = (max(1, pagina) - 1) * tamanho_pagina
+        posicoes = ordem[inicio:inicio + tamanho_pagina]
+
+        df_pagina = self.df.iloc[posicoes]
+        if colunas is not None:
+            df_pagina = df_pagina[[c for c in colunas if c in df_pagina.columns]]
+        return df_pagina
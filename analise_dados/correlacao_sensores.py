@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Correlações entre Sensores Hermes Reply
+Correlação móvel e defasada (cruzada) entre temperatura, umidade, luminosidade e vibração, por dispositivo
+"""
+
+import numpy as np
+import pandas as pd
+
+from esbocos import SENSORES
+from qualidade_dados import INTERVALO_LEITURA_MS
+
+# Lacunas maiores que isto (em leituras) são encurtadas na grade; janelas e defasagens não passam disso
+SEPARACAO_MAXIMA = 720  # 1 hora de leituras
+# Até esta defasagem máxima as somas são feitas por deslocamento direto; acima, por FFT
+LIMITE_DEFASAGEM_DIRETA = 8
+# Pares válidos mínimos para uma correlação defasada
+MINIMO_PARES = 8
+# Quadros de uma animação (janelas móveis ou defasagens amostradas)
+MAX_QUADROS = 120
+# Ordem dos momentos: pares válidos, Σx, Σy, Σx², Σy², Σxy
+MOMENTOS = ['pares', 'soma_x', 'soma_y', 'soma_xx', 'soma_yy', 'soma_xy']
+TROCA_XY = [0, 2, 1, 4, 3, 5]
+
+
+def _tempos_ms(serie):
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        tempos = serie.to_numpy(dtype='datetime64[ms]').astype('int64').astype('float64')
+        return np.where(serie.isna().to_numpy(), np.nan, tempos)
+    return pd.to_numeric(serie, errors='coerce').to_numpy(dtype='float64')
+
+
+def montar_grade(df, sensores=SENSORES, intervalo_ms=INTERVALO_LEITURA_MS, separacao=SEPARACAO_MAXIMA):
+    """Leituras numa grade regular: uma posição por intervalo de leitura, dispositivos em sequência.
+
+    Retorna (valores, tempos_ms, trechos). ``valores`` tem uma coluna por
+    sensor, centrada na média do dispositivo, com NaN nas posições sem
+    leitura; ``tempos_ms`` é o instante de cada posição (NaN nas vazias) e
+    ``trechos`` leva cada dispositivo ao seu intervalo [inicio, fim) na
+    grade. Lacunas longas e a passagem de um dispositivo ao seguinte viram
+    ``separacao`` posições vazias, mais do que qualquer janela ou defasagem
+    alcança: nenhum cálculo mistura dispositivos nem trata uma lacuna longa
+    como leituras consecutivas.
+    """
+    tempos = _tempos_ms(df['timestamp_simulacao'])
+    codigos, nomes = pd.factorize(df['device_id'], use_na_sentinel=False)
+    ordem = np.lexsort((tempos, codigos))
+    ordem = ordem[~np.isnan(tempos[ordem])]
+    if len(ordem) == 0:
+        return np.empty((0, len(sensores))), np.empty(0), {}
+
+    codigos, tempos = codigos[ordem], tempos[ordem]
+    novo_dispositivo = np.r_[True, codigos[1:] != codigos[:-1]]
+    passos = np.clip(np.rint(np.diff(tempos, prepend=tempos[0]) / intervalo_ms), 0, separacao)
+    passos[novo_dispositivo] = separacao
+    passos[0] = 0
+    posicoes = np.cumsum(passos).astype(np.int64)
+
+    # Centrar na média do dispositivo mantém as somas acumuladas pequenas (precisão) e agrupa "dentro do dispositivo"
+    segmento = np.cumsum(novo_dispositivo) - 1
+    brutos = np.column_stack([pd.to_numeric(df[s], errors='coerce').to_numpy(dtype='float64') for s in sensores])[ordem]
+    for coluna in range(brutos.shape[1]):
+        presentes = ~np.isnan(brutos[:, coluna])
+        soma = np.bincount(segmento, weights=np.where(presentes, brutos[:, coluna], 0.0))
+        quantidade = np.bincount(segmento, weights=presentes)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            brutos[:, coluna] -= (soma / quantidade)[segmento]
+
+    # Leituras duplicadas caem na mesma posição: vale a última
+    valores = np.full((posicoes[-1] + 1, len(sensores)), np.nan)
+    valores[posicoes] = brutos
+    tempos_grade = np.full(len(valores), np.nan)
+    tempos_grade[posicoes] = tempos
+
+    inicios = np.flatnonzero(novo_dispositivo)
+    fins = np.r_[inicios[1:], len(posicoes)]
+    trechos = {str(nomes[codigos[a]]): (int(posicoes[a]), int(posicoes[b - 1]) + 1) for a, b in zip(inicios, fins)}
+    return valores, tempos_grade, trechos
+
+
+def correlacao_de_momentos(momentos, minimo=MINIMO_PARES):
+    """Pearson a partir dos momentos (eixo 0 em ``MOMENTOS``); NaN com poucos pares ou variância nula"""
+    pares, soma_x, soma_y, soma_xx, soma_yy, soma_xy = momentos
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariancia = soma_xy - soma_x * soma_y / pares
+        variancia_x = soma_xx - soma_x * soma_x / pares
+        variancia_y = soma_yy - soma_y * soma_y / pares
+        r = covariancia / np.sqrt(variancia_x * variancia_y)
+    # Variância relativa desprezível: série constante na janela (o resto é erro de arredondamento)
+    invalida = (pares < minimo) | (variancia_x <= 1e-9 * soma_xx) | (variancia_y <= 1e-9 * soma_yy)
+    return np.clip(np.where(invalida, np.nan, r), -1.0, 1.0)
+
+
+def _termos(x, y):
+    """Valores zerados fora dos pares válidos e os indicadores de presença"""
+    presente_x, presente_y = ~np.isnan(x), ~np.isnan(y)
+    return np.where(presente_x, x, 0.0), np.where(presente_y, y, 0.0), presente_x.astype('float64'), presente_y.astype('float64')
+
+
+def _momentos_deslocados(x, y, max_defasagem):
+    """Momentos de (x(t), y(t+k)) por deslocamento direto, O(n·L): barato para defasagens curtas"""
+    n = len(x)
+    x0, y0, px, py = _termos(x, y)
+    momentos = np.zeros((6, 2 * max_defasagem + 1))
+    for indice, k in enumerate(range(-max_defasagem, max_defasagem + 1)):
+        a = slice(max(0, -k), max(0, n - max(0, k)))
+        b = slice(max(0, k), max(0, n - max(0, -k)))
+        pares = px[a] * py[b]
+        xa, yb = x0[a] * pares, y0[b] * pares
+        momentos[:, indice] = [pares.sum(), xa.sum(), yb.sum(), (xa * xa).sum(), (yb * yb).sum(), (xa * yb).sum()]
+    return momentos
+
+
+class _TransformadasSensor:
+    """FFT de presença, valor e quadrado de um sensor, reaproveitadas em todos os pares em que ele entra"""
+
+    def __init__(self, valores, tamanho_fft):
+        presente = ~np.isnan(valores)
+        zerados = np.where(presente, valores, 0.0)
+        self.presenca = np.fft.rfft(presente.astype('float64'), tamanho_fft)
+        self.valor = np.fft.rfft(zerados, tamanho_fft)
+        self.quadrado = np.fft.rfft(zerados * zerados, tamanho_fft)
+
+
+def _momentos_fft(tx, ty, max_defasagem, tamanho_fft):
+    """Momentos de (x(t), y(t+k)) por correlação circular via FFT, O(n log n) para todas as defasagens"""
+    def correlacao(a, b):
+        c = np.fft.irfft(np.conj(a) * b, tamanho_fft)
+        return np.concatenate([c[tamanho_fft - max_defasagem:], c[:max_defasagem + 1]])
+
+    return np.array([
+        np.rint(correlacao(tx.presenca, ty.presenca)),
+        correlacao(tx.valor, ty.presenca),
+        correlacao(tx.presenca, ty.valor),
+        correlacao(tx.quadrado, ty.presenca),
+        correlacao(tx.presenca, ty.quadrado),
+        correlacao(tx.valor, ty.valor)
+    ])
+
+
+def momentos_defasados(valores, max_defasagem):
+    """Momentos de (sensor_i(t), sensor_j(t+k)) para todos os pares e k em [-L, L]: array (6, 2L+1, S, S).
+
+    Só os pares i <= j são calculados; (j, i) é o mesmo par com x e y
+    trocados e as defasagens invertidas. Com FFT, cada sensor é transformado
+    uma vez e o preenchimento até ``n + L`` evita que a correlação circular
+    dê a volta.
+    """
+    n, quantidade = valores.shape
+    momentos = np.zeros((6, 2 * max_defasagem + 1, quantidade, quantidade))
+    usar_fft = max_defasagem > LIMITE_DEFASAGEM_DIRETA
+    if usar_fft:
+        tamanho_fft = 1 << max(1, (n + max_defasagem).bit_length())
+        transformadas = [_TransformadasSensor(valores[:, i], tamanho_fft) for i in range(quantidade)]
+
+    for i in range(quantidade):
+        for j in range(i, quantidade):
+            if usar_fft:
+                par = _momentos_fft(transformadas[i], transformadas[j], max_defasagem, tamanho_fft)
+            else:
+                par = _momentos_deslocados(valores[:, i], valores[:, j], max_defasagem)
+            momentos[:, :, i, j] = par
+            if i != j:
+                momentos[:, :, j, i] = par[TROCA_XY, ::-1]
+    return momentos
+
+
+def momentos_moveis(x, y, janela, fins, defasagem=0):
+    """Momentos de (x(t), y(t+k)) nas janelas de ``janela`` posições que terminam em ``fins``: array (6, F).
+
+    Somas acumuladas de pares, Σx, Σy, Σx², Σy² e Σxy dão a soma de qualquer
+    janela por uma subtração, então o custo não depende do tamanho da janela.
+    """
+    if defasagem:
+        deslocado = np.full(len(y), np.nan)
+        if defasagem > 0:
+            deslocado[:-defasagem] = y[defasagem:]
+        else:
+            deslocado[-defasagem:] = y[:defasagem]
+        y = deslocado
+    pares = ~np.isnan(x) & ~np.isnan(y)
+    x0, y0 = np.where(pares, x, 0.0), np.where(pares, y, 0.0)
+    acumulados = np.zeros((6, len(x) + 1))
+    np.cumsum(np.stack([pares, x0, y0, x0 * x0, y0 * y0, x0 * y0]), axis=1, out=acumulados[:, 1:])
+    return acumulados[:, fins + 1] - acumulados[:, fins + 1 - janela]
+
+
+def amostrar_quadros(total, maximo=MAX_QUADROS, incluir=None):
+    """Índices igualmente espaçados de ``total`` quadros (no máximo ``maximo``), incluindo ``incluir``"""
+    indices = np.unique(np.linspace(0, total - 1, min(total, maximo)).round().astype(int)) if total else np.empty(0, int)
+    if incluir is not None and total:
+        indices = np.union1d(indices, [incluir])
+    return indices
+
+
+class MotorCorrelacao:
+    """Correlações móveis e defasadas entre os sensores, por dispositivo.
+
+    As leituras vão para uma grade regular (``montar_grade``) uma vez; cada
+    consulta é vetorizada sobre ela e o resultado fica memorizado pelos
+    parâmetros, então a animação e os reruns do dashboard reaproveitam o
+    cálculo. A correlação defasada usa deslocamentos diretos até
+    ``LIMITE_DEFASAGEM_DIRETA`` e FFT acima disso; a móvel usa somas
+    acumuladas dos momentos.
+    """
+
+    def __init__(self, df, sensores=SENSORES, intervalo_ms=INTERVALO_LEITURA_MS):
+        self.sensores = list(sensores)
+        self.intervalo_ms = intervalo_ms
+        self.valores, self.tempos_ms, self.trechos = montar_grade(df, self.sensores, intervalo_ms)
+        self._resultados = {}
+
+    @property
+    def dispositivos(self):
+        return list(self.trechos)
+
+    def _trecho(self, dispositivo):
+        if dispositivo is None:
+            return self.valores, self.tempos_ms
+        if dispositivo not in self.trechos:
+            raise ValueError(f"dispositivo sem leituras: {dispositivo}")
+        inicio, fim = self.trechos[dispositivo]
+        return self.valores[inicio:fim], self.tempos_ms[inicio:fim]
+
+    def _memorizado(self, chave, calcular):
+        if chave not in self._resultados:
+            self._resultados[chave] = calcular()
+        return self._resultados[chave]
+
+    def defasada(self, max_defasagem, dispositivo=None):
+        """Correlação cruzada: ``correlacoes[k, i, j]`` = corr(sensor_i(t), sensor_j(t + defasagens[k])).
+
+        Um pico em defasagem positiva indica que o sensor i antecede o j.
+        Sem ``dispositivo``, todos entram juntos, cada um centrado na própria
+        média (a correlação é a de dentro dos dispositivos).
+        """
+        if not 0 <= max_defasagem < SEPARACAO_MAXIMA:
+            raise ValueError(f"defasagem máxima deve estar em [0, {SEPARACAO_MAXIMA})")
+
+        def calcular():
+            valores, _ = self._trecho(dispositivo)
+            momentos = momentos_defasados(valores, max_defasagem)
+            return {
+                'defasagens': np.arange(-max_defasagem, max_defasagem + 1),
+                'correlacoes': correlacao_de_momentos(momentos),
+                'pares': momentos[0].astype('int64')
+            }
+        return self._memorizado(('defasada', max_defasagem, dispositivo), calcular)
+
+    def movel(self, dispositivo, janela, defasagem=0, max_quadros=MAX_QUADROS):
+        """Matrizes de correlação em janelas móveis de ``janela`` leituras, amostradas em até ``max_quadros``.
+
+        ``correlacoes[f, i, j]`` = corr(sensor_i(t), sensor_j(t + defasagem))
+        na janela que termina em ``instantes[f]``. Janelas com menos da
+        metade das leituras (lacunas) ficam de fora.
+        """
+        if not 2 <= janela <= SEPARACAO_MAXIMA or abs(defasagem) >= SEPARACAO_MAXIMA:
+            raise ValueError(f"janela deve estar em [2, {SEPARACAO_MAXIMA}] e |defasagem| abaixo de {SEPARACAO_MAXIMA}")
+
+        def calcular():
+            valores, tempos = self._trecho(dispositivo)
+            quantidade = len(self.sensores)
+            fins = np.arange(janela - 1, len(valores))
+            if len(fins):
+                fins = fins[amostrar_quadros(len(fins), max_quadros, len(fins) - 1)]
+            momentos = np.zeros((6, len(fins), quantidade, quantidade))
+            for i in range(quantidade):
+                for j in range(quantidade if defasagem else i + 1):
+                    momentos[:, :, i, j] = momentos_moveis(valores[:, i], valores[:, j], janela, fins, defasagem)
+                    if not defasagem:
+                        momentos[:, :, j, i] = momentos[TROCA_XY, :, i, j]
+            correlacoes = correlacao_de_momentos(momentos, minimo=max(MINIMO_PARES, janela // 2))
+
+            # Instante do fim de cada janela: última leitura real mais as posições vazias depois dela
+            posicoes = np.arange(len(tempos))
+            ultima = np.maximum.accumulate(np.where(np.isnan(tempos), 0, posicoes))
+            instantes = (tempos[ultima] + (posicoes - ultima) * self.intervalo_ms)[fins]
+            validos = ~np.all(np.isnan(correlacoes), axis=(1, 2))
+            return {
+                'instantes': pd.to_datetime(instantes[validos], unit='ms'),
+                'correlacoes': correlacoes[validos],
+                'pares': momentos[0][validos].astype('int64')
+            }
+        return self._memorizado(('movel', dispositivo, janela, defasagem, max_quadros), calcular)
+
+    def picos_defasagem(self, max_defasagem, dispositivo=None):
+        """Para cada par de sensores, a defasagem de maior |correlação| e qual dos dois antecede o outro"""
+        resultado = self.defasada(max_defasagem, dispositivo)
+        defasagens, correlacoes = resultado['defasagens'], resultado['correlacoes']
+        linhas = []
+        for i in range(len(self.sensores)):
+            for j in range(i + 1, len(self.sensores)):
+                r = correlacoes[:, i, j]
+                if np.all(np.isnan(r)):
+                    continue
+                pico = int(np.nanargmax(np.abs(r)))
+                defasagem = int(defasagens[pico])
+                a, b = self.sensores[i], self.sensores[j]
+                linhas.append({
+                    'sensor_a': a,
+                    'sensor_b': b,
+                    'correlacao_sem_defasagem': r[max_defasagem],
+                    'correlacao_pico': r[pico],
+                    'defasagem_leituras': defasagem,
+                    'defasagem_s': defasagem * self.intervalo_ms / 1000,
+                    'antecede': a if defasagem > 0 else b if defasagem < 0 else 'simultâneos'
+                })
+        return pd.DataFrame(linhas, columns=['sensor_a', 'sensor_b', 'correlacao_sem_defasagem', 'correlacao_pico',
+                                             'defasagem_leituras', 'defasagem_s', 'antecede'])
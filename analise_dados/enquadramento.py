@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitura do Canal Serial Hermes Reply
+Quadros JSON com prefixo de tamanho (canal de máquina) e linhas JSON_DATA (canal misto)
+"""
+
+import glob
+import gzip
+import io
+import json
+import lzma
+import os
+import re
+
+from instrumentacao import METRICAS
+
+try:
+    # Opcional: decodificação JSON ~2x mais rápida; sem ele usa o json da biblioteca padrão
+    from orjson import loads as carregar_json
+except ImportError:
+    carregar_json = json.loads
+
+try:
+    # Opcional: leitura de logs arquivados em .zst; .gz e .xz usam a biblioteca padrão
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Arquivo comprimido truncado ou corrompido (interrompe a leitura daquele arquivo)
+ERROS_DESCOMPRESSAO = (OSError, EOFError, lzma.LZMAError) + ((zstandard.ZstdError,) if zstandard else ())
+
+# "@LLLL:" seguido de LLLL bytes de JSON (ver sendMachineRecord em arduino/src/main.cpp)
+PADRAO_PREFIXO = re.compile(rb'@([0-9A-Fa-f]{4}):')
+PADRAO_INICIO_ENQUADRADO = re.compile(rb'(?:^|\n)@[0-9A-Fa-f]{4}:\{')
+# Canal misto: uma linha JSON_DATA a cada ~9 linhas de molduras decorativas
+PADRAO_JSON_DATA = re.compile(rb'JSON_DATA:[ \t]*(\{.*\})')
+
+TAMANHO_AMOSTRA = 64 * 1024
+TAMANHO_PREFIXO = len(b'@0000:')
+# ~8 MB, múltiplo dos 60 bytes do TelemetryFrameV1: um log só de quadros binários é lido
+# em blocos de quadros inteiros e cada bloco vira um array sem cópia (numpy.frombuffer)
+TAMANHO_BLOCO_LEITURA = 8 * 1024 * 1024 // 60 * 60
+PADRAO_LOGS_DIRETORIO = '*.log*'
+
+
+def tem_prefixo_tamanho(dados):
+    """Indica se o log foi gravado no canal de máquina com prefixo de tamanho"""
+    return PADRAO_INICIO_ENQUADRADO.search(dados[:TAMANHO_AMOSTRA]) is not None
+
+
+def extrair_registros_parciais(dados):
+    """Extrai os payloads JSON de um fluxo com prefixo de tamanho.
+
+    O leitor salta de quadro em quadro pelo tamanho declarado, sem procurar
+    fim de linha nem decodificar UTF-8. Bytes fora de quadro (mensagens de
+    boot, quadros binários) são pulados até o próximo ``@``. Retorna os
+    payloads (bytes), o número de quadros descartados por tamanho inválido
+    e quantos bytes foram consumidos: um quadro (ou prefixo) incompleto no
+    final não é consumido, para que a próxima leitura o retome do início.
+    """
+    registros = []
+    descartados = 0
+    posicao = 0
+    total = len(dados)
+
+    while True:
+        inicio = dados.find(b'@', posicao)
+        if inicio < 0:
+            posicao = total
+            break
+        prefixo = PADRAO_PREFIXO.match(dados, inicio)
+        if prefixo is None:
+            if total - inicio < TAMANHO_PREFIXO:
+                posicao = inicio  # prefixo ainda sendo gravado
+                break
+            posicao = inicio + 1
+            continue
+
+        corpo = prefixo.end()
+        fim = corpo + int(prefixo.group(1), 16)
+        if fim > total:
+            posicao = inicio  # quadro truncado no final do log
+            break
+
+        if dados[corpo:corpo + 1] == b'{' and dados[fim - 1:fim] == b'}':
+            registros.append(dados[corpo:fim])
+            posicao = fim
+        else:
+            descartados += 1
+            posicao = inicio + 1
+
+    return registros, descartados, posicao
+
+
+def extrair_linhas_json_data(dados):
+    """Extrai os payloads das linhas ``JSON_DATA:`` do canal misto"""
+    return PADRAO_JSON_DATA.findall(dados)
+
+
+def decodificar_payloads(brutos):
+    """Decodifica os payloads JSON em lote.
+
+    Todos os payloads são unidos em um único array JSON e decodificados em
+    uma chamada; se algum estiver corrompido, cai para a decodificação
+    individual para descartar só os inválidos. Retorna os dicionários, o
+    número de erros e a descrição do primeiro erro.
+    """
+    if not brutos:
+        return [], 0, None
+
+    try:
+        return carregar_json(b'[' + b','.join(brutos) + b']'), 0, None
+    except ValueError:
+        pass
+
+    payloads = []
+    erros = 0
+    primeiro_erro = None
+    for bruto in brutos:
+        try:
+            payloads.append(carregar_json(bruto))
+        except ValueError as e:
+            erros += 1
+            primeiro_erro = primeiro_erro or f"{e} no payload: {bruto[:120].decode('utf-8', 'replace')}"
+    return payloads, erros, primeiro_erro
+
+
+def abrir_log(caminho):
+    """Abre um log para leitura binária, descomprimindo em fluxo conforme a extensão (.gz, .xz, .zst)"""
+    if caminho.endswith('.gz'):
+        return gzip.open(caminho, 'rb')
+    if caminho.endswith('.xz'):
+        return lzma.open(caminho, 'rb')
+    if caminho.endswith('.zst'):
+        if zstandard is None:
+            raise ValueError(f"{caminho}: leitura de .zst requer o pacote 'zstandard'")
+        leitor = zstandard.ZstdDecompressor().stream_reader(open(caminho, 'rb'), read_across_frames=True, closefd=True)
+        return io.BufferedReader(leitor, TAMANHO_BLOCO_LEITURA)  # read(n) devolve n bytes, como gzip e lzma
+    return open(caminho, 'rb')
+
+
+def ler_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO_LEITURA):
+    """Gera o conteúdo (já descomprimido) do log em blocos grandes, sem materializar o arquivo inteiro"""
+    with abrir_log(caminho) as f:
+        while True:
+            with METRICAS.etapa('ler_log'):
+                bloco = f.read(tamanho_bloco)
+            if not bloco:
+                break
+            METRICAS.contar('bytes_lidos', len(bloco))
+            yield bloco
+
+
+def expandir_entradas(entradas):
+    """Arquivos de log de uma lista de caminhos, padrões glob (``**`` recursivo) e diretórios.
+
+    Diretórios contribuem com os ``*.log*`` (inclusive comprimidos) que
+    contêm; a ordem das entradas é mantida e arquivos repetidos entram uma vez.
+    """
+    arquivos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            encontrados = sorted(glob.glob(os.path.join(entrada, PADRAO_LOGS_DIRETORIO)))
+        elif any(caractere in entrada for caractere in '*?['):
+            encontrados = sorted(glob.glob(entrada, recursive=True))
+        else:
+            encontrados = [entrada]
+        for caminho in encontrados:
+            if caminho not in arquivos and not os.path.isdir(caminho):
+                arquivos.append(caminho)
+    return arquivos
+
+
+class ExtratorPayloads:
+    """Extrai os payloads de um log entregue em blocos, em qualquer um dos canais.
+
+    O canal é detectado no primeiro bloco. O final de cada bloco que ainda
+    pode conter um registro incompleto (quadro ou linha ``JSON_DATA``) é
+    guardado e prefixado ao bloco seguinte; ``finalizar`` trata o que
+    sobrou no fim do arquivo. Use uma instância por arquivo.
+    """
+
+    def __init__(self):
+        self.enquadrado = None
+        self.resto = b''
+        self.descartados = 0
+
+    def alimentar(self, bloco):
+        """Retorna os payloads brutos completos disponíveis até este bloco"""
+        dados = self.resto + bloco if self.resto else bloco
+        if self.enquadrado is None:
+            self.enquadrado = tem_prefixo_tamanho(dados)
+
+        with METRICAS.etapa('extrair_payloads'):
+            if self.enquadrado:
+                brutos, descartados, consumido = extrair_registros_parciais(dados)
+                self.descartados += descartados
+                self.resto = dados[consumido:]
+            else:
+                consumido = dados.rfind(b'\n') + 1
+                brutos = extrair_linhas_json_data(dados[:consumido])
+                # Linha maior que a amostra não é um JSON_DATA válido (ex.: log só com quadros binários)
+                self.resto = dados[consumido:][-TAMANHO_AMOSTRA:]
+                if METRICAS.ativo:
+                    METRICAS.contar('linhas_varridas', dados.count(b'\n', 0, consumido))
+        return brutos
+
+    def finalizar(self):
+        """Payloads da última linha sem quebra; um quadro truncado no fim do arquivo é ignorado"""
+        resto, self.resto = self.resto, b''
+        if self.enquadrado or not resto:
+            return []
+        return extrair_linhas_json_data(resto)
+
+
+class LeitorIncremental:
+    """Lê apenas os payloads novos de um log serial que ainda está sendo gravado.
+
+    Guarda a posição já consumida; cada ``ler_novos`` lê do ponto anterior
+    até o último registro completo (linha ``JSON_DATA`` ou quadro com
+    prefixo). Na primeira leitura de um log grande começa pela cauda
+    (``cauda_inicial`` bytes). Se o arquivo encolher, a simulação foi
+    reiniciada e a leitura recomeça do início.
+    """
+
+    def __init__(self, caminho, cauda_inicial=1024 * 1024):
+        self.caminho = caminho
+        self.cauda_inicial = cauda_inicial
+        self.posicao = None
+        self.enquadrado = None
+
+    def ler_novos(self):
+        """Retorna (payloads brutos, reiniciado)"""
+        try:
+            tamanho = os.path.getsize(self.caminho)
+        except OSError:
+            return [], False
+
+        reiniciado = False
+        if self.posicao is None:
+            self.posicao = max(0, tamanho - self.cauda_inicial)
+        elif tamanho < self.posicao:
+            self.posicao = 0
+            self.enquadrado = None
+            reiniciado = True
+        if tamanho == self.posicao:
+            return [], reiniciado
+
+        with open(self.caminho, 'rb') as f:
+            f.seek(self.posicao)
+            dados = f.read(tamanho - self.posicao)
+
+        if self.enquadrado is None:
+            if tem_prefixo_tamanho(dados):
+                self.enquadrado = True
+            elif b'JSON_DATA:' in dados:
+                self.enquadrado = False
+
+        if self.enquadrado:
+            brutos, _, consumido = extrair_registros_parciais(dados)
+        else:
+            consumido = dados.rfind(b'\n') + 1
+            brutos = extrair_linhas_json_data(dados[:consumido])
+        self.posicao += consumido
+        return brutos, reiniciado
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Esboços Estatísticos Mescláveis Hermes Reply
+Quantis aproximados (t-digest), histogramas de faixas fixas e HyperLogLog, todos vetorizados
+"""
+
+import numpy as np
+import pandas as pd
+
+from esquemas import sensor_em_alerta
+
+# === SENSORES E FAIXAS DOS HISTOGRAMAS (início, fim, número de faixas) ===
+SENSORES = ['temperatura', 'umidade', 'luminosidade', 'vibracao']
+FAIXAS_HISTOGRAMA = {
+    'temperatura': (-10.0, 60.0, 70),
+    'umidade': (0.0, 100.0, 50),
+    'luminosidade': (0.0, 1024.0, 64),
+    'vibracao': (0.0, 1024.0, 64)
+}
+
+
+class EsbocoQuantis:
+    """Esboço de quantis no estilo t-digest (merging digest).
+
+    Os centróides são comprimidos de forma vetorizada com a função de escala
+    k1 (arco-seno): pontos vizinhos cujo quantil à esquerda cai na mesma
+    unidade de k são agrupados. Isso mantém centróides pequenos nas caudas,
+    onde p95/p99 precisam de precisão, e no máximo ``compressao + 1``
+    centróides no total. Dois esboços se mesclam concatenando centróides.
+    """
+
+    def __init__(self, compressao=200, medias=None, pesos=None, minimo=np.inf, maximo=-np.inf):
+        self.compressao = compressao
+        self.medias = np.asarray(medias if medias is not None else [], dtype='float64')
+        self.pesos = np.asarray(pesos if pesos is not None else [], dtype='float64')
+        self.minimo = float(minimo)
+        self.maximo = float(maximo)
+
+    @property
+    def contagem(self):
+        """Número total de valores resumidos"""
+        return float(self.pesos.sum())
+
+    def adicionar(self, valores):
+        """Adiciona um lote de valores (NaN são ignorados)"""
+        valores = np.asarray(valores, dtype='float64').ravel()
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+
+        self.minimo = min(self.minimo, float(valores.min()))
+        self.maximo = max(self.maximo, float(valores.max()))
+        self._comprimir(
+            np.concatenate([self.medias, valores]),
+            np.concatenate([self.pesos, np.ones(len(valores))])
+        )
+        return self
+
+    def mesclar(self, outro):
+        """Mescla outro esboço neste (in-place)"""
+        if outro.contagem == 0:
+            return self
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self._comprimir(
+            np.concatenate([self.medias, outro.medias]),
+            np.concatenate([self.pesos, outro.pesos])
+        )
+        return self
+
+    def _comprimir(self, medias, pesos):
+        """Agrupa centróides vizinhos respeitando o limite da função de escala"""
+        ordem = np.argsort(medias, kind='stable')
+        medias, pesos = medias[ordem], pesos[ordem]
+
+        total = pesos.sum()
+        quantil_esquerda = (np.cumsum(pesos) - pesos) / total
+        k = self.compressao * (np.arcsin(2.0 * quantil_esquerda - 1.0) / np.pi + 0.5)
+        grupos = np.floor(k).astype('int64')
+
+        # Grupos são contíguos porque k é monótono: índices de início via diff
+        inicios = np.flatnonzero(np.r_[True, grupos[1:] != grupos[:-1]])
+        novos_pesos = np.add.reduceat(pesos, inicios)
+        self.medias = np.add.reduceat(medias * pesos, inicios) / novos_pesos
+        self.pesos = novos_pesos
+
+    def quantil(self, q):
+        """Estima quantis (escalar ou array em [0, 1])"""
+        q = np.asarray(q, dtype='float64')
+        total = self.contagem
+        if total == 0:
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+
+        centros = np.cumsum(self.pesos) - self.pesos / 2.0
+        x = np.r_[0.0, centros, total]
+        y = np.r_[self.minimo, self.medias, self.maximo]
+        resultado = np.interp(q * total, x, y)
+        return resultado if q.ndim else float(resultado)
+
+    def cdf(self, valores):
+        """Estima a fração de valores menores ou iguais a cada valor informado"""
+        valores = np.asarray(valores, dtype='float64')
+        total = self.contagem
+        if total == 0:
+            return np.full(valores.shape, np.nan)
+
+        centros = np.cumsum(self.pesos) - self.pesos / 2.0
+        x = np.r_[self.minimo, self.medias, self.maximo]
+        y = np.r_[0.0, centros, total] / total
+        return np.interp(valores, x, y)
+
+    def para_dict(self):
+        """Serializa o esboço para JSON"""
+        return {
+            'compressao': self.compressao,
+            'medias': np.round(self.medias, 6).tolist(),
+            'pesos': self.pesos.tolist(),
+            'minimo': self.minimo if np.isfinite(self.minimo) else None,
+            'maximo': self.maximo if np.isfinite(self.maximo) else None
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Reconstrói o esboço a partir do JSON"""
+        return cls(
+            compressao=dados.get('compressao', 200),
+            medias=dados.get('medias'),
+            pesos=dados.get('pesos'),
+            minimo=dados['minimo'] if dados.get('minimo') is not None else np.inf,
+            maximo=dados['maximo'] if dados.get('maximo') is not None else -np.inf
+        )
+
+
+class HistogramaFixo:
+    """Histograma de faixas fixas com contagem de valores abaixo e acima da faixa"""
+
+    def __init__(self, inicio, fim, n_faixas, contagens=None):
+        self.inicio = float(inicio)
+        self.fim = float(fim)
+        self.n_faixas = int(n_faixas)
+        # Posição 0 = abaixo da faixa, última posição = acima da faixa
+        self.contagens = np.asarray(
+            contagens if contagens is not None else np.zeros(self.n_faixas + 2),
+            dtype='int64'
+        )
+
+    @classmethod
+    def para_sensor(cls, sensor):
+        """Cria histograma com as faixas padrão do sensor"""
+        return cls(*FAIXAS_HISTOGRAMA[sensor])
+
+    @property
+    def limites(self):
+        """Limites das faixas internas"""
+        return np.linspace(self.inicio, self.fim, self.n_faixas + 1)
+
+    def adicionar(self, valores):
+        """Adiciona um lote de valores (NaN são ignorados)"""
+        valores = np.asarray(valores, dtype='float64').ravel()
+        valores = valores[~np.isnan(valores)]
+        largura = (self.fim - self.inicio) / self.n_faixas
+        indices = np.floor((valores - self.inicio) / largura).astype('int64') + 1
+        indices = np.clip(indices, 0, self.n_faixas + 1)
+        self.contagens += np.bincount(indices, minlength=self.n_faixas + 2)
+        return self
+
+    def mesclar(self, outro):
+        """Mescla outro histograma com as mesmas faixas"""
+        if (outro.inicio, outro.fim, outro.n_faixas) != (self.inicio, self.fim, self.n_faixas):
+            raise ValueError("Histogramas com faixas diferentes não podem ser mesclados")
+        self.contagens += outro.contagens
+        return self
+
+    def densidade(self):
+        """Fração de valores em cada faixa interna"""
+        total = self.contagens.sum()
+        internas = self.contagens[1:-1].astype('float64')
+        return internas / total if total else internas
+
+    def para_dict(self):
+        """Serializa o histograma para JSON"""
+        return {
+            'inicio': self.inicio,
+            'fim': self.fim,
+            'n_faixas': self.n_faixas,
+            'contagens': self.contagens.tolist()
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Reconstrói o histograma a partir do JSON"""
+        return cls(dados['inicio'], dados['fim'], dados['n_faixas'], dados['contagens'])
+
+
+class HyperLogLog:
+    """Contador aproximado de valores distintos (HyperLogLog) com registros mescláveis"""
+
+    def __init__(self, precisao=12, registros=None):
+        self.precisao = precisao
+        self.registros = np.asarray(
+            registros if registros is not None else np.zeros(1 << precisao),
+            dtype='uint8'
+        )
+
+    def adicionar(self, valores):
+        """Adiciona um lote de valores de qualquer tipo"""
+        valores = np.asarray(valores, dtype=object).ravel()
+        if len(valores) == 0:
+            return self
+
+        hashes = pd.util.hash_array(valores.astype(str).astype(object))
+        bits_restantes = 64 - self.precisao
+        indices = (hashes >> np.uint64(bits_restantes)).astype('int64')
+        resto = hashes & np.uint64((1 << bits_restantes) - 1)
+
+        # frexp dá o número de bits significativos (exato pois resto < 2^53)
+        _, bits = np.frexp(resto.astype('float64'))
+        rank = (bits_restantes - bits + 1).astype('uint8')
+        np.maximum.at(self.registros, indices, rank)
+        return self
+
+    def mesclar(self, outro):
+        """Mescla outro HyperLogLog de mesma precisão"""
+        np.maximum(self.registros, outro.registros, out=self.registros)
+        return self
+
+    def estimar(self):
+        """Estima a cardinalidade com correção para pequenos conjuntos"""
+        m = float(len(self.registros))
+        alfa = 0.7213 / (1.0 + 1.079 / m)
+        estimativa = alfa * m * m / np.sum(np.exp2(-self.registros.astype('float64')))
+        zeros = int(np.count_nonzero(self.registros == 0))
+        if estimativa <= 2.5 * m and zeros:
+            estimativa = m * np.log(m / zeros)
+        return float(estimativa)
+
+    def para_dict(self):
+        """Serializa os registros de forma compacta (apenas posições não nulas)"""
+        posicoes = np.flatnonzero(self.registros)
+        return {
+            'precisao': self.precisao,
+            'posicoes': posicoes.tolist(),
+            'valores': self.registros[posicoes].tolist()
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Reconstrói o HyperLogLog a partir do JSON"""
+        hll = cls(dados['precisao'])
+        hll.registros[np.asarray(dados['posicoes'], dtype='int64')] = dados['valores']
+        return hll
+
+
+class EsbocoExecucao:
+    """Resumo mesclável de uma execução: quantis, histogramas, contagens e dispositivos distintos"""
+
+    def __init__(self, execucao_id=None):
+        self.execucao_id = execucao_id
+        self.registros = 0
+        self.quantis = {sensor: EsbocoQuantis() for sensor in SENSORES}
+        self.histogramas = {sensor: HistogramaFixo.para_sensor(sensor) for sensor in SENSORES}
+        self.somas = {sensor: [0.0, 0.0] for sensor in SENSORES}  # soma e soma dos quadrados
+        self.contagem_status = {}
+        self.alertas_sensores = {sensor: 0 for sensor in SENSORES}
+        self.dispositivos = HyperLogLog()
+
+    @classmethod
+    def de_dataframe(cls, df, execucao_id=None):
+        """Constrói o esboço a partir de um DataFrame no formato hermes_data"""
+        esboco = cls(execucao_id)
+        esboco.adicionar(df)
+        return esboco
+
+    def adicionar(self, df):
+        """Adiciona um lote de leituras ao esboço"""
+        self.registros += len(df)
+        for sensor in SENSORES:
+            if sensor not in df.columns:
+                continue
+            valores = pd.to_numeric(df[sensor], errors='coerce').to_numpy(dtype='float64')
+            self.quantis[sensor].adicionar(valores)
+            self.histogramas[sensor].adicionar(valores)
+            validos = valores[~np.isnan(valores)]
+            self.somas[sensor][0] += float(validos.sum())
+            self.somas[sensor][1] += float(np.square(validos).sum())
+
+            coluna_status = f'{sensor}_status'
+            if coluna_status in df.columns:
+                self.alertas_sensores[sensor] += int(sensor_em_alerta(df[coluna_status]).sum())
+
+        if 'system_status' in df.columns:
+            for status, contagem in df['system_status'].value_counts().items():
+                self.contagem_status[status] = self.contagem_status.get(status, 0) + int(contagem)
+
+        if 'device_id' in df.columns:
+            self.dispositivos.adicionar(df['device_id'].to_numpy())
+        return self
+
+    def mesclar(self, outro):
+        """Mescla outro esboço de execução neste (in-place)"""
+        self.registros += outro.registros
+        for sensor in SENSORES:
+            self.quantis[sensor].mesclar(outro.quantis[sensor])
+            self.histogramas[sensor].mesclar(outro.histogramas[sensor])
+            self.somas[sensor][0] += outro.somas[sensor][0]
+            self.somas[sensor][1] += outro.somas[sensor][1]
+            self.alertas_sensores[sensor] += outro.alertas_sensores[sensor]
+        for status, contagem in outro.contagem_status.items():
+            self.contagem_status[status] = self.contagem_status.get(status, 0) + contagem
+        self.dispositivos.mesclar(outro.dispositivos)
+        return self
+
+    def media(self, sensor):
+        """Média exata do sensor, derivada das somas"""
+        n = self.quantis[sensor].contagem
+        return self.somas[sensor][0] / n if n else np.nan
+
+    def desvio_padrao(self, sensor):
+        """Desvio padrão populacional do sensor, derivado das somas"""
+        n = self.quantis[sensor].contagem
+        if not n:
+            return np.nan
+        media = self.somas[sensor][0] / n
+        return float(np.sqrt(max(self.somas[sensor][1] / n - media * media, 0.0)))
+
+    def para_dict(self):
+        """Serializa o esboço para JSON"""
+        return {
+            'execucao_id': self.execucao_id,
+            'registros': self.registros,
+            'quantis': {s: e.para_dict() for s, e in self.quantis.items()},
+            'histogramas': {s: h.para_dict() for s, h in self.histogramas.items()},
+            'somas': self.somas,
+            'contagem_status': self.contagem_status,
+            'alertas_sensores': self.alertas_sensores,
+            'dispositivos': self.dispositivos.para_dict()
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Reconstrói o esboço a partir do JSON"""
+        esboco = cls(dados.get('execucao_id'))
+        esboco.registros = dados['registros']
+        esboco.quantis = {s: EsbocoQuantis.de_dict(d) for s, d in dados['quantis'].items()}
+        esboco.histogramas = {s: HistogramaFixo.de_dict(d) for s, d in dados['histogramas'].items()}
+        esboco.somas = {s: list(v) for s, v in dados['somas'].items()}
+        esboco.contagem_status = dict(dados['contagem_status'])
+        esboco.alertas_sensores = dict(dados['alertas_sensores'])
+        esboco.dispositivos = HyperLogLog.de_dict(dados['dispositivos'])
+        return esboco
+
+
+class EsbocosPorBalde:
+    """Esboços de quantis e histogramas por dispositivo, execução e balde de tempo.
+
+    Cada balde cobre ``largura_ms`` milissegundos de ``timestamp_simulacao``.
+    Consultas selecionam baldes com máscaras vetorizadas sobre os metadados e
+    mesclam apenas os esboços escolhidos, sem tocar nos dados brutos.
+    """
+
+    def __init__(self, largura_ms=3_600_000):
+        self.largura_ms = int(largura_ms)
+        self.dispositivos = np.array([], dtype=object)
+        self.execucoes = np.array([], dtype=object)
+        self.inicios = np.array([], dtype='int64')
+        self.quantis = []
+        self.histogramas = []
+
+    def __len__(self):
+        return len(self.quantis)
+
+    def adicionar_dataframe(self, df, execucao_id):
+        """Cria os baldes de uma execução a partir de um DataFrame no formato hermes_data"""
+        tempos = pd.to_numeric(df['timestamp_simulacao'], errors='coerce')
+        validos = df[tempos.notna()]
+        baldes = (tempos[tempos.notna()].astype('int64') // self.largura_ms) * self.largura_ms
+        dispositivos = validos['device_id'].fillna('DESCONHECIDO') if 'device_id' in validos.columns \
+            else pd.Series('DESCONHECIDO', index=validos.index)
+
+        novos_dispositivos, novos_inicios = [], []
+        for (dispositivo, inicio), grupo in validos.groupby([dispositivos, baldes], sort=True):
+            quantis, histogramas = {}, {}
+            for sensor in SENSORES:
+                if sensor not in grupo.columns:
+                    continue
+                valores = pd.to_numeric(grupo[sensor], errors='coerce').to_numpy(dtype='float64')
+                quantis[sensor] = EsbocoQuantis(compressao=100).adicionar(valores)
+                histogramas[sensor] = HistogramaFixo.para_sensor(sensor).adicionar(valores)
+            novos_dispositivos.append(dispositivo)
+            novos_inicios.append(int(inicio))
+            self.quantis.append(quantis)
+            self.histogramas.append(histogramas)
+
+        self.dispositivos = np.concatenate([self.dispositivos, np.array(novos_dispositivos, dtype=object)])
+        self.execucoes = np.concatenate([self.execucoes, np.full(len(novos_inicios), execucao_id, dtype=object)])
+        self.inicios = np.concatenate([self.inicios, np.array(novos_inicios, dtype='int64')])
+        return self
+
+    def mesclar(self, outro):
+        """Anexa os baldes de outro índice com a mesma largura"""
+        if outro.largura_ms != self.largura_ms:
+            raise ValueError("Índices com larguras de balde diferentes não podem ser mesclados")
+        self.dispositivos = np.concatenate([self.dispositivos, outro.dispositivos])
+        self.execucoes = np.concatenate([self.execucoes, outro.execucoes])
+        self.inicios = np.concatenate([self.inicios, outro.inicios])
+        self.quantis.extend(outro.quantis)
+        self.histogramas.extend(outro.histogramas)
+        return self
+
+    def selecionar(self, inicio_ms=None, fim_ms=None, dispositivos=None, execucoes=None):
+        """Posições dos baldes que intersectam o intervalo e os filtros informados"""
+        mascara = np.ones(len(self), dtype=bool)
+        if inicio_ms is not None:
+            mascara &= self.inicios + self.largura_ms > inicio_ms
+        if fim_ms is not None:
+            mascara &= self.inicios <= fim_ms
+        if dispositivos is not None:
+            mascara &= np.isin(self.dispositivos, list(dispositivos))
+        if execucoes is not None:
+            mascara &= np.isin(self.execucoes, list(execucoes))
+        return np.flatnonzero(mascara)
+
+    def esboco_quantis(self, sensor, posicoes):
+        """Mescla os esboços de quantis do sensor nos baldes selecionados"""
+        agregado = EsbocoQuantis()
+        for posicao in posicoes:
+            esboco = self.quantis[posicao].get(sensor)
+            if esboco is not None:
+                agregado.mesclar(esboco)
+        return agregado
+
+    def histograma(self, sensor, posicoes):
+        """Soma os histogramas do sensor nos baldes selecionados"""
+        agregado = HistogramaFixo.para_sensor(sensor)
+        for posicao in posicoes:
+            histograma = self.histogramas[posicao].get(sensor)
+            if histograma is not None:
+                agregado.mesclar(histograma)
+        return agregado
+
+    def para_dict(self):
+        """Serializa os baldes para JSON"""
+        return {
+            'largura_ms': self.largura_ms,
+            'baldes': [
+                {
+                    'device_id': dispositivo,
+                    'execucao_id': execucao,
+                    'inicio_ms': int(inicio),
+                    'quantis': {s: e.para_dict() for s, e in quantis.items()},
+                    'histogramas': {s: h.contagens.tolist() for s, h in histogramas.items()}
+                }
+                for dispositivo, execucao, inicio, quantis, histogramas in zip(
+                    self.dispositivos, self.execucoes, self.inicios, self.quantis, self.histogramas
+                )
+            ]
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Reconstrói os baldes a partir do JSON"""
+        indice = cls(dados['largura_ms'])
+        baldes = dados['baldes']
+        indice.dispositivos = np.array([b['device_id'] for b in baldes], dtype=object)
+        indice.execucoes = np.array([b['execucao_id'] for b in baldes], dtype=object)
+        indice.inicios = np.array([b['inicio_ms'] for b in baldes], dtype='int64')
+        indice.quantis = [
+            {s: EsbocoQuantis.de_dict(d) for s, d in b['quantis'].items()} for b in baldes
+        ]
+        indice.histogramas = [
+            {s: HistogramaFixo(*FAIXAS_HISTOGRAMA[s], contagens=c) for s, c in b['histogramas'].items()}
+            for b in baldes
+        ]
+        return indice
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registro de Esquemas de Telemetria Hermes Reply
+Decodificadores vetorizados por versão de firmware e importação de layouts CSV legados
+"""
+
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from instrumentacao import METRICAS
+
+# === ESQUEMA CANÔNICO (colunas dos arquivos hermes_data_*.csv) ===
+COLUNAS_CANONICAS = [
+    'timestamp_simulacao', 'timestamp_processamento', 'execucao_id', 'device_id', 'reading_id',
+    'firmware_version', 'temperatura', 'temperatura_media_movel', 'temperatura_status',
+    'umidade', 'umidade_media_movel', 'umidade_status', 'luminosidade', 'luminosidade_status',
+    'vibracao', 'vibracao_status', 'system_status', 'risk_level', 'next_maintenance',
+    'status_detail', 'uptime', 'total_readings', 'avg_temperature', 'avg_humidity', 'risk_score'
+]
+COLUNAS_NUMERICAS = [
+    'temperatura', 'temperatura_media_movel', 'umidade', 'umidade_media_movel', 'luminosidade',
+    'vibracao', 'avg_temperature', 'avg_humidity', 'risk_score'
+]
+COLUNAS_INTEIRAS = ['timestamp_simulacao', 'reading_id', 'uptime', 'total_readings']
+COLUNAS_STATUS_SENSORES = ['temperatura_status', 'umidade_status', 'luminosidade_status', 'vibracao_status']
+COLUNAS_STATUS = [*COLUNAS_STATUS_SENSORES, 'system_status']
+# Textos repetidos em todas as leituras: guardados como categorias no perfil tipado de carga
+COLUNAS_CATEGORICAS = [
+    'execucao_id', 'device_id', 'firmware_version', *COLUNAS_STATUS,
+    'risk_level', 'next_maintenance', 'status_detail'
+]
+
+# Grafias sem acento (firmware v2.1.0) e em inglês (hermes_reply_data_*.csv)
+NORMALIZACAO_STATUS = {
+    'ATENCAO': 'ATENÇÃO', 'CRITICO': 'CRÍTICO',
+    'ATTENTION': 'ATENÇÃO', 'CRITICAL': 'CRÍTICO'
+}
+# Status por sensor no vocabulário do sistema (NORMAL, ATENÇÃO, CRÍTICO). A v2.1.0 gradua e usa BAIXO
+# como nível intermediário da luminosidade; a 1.0.0 e os quadros binários só dizem OK ou ALERTA
+# (fora da faixa, sem gravidade), que fica como ALERTA
+STATUS_SENSOR_NORMAL = 'NORMAL'
+NORMALIZACAO_STATUS_SENSOR = {**NORMALIZACAO_STATUS, 'OK': STATUS_SENSOR_NORMAL, 'BAIXO': 'ATENÇÃO'}
+NIVEIS_RISCO = np.array(['BAIXO', 'MÉDIO', 'ALTO'], dtype=object)
+LIMITES_RISCO = [0.3, 0.7]  # score < 0.3 BAIXO, < 0.7 MÉDIO, senão ALTO
+
+# Caminhos do payload JSON_DATA aninhado -> coluna canônica
+MAPEAMENTO_JSON_ANINHADO = {
+    'timestamp': 'timestamp_simulacao',
+    'deviceId': 'device_id',
+    'readingId': 'reading_id',
+    'firmwareVersion': 'firmware_version',
+    'sensors.temperature.value': 'temperatura',
+    'sensors.temperature.movingAverage': 'temperatura_media_movel',
+    'sensors.temperature.status': 'temperatura_status',
+    'sensors.humidity.value': 'umidade',
+    'sensors.humidity.movingAverage': 'umidade_media_movel',
+    'sensors.humidity.status': 'umidade_status',
+    'sensors.lightLevel.value': 'luminosidade',
+    'sensors.lightLevel.status': 'luminosidade_status',
+    'sensors.vibration.value': 'vibracao',
+    'sensors.vibration.status': 'vibracao_status',
+    'analysis.systemStatus': 'system_status',
+    'analysis.riskLevel': 'risk_level',
+    'analysis.nextMaintenance': 'next_maintenance',
+    'analysis.statusDetail': 'status_detail',
+    'operationalStats.uptime': 'uptime',
+    'operationalStats.totalReadings': 'total_readings',
+    'operationalStats.avgTemperature': 'avg_temperature',
+    'operationalStats.avgHumidity': 'avg_humidity'
+}
+CAMPOS_OBRIGATORIOS = ['temperatura', 'umidade', 'luminosidade', 'vibracao', 'system_status']
+
+# Layout plano de hermes_reply_data_*.csv -> coluna canônica
+MAPEAMENTO_CSV_REPLY = {
+    'timestamp': 'timestamp_simulacao',
+    'readingId': 'reading_id',
+    'temperature': 'temperatura',
+    'humidity': 'umidade',
+    'light': 'luminosidade',
+    'vibration': 'vibracao',
+    'status': 'system_status'
+}
+# firmware_version das leituras importadas desses arquivos
+FIRMWARE_LEGADO = 'legado-csv'
+
+
+def sensor_em_alerta(status):
+    """Leituras com o sensor fora da faixa normal (qualquer gravidade, qualquer firmware), vetorizado.
+
+    Aceita a coluna normalizada ou bruta; status ausente não conta como alerta.
+    """
+    status = pd.Series(status)
+    normalizado = status.astype(object).replace(NORMALIZACAO_STATUS_SENSOR)
+    return status.notna() & (normalizado != STATUS_SENSOR_NORMAL)
+
+
+def normalizar_risco(df):
+    """Separa risco numérico (risk_score) do nível textual (risk_level) de forma vetorizada"""
+    bruto = df['risk_level']
+    # Históricos antigos gravaram o score numérico da v2.1.0 em risk_level
+    numerico = pd.to_numeric(bruto, errors='coerce')
+    score = pd.to_numeric(df['risk_score'], errors='coerce').fillna(numerico)
+
+    indices = np.searchsorted(LIMITES_RISCO, score.fillna(0).to_numpy(), side='right')
+    derivado = pd.Series(NIVEIS_RISCO[indices], index=df.index).where(score.notna())
+    df['risk_level'] = bruto.where(numerico.isna()).fillna(derivado)
+    df['risk_score'] = score
+    return df
+
+
+def normalizar_dataframe(df, execucao_id=None, timestamp_processamento=None):
+    """Converte qualquer DataFrame parcial para o esquema canônico (colunas, tipos e grafias)"""
+    df = df.copy()
+    for coluna in COLUNAS_CANONICAS:
+        if coluna not in df.columns:
+            df[coluna] = np.nan
+
+    if execucao_id is not None:
+        df['execucao_id'] = df['execucao_id'].fillna(execucao_id) if len(df) else execucao_id
+    if timestamp_processamento is not None:
+        df['timestamp_processamento'] = df['timestamp_processamento'].fillna(timestamp_processamento)
+
+    for coluna in COLUNAS_NUMERICAS:
+        df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
+    for coluna in COLUNAS_INTEIRAS:
+        if not pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype('Int64')
+    for coluna in COLUNAS_STATUS_SENSORES:
+        df[coluna] = df[coluna].replace(NORMALIZACAO_STATUS_SENSOR)
+    df['system_status'] = df['system_status'].replace(NORMALIZACAO_STATUS)
+
+    df['firmware_version'] = df['firmware_version'].astype('string').str.lstrip('v').astype(object)
+    df['status_detail'] = df['status_detail'].fillna('')
+    return normalizar_risco(df)[COLUNAS_CANONICAS]
+
+
+def compactar_dataframe(df):
+    """Perfil tipado de carga: textos repetidos como categorias, sensores em float32 e inteiros no menor tipo.
+
+    Inteiros com valores ausentes permanecem como ``Int64``. O resultado
+    ocupa uma fração da memória do DataFrame canônico e se comporta igual
+    nas consultas do dashboard (filtros, agrupamentos e gráficos).
+    """
+    colunas = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if coluna in COLUNAS_CATEGORICAS:
+            serie = serie.astype('category')
+        elif coluna in COLUNAS_NUMERICAS:
+            serie = serie.astype('float32')
+        elif (coluna in COLUNAS_INTEIRAS and not pd.api.types.is_datetime64_any_dtype(serie)
+              and len(serie) and not serie.isna().any()):
+            serie = pd.to_numeric(serie.astype('int64'), downcast='integer')
+        colunas[coluna] = serie
+    return pd.DataFrame(colunas, index=df.index)
+
+
+def tipar_dataframe(df, colunas=COLUNAS_CANONICAS):
+    """Converte para o esquema canônico no perfil tipado, mantendo apenas ``colunas``"""
+    df = compactar_dataframe(normalizar_dataframe(df)[colunas])
+    df['timestamp_simulacao'] = pd.to_datetime(df['timestamp_simulacao'], unit='ms')
+    if 'timestamp_processamento' in df.columns:
+        df['timestamp_processamento'] = pd.to_datetime(df['timestamp_processamento'])
+    return df
+
+
+def ler_csv_tipado(arquivo, colunas=COLUNAS_CANONICAS):
+    """Lê um CSV de telemetria no perfil tipado, sem analisar as colunas descartadas"""
+    selecionadas = set(colunas)
+    return tipar_dataframe(pd.read_csv(arquivo, usecols=lambda c: c in selecionadas), colunas)
+
+
+class DecodificadorJson:
+    """Decodificador de payloads JSON_DATA de uma versão de firmware.
+
+    O mapeamento de caminhos é resolvido uma única vez; cada lote de payloads
+    é achatado de uma vez com ``pandas.json_normalize`` e renomeado, em vez de
+    montar um dicionário por leitura. Campos ausentes viram NaN.
+    """
+
+    def __init__(self, versao, mapeamento=None):
+        self.versao = versao
+        self.mapeamento = dict(mapeamento or MAPEAMENTO_JSON_ANINHADO)
+
+    def decodificar(self, payloads):
+        """Decodifica uma lista de dicionários JSON em um DataFrame parcial"""
+        plano = pd.json_normalize(payloads)
+        colunas = {caminho: coluna for caminho, coluna in self.mapeamento.items() if caminho in plano.columns}
+        return plano[list(colunas)].rename(columns=colunas)
+
+    def mapear(self, caminho, coluna):
+        """Redireciona um caminho do payload para outra coluna canônica"""
+        self.mapeamento[caminho] = coluna
+        return self
+
+
+class RegistroEsquemas:
+    """Registro de decodificadores indexado por ``firmwareVersion``.
+
+    Versões desconhecidas usam o decodificador padrão (payload aninhado),
+    que tolera campos ausentes; a normalização final detecta se o risco
+    veio como score ou como nível textual.
+    """
+
+    def __init__(self):
+        self.decodificadores = {}
+        self.padrao = DecodificadorJson('padrao')
+
+    def registrar(self, decodificador):
+        """Registra o decodificador para a sua versão de firmware"""
+        self.decodificadores[decodificador.versao.lstrip('v')] = decodificador
+        return decodificador
+
+    def obter(self, versao):
+        """Retorna o decodificador da versão (ou o padrão)"""
+        return self.decodificadores.get(str(versao).lstrip('v'), self.padrao)
+
+    def decodificar(self, payloads, execucao_id, timestamp_processamento):
+        """Decodifica payloads de versões misturadas para o esquema canônico.
+
+        Retorna o DataFrame canônico e o número de registros descartados por
+        não terem os campos obrigatórios de sensores e status.
+        """
+        if not payloads:
+            return pd.DataFrame(columns=COLUNAS_CANONICAS), 0
+
+        versoes = pd.Series([p.get('firmwareVersion') for p in payloads], dtype=object).fillna('')
+        partes = []
+        for versao, posicoes in versoes.groupby(versoes).indices.items():
+            inicio = time.perf_counter()
+            lote = [payloads[i] for i in posicoes]
+            parte = self.obter(versao).decodificar(lote)
+            METRICAS.observar('lote_json_segundos', time.perf_counter() - inicio)
+            parte.index = posicoes
+            partes.append(parte)
+
+        df = normalizar_dataframe(pd.concat(partes).sort_index(), execucao_id, timestamp_processamento)
+        completos = df[CAMPOS_OBRIGATORIOS].notna().all(axis=1)
+        return df[completos].reset_index(drop=True), int((~completos).sum())
+
+
+def criar_registro_padrao():
+    """Registro com as versões de firmware conhecidas"""
+    registro = RegistroEsquemas()
+    # v2.1.0: riskLevel é um score numérico (0-1); status sem acento; vibração em float
+    registro.registrar(DecodificadorJson('v2.1.0').mapear('analysis.riskLevel', 'risk_score'))
+    # 1.0.0 (arduino/src/main.cpp): riskLevel textual; status OK/ALERTA; vibração inteira
+    registro.registrar(DecodificadorJson('1.0.0'))
+    return registro
+
+
+REGISTRO_PADRAO = criar_registro_padrao()
+
+
+# === IMPORTAÇÃO DE LAYOUTS CSV LEGADOS ===
+def detectar_layout_csv(colunas):
+    """Identifica o layout de um CSV pelas colunas do cabeçalho"""
+    colunas = set(colunas)
+    if {'timestamp_simulacao', 'temperatura', 'system_status'} <= colunas:
+        return 'hermes_data'
+    if {'timestamp', 'readingId', 'temperature', 'status'} <= colunas:
+        return 'hermes_reply_data'
+    return None
+
+
+def execucao_do_arquivo(caminho):
+    """Extrai o identificador AAAAMMDD_HHMMSS do nome do arquivo"""
+    encontrado = re.search(r'(\d{8}_\d{6})', os.path.basename(caminho))
+    return encontrado.group(1) if encontrado else os.path.splitext(os.path.basename(caminho))[0]
+
+
+def importar_csv_legado(caminho, device_id=None, timestamp_processamento=None):
+    """Importa um CSV em qualquer layout conhecido para o esquema canônico.
+
+    O layout hermes_reply_data não identifica o dispositivo e conta o tempo
+    desde o boot, então dois arquivos geram as mesmas chaves
+    ``(device_id, reading_id, timestamp_simulacao)``. Sem ``device_id``,
+    cada arquivo recebe a identidade própria ``LEGADO_<execução>`` para não
+    ser descartado como duplicata do anterior.
+    """
+    df = pd.read_csv(caminho)
+    layout = detectar_layout_csv(df.columns)
+    execucao_id = execucao_do_arquivo(caminho)
+    device_id = device_id or f'LEGADO_{execucao_id}'
+
+    if layout == 'hermes_reply_data':
+        df = df.rename(columns=MAPEAMENTO_CSV_REPLY)[list(MAPEAMENTO_CSV_REPLY.values())]
+        df['device_id'] = device_id
+        df['firmware_version'] = FIRMWARE_LEGADO
+        df['total_readings'] = df['reading_id']
+        df['uptime'] = df['timestamp_simulacao']
+    elif layout is None:
+        raise ValueError(f"Layout CSV não reconhecido: {os.path.basename(caminho)}")
+
+    return normalizar_dataframe(df, execucao_id, timestamp_processamento)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Explicabilidade do Modelo Hermes Reply
+Importância por permutação e atribuições por caminho de decisão do RandomForest, em lotes paralelos
+"""
+
+import numpy as np
+import pandas as pd
+
+# Leituras usadas na importância por permutação (amostra aleatória das rotuladas)
+MAX_LEITURAS_PERMUTACAO = 20000
+# Leituras com atribuição individual (as mais recentes: são as que justificam uma manutenção)
+MAX_LEITURAS_EXPLICADAS = 5000
+REPETICOES_PERMUTACAO = 5
+TAMANHO_LOTE = 2000
+# Colunas que identificam uma leitura explicada na tabela de justificativas
+COLUNAS_IDENTIFICACAO = ['device_id', 'timestamp_simulacao', 'system_status']
+
+
+def matriz_deltas(modelo, n_features):
+    """Variação da probabilidade de cada classe ao entrar em cada nó, na coluna da feature que decidiu a entrada.
+
+    Retorna ``(deltas, vies)``: ``deltas`` tem uma linha por nó de todas as
+    árvores (na ordem do ``decision_path`` da floresta) e ``n_features * C``
+    colunas; ``vies`` é a probabilidade média na raiz. Somar as linhas dos
+    nós percorridos por uma leitura dá a sua atribuição por feature.
+    """
+    blocos, raizes = [], []
+    for arvore in modelo.estimators_:
+        estrutura = arvore.tree_
+        valores = estrutura.value[:, 0, :]
+        valores = valores / valores.sum(axis=1, keepdims=True)
+        internos = np.flatnonzero(estrutura.children_left >= 0)
+        pais = np.full(estrutura.node_count, -1)
+        pais[estrutura.children_left[internos]] = internos
+        pais[estrutura.children_right[internos]] = internos
+
+        classes = valores.shape[1]
+        deltas = np.zeros((estrutura.node_count, n_features, classes))
+        filhos = np.flatnonzero(pais >= 0)
+        deltas[filhos, estrutura.feature[pais[filhos]]] = valores[filhos] - valores[pais[filhos]]
+        blocos.append(deltas.reshape(estrutura.node_count, -1))
+        raizes.append(valores[0])
+    return np.vstack(blocos) / len(blocos), np.mean(raizes, axis=0)
+
+
+def _atribuir_lote(modelo, deltas, X):
+    caminhos, _ = modelo.decision_path(X)
+    return np.asarray(caminhos @ deltas)
+
+
+def atribuicoes_caminho(modelo, X, n_jobs=-1, tamanho_lote=TAMANHO_LOTE):
+    """Atribuição de cada feature (colunas de ``X``) à probabilidade de cada classe, por leitura: ``(vies, (n, F, C))``.
+
+    Decomposição por caminho de decisão (Saabas): em cada divisão, a mudança
+    na probabilidade da classe vai para a feature que dividiu, e
+    ``vies + atribuicoes.sum(axis=1)`` reproduz ``predict_proba``. Os
+    caminhos vêm do ``decision_path`` da floresta (matriz esparsa) e a soma
+    é um produto esparso pela matriz de deltas, em lotes distribuídos entre
+    os núcleos. Threads bastam: o percurso das árvores libera o GIL e a
+    floresta não é copiada para cada worker.
+    """
+    from joblib import Parallel, delayed
+
+    n_features = X.shape[1]
+    deltas, vies = matriz_deltas(modelo, n_features)
+    lotes = [X.iloc[inicio:inicio + tamanho_lote] for inicio in range(0, len(X), tamanho_lote)]
+    partes = Parallel(n_jobs=n_jobs, prefer='threads')(delayed(_atribuir_lote)(modelo, deltas, lote) for lote in lotes)
+    atribuicoes = np.vstack(partes) if partes else np.empty((0, deltas.shape[1]))
+    return vies, atribuicoes.reshape(len(X), n_features, -1)
+
+
+def importancia_permutacao(modelo, X, y, features, n_jobs=-1, repeticoes=REPETICOES_PERMUTACAO, semente=42):
+    """Queda média da acurácia ao embaralhar cada feature (com desvio entre repetições), já ordenada"""
+    from joblib import parallel_config
+    from sklearn.inspection import permutation_importance
+
+    with parallel_config(backend='threading', n_jobs=n_jobs):
+        resultado = permutation_importance(modelo, X, y, scoring='accuracy', n_repeats=repeticoes,
+                                           random_state=semente, n_jobs=n_jobs)
+    return pd.DataFrame({
+        'feature': features,
+        'queda_acuracia': resultado.importances_mean,
+        'desvio': resultado.importances_std
+    }).sort_values('queda_acuracia', ascending=False, ignore_index=True)
+
+
+def explicar_modelo(modelo, classes, df, features, n_jobs=-1, semente=42):
+    """Explicações globais e por leitura do modelo sobre um conjunto de leituras.
+
+    ``classes`` são os nomes do LabelEncoder do treino (``modelo.classes_``
+    são índices nele). Ausentes são preenchidos com a média das leituras,
+    como no treino. Retorna um dicionário com a importância por permutação,
+    a importância por impureza, a atribuição média absoluta por feature e
+    classe e, para as leituras explicadas, previsões e atribuições.
+    """
+    nomes = np.asarray(classes)[modelo.classes_]
+    X_completo = df[features].apply(pd.to_numeric, errors='coerce')
+    X_completo = X_completo.fillna(X_completo.mean())
+
+    # Posições, não rótulos do índice: o histórico pode ter índice repetido
+    rotuladas = np.flatnonzero(df['system_status'].isin(nomes).to_numpy()) if 'system_status' in df.columns \
+        else np.empty(0, dtype='int64')
+    if len(rotuladas) > MAX_LEITURAS_PERMUTACAO:
+        rotuladas = np.sort(np.random.default_rng(semente).choice(rotuladas, MAX_LEITURAS_PERMUTACAO, replace=False))
+    permutacao = None
+    if len(rotuladas):
+        codigos = pd.Categorical(df['system_status'].iloc[rotuladas].astype(str), categories=list(classes)).codes
+        permutacao = importancia_permutacao(modelo, X_completo.iloc[rotuladas], codigos, features, n_jobs, semente=semente)
+
+    if 'timestamp_simulacao' in df.columns:
+        recentes = np.argsort(df['timestamp_simulacao'].to_numpy(), kind='stable')[-MAX_LEITURAS_EXPLICADAS:]
+    else:
+        recentes = np.arange(max(0, len(df) - MAX_LEITURAS_EXPLICADAS), len(df))
+    X_explicado = X_completo.iloc[recentes]
+    vies, atribuicoes = atribuicoes_caminho(modelo, X_explicado, n_jobs)
+    probabilidades = vies + atribuicoes.sum(axis=1)
+
+    return {
+        'classes': list(nomes),
+        'features': list(features),
+        'permutacao': permutacao,
+        'impureza': pd.Series(modelo.feature_importances_, index=features),
+        'atribuicao_media': pd.DataFrame(np.abs(atribuicoes).mean(axis=0), index=features, columns=nomes),
+        'leituras': df.iloc[recentes][[c for c in COLUNAS_IDENTIFICACAO if c in df.columns]],
+        'valores': X_explicado,
+        'vies': vies,
+        'atribuicoes': atribuicoes,
+        'previstos': nomes[probabilidades.argmax(axis=1)],
+        'probabilidades': probabilidades
+    }
+
+
+def explicacao_leitura(explicacoes, posicao, classe=None):
+    """Tabela da atribuição de cada feature para uma leitura explicada (classe prevista por padrão)"""
+    classe = explicacoes['previstos'][posicao] if classe is None else classe
+    coluna = explicacoes['classes'].index(classe)
+    return pd.DataFrame({
+        'feature': explicacoes['features'],
+        'valor': explicacoes['valores'].iloc[posicao].to_numpy(),
+        'atribuicao': explicacoes['atribuicoes'][posicao, :, coluna]
+    }).sort_values('atribuicao', key=np.abs, ascending=False, ignore_index=True)
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gerador de Relatório Hermes Reply
+Regenera RELATORIO_ANALISE.md e as figuras de documentacao/imagens sem o dashboard
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from esquemas import sensor_em_alerta
+from hermes_analytics import FEATURES_MODELO, HermesAnalytics
+from renderizacao import impressao_digital
+from retencao import pesos_leituras, somente_brutas
+
+# Incrementar ao mudar o desenho das figuras (invalida as impressões digitais salvas)
+VERSAO_FIGURAS = 1
+MAX_PONTOS_TIMELINE = 5000
+ARQUIVO_MANIFESTO = 'manifesto_figuras.json'
+
+FIGURAS = {
+    'timeline': 'hermes_reply_sensores_timeline.png',
+    'status': 'hermes_reply_status_analysis.png',
+    'correlacoes': 'hermes_reply_correlations.png',
+    'matriz_confusao': 'hermes_reply_confusion_matrix.png',
+    'importancia': 'hermes_reply_feature_importance.png'
+}
+TITULOS_FIGURAS = {
+    'timeline': 'Timeline',
+    'status': 'Status',
+    'correlacoes': 'Correlação',
+    'matriz_confusao': 'Matriz de Confusão',
+    'importancia': 'Importância das Features'
+}
+
+# Faixas normais do firmware (analyzeSystemHealth em arduino/src/main.cpp)
+SENSORES_TIMELINE = [
+    ('temperatura', 'Temperatura (°C)', 'red', (15, 35)),
+    ('umidade', 'Umidade (%)', 'blue', (30, 70)),
+    ('luminosidade', 'Luminosidade (lux)', 'orange', (200, 800)),
+    ('vibracao', 'Vibração (intensidade)', 'purple', (None, 500))
+]
+CORES_STATUS = {'NORMAL': 'green', 'ATENÇÃO': 'orange', 'CRÍTICO': 'red'}
+
+
+# === DESENHO DAS FIGURAS (executado nos processos de trabalho) ===
+def _preparar_matplotlib():
+    """Backend sem janela e estilo das figuras originais"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.style.use('seaborn-v0_8-darkgrid')
+    return plt
+
+
+def desenhar_timeline(plt, dados):
+    """Séries temporais dos quatro sensores com as faixas normais"""
+    fig, eixos = plt.subplots(2, 2, figsize=(15, 10))
+    fig.suptitle('HERMES REPLY - Monitoramento Temporal de Sensores IoT', fontsize=16, fontweight='bold')
+    tempo = dados['tempo_minutos']
+    marcador = 'o' if len(tempo) <= 200 else None
+
+    for eixo, (coluna, titulo, cor, (minimo, maximo)) in zip(eixos.ravel(), SENSORES_TIMELINE):
+        eixo.plot(tempo, dados[coluna], color=cor, marker=marcador, linewidth=1.5, alpha=0.8)
+        if minimo is not None:
+            eixo.axhspan(minimo, maximo, color='green', alpha=0.2, label='Range Normal')
+        else:
+            eixo.axhline(maximo, color='red', linestyle='--', alpha=0.6, label='Limite Crítico')
+        eixo.set_title(titulo)
+        eixo.legend()
+    for eixo in eixos[1]:
+        eixo.set_xlabel('Tempo (minutos)')
+    fig.tight_layout()
+    return fig
+
+
+def desenhar_status(plt, dados):
+    """Distribuição de status e alertas por sensor"""
+    fig, (eixo_pizza, eixo_barras) = plt.subplots(1, 2, figsize=(15, 6))
+    fig.suptitle('HERMES REPLY - Análise de Status do Sistema', fontsize=16, fontweight='bold')
+
+    contagens = dados['status']
+    eixo_pizza.pie(list(contagens.values()), labels=list(contagens), autopct='%1.1f%%',
+                   colors=[CORES_STATUS.get(s, 'gray') for s in contagens])
+    eixo_pizza.set_title('Distribuição de Status do Sistema')
+
+    alertas = dados['alertas']
+    eixo_barras.bar(list(alertas), list(alertas.values()), color=[c for _, _, c, _ in SENSORES_TIMELINE])
+    eixo_barras.set_title('Leituras em Alerta por Sensor')
+    eixo_barras.set_ylabel('Registros')
+    fig.tight_layout()
+    return fig
+
+
+def desenhar_correlacoes(plt, dados):
+    """Matriz de correlação dos sensores"""
+    import seaborn as sns
+    fig, eixo = plt.subplots(figsize=(9, 8))
+    matriz = pd.DataFrame(dados['matriz'], index=dados['sensores'], columns=dados['sensores'])
+    sns.heatmap(matriz, annot=True, fmt='.2f', cmap='RdBu_r', vmin=-1, vmax=1, square=True, ax=eixo)
+    eixo.set_title('HERMES REPLY - Correlação entre Sensores', fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+def desenhar_matriz_confusao(plt, dados):
+    """Matriz de confusão do modelo no conjunto de teste"""
+    import seaborn as sns
+    fig, eixo = plt.subplots(figsize=(6, 5))
+    sns.heatmap(np.array(dados['matriz']), annot=True, fmt='d', cmap='Blues',
+                xticklabels=dados['classes'], yticklabels=dados['classes'], ax=eixo)
+    eixo.set_xlabel('Predito')
+    eixo.set_ylabel('Real')
+    eixo.set_title('Matriz de Confusão - RandomForest', fontsize=12, fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+def desenhar_importancia(plt, dados):
+    """Importância das features do modelo"""
+    fig, eixo = plt.subplots(figsize=(10, 6))
+    importancias = sorted(dados['importancia'].items(), key=lambda item: item[1])
+    eixo.barh([nome for nome, _ in importancias], [valor for _, valor in importancias], color='steelblue')
+    eixo.set_xlabel('Importância')
+    eixo.set_title('HERMES REPLY - Importância dos Sensores na Predição', fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+DESENHOS = {
+    'timeline': desenhar_timeline,
+    'status': desenhar_status,
+    'correlacoes': desenhar_correlacoes,
+    'matriz_confusao': desenhar_matriz_confusao,
+    'importancia': desenhar_importancia
+}
+
+
+def renderizar_figura(tarefa):
+    """Desenha e exporta uma figura PNG (ponto de entrada dos processos de trabalho)"""
+    nome, caminho, dados = tarefa
+    inicio = time.perf_counter()
+    plt = _preparar_matplotlib()
+    fig = DESENHOS[nome](plt, dados)
+    temporario = caminho + '.tmp.png'
+    fig.savefig(temporario, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    os.replace(temporario, caminho)
+    return nome, time.perf_counter() - inicio
+
+
+# === GERADOR ===
+class GeradorRelatorio:
+    """Gera o relatório a partir dos loaders de ``HermesAnalytics``.
+
+    Cada figura tem uma impressão digital das suas entradas salva em
+    ``manifesto_figuras.json``; figuras cujas entradas não mudaram não são
+    redesenhadas. As métricas do modelo também ficam no manifesto e o
+    modelo só é retreinado quando os dados mudam.
+    """
+
+    def __init__(self, analytics=None, raiz=None):
+        self.analytics = analytics or HermesAnalytics()
+        self.raiz = raiz or os.path.normpath(os.path.join(self.analytics.base_path, '..'))
+        self.imagens_path = os.path.join(self.raiz, 'documentacao', 'imagens')
+        self.relatorio_path = os.path.join(self.raiz, 'RELATORIO_ANALISE.md')
+        self.manifesto_path = os.path.join(self.imagens_path, ARQUIVO_MANIFESTO)
+
+    def carregar_manifesto(self):
+        """Lê as impressões digitais da última geração"""
+        if os.path.exists(self.manifesto_path):
+            try:
+                with open(self.manifesto_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except ValueError:
+                print("[AVISO] Manifesto de figuras inválido, todas as figuras serão regeneradas")
+        return {'figuras': {}, 'modelo': None}
+
+    def salvar_manifesto(self, manifesto):
+        """Grava o manifesto de forma atômica"""
+        temporario = self.manifesto_path + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, self.manifesto_path)
+
+    def obter_metricas_modelo(self, df, impressao_dados, manifesto):
+        """Métricas do modelo, retreinando apenas se os dados mudaram"""
+        salvo = manifesto.get('modelo')
+        if salvo and salvo.get('impressao') == impressao_dados:
+            return salvo['metricas']
+
+        if not self.analytics.criar_modelo_ml(df, salvar_modelo=False):
+            return None
+
+        metricas = self.analytics.estado['metricas_modelo']
+        metricas = {
+            'accuracy': float(metricas['accuracy']),
+            'feature_importance': {k: float(v) for k, v in metricas['feature_importance'].items()},
+            'classification_report': metricas['classification_report'],
+            'confusion_matrix': metricas['confusion_matrix'],
+            'classes': metricas['classes'],
+            'n_samples': int(metricas['n_samples'])
+        }
+        manifesto['modelo'] = {'impressao': impressao_dados, 'metricas': metricas}
+        return metricas
+
+    def preparar_entradas(self, df, metricas):
+        """Dados mínimos de cada figura (o que é enviado aos processos de trabalho)"""
+        ordenado = df.sort_values('timestamp_simulacao')
+        passo = max(1, len(ordenado) // MAX_PONTOS_TIMELINE)
+        amostra = ordenado.iloc[::passo]
+        inicio = ordenado['timestamp_simulacao'].iloc[0]
+        brutas = somente_brutas(df)
+        pesos = pesos_leituras(df)
+
+        entradas = {
+            'timeline': {
+                'tempo_minutos': ((amostra['timestamp_simulacao'] - inicio).dt.total_seconds() / 60).to_numpy(),
+                **{coluna: amostra[coluna].to_numpy(dtype=float) for coluna, _, _, _ in SENSORES_TIMELINE}
+            },
+            'status': {
+                'status': {s: int(c) for s, c in pesos.groupby(df['system_status'], observed=True).sum().sort_values(ascending=False).items() if c},
+                'alertas': {
+                    sensor: int(sensor_em_alerta(brutas[f'{sensor}_status']).sum())
+                    for sensor, _, _, _ in SENSORES_TIMELINE
+                }
+            },
+            'correlacoes': {
+                'sensores': FEATURES_MODELO,
+                'matriz': brutas[FEATURES_MODELO].corr().round(6).to_numpy().tolist()
+            }
+        }
+        if metricas:
+            entradas['matriz_confusao'] = {'matriz': metricas['confusion_matrix'], 'classes': metricas['classes']}
+            entradas['importancia'] = {'importancia': metricas['feature_importance']}
+        return entradas
+
+    def renderizar(self, entradas, manifesto, forcar=False, processos=None):
+        """Renderiza em paralelo apenas as figuras com entradas novas"""
+        tarefas = []
+        for nome, dados in entradas.items():
+            caminho = os.path.join(self.imagens_path, FIGURAS[nome])
+            # Arrays entram por conteúdo (repr de arrays grandes é resumido com '...')
+            partes = [parte for chave in sorted(dados) for parte in (chave, dados[chave])]
+            impressao = impressao_digital(VERSAO_FIGURAS, nome, *partes)
+            if not forcar and os.path.exists(caminho) and manifesto['figuras'].get(nome) == impressao:
+                continue
+            tarefas.append(((nome, caminho, dados), impressao))
+
+        if not tarefas:
+            print("[HERMES] Figuras atualizadas, nada a redesenhar")
+            return []
+
+        processos = processos or min(len(tarefas), os.cpu_count() or 1)
+        if processos > 1:
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                resultados = list(executor.map(renderizar_figura, [tarefa for tarefa, _ in tarefas]))
+        else:
+            resultados = [renderizar_figura(tarefa) for tarefa, _ in tarefas]
+
+        for (tarefa, impressao), (nome, duracao) in zip(tarefas, resultados):
+            manifesto['figuras'][nome] = impressao
+            print(f"[SUCESSO] Figura {FIGURAS[nome]} gerada em {duracao:.2f}s")
+        return [nome for nome, _ in resultados]
+
+    def escrever_markdown(self, df, metricas):
+        """Escreve RELATORIO_ANALISE.md com os números atuais"""
+        inicio, fim = df['timestamp_simulacao'].min(), df['timestamp_simulacao'].max()
+        pesos = pesos_leituras(df)
+        total = int(pesos.sum())
+        brutas = somente_brutas(df)
+        linhas = [
+            '# Relatório de Análise IoT - Hermes Reply',
+            'Este relatório resume os resultados da análise de dados, do modelo preditivo e das principais descobertas.',
+            '',
+            f'_Gerado em {datetime.now():%d/%m/%Y %H:%M} por `analise_dados/gerar_relatorio.py`._',
+            '## Visão Geral',
+            f'- Total de registros: {total:,}'.replace(',', '.'),
+            f"- Execuções: {df['execucao_id'].nunique()}",
+            f"- Dispositivos: {df['device_id'].nunique()}",
+            f'- Período simulado: {inicio:%d/%m/%Y %H:%M:%S} a {fim:%d/%m/%Y %H:%M:%S}',
+            '## Distribuição de Status',
+            '| Status | Registros | % |',
+            '|---|---:|---:|'
+        ]
+        contagens = pesos.groupby(df['system_status'], observed=True).sum().sort_values(ascending=False)
+        for status, contagem in contagens.items():
+            if contagem:
+                linhas.append(f'| {status} | {int(contagem)} | {contagem / total:.1%} |')
+        if 'leituras' in df.columns:
+            linhas.append('')
+            linhas.append('_Execuções agregadas pela retenção entram nas contagens pelo total de leituras de cada janela '
+                          '(status mais frequente) e ficam fora das estatísticas dos sensores, do modelo, das correlações e dos alertas por sensor._')
+
+        linhas += ['## Sensores', '| Sensor | Média | Mínimo | p50 | p95 | Máximo |', '|---|---:|---:|---:|---:|---:|']
+        for sensor in FEATURES_MODELO:
+            serie = brutas[sensor].dropna()
+            if len(serie) == 0:
+                continue
+            p50, p95 = serie.quantile([0.5, 0.95])
+            linhas.append(f'| {sensor} | {serie.mean():.2f} | {serie.min():.2f} | {p50:.2f} | {p95:.2f} | {serie.max():.2f} |')
+
+        linhas.append('## Modelo Preditivo')
+        if metricas:
+            principal = max(metricas['feature_importance'].items(), key=lambda item: item[1])
+            linhas += [
+                f"- Acurácia (RandomForest, 30% de teste): {metricas['accuracy']:.2%}",
+                f"- Amostras: {metricas['n_samples']}",
+                f'- Sensor mais influente: {principal[0]} ({principal[1]:.2f})',
+                '',
+                '| Classe | Precisão | Recall | F1-Score |',
+                '|---|---:|---:|---:|'
+            ]
+            for classe in metricas['classes']:
+                relatorio = metricas['classification_report'].get(classe, {})
+                linhas.append(f"| {classe} | {relatorio.get('precision', 0):.2%} | "
+                              f"{relatorio.get('recall', 0):.2%} | {relatorio.get('f1-score', 0):.2%} |")
+        else:
+            linhas.append('- Modelo não treinado: dados insuficientes ou apenas uma classe de status.')
+
+        linhas.append('## Gráficos Gerados')
+        for nome, arquivo in FIGURAS.items():
+            if os.path.exists(os.path.join(self.imagens_path, arquivo)):
+                linhas.append(f'![{TITULOS_FIGURAS[nome]}](documentacao/imagens/{arquivo})')
+
+        with open(self.relatorio_path, 'w', encoding='utf-8', newline='\r\n') as f:
+            f.write('\n'.join(linhas) + '\n')
+        print(f"[SUCESSO] Relatório salvo: {self.relatorio_path}")
+
+    def gerar(self, forcar=False, processos=None):
+        """Regenera figuras alteradas e o relatório em markdown"""
+        inicio = time.perf_counter()
+        df = self.analytics.carregar_dados_historicos()
+        if df is None or len(df) == 0:
+            print("[ERRO] Sem dados históricos para o relatório")
+            return False
+
+        os.makedirs(self.imagens_path, exist_ok=True)
+        manifesto = self.carregar_manifesto()
+        # Modelo só com leituras individuais: janelas agregadas têm outra distribuição
+        brutas = somente_brutas(df)
+        impressao_dados = impressao_digital(brutas[FEATURES_MODELO + ['system_status']])
+
+        metricas = self.obter_metricas_modelo(brutas, impressao_dados, manifesto)
+        entradas = self.preparar_entradas(df, metricas)
+        self.renderizar(entradas, manifesto, forcar, processos)
+        self.salvar_manifesto(manifesto)
+        self.escrever_markdown(df, metricas)
+
+        print(f"[HERMES] Relatório gerado em {time.perf_counter() - inicio:.1f}s")
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera RELATORIO_ANALISE.md e as figuras do relatório')
+    parser.add_argument('--forcar', action='store_true', help='redesenha todas as figuras')
+    parser.add_argument('--processos', type=int, default=None, help='processos de renderização (1 = sequencial)')
+    args = parser.parse_args()
+    GeradorRelatorio().gerar(forcar=args.forcar, processos=args.processos)
+
+
+if __name__ == "__main__":
+    main()
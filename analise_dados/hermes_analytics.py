@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Núcleo de Análise Hermes Reply
+Carregamento de dados e treino do modelo sem dependência da interface (dashboard ou linha de comando)
+"""
+
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from esquemas import COLUNAS_CANONICAS, ler_csv_tipado
+from monitor_deriva import ARQUIVO_MODELO, MonitorDeriva, ReferenciaModelo, salvar_referencia
+from retencao import juntar_agregados, ler_agregados, ler_catalogo, ler_execucao_arquivada, ler_tabela_arquivada
+
+FEATURES_MODELO = ['temperatura', 'umidade', 'luminosidade', 'vibracao']
+
+# Colunas carregadas por visão (None = esquema canônico completo); as
+# estatísticas operacionais do firmware não aparecem no histórico do dashboard
+COLUNAS_VISAO = {
+    'historico': [c for c in COLUNAS_CANONICAS
+                  if c not in ('timestamp_processamento', 'uptime', 'total_readings', 'avg_temperature', 'avg_humidity')],
+    None: COLUNAS_CANONICAS
+}
+
+ESTADO_INICIAL = {
+    'modelo_treinado': False,
+    'modelo': None,
+    'label_encoder': None,
+    'metricas_modelo': None
+}
+
+
+def notificar_terminal(nivel, mensagem):
+    """Notificação padrão fora do dashboard: imprime com a tag do nível"""
+    print(f"[{nivel.upper()}] {mensagem}")
+
+
+class HermesAnalytics:
+    """Loaders e modelo de ML compartilhados pelo dashboard e pelo relatório.
+
+    ``estado`` guarda modelo e métricas (um dicionário comum ou o
+    ``st.session_state``); ``notificar(nivel, mensagem)`` recebe os níveis
+    ``'erro'`` e ``'aviso'``.
+    """
+
+    def __init__(self, estado=None, notificar=None, dados_path=None):
+        self.base_path = os.path.dirname(os.path.abspath(__file__))
+        self.dados_path = dados_path or os.path.normpath(os.path.join(self.base_path, '..', 'dados_simulacao'))
+        self.estado = {} if estado is None else estado
+        self.notificar = notificar or notificar_terminal
+
+        for chave, valor in ESTADO_INICIAL.items():
+            if chave not in self.estado:
+                self.estado[chave] = valor
+
+    def ler_csv_tipado(self, arquivo, visao=None):
+        """Lê um CSV de telemetria no perfil tipado, apenas com as colunas da visão"""
+        return ler_csv_tipado(arquivo, COLUNAS_VISAO[visao])
+
+    def carregar_dados_historicos(self, visao=None, agregados=True):
+        """Carrega dados históricos de todas as execuções.
+
+        Execuções agregadas pela retenção saem do CSV do histórico; com
+        ``agregados`` elas voltam como uma linha por hora e dispositivo, com
+        o total representado na coluna ``leituras`` (vazia nas brutas).
+        """
+        arquivo_historico = os.path.join(self.dados_path, 'hermes_historico_completo.csv')
+
+        if os.path.exists(arquivo_historico):
+            try:
+                df = self.ler_csv_tipado(arquivo_historico, visao)
+                return juntar_agregados(df, ler_agregados(self.dados_path, COLUNAS_VISAO[visao])) if agregados else df
+            except Exception as e:
+                self.notificar('erro', f"❌ Erro ao carregar dados históricos: {e}")
+                return None
+        else:
+            self.notificar('aviso', "⚠️ Arquivo de dados históricos não encontrado. Execute uma simulação primeiro.")
+            return None
+
+    def listar_execucoes_disponiveis(self):
+        """Lista todas as execuções disponíveis (incluindo as compactadas ou agregadas pela retenção)"""
+        execucoes = list(ler_catalogo(self.dados_path))
+
+        if os.path.exists(self.dados_path):
+            for arquivo in os.listdir(self.dados_path):
+                if arquivo.startswith('hermes_data_') and arquivo.endswith('.csv'):
+                    execucao_id = arquivo.replace('hermes_data_', '').replace('.csv', '')
+                    execucoes.append(execucao_id)
+
+        return sorted(set(execucoes), reverse=True)
+
+    def carregar_execucao_especifica(self, execucao_id, visao=None):
+        """Carrega dados de uma execução específica.
+
+        Execuções antigas saem de dados_simulacao/ pela retenção: são lidas da
+        partição mensal comprimida ou, depois de agregadas, como uma linha
+        por hora e dispositivo (coluna ``leituras`` com o total representado).
+        """
+        arquivo = os.path.join(self.dados_path, f'hermes_data_{execucao_id}.csv')
+
+        try:
+            if os.path.exists(arquivo):
+                return self.ler_csv_tipado(arquivo, visao)
+            return ler_execucao_arquivada(self.dados_path, execucao_id, COLUNAS_VISAO[visao])
+        except Exception as e:
+            self.notificar('erro', f"❌ Erro ao carregar execução {execucao_id}: {e}")
+            return None
+
+    def carregar_resumos_estatisticos(self):
+        """Carrega resumos estatísticos de todas as execuções"""
+        return self.carregar_linhas_por_execucao('hermes_resumo_')
+
+    def carregar_qualidade_execucoes(self):
+        """Carrega os indicadores de qualidade dos dados de todas as execuções"""
+        return self.carregar_linhas_por_execucao('hermes_qualidade_')
+
+    def carregar_estado_deriva(self):
+        """Carrega o estado do monitor de deriva do modelo salvo (None se o modelo nunca foi salvo)"""
+        monitor = MonitorDeriva(self.dados_path)
+        if not os.path.exists(monitor.arquivo_estado):
+            return None
+        return monitor.carregar_estado()
+
+    def carregar_linhas_por_execucao(self, prefixo):
+        """Junta os CSVs de uma linha por execução (``<prefixo><execucao_id>.csv``)"""
+        resumos = []
+
+        if os.path.exists(self.dados_path):
+            for arquivo in os.listdir(self.dados_path):
+                if arquivo.startswith(prefixo) and arquivo.endswith('.csv'):
+                    try:
+                        df_resumo = pd.read_csv(os.path.join(self.dados_path, arquivo))
+                        resumos.append(df_resumo.iloc[0].to_dict())
+                    except Exception as e:
+                        continue
+
+        # Linhas de execuções antigas ficam numa única tabela comprimida (retenção)
+        arquivadas = ler_tabela_arquivada(self.dados_path, prefixo)
+        if len(arquivadas):
+            recentes = {resumo.get('execucao_id') for resumo in resumos}
+            resumos.extend(r for r in arquivadas.to_dict('records') if r.get('execucao_id') not in recentes)
+
+        return pd.DataFrame(resumos) if resumos else None
+
+    def criar_modelo_ml(self, df, salvar_modelo=True):
+        """Cria e treina modelo de Machine Learning com validação robusta"""
+        # scikit-learn e joblib só são importados no treino: abrir o dashboard não paga ~1s de importação
+        import joblib
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import LabelEncoder
+
+        if df is None or len(df) < 10:
+            self.notificar('erro', "❌ Dados insuficientes para treinar o modelo (mínimo 10 registros)")
+            return False
+
+        try:
+            # Preparar features
+            features = FEATURES_MODELO
+            X = df[features].fillna(df[features].mean())
+
+            # Verificar se há variabilidade nos dados
+            if X.std().min() == 0:
+                self.notificar('aviso', "⚠️ Alguns sensores têm valores constantes. Isso pode afetar a performance do modelo.")
+
+            # Preparar target
+            le = LabelEncoder()
+            y = le.fit_transform(df['system_status'])
+
+            # Verificar distribuição de classes
+            unique_classes, class_counts = np.unique(y, return_counts=True)
+            min_class_count = class_counts.min()
+
+            if len(unique_classes) < 2:
+                self.notificar('erro', "❌ É necessário pelo menos 2 classes diferentes de status para treinar o modelo")
+                return False
+
+            # Verificar se há classes com apenas 1 amostra
+            if min_class_count < 2:
+                self.notificar('aviso', "⚠️ Algumas classes têm poucas amostras. Usando split simples sem estratificação.")
+                # Split sem estratificação para evitar erro
+                X_train, X_test, y_train, y_test = train_test_split(
+                    X, y, test_size=0.3, random_state=42
+                )
+            else:
+                # Split com estratificação quando possível
+                X_train, X_test, y_train, y_test = train_test_split(
+                    X, y, test_size=0.3, random_state=42, stratify=y
+                )
+
+            # Treinar modelo
+            modelo = RandomForestClassifier(
+                n_estimators=100,
+                random_state=42,
+                max_depth=10,
+                min_samples_split=5,
+                min_samples_leaf=2
+            )
+            modelo.fit(X_train, y_train)
+
+            # Avaliar modelo
+            y_pred = modelo.predict(X_test)
+            accuracy = accuracy_score(y_test, y_pred)
+            feature_importance = dict(zip(features, modelo.feature_importances_))
+            classes = np.arange(len(le.classes_))
+
+            # Salvar modelo
+            if salvar_modelo:
+                modelo_path = os.path.join(self.dados_path, ARQUIVO_MODELO)
+                joblib.dump(modelo, modelo_path)
+                # Distribuições compactas do treino: a ingestão compara cada execução com elas (monitor_deriva)
+                referencia = ReferenciaModelo.de_treino(
+                    df.loc[X_train.index], features, le.classes_, le.inverse_transform(y_train), accuracy
+                )
+                salvar_referencia(referencia, self.dados_path)
+
+            # Armazenar no estado (session state no dashboard)
+            self.estado['modelo'] = modelo
+            self.estado['label_encoder'] = le
+            self.estado['metricas_modelo'] = {
+                'accuracy': accuracy,
+                'feature_importance': feature_importance,
+                'classification_report': classification_report(
+                    y_test, y_pred, labels=classes, target_names=le.classes_, output_dict=True, zero_division=0
+                ),
+                'confusion_matrix': confusion_matrix(y_test, y_pred, labels=classes).tolist(),
+                'classes': list(le.classes_),
+                'n_samples': len(df),
+                'n_features': len(features),
+                # Identifica o modelo nos caches de explicações (explicabilidade_modelo)
+                'versao': datetime.now().isoformat()
+            }
+            self.estado['modelo_treinado'] = True
+
+            return True
+
+        except Exception as e:
+            self.notificar('erro', f"❌ Erro no treinamento do modelo: {e}")
+            return False
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ingestão Idempotente Hermes Reply
+Journal de lotes, escrita atômica e índice de deduplicação por (device_id, reading_id, timestamp_simulacao)
+"""
+
+import csv
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_CHAVE = ['device_id', 'reading_id', 'timestamp_simulacao']
+PARTICOES_PADRAO = 16
+DIRETORIO_INDICE = 'indice_dedup'
+ARQUIVO_JOURNAL = 'hermes_journal.jsonl'
+MAX_ENTRADAS_JOURNAL = 2000
+
+
+def escrever_atomico(caminho, escrever):
+    """Grava via arquivo temporário + fsync + ``os.replace``: leitores veem o arquivo antigo ou o novo inteiro"""
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    try:
+        with open(temporario, 'wb') as f:
+            escrever(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return caminho
+
+
+def escrever_csv_atomico(df, caminho):
+    """CSV gravado de forma atômica (mesmo formato de ``DataFrame.to_csv``)"""
+    return escrever_atomico(caminho, lambda f: df.to_csv(f, index=False, encoding='utf-8'))
+
+
+def anexar_csv_atomico(df, caminho):
+    """Anexa as linhas de ``df`` a um CSV existente sem reinterpretá-lo, de forma atômica.
+
+    O conteúdo atual é copiado byte a byte para o temporário e o lote vem em
+    seguida, nas colunas do cabeçalho existente (as ausentes ficam vazias).
+    O custo é uma cópia do arquivo, sem ``read_csv`` nem reformatação das
+    linhas antigas. Colunas do lote que não estão no cabeçalho levantam
+    ValueError: o arquivo precisa ser regravado com o cabeçalho ampliado.
+    """
+    if not os.path.exists(caminho) or os.path.getsize(caminho) == 0:
+        return escrever_csv_atomico(df, caminho)
+    with open(caminho, 'rb') as f:
+        cabecalho = next(csv.reader([f.readline().decode('utf-8-sig')]))
+        f.seek(-1, os.SEEK_END)
+        termina_em_linha = f.read(1) == b'\n'
+    novas = [coluna for coluna in df.columns if coluna not in cabecalho]
+    if novas:
+        raise ValueError(f"colunas fora do cabeçalho de {os.path.basename(caminho)}: {', '.join(novas)}")
+
+    def escrever(f):
+        with open(caminho, 'rb') as origem:
+            shutil.copyfileobj(origem, f, 1024 * 1024)
+        if not termina_em_linha:
+            f.write(os.linesep.encode('ascii'))
+        df.reindex(columns=cabecalho).to_csv(f, header=False, index=False, encoding='utf-8')
+    return escrever_atomico(caminho, escrever)
+
+
+def chaves_leitura(df):
+    """Hash de 64 bits de (device_id, reading_id, timestamp_simulacao) por linha, vetorizado.
+
+    As colunas são normalizadas antes do hash para que a mesma leitura gere
+    a mesma chave vinda do log (tipos do decodificador) ou do CSV histórico
+    (tipos inferidos pelo ``read_csv``).
+    """
+    if not len(df):
+        return np.empty(0, dtype='uint64')
+    chave = pd.DataFrame({
+        'device_id': df['device_id'].astype(object).where(df['device_id'].notna(), '').astype(str).to_numpy(dtype=object),
+        'reading_id': pd.to_numeric(df['reading_id'], errors='coerce').fillna(-1).to_numpy(dtype='int64'),
+        'timestamp_simulacao': pd.to_numeric(df['timestamp_simulacao'], errors='coerce').fillna(-1).to_numpy(dtype='int64')
+    })
+    return pd.util.hash_pandas_object(chave, index=False).to_numpy()
+
+
+class IndiceDeduplicacao:
+    """Conjunto de chaves já ingeridas, particionado pelos bits baixos do hash.
+
+    Cada partição é um array ordenado de ``uint64`` em ``p<NN>.npy``, gravado
+    de forma atômica; consultas usam busca binária e só carregam as partições
+    tocadas pelo lote. ``manifesto.json`` guarda a assinatura do histórico
+    que o índice reflete, para detectar um histórico alterado por fora.
+    """
+
+    def __init__(self, diretorio, particoes=PARTICOES_PADRAO):
+        self.diretorio = diretorio
+        self.particoes = particoes
+        self._carregadas = {}
+
+    def _caminho(self, particao):
+        return os.path.join(self.diretorio, f'p{particao:02d}.npy')
+
+    def _particao(self, particao):
+        if particao not in self._carregadas:
+            caminho = self._caminho(particao)
+            self._carregadas[particao] = np.load(caminho) if os.path.exists(caminho) else np.empty(0, dtype='uint64')
+        return self._carregadas[particao]
+
+    def contem(self, chaves):
+        """Máscara das chaves já presentes no índice"""
+        presentes = np.zeros(len(chaves), dtype=bool)
+        grupos = chaves % np.uint64(self.particoes)
+        for particao in np.unique(grupos):
+            posicoes = np.flatnonzero(grupos == particao)
+            existentes = self._particao(int(particao))
+            if len(existentes):
+                indices = np.minimum(np.searchsorted(existentes, chaves[posicoes]), len(existentes) - 1)
+                presentes[posicoes] = existentes[indices] == chaves[posicoes]
+        return presentes
+
+    def registrar(self, chaves):
+        """Acrescenta chaves ao índice, regravando só as partições afetadas"""
+        os.makedirs(self.diretorio, exist_ok=True)
+        grupos = chaves % np.uint64(self.particoes)
+        for particao in np.unique(grupos):
+            particao = int(particao)
+            atualizada = np.union1d(self._particao(particao), chaves[grupos == particao])
+            escrever_atomico(self._caminho(particao), lambda f: np.save(f, atualizada))
+            self._carregadas[particao] = atualizada
+
+    def reconstruir(self, chaves):
+        """Substitui o índice inteiro pelas chaves informadas"""
+        os.makedirs(self.diretorio, exist_ok=True)
+        grupos = chaves % np.uint64(self.particoes)
+        for particao in range(self.particoes):
+            conteudo = np.unique(chaves[grupos == particao])
+            escrever_atomico(self._caminho(particao), lambda f: np.save(f, conteudo))
+            self._carregadas[particao] = conteudo
+
+    def assinatura(self):
+        """Assinatura do histórico refletida pelo índice (None se desconhecida)"""
+        try:
+            with open(os.path.join(self.diretorio, 'manifesto.json'), encoding='utf-8') as f:
+                return tuple(json.load(f)['historico'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def marcar(self, assinatura_historico):
+        """Registra a assinatura do histórico que o índice passa a refletir"""
+        dados = json.dumps({'historico': list(assinatura_historico), 'particoes': self.particoes}).encode('utf-8')
+        escrever_atomico(os.path.join(self.diretorio, 'manifesto.json'), lambda f: f.write(dados))
+
+
+class JournalIngestao:
+    """Journal (write-ahead) dos lotes de ingestão em JSONL.
+
+    Cada lote registra ``iniciado`` (com a execução e os arquivos que vai
+    gravar) antes de qualquer escrita, ``confirmado`` logo após o commit e
+    ``concluido`` ou ``abortado`` ao final; cada linha é gravada com fsync.
+    Um lote sem desfecho indica uma ingestão interrompida, tratada por
+    ``pendentes`` na próxima execução.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    def _acrescentar(self, entrada):
+        entrada = dict(entrada, momento=datetime.now().isoformat())
+        with open(self.caminho, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entrada, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def entradas(self):
+        if not os.path.exists(self.caminho):
+            return []
+        entradas = []
+        with open(self.caminho, encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    entradas.append(json.loads(linha))
+                except ValueError:
+                    continue  # linha final truncada por uma queda no meio da escrita
+        return entradas
+
+    def iniciar(self, lote, **detalhes):
+        self._acrescentar(dict(detalhes, lote=lote, estado='iniciado'))
+
+    def confirmar(self, lote, **detalhes):
+        self._acrescentar(dict(detalhes, lote=lote, estado='confirmado'))
+
+    def concluir(self, lote, **detalhes):
+        self._acrescentar(dict(detalhes, lote=lote, estado='concluido'))
+        self.compactar()
+
+    def abortar(self, lote, **detalhes):
+        self._acrescentar(dict(detalhes, lote=lote, estado='abortado'))
+
+    def pendentes(self):
+        """Entrada ``iniciado`` de cada lote sem desfecho, com ``confirmado`` indicando se houve commit"""
+        abertos = {}
+        for entrada in self.entradas():
+            if entrada.get('estado') == 'iniciado':
+                abertos[entrada['lote']] = dict(entrada, confirmado=False)
+            elif entrada.get('estado') == 'confirmado' and entrada.get('lote') in abertos:
+                abertos[entrada['lote']]['confirmado'] = True
+            else:
+                abertos.pop(entrada.get('lote'), None)
+        return list(abertos.values())
+
+    def compactar(self, max_entradas=MAX_ENTRADAS_JOURNAL):
+        """Mantém só as entradas mais recentes, preservando lotes pendentes"""
+        entradas = self.entradas()
+        if len(entradas) <= max_entradas:
+            return
+        pendentes = {entrada['lote'] for entrada in self.pendentes()}
+        manter = [e for e in entradas[:-max_entradas // 2] if e.get('lote') in pendentes] + entradas[-max_entradas // 2:]
+        conteudo = ''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in manter).encode('utf-8')
+        escrever_atomico(self.caminho, lambda f: f.write(conteudo))
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentação do Pipeline Hermes Reply
+Temporizadores por etapa, contadores, histogramas de latência e pico de memória, com exportação Prometheus
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PREFIXO_METRICAS = 'hermes'
+# Limites (segundos) dos histogramas de latência por lote
+LIMITES_LATENCIA = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+# Intervalo (segundos) entre regravações do textfile durante uma ingestão longa
+INTERVALO_EXPORTACAO_S = 15
+
+
+def memoria_pico_bytes():
+    """Pico de memória residente do processo (None quando indisponível)"""
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa em KiB; macOS em bytes
+        return pico if sys.platform == 'darwin' else pico * 1024
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset
+    except (ImportError, AttributeError):
+        return None
+
+
+class Histograma:
+    """Histograma cumulativo no formato Prometheus (baldes fixos, soma e contagem)"""
+
+    def __init__(self, limites=LIMITES_LATENCIA):
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1)
+        self.soma = 0.0
+        self.contagem = 0
+
+    def observar(self, valor):
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.contagem += 1
+
+    def cumulativo(self):
+        """Pares (limite, contagem acumulada), terminando em +Inf"""
+        total = 0
+        pares = []
+        for limite, contagem in zip(self.limites + (float('inf'),), self.contagens):
+            total += contagem
+            pares.append((limite, total))
+        return pares
+
+
+class _EtapaInativa:
+    """Gerenciador de contexto vazio, compartilhado quando a instrumentação está desligada"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+
+ETAPA_INATIVA = _EtapaInativa()
+
+
+class Instrumentacao:
+    """Registro de métricas do pipeline.
+
+    Desligada, cada chamada é só um teste de atributo: ``etapa`` devolve um
+    gerenciador de contexto vazio compartilhado e ``contar``/``observar``
+    retornam de imediato. Ligada, acumula tempos por etapa, contadores,
+    histogramas e o pico de memória ao fim de cada etapa.
+    """
+
+    def __init__(self, ativo=False):
+        self.ativo = ativo
+        self._trava = threading.Lock()
+        self.limpar()
+
+    def limpar(self):
+        """Zera todas as métricas"""
+        self.etapas = {}
+        self.contadores = {}
+        self.histogramas = {}
+        self.memoria_pico = None
+        self.inicio = time.time()
+
+    def ativar(self, ativo=True):
+        self.ativo = ativo
+        return self
+
+    def etapa(self, nome):
+        """Cronometra um bloco ``with`` como etapa do pipeline"""
+        if not self.ativo:
+            return ETAPA_INATIVA
+        return self._cronometrar(nome)
+
+    @contextmanager
+    def _cronometrar(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield self
+        finally:
+            duracao = time.perf_counter() - inicio
+            memoria = memoria_pico_bytes()
+            with self._trava:
+                etapa = self.etapas.setdefault(nome, {'segundos': 0.0, 'execucoes': 0, 'maximo': 0.0})
+                etapa['segundos'] += duracao
+                etapa['execucoes'] += 1
+                etapa['maximo'] = max(etapa['maximo'], duracao)
+                if memoria is not None:
+                    etapa['memoria_pico_bytes'] = memoria
+                    self.memoria_pico = max(self.memoria_pico or 0, memoria)
+
+    def contar(self, nome, valor=1):
+        """Incrementa um contador (linhas, quadros, bytes, erros...)"""
+        if not self.ativo:
+            return
+        with self._trava:
+            self.contadores[nome] = self.contadores.get(nome, 0) + valor
+
+    def observar(self, nome, valor, limites=LIMITES_LATENCIA):
+        """Registra uma observação (ex.: latência de um lote) no histograma"""
+        if not self.ativo:
+            return
+        with self._trava:
+            if nome not in self.histogramas:
+                self.histogramas[nome] = Histograma(limites)
+            self.histogramas[nome].observar(valor)
+
+    # === EXPORTAÇÃO ===
+    def resumo(self):
+        """Resumo estruturado (para execuções em lote)"""
+        with self._trava:
+            return {
+                'inicio': self.inicio,
+                'duracao_total': round(time.time() - self.inicio, 6),
+                'etapas': {nome: dict(e, segundos=round(e['segundos'], 6), maximo=round(e['maximo'], 6))
+                           for nome, e in self.etapas.items()},
+                'contadores': dict(self.contadores),
+                'histogramas': {nome: {'contagem': h.contagem, 'soma': round(h.soma, 6),
+                                       'baldes': {('+Inf' if l == float('inf') else f'{l:g}'): c
+                                                  for l, c in h.cumulativo()}}
+                                for nome, h in self.histogramas.items()},
+                'memoria_pico_bytes': self.memoria_pico
+            }
+
+    def para_prometheus(self):
+        """Métricas no formato de texto do Prometheus"""
+        p = PREFIXO_METRICAS
+        linhas = []
+        with self._trava:
+            if self.etapas:
+                linhas += [f'# HELP {p}_etapa_segundos_total Tempo acumulado por etapa do pipeline',
+                           f'# TYPE {p}_etapa_segundos_total counter']
+                linhas += [f'{p}_etapa_segundos_total{{etapa="{n}"}} {e["segundos"]:.6f}' for n, e in self.etapas.items()]
+                linhas += [f'# TYPE {p}_etapa_execucoes_total counter']
+                linhas += [f'{p}_etapa_execucoes_total{{etapa="{n}"}} {e["execucoes"]}' for n, e in self.etapas.items()]
+
+            for nome, valor in sorted(self.contadores.items()):
+                linhas += [f'# TYPE {p}_{nome}_total counter', f'{p}_{nome}_total {valor}']
+
+            for nome, histograma in sorted(self.histogramas.items()):
+                linhas.append(f'# TYPE {p}_{nome} histogram')
+                for limite, acumulado in histograma.cumulativo():
+                    rotulo = '+Inf' if limite == float('inf') else f'{limite:g}'
+                    linhas.append(f'{p}_{nome}_bucket{{le="{rotulo}"}} {acumulado}')
+                linhas += [f'{p}_{nome}_sum {histograma.soma:.6f}', f'{p}_{nome}_count {histograma.contagem}']
+
+            if self.memoria_pico is not None:
+                linhas += [f'# TYPE {p}_memoria_pico_bytes gauge', f'{p}_memoria_pico_bytes {self.memoria_pico}']
+        return '\n'.join(linhas) + '\n'
+
+    def escrever_prometheus(self, caminho):
+        """Grava as métricas em arquivo (coletor textfile do node_exporter), de forma atômica"""
+        temporario = caminho + '.tmp'
+        with open(temporario, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(self.para_prometheus())
+        os.replace(temporario, caminho)
+        return caminho
+
+    @contextmanager
+    def exportacao_periodica(self, caminho, intervalo_s=INTERVALO_EXPORTACAO_S):
+        """Regrava o textfile a cada ``intervalo_s`` durante o bloco ``with`` e uma última vez ao sair.
+
+        As métricas da ingestão ficam no processo da ingestão (o ``/metrics``
+        da API de consulta só expõe as da própria API); assim o coletor
+        textfile acompanha uma ingestão longa enquanto ela roda.
+        """
+        parar = threading.Event()
+
+        def exportar():
+            while not parar.wait(intervalo_s):
+                try:
+                    self.escrever_prometheus(caminho)
+                except OSError as e:
+                    print(f"[AVISO] Não foi possível atualizar {caminho}: {e}")
+
+        exportador = threading.Thread(target=exportar, name='hermes-metricas', daemon=True)
+        exportador.start()
+        try:
+            yield caminho
+        finally:
+            parar.set()
+            exportador.join()
+            self.escrever_prometheus(caminho)
+
+    def imprimir_resumo(self):
+        """Emite o resumo estruturado em uma linha JSON"""
+        print(f"[METRICAS] {json.dumps(self.resumo(), ensure_ascii=False)}")
+
+
+# Instância do processo; ligada com HERMES_METRICAS=1 ou pela linha de comando
+METRICAS = Instrumentacao(ativo=os.environ.get('HERMES_METRICAS', '') not in ('', '0'))
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Monitor de Deriva Hermes Reply
+Distribuições de referência do treino, PSI/KS por execução e acurácia móvel do modelo para sinalizar retreino
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from esbocos import EsbocoQuantis
+from esquemas import tipar_dataframe
+from idempotencia import escrever_atomico
+from retencao import CAMADA_AGREGADA, ler_execucao_arquivada
+
+ARQUIVO_REFERENCIA = 'hermes_referencia_modelo.json'
+ARQUIVO_DERIVA = 'hermes_deriva.json'
+ARQUIVO_MODELO = 'modelo_randomforest.joblib'
+
+# Faixas de mesma massa no treino para o PSI (as pontas ficam abertas)
+FAIXAS_PSI = 20
+# Proporção mínima por faixa no PSI: faixa vazia de um lado não vira log(0)
+EPSILON_PSI = 1e-4
+# Limiares usuais do PSI: abaixo de 0.1 estável, até 0.25 moderado, acima significativo
+PSI_MODERADO = 0.1
+PSI_SIGNIFICATIVO = 0.25
+# Distância KS (tamanho do efeito, não p-valor: com milhares de leituras tudo seria "significativo")
+KS_SIGNIFICATIVO = 0.2
+# Queda da acurácia móvel em relação à acurácia de teste do treino que pede retreino
+QUEDA_ACURACIA = 0.05
+# Acurácia móvel: últimas execuções avaliadas com a referência atual
+JANELA_EXECUCOES = 5
+# Execuções menores que isto não entram no sinal (PSI e KS ruidosos demais)
+MINIMO_LEITURAS = 200
+MAX_EXECUCOES_REGISTRADAS = 500
+
+
+def indice_psi(esperado, observado, epsilon=EPSILON_PSI):
+    """PSI entre contagens por faixa, vetorizado na última dimensão (uma linha por feature).
+
+    Linhas podem ser completadas com zeros dos dois lados: faixas vazias em
+    ambos contribuem com zero. Linhas sem nenhuma contagem dão NaN.
+    """
+    esperado = np.asarray(esperado, dtype='float64')
+    observado = np.asarray(observado, dtype='float64')
+    total_esperado = esperado.sum(axis=-1, keepdims=True)
+    total_observado = observado.sum(axis=-1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = np.maximum(esperado / total_esperado, epsilon)
+        q = np.maximum(observado / total_observado, epsilon)
+    return ((q - p) * np.log(q / p)).sum(axis=-1)
+
+
+def _numero(valor):
+    """float para o JSON do estado (NaN vira None)"""
+    return None if valor is None or np.isnan(valor) else float(valor)
+
+
+def distancia_ks(esboco, valores):
+    """Maior distância entre a CDF empírica dos valores e a CDF do esboço de referência (NaN ignorados)"""
+    valores = np.sort(np.asarray(valores, dtype='float64'))
+    valores = valores[~np.isnan(valores)]
+    if len(valores) == 0 or esboco.contagem == 0:
+        return np.nan
+    # Avaliada nos valores distintos, antes e depois de cada salto (valores repetidos são comuns nos sensores)
+    distintos = np.unique(valores)
+    referencia = esboco.cdf(distintos)
+    depois = np.searchsorted(valores, distintos, 'right') / len(valores)
+    antes = np.searchsorted(valores, distintos, 'left') / len(valores)
+    return float(max(np.abs(depois - referencia).max(), np.abs(antes - referencia).max()))
+
+
+class ReferenciaModelo:
+    """Distribuições compactas dos dados de treino do modelo, gravadas junto com ele.
+
+    Por feature guarda os limites de ``FAIXAS_PSI`` faixas de mesma massa e
+    as contagens do treino (PSI) e um t-digest (KS); guarda também a
+    contagem de cada rótulo, as médias usadas para preencher ausentes e a
+    acurácia de teste, base para detectar queda. Poucos KB, qualquer que
+    seja o tamanho do treino: a ingestão compara sem reler o conjunto.
+    """
+
+    def __init__(self, features, limites, contagens, esbocos, classes, rotulos, medias, acuracia, n_amostras,
+                 versao=None):
+        self.features = list(features)
+        self.limites = {f: np.asarray(limites[f], dtype='float64') for f in self.features}
+        self.contagens = {f: np.asarray(contagens[f], dtype='int64') for f in self.features}
+        self.esbocos = esbocos
+        self.classes = list(classes)
+        self.rotulos = dict(rotulos)
+        self.medias = dict(medias)
+        self.acuracia = acuracia
+        self.n_amostras = n_amostras
+        self.versao = versao or datetime.now().isoformat(timespec='seconds')
+
+    @classmethod
+    def de_treino(cls, df, features, classes, rotulos, acuracia):
+        """Resume as leituras de treino (valores brutos, antes do preenchimento de ausentes).
+
+        ``classes`` é a ordem do LabelEncoder do modelo (índice previsto ->
+        status); ``rotulos`` são os status das leituras de treino.
+        """
+        limites, contagens, esbocos = {}, {}, {}
+        for feature in features:
+            valores = pd.to_numeric(df[feature], errors='coerce').to_numpy(dtype='float64')
+            valores = valores[~np.isnan(valores)]
+            internos = np.quantile(valores, np.linspace(0, 1, FAIXAS_PSI + 1)[1:-1]) if len(valores) else []
+            limites[feature] = np.unique(internos)
+            contagens[feature] = np.bincount(np.searchsorted(limites[feature], valores, 'right'),
+                                             minlength=len(limites[feature]) + 1)
+            esbocos[feature] = EsbocoQuantis().adicionar(valores)
+        medias = df[features].mean().to_dict()
+        return cls(features, limites, contagens, esbocos, classes, pd.Series(rotulos).value_counts().to_dict(),
+                   medias, float(acuracia), len(df))
+
+    def comparar(self, df):
+        """PSI e KS de cada feature e PSI dos rótulos entre um lote de leituras e o treino"""
+        largura = max(len(c) for c in self.contagens.values())
+        esperado = np.zeros((len(self.features), largura))
+        observado = np.zeros((len(self.features), largura))
+        ks = {}
+        for linha, feature in enumerate(self.features):
+            valores = pd.to_numeric(df[feature], errors='coerce').to_numpy(dtype='float64') \
+                if feature in df.columns else np.empty(0)
+            valores = valores[~np.isnan(valores)]
+            faixas = len(self.contagens[feature])
+            esperado[linha, :faixas] = self.contagens[feature]
+            observado[linha, :faixas] = np.bincount(np.searchsorted(self.limites[feature], valores, 'right'),
+                                                    minlength=faixas)
+            ks[feature] = _numero(distancia_ks(self.esbocos[feature], valores))
+        psi = indice_psi(esperado, observado)
+
+        comparacao = {
+            'psi': {f: _numero(v) for f, v in zip(self.features, psi)},
+            'ks': ks,
+            'psi_rotulos': None,
+            'rotulos_novos': []
+        }
+        if 'system_status' in df.columns:
+            contagem = df['system_status'].dropna().astype(str).value_counts()
+            classes = sorted(set(self.rotulos) | set(contagem.index))
+            comparacao['psi_rotulos'] = _numero(indice_psi(
+                [self.rotulos.get(c, 0) for c in classes], [contagem.get(c, 0) for c in classes]
+            ))
+            comparacao['rotulos_novos'] = [c for c in classes if c not in self.classes and contagem.get(c, 0)]
+        return comparacao
+
+    def para_dict(self):
+        """Serializa a referência para JSON"""
+        return {
+            'versao': self.versao,
+            'features': self.features,
+            'limites': {f: self.limites[f].tolist() for f in self.features},
+            'contagens': {f: self.contagens[f].tolist() for f in self.features},
+            'esbocos': {f: self.esbocos[f].para_dict() for f in self.features},
+            'classes': [str(c) for c in self.classes],
+            'rotulos': {str(c): int(n) for c, n in self.rotulos.items()},
+            'medias': {f: (None if pd.isna(v) else float(v)) for f, v in self.medias.items()},
+            'acuracia': self.acuracia,
+            'n_amostras': int(self.n_amostras)
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Reconstrói a referência a partir do JSON"""
+        return cls(
+            dados['features'], dados['limites'], dados['contagens'],
+            {f: EsbocoQuantis.de_dict(e) for f, e in dados['esbocos'].items()},
+            dados['classes'], dados['rotulos'], {f: (np.nan if v is None else v) for f, v in dados['medias'].items()},
+            dados['acuracia'], dados['n_amostras'], dados['versao']
+        )
+
+
+def salvar_referencia(referencia, dados_path):
+    """Grava a referência do modelo de forma atômica"""
+    caminho = os.path.join(dados_path, ARQUIVO_REFERENCIA)
+    return escrever_atomico(caminho, lambda f: f.write(json.dumps(referencia.para_dict(), separators=(',', ':')).encode('utf-8')))
+
+
+def carregar_referencia(dados_path):
+    """Referência do modelo salvo, ou None se nenhum modelo foi treinado com ``salvar_modelo``"""
+    caminho = os.path.join(dados_path, ARQUIVO_REFERENCIA)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return ReferenciaModelo.de_dict(json.load(f))
+
+
+class MonitorDeriva:
+    """Avalia cada execução ingerida contra a referência do modelo e mantém o sinal de retreino.
+
+    O estado (``hermes_deriva.json``) guarda, por execução, PSI/KS das
+    features, PSI dos rótulos e acertos/avaliadas do modelo salvo contra o
+    ``system_status`` do firmware. A acurácia móvel soma as últimas
+    ``JANELA_EXECUCOES`` execuções avaliadas com a referência atual; retreinar
+    um modelo troca a referência e recomeça a janela.
+    """
+
+    def __init__(self, dados_path):
+        self.dados_path = dados_path
+        self.arquivo_estado = os.path.join(dados_path, ARQUIVO_DERIVA)
+        self._referencia = None
+        self._modelo = None
+
+    @property
+    def referencia(self):
+        if self._referencia is None:
+            self._referencia = carregar_referencia(self.dados_path)
+        return self._referencia
+
+    def carregar_modelo(self):
+        """Modelo salvo junto com a referência (joblib e scikit-learn só são importados aqui)"""
+        caminho = os.path.join(self.dados_path, ARQUIVO_MODELO)
+        if self._modelo is None and os.path.exists(caminho):
+            import joblib
+            self._modelo = joblib.load(caminho)
+        return self._modelo
+
+    def avaliar_predicoes(self, df):
+        """Acertos e leituras avaliadas do modelo salvo contra os rótulos do firmware (None sem modelo)"""
+        referencia = self.referencia
+        modelo = self.carregar_modelo()
+        if modelo is None or 'system_status' not in df.columns:
+            return None
+        rotulados = df[df['system_status'].notna()]
+        if len(rotulados) == 0:
+            return None
+        X = rotulados[referencia.features].apply(pd.to_numeric, errors='coerce').fillna(referencia.medias)
+        # O modelo prevê índices do LabelEncoder do treino
+        preditos = np.array(referencia.classes)[modelo.predict(X)]
+        return int((preditos == rotulados['system_status'].astype(str).to_numpy()).sum()), len(rotulados)
+
+    def avaliar_execucao(self, df, execucao_id):
+        """Entrada de estado de uma execução: PSI/KS, PSI dos rótulos e acertos do modelo"""
+        referencia = self.referencia
+        entrada = {
+            'execucao_id': execucao_id,
+            'referencia': referencia.versao,
+            'timestamp_avaliacao': datetime.now().isoformat(timespec='seconds'),
+            'leituras': len(df),
+            **referencia.comparar(df)
+        }
+        predicoes = self.avaliar_predicoes(df)
+        if predicoes is not None:
+            entrada['acertos'], entrada['avaliadas'] = predicoes
+        return entrada
+
+    def carregar_estado(self):
+        """Estado salvo do monitor (execuções avaliadas e último sinal)"""
+        if not os.path.exists(self.arquivo_estado):
+            return {'execucoes': [], 'retreinar': False, 'motivos': []}
+        with open(self.arquivo_estado, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def sinal_retreino(self, execucoes):
+        """Motivos para retreinar, a partir da última execução e da acurácia móvel da referência atual"""
+        referencia = self.referencia
+        atuais = [e for e in execucoes if e['referencia'] == referencia.versao and e['leituras'] >= MINIMO_LEITURAS]
+        motivos = []
+        if atuais:
+            ultima = atuais[-1]
+            for feature, psi in ultima['psi'].items():
+                if psi is not None and psi >= PSI_SIGNIFICATIVO:
+                    motivos.append(f"{feature}: PSI {psi:.2f} na execução {ultima['execucao_id']}")
+                elif (ultima['ks'].get(feature) or 0) >= KS_SIGNIFICATIVO:
+                    motivos.append(f"{feature}: KS {ultima['ks'][feature]:.2f} na execução {ultima['execucao_id']}")
+            if (ultima.get('psi_rotulos') or 0) >= PSI_SIGNIFICATIVO:
+                motivos.append(f"status: PSI {ultima['psi_rotulos']:.2f} na execução {ultima['execucao_id']}")
+            if ultima.get('rotulos_novos'):
+                motivos.append(f"status fora do treino: {', '.join(ultima['rotulos_novos'])}")
+
+        acuracia = self.acuracia_movel(atuais)
+        if acuracia is not None and acuracia < referencia.acuracia - QUEDA_ACURACIA:
+            motivos.append(f"acurácia móvel {acuracia:.1%} (treino {referencia.acuracia:.1%})")
+        return motivos, acuracia
+
+    @staticmethod
+    def acuracia_movel(execucoes, janela=JANELA_EXECUCOES):
+        """Acertos sobre avaliadas nas últimas ``janela`` execuções com predições"""
+        avaliadas = [e for e in execucoes if e.get('avaliadas')][-janela:]
+        total = sum(e['avaliadas'] for e in avaliadas)
+        return sum(e['acertos'] for e in avaliadas) / total if total else None
+
+    def registrar(self, df, execucao_id):
+        """Avalia a execução, grava o estado e retorna (entrada, motivos); None sem modelo de referência"""
+        if self.referencia is None:
+            return None
+        entrada = self.avaliar_execucao(df, execucao_id)
+        estado = self.carregar_estado()
+        execucoes = [e for e in estado['execucoes'] if e['execucao_id'] != execucao_id] + [entrada]
+        execucoes = execucoes[-MAX_EXECUCOES_REGISTRADAS:]
+        motivos, acuracia = self.sinal_retreino(execucoes)
+        entrada['acuracia_movel'] = _numero(acuracia)
+
+        estado = {
+            'referencia': self.referencia.versao,
+            'acuracia_treino': self.referencia.acuracia,
+            'retreinar': bool(motivos),
+            'motivos': motivos,
+            'execucoes': execucoes
+        }
+        conteudo = json.dumps(estado, ensure_ascii=False, separators=(',', ':'))
+        escrever_atomico(self.arquivo_estado, lambda f: f.write(conteudo.encode('utf-8')))
+        return entrada, motivos
+
+
+def tabela_execucoes(estado):
+    """Execuções avaliadas como DataFrame (PSI e KS máximos entre as features)"""
+    linhas = []
+    for entrada in estado.get('execucoes', []):
+        psi = {f: v for f, v in entrada['psi'].items() if v is not None}
+        ks = {f: v for f, v in entrada['ks'].items() if v is not None}
+        linhas.append({
+            'execucao_id': entrada['execucao_id'],
+            'leituras': entrada['leituras'],
+            'psi_max': max(psi.values()) if psi else np.nan,
+            'feature_psi_max': max(psi, key=psi.get) if psi else None,
+            'ks_max': max(ks.values()) if ks else np.nan,
+            'psi_status': entrada.get('psi_rotulos'),
+            'acuracia': entrada['acertos'] / entrada['avaliadas'] if entrada.get('avaliadas') else np.nan,
+            'acuracia_movel': entrada.get('acuracia_movel'),
+            'referencia': entrada['referencia']
+        })
+    return pd.DataFrame(linhas, columns=['execucao_id', 'leituras', 'psi_max', 'feature_psi_max', 'ks_max',
+                                         'psi_status', 'acuracia', 'acuracia_movel', 'referencia'])
+
+
+def main():
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Deriva entre os dados de treino do modelo e as execuções ingeridas')
+    parser.add_argument('--execucao', action='append', default=[],
+                        help='reavalia a execução (hermes_data_<id>.csv ou partição compactada pela retenção); repetível')
+    parser.add_argument('--dados', default=os.path.normpath(os.path.join(base_path, '..', 'dados_simulacao')))
+    args = parser.parse_args()
+
+    monitor = MonitorDeriva(args.dados)
+    if monitor.referencia is None:
+        print(f"[AVISO] Nenhuma referência em {args.dados}: treine e salve o modelo no dashboard primeiro")
+        return
+
+    for execucao_id in args.execucao:
+        arquivo = os.path.join(args.dados, f'hermes_data_{execucao_id}.csv')
+        if os.path.exists(arquivo):
+            # Tipada como na ingestão e no arquivo (status legados como ATENCAO viram ATENÇÃO)
+            df = tipar_dataframe(pd.read_csv(arquivo))
+        else:
+            # Execuções antigas saem de dados_simulacao/ pela retenção
+            df = ler_execucao_arquivada(args.dados, execucao_id)
+            if df is None:
+                parser.error(f'execução não encontrada: {execucao_id} (nem {arquivo} nem no arquivo da retenção)')
+            if df.attrs.get('camada') == CAMADA_AGREGADA:
+                parser.error(f'execução {execucao_id} já agregada por hora: sem leituras individuais para avaliar deriva')
+        monitor.registrar(df, execucao_id)
+
+    estado = monitor.carregar_estado()
+    print(f"[HERMES] Referência {monitor.referencia.versao}: {monitor.referencia.n_amostras:,} amostras, "
+          f"acurácia de teste {monitor.referencia.acuracia:.1%}")
+    tabela = tabela_execucoes(estado)
+    if len(tabela):
+        print(tabela.tail(JANELA_EXECUCOES * 2).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    if estado['retreinar']:
+        print(f"[AVISO] Retreino recomendado: {'; '.join(estado['motivos'])}")
+    else:
+        print("[SUCESSO] Sem deriva significativa nas execuções avaliadas")
+
+
+if __name__ == "__main__":
+    main()
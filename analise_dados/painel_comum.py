@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Componentes Comuns do Dashboard Hermes Reply
+Tema, estilos, carga compartilhada de dados, cards, alertas e cache de seções usados por todas as visões
+"""
+
+import os
+import re
+
+import streamlit as st
+from consulta_dados import ConsultaTelemetria
+from renderizacao import CacheSecoes, RenderizadorSecoes
+from hermes_analytics import COLUNAS_VISAO, HermesAnalytics
+from armazem_colunar import CacheDatasets, assinatura_arquivo
+from retencao import assinatura_catalogo, assinatura_execucao, juntar_agregados, ler_agregados, pesos_leituras
+from perfilamento import PERFIL_INATIVO, PerfiladorPagina
+
+# === TEMA E CORES PERSONALIZADAS ===
+CORES_TEMA = {
+    'primaria': '#1f77b4',
+    'secundaria': '#ff7f0e', 
+    'sucesso': '#2ca02c',
+    'alerta': '#d62728',
+    'info': '#17becf',
+    'fundo': '#f8f9fa',
+    'texto': '#2c3e50'
+}
+
+ARQUIVO_ESTILOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'estilos.css')
+
+@st.cache_resource(show_spinner=False)
+def carregar_estilos(caminho=ARQUIVO_ESTILOS):
+    """Lê e reduz o CSS uma vez por processo (comentários e espaços fora), pronto para o st.markdown"""
+    with open(caminho, encoding='utf-8') as f:
+        css = f.read()
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,>])\s*', r'\1', css).replace(';}', '}')
+    return f'<style>{css.strip()}</style>'
+
+def aplicar_estilos():
+    """Injeta o CSS personalizado (UX/UI otimizada para vieses cognitivos) na página"""
+    st.markdown(carregar_estilos(), unsafe_allow_html=True)
+
+def notificar_streamlit(nivel, mensagem):
+    """Exibe notificações do núcleo de análise na interface"""
+    if nivel == 'erro':
+        st.error(mensagem)
+    else:
+        st.warning(mensagem)
+
+@st.cache_resource
+def obter_cache_datasets(dados_path):
+    """Versões do armazém colunar abertas neste processo (uma cópia mapeada para todas as sessões)"""
+    return CacheDatasets(dados_path)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def carregar_dados_compartilhados(dados_path, execucao_id, assinatura, visao):
+    """Uma cópia tipada por versão do arquivo e visão, compartilhada por todas as sessões.
+    
+    O DataFrame é somente leitura: as seções filtram e agregam, nunca alteram
+    colunas no lugar (com o copy-on-write do pandas, derivados não o afetam).
+    """
+    analytics = HermesAnalytics(dados_path=dados_path, notificar=notificar_streamlit)
+    if execucao_id is None:
+        return analytics.carregar_dados_historicos(visao)
+    return analytics.carregar_execucao_especifica(execucao_id, visao)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def obter_consulta_compartilhada(assinatura, _df):
+    """Índice temporal do histórico, compartilhado pelas sessões junto com o DataFrame"""
+    return ConsultaTelemetria(_df, assinatura=assinatura)
+
+class HermesAnalyticsDashboard(HermesAnalytics):
+    def __init__(self):
+        # Modelo e métricas ficam no session state para sobreviver aos reruns
+        super().__init__(estado=st.session_state, notificar=notificar_streamlit)
+        self.arrendamento_historico = None
+    
+    def carregar_dados_historicos(self, visao='historico'):
+        """Histórico no perfil tipado, sem as colunas que o dashboard não exibe.
+        
+        Usa a versão publicada no armazém colunar (mapeada em memória, sem
+        cópia) quando ela corresponde ao CSV atual; senão lê o CSV. As
+        execuções agregadas pela retenção são juntadas às brutas (coluna
+        ``leituras``), uma vez por versão e catálogo.
+        """
+        arquivo_historico = os.path.join(self.dados_path, 'hermes_historico_completo.csv')
+        origem = assinatura_arquivo(arquivo_historico)
+        catalogo = assinatura_catalogo(self.dados_path)
+        
+        # A sessão mantém a versão em uso até o próximo rerun, mesmo que a ingestão publique outra
+        arrendamento = obter_cache_datasets(self.dados_path).adquirir('historico', origem)
+        anterior = st.session_state.get('arrendamento_historico')
+        st.session_state.arrendamento_historico = arrendamento
+        if anterior is not None:
+            anterior.liberar()
+        
+        self.arrendamento_historico = arrendamento
+        if arrendamento is None:
+            return carregar_dados_compartilhados(self.dados_path, None, origem + catalogo, visao)
+        brutas = arrendamento.df[[c for c in COLUNAS_VISAO[visao] if c in arrendamento.df.columns]]
+        return arrendamento.derivado(('agregados', visao) + catalogo, lambda: juntar_agregados(
+            brutas, ler_agregados(self.dados_path, COLUNAS_VISAO[visao])))
+    
+    def carregar_execucao_especifica(self, execucao_id, visao=None):
+        """Execução no perfil tipado (em qualquer camada da retenção), compartilhada entre as sessões"""
+        assinatura = assinatura_execucao(self.dados_path, execucao_id)
+        return carregar_dados_compartilhados(self.dados_path, execucao_id, assinatura, visao)
+        
+    def obter_consulta_historico(self, df):
+        """Retorna o motor de consulta do histórico, reaproveitando o índice entre reruns e sessões"""
+        arrendamento = self.arrendamento_historico
+        if arrendamento is not None:
+            # Índice temporal pré-computado na publicação (só cobre as linhas brutas); a consulta vive
+            # enquanto a versão estiver aberta
+            indice_tempo = arrendamento.indice_tempo if len(df) == len(arrendamento.df) else None
+            return arrendamento.derivado(('consulta', len(df)), lambda: ConsultaTelemetria(
+                df, assinatura=('colunar', arrendamento.versao, len(df)), indice_tempo=indice_tempo
+            ))
+        arquivo_historico = os.path.join(self.dados_path, 'hermes_historico_completo.csv')
+        return obter_consulta_compartilhada(assinatura_arquivo(arquivo_historico) + (len(df),), df)
+    
+    def criar_grafico_moderno(self, df, x, y, tipo='line', titulo='', cor=None):
+        """Cria gráficos com design moderno e consistente"""
+        import plotly.express as px
+        
+        if tipo == 'line':
+            fig = px.line(df, x=x, y=y, title=titulo)
+        elif tipo == 'bar':
+            fig = px.bar(df, x=x, y=y, title=titulo)
+        elif tipo == 'scatter':
+            fig = px.scatter(df, x=x, y=y, title=titulo, color=cor)
+        elif tipo == 'pie':
+            fig = px.pie(df, values=y, names=x, title=titulo)
+        
+        # Aplicar tema moderno
+        fig.update_layout(
+            title_font_size=20,
+            title_font_color=CORES_TEMA['texto'],
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(family="Arial, sans-serif", size=12, color=CORES_TEMA['texto']),
+            margin=dict(l=20, r=20, t=60, b=20),
+            showlegend=True,
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="right",
+                x=1
+            )
+        )
+        
+        # Estilizar eixos
+        fig.update_xaxes(
+            gridcolor='rgba(128,128,128,0.2)',
+            showgrid=True,
+            zeroline=False,
+            tickangle=45
+        )
+        fig.update_yaxes(
+            gridcolor='rgba(128,128,128,0.2)',
+            showgrid=True,
+            zeroline=False
+        )
+        
+        return fig
+
+def exibir_alerta_cognitivo(tipo, titulo, mensagem):
+    """Exibe alertas otimizados para reduzir vieses cognitivos"""
+    if tipo == "success":
+        st.markdown(f"""
+        <div class="alert-success">
+            <strong>✅ {titulo}</strong><br>
+            {mensagem}
+        </div>
+        """, unsafe_allow_html=True)
+    elif tipo == "warning":
+        st.markdown(f"""
+        <div class="alert-warning">
+            <strong>⚠️ {titulo}</strong><br>
+            {mensagem}
+        </div>
+        """, unsafe_allow_html=True)
+    elif tipo == "error":
+        st.markdown(f"""
+        <div class="alert-error">
+            <strong>❌ {titulo}</strong><br>
+            {mensagem}
+        </div>
+        """, unsafe_allow_html=True)
+
+def calcular_metricas_principais(df):
+    """Valores dos cards de métricas principais (janelas agregadas contam todas as leituras que representam)"""
+    return {
+        'total_registros': int(pesos_leituras(df).sum()),
+        'execucoes': df['execucao_id'].nunique() if 'execucao_id' in df.columns else 1,
+        'temp_media': df['temperatura'].mean(),
+        'temp_min': df['temperatura'].min(),
+        'temp_max': df['temperatura'].max(),
+        'umidade_media': df['umidade'].mean(),
+        'umidade_min': df['umidade'].min(),
+        'umidade_max': df['umidade'].max()
+    }
+
+def exibir_metricas_principais(df, metricas=None):
+    """Exibe métricas principais com cards otimizados para cognição"""
+    # Calcular métricas com contexto (o modo ao vivo entrega os valores acumulados incrementalmente)
+    metricas = metricas or calcular_metricas_principais(df)
+    total_registros = metricas['total_registros']
+    execucoes = metricas['execucoes']
+    temp_media = metricas['temp_media']
+    umidade_media = metricas['umidade_media']
+    
+    # Determinar status das métricas para feedback visual
+    temp_status = "🟢" if 20 <= temp_media <= 30 else "🟡" if 15 <= temp_media <= 35 else "🔴"
+    umidade_status = "🟢" if 40 <= umidade_media <= 70 else "🟡" if 30 <= umidade_media <= 80 else "🔴"
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">📊 Total de Registros</div>
+            <div class="metric-value">{total_registros:,}</div>
+            <div style="font-size: 0.9rem; opacity: 0.8;">
+                {execucoes} execução{'ões' if execucoes > 1 else ''}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        duracao_estimada = total_registros * 5 / 60  # 5s por registro
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">⏱️ Duração Total</div>
+            <div class="metric-value">{duracao_estimada:.1f}min</div>
+            <div style="font-size: 0.9rem; opacity: 0.8;">
+                ~{total_registros * 5}s de dados
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">🌡️ Temperatura {temp_status}</div>
+            <div class="metric-value">{temp_media:.1f}°C</div>
+            <div style="font-size: 0.9rem; opacity: 0.8;">
+                Faixa: {metricas['temp_min']:.1f}° - {metricas['temp_max']:.1f}°
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">💧 Umidade {umidade_status}</div>
+            <div class="metric-value">{umidade_media:.1f}%</div>
+            <div style="font-size: 0.9rem; opacity: 0.8;">
+                Faixa: {metricas['umidade_min']:.1f}% - {metricas['umidade_max']:.1f}%
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+def exibir_indicador_progresso():
+    """Exibe indicador de progresso para reduzir ansiedade"""
+    st.markdown('<div class="progress-indicator"></div>', unsafe_allow_html=True)
+
+def calcular_resumo_inteligente(df):
+    """Contagens de status e temperaturas inicial/final usadas no resumo inteligente"""
+    pesos = pesos_leituras(df)
+    resumo = {
+        'status_counts': pesos.groupby(df['system_status'], observed=True).sum().sort_values(ascending=False),
+        'total_registros': int(pesos.sum()),
+        'temp_inicial': None,
+        'temp_final': None
+    }
+    if 'timestamp_simulacao' in df.columns:
+        df_sorted = df.sort_values('timestamp_simulacao')
+        resumo['temp_inicial'] = df_sorted['temperatura'].iloc[:3].mean()
+        resumo['temp_final'] = df_sorted['temperatura'].iloc[-3:].mean()
+    return resumo
+
+def exibir_resumo_inteligente(df, resumo=None):
+    """Exibe resumo inteligente para reduzir carga cognitiva"""
+    resumo = resumo or calcular_resumo_inteligente(df)
+    status_counts = resumo['status_counts']
+    status_dominante = status_counts.index[0]
+    porcentagem_dominante = (status_counts.iloc[0] / resumo['total_registros']) * 100
+    
+    # Análise de tendência
+    temp_inicial, temp_final = resumo['temp_inicial'], resumo['temp_final']
+    if temp_inicial is not None:
+        tendencia_temp = "📈 Subindo" if temp_final > temp_inicial + 1 else "📉 Descendo" if temp_final < temp_inicial - 1 else "➡️ Estável"
+    else:
+        tendencia_temp = "➡️ Estável"
+    
+    st.markdown(f"""
+    <div class="section-container">
+        <h3>🧠 Resumo Inteligente</h3>
+        <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; margin-top: 1rem;">
+            <div>
+                <strong>Status Predominante:</strong><br>
+                <span class="status-{status_dominante.lower()}">{status_dominante}</span>
+                <small style="color: #666;"> ({porcentagem_dominante:.1f}% dos dados)</small>
+            </div>
+            <div>
+                <strong>Tendência de Temperatura:</strong><br>
+                {tendencia_temp}
+            </div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+def obter_cache_secoes():
+    """Retorna o cache de figuras da sessão"""
+    if 'cache_secoes' not in st.session_state:
+        st.session_state.cache_secoes = CacheSecoes()
+    return st.session_state.cache_secoes
+
+def obter_perfil():
+    """Retorna o perfilador desta execução do script (inativo quando o perfil está desligado)"""
+    return st.session_state.get('perfil_pagina', PERFIL_INATIVO)
+
+def iniciar_perfil(modo_visualizacao):
+    """Cria o perfilador da execução conforme a opção da barra lateral"""
+    ativo = st.sidebar.toggle(
+        "⏱️ Perfil de Renderização",
+        value=os.environ.get('HERMES_PERFIL', '') not in ('', '0'),
+        help="Mede tempo e volume de dados de cada carga, filtro, figura e seção e grava o trace"
+    )
+    perfil = PerfiladorPagina(ativo=True, modo=modo_visualizacao) if ativo else PERFIL_INATIVO
+    st.session_state.perfil_pagina = perfil
+    obter_cache_secoes().perfil = perfil
+    return perfil
+
+def exibir_grafico(fig, secao):
+    """Exibe a figura, medindo serialização e envio quando o perfil está ligado.
+
+    O tamanho em bytes é medido uma vez por figura (a serialização extra só
+    acontece quando a figura é construída); figuras vindas do cache de seções
+    reaproveitam a medida.
+    """
+    perfil = obter_perfil()
+    tamanho = None
+    if perfil.ativo:
+        medidas = st.session_state.setdefault('bytes_figuras', {})
+        figura_medida, tamanho = medidas.get(secao, (None, None))
+        if figura_medida is not fig:
+            with perfil.etapa(secao, 'serializacao') as registro:
+                tamanho = registro['bytes'] = len(fig.to_json(validate=False))
+            medidas[secao] = (fig, tamanho)
+    with perfil.etapa(secao, 'exibicao') as registro:
+        registro['bytes'] = tamanho
+        st.plotly_chart(fig, use_container_width=True)
+
+def obter_renderizador(secoes):
+    """Cria o renderizador de seções com o cache de figuras da sessão"""
+    secoes_visiveis = st.sidebar.multiselect(
+        "🧩 Seções Exibidas",
+        secoes,
+        default=secoes,
+        help="Seções ocultas não são calculadas, reduzindo o tempo de atualização"
+    )
+    return RenderizadorSecoes(obter_cache_secoes(), secoes_visiveis)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfil de Renderização do Dashboard Hermes Reply
+Tempo e volume de dados por loader, filtro, construção de figura e serialização, com histórico de traces em JSONL
+"""
+
+import argparse
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+ARQUIVO_TRACES = 'hermes_perfil_dashboard.jsonl'
+MAX_TRACES = 500
+# Regressão: etapa acima de FATOR_REGRESSAO x a mediana dos traces anteriores e ao menos MIN_REGRESSAO_MS mais lenta
+FATOR_REGRESSAO = 1.5
+MIN_REGRESSAO_MS = 5.0
+JANELA_REGRESSAO = 20
+# Construções de figura acima deste tempo médio são candidatas a cache dedicado ou pré-agregação
+LIMITE_CANDIDATA_CACHE_MS = 100.0
+
+
+def volume_payload(obj):
+    """Linhas e bytes de um resultado (DataFrame, Series, figura Plotly); (None, None) se desconhecido"""
+    if isinstance(obj, pd.DataFrame):
+        return len(obj), int(obj.memory_usage(index=False, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return len(obj), int(obj.memory_usage(index=False, deep=True))
+    return None, None
+
+
+class _RegistroInativo(dict):
+    """Registro descartável entregue quando o perfil está desligado"""
+
+    def __setitem__(self, chave, valor):
+        pass
+
+
+class PerfiladorPagina:
+    """Coleta o trace de uma execução do script do dashboard.
+
+    Cada etapa registra nome, tipo (``carga``, ``filtro``, ``secao``,
+    ``construcao``, ``serializacao``, ``exibicao``), duração e, quando
+    conhecido, linhas, bytes e acerto de cache. Desligado, ``etapa`` entrega
+    um registro descartável e nada é medido.
+    """
+
+    def __init__(self, ativo=False, modo=''):
+        self.ativo = ativo
+        self.modo = modo
+        self.etapas = []
+        self.inicio = time.perf_counter()
+
+    @contextmanager
+    def etapa(self, nome, tipo='secao'):
+        """Cronometra um bloco; o registro entregue aceita 'linhas', 'bytes' e 'cache'"""
+        if not self.ativo:
+            yield _RegistroInativo()
+            return
+        registro = {'nome': nome, 'tipo': tipo}
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['ms'] = round((time.perf_counter() - inicio) * 1000, 3)
+            self.etapas.append(registro)
+
+    def medir(self, nome, funcao, *args, tipo='carga', **kwargs):
+        """Executa ``funcao`` como etapa e registra o volume do resultado"""
+        if not self.ativo:
+            return funcao(*args, **kwargs)
+        with self.etapa(nome, tipo) as registro:
+            resultado = funcao(*args, **kwargs)
+            registro['linhas'], registro['bytes'] = volume_payload(resultado)
+        return resultado
+
+    def registrar_cache(self, secao, acerto, ms=0.0):
+        """Registra a obtenção de uma figura do cache de seções"""
+        if self.ativo:
+            self.etapas.append({'nome': secao, 'tipo': 'construcao', 'ms': round(ms, 3),
+                                'cache': 'acerto' if acerto else 'falha'})
+
+    def trace(self):
+        """Trace desta execução do script"""
+        return {
+            'momento': datetime.now().isoformat(timespec='seconds'),
+            'modo': self.modo,
+            'total_ms': round((time.perf_counter() - self.inicio) * 1000, 3),
+            'etapas': self.etapas
+        }
+
+
+# Perfilador desligado (padrão), compartilhado entre execuções
+PERFIL_INATIVO = PerfiladorPagina(ativo=False)
+
+
+# === HISTÓRICO DE TRACES ===
+def salvar_trace(trace, caminho, max_traces=MAX_TRACES):
+    """Acrescenta o trace ao JSONL, compactando para os últimos ``max_traces`` quando excede o limite"""
+    linha = json.dumps(trace, ensure_ascii=False)
+    with open(caminho, 'a', encoding='utf-8') as f:
+        f.write(linha + '\n')
+
+    if os.path.getsize(caminho) > max_traces * len(linha) * 2:
+        with open(caminho, encoding='utf-8') as f:
+            linhas = f.readlines()
+        if len(linhas) > max_traces:
+            temporario = caminho + '.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                f.writelines(linhas[-max_traces:])
+            os.replace(temporario, caminho)
+
+
+def carregar_traces(caminho, limite=None):
+    """Lê os traces persistidos (os ``limite`` mais recentes), ignorando linhas corrompidas"""
+    if not os.path.exists(caminho):
+        return []
+    traces = []
+    with open(caminho, encoding='utf-8') as f:
+        for linha in f:
+            try:
+                traces.append(json.loads(linha))
+            except ValueError:
+                continue
+    return traces[-limite:] if limite else traces
+
+
+def tabela_etapas(traces):
+    """Uma linha por etapa de cada trace, com o modo e o momento do trace"""
+    linhas = [
+        dict(etapa, modo=trace.get('modo', ''), momento=trace.get('momento'), trace=i)
+        for i, trace in enumerate(traces)
+        for etapa in trace.get('etapas', [])
+    ]
+    colunas = ['trace', 'momento', 'modo', 'nome', 'tipo', 'ms', 'linhas', 'bytes', 'cache']
+    return pd.DataFrame(linhas).reindex(columns=colunas)
+
+
+def detectar_regressoes(trace, anteriores, fator=FATOR_REGRESSAO, min_ms=MIN_REGRESSAO_MS, janela=JANELA_REGRESSAO):
+    """Etapas do trace mais lentas que a mediana das mesmas etapas nos traces anteriores do mesmo modo.
+
+    Construções servidas pelo cache não entram na comparação, já que só
+    refletem se as entradas mudaram.
+    """
+    historico = tabela_etapas([t for t in anteriores if t.get('modo') == trace.get('modo')][-janela:])
+    atual = tabela_etapas([trace])
+    colunas = ['nome', 'tipo', 'ms', 'mediana_ms', 'fator']
+    if historico.empty or atual.empty:
+        return pd.DataFrame(columns=colunas)
+
+    historico = historico[historico['cache'] != 'acerto']
+    atual = atual[atual['cache'] != 'acerto']
+    medianas = historico.groupby(['nome', 'tipo'])['ms'].median().rename('mediana_ms').reset_index()
+    comparacao = atual.groupby(['nome', 'tipo'], as_index=False)['ms'].sum().merge(medianas, on=['nome', 'tipo'])
+    comparacao['fator'] = comparacao['ms'] / comparacao['mediana_ms'].where(comparacao['mediana_ms'] > 0)
+    regressoes = comparacao[(comparacao['fator'] > fator) & (comparacao['ms'] - comparacao['mediana_ms'] > min_ms)]
+    return regressoes[colunas].sort_values('fator', ascending=False).reset_index(drop=True)
+
+
+def candidatas_cache(traces, limite_ms=LIMITE_CANDIDATA_CACHE_MS):
+    """Etapas caras e recalculadas a cada execução: candidatas a cache ou pré-agregação.
+
+    Considera o tempo médio das construções que falharam no cache e das
+    cargas e filtros (que não têm cache de figura), ordenando pelo tempo
+    total gasto nos traces.
+    """
+    etapas = tabela_etapas(traces)
+    colunas = ['nome', 'tipo', 'execucoes', 'ms_medio', 'ms_total', 'taxa_acerto_cache']
+    if etapas.empty:
+        return pd.DataFrame(columns=colunas)
+
+    etapas['acerto'] = etapas['cache'] == 'acerto'
+    etapas['com_cache'] = etapas['cache'].notna()
+    agregado = etapas.groupby(['nome', 'tipo']).agg(
+        execucoes=('ms', 'size'),
+        ms_total=('ms', 'sum'),
+        acertos=('acerto', 'sum'),
+        com_cache=('com_cache', 'sum')
+    ).reset_index()
+    recalculos = etapas[~etapas['acerto']].groupby(['nome', 'tipo'])['ms'].mean().rename('ms_medio').reset_index()
+    agregado = agregado.merge(recalculos, on=['nome', 'tipo'])
+    agregado['taxa_acerto_cache'] = (agregado['acertos'] / agregado['com_cache'].where(agregado['com_cache'] > 0)).round(3)
+
+    candidatas = agregado[agregado['tipo'].isin(['carga', 'filtro', 'construcao', 'serializacao'])
+                          & (agregado['ms_medio'] >= limite_ms)]
+    return candidatas[colunas].sort_values('ms_total', ascending=False).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resumo dos traces de renderização do dashboard Hermes')
+    parser.add_argument('--arquivo', default=None, help=f'JSONL de traces (padrão: dados_simulacao/{ARQUIVO_TRACES})')
+    parser.add_argument('--ultimos', type=int, default=100, help='Quantidade de traces recentes considerados')
+    parser.add_argument('--limite-ms', type=float, default=LIMITE_CANDIDATA_CACHE_MS,
+                        help='Tempo médio mínimo para sugerir cache')
+    args = parser.parse_args()
+
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    arquivo = args.arquivo or os.path.normpath(os.path.join(base_path, '..', 'dados_simulacao', ARQUIVO_TRACES))
+    traces = carregar_traces(arquivo, args.ultimos)
+    if not traces:
+        print(f"[AVISO] Nenhum trace encontrado em {arquivo}. Ative o perfil de renderização no dashboard.")
+        return
+
+    print(f"[PERFIL] {len(traces)} traces de {traces[0]['momento']} a {traces[-1]['momento']}")
+    etapas = tabela_etapas(traces)
+    resumo = etapas.groupby(['modo', 'tipo', 'nome'])['ms'].describe(percentiles=[0.5, 0.95])[['count', 'mean', '50%', '95%', 'max']]
+    print(resumo.round(1).to_string())
+
+    regressoes = detectar_regressoes(traces[-1], traces[:-1])
+    if not regressoes.empty:
+        print("\n[ALERTA] Regressões no trace mais recente:")
+        print(regressoes.round(2).to_string(index=False))
+
+    candidatas = candidatas_cache(traces, args.limite_ms)
+    if not candidatas.empty:
+        print("\n[PERFIL] Candidatas a cache:")
+        print(candidatas.round(1).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,115 +5,318 @@ Processador de Dados de Simulação Hermes Reply
 Processa dados JSON da simulação Wokwi e salva em formato estruturado para BI
 """
 
-import json
 import pandas as pd
-import re
 import os
+import sys
 from datetime import datetime
 import time
+from contextlib import nullcontext
+from esbocos import EsbocoExecucao, EsbocosPorBalde
+from comparacao_execucoes import caminho_esboco, salvar_esboco
+from quantis_sensores import LARGURA_BALDE_MS, caminho_baldes, salvar_baldes
+from protocolo_binario import ExtratorQuadros, quadros_para_dataframe
+from enquadramento import ERROS_DESCOMPRESSAO, ExtratorPayloads, decodificar_payloads, expandir_entradas, ler_blocos
+from instrumentacao import METRICAS
+from esquemas import (COLUNAS_CANONICAS, REGISTRO_PADRAO, compactar_dataframe, execucao_do_arquivo, importar_csv_legado,
+                      sensor_em_alerta, tipar_dataframe)
+from armazem_colunar import abrir_versao, assinatura_arquivo, diretorio_dataset, ler_manifesto, publicar_dataset
+from qualidade_dados import avaliar_qualidade, caminho_qualidade
+from monitor_deriva import MonitorDeriva
+from retencao import GestorRetencao, ler_catalogo
+from idempotencia import (ARQUIVO_JOURNAL, COLUNAS_CHAVE, DIRETORIO_INDICE, IndiceDeduplicacao, JournalIngestao,
+                          anexar_csv_atomico, chaves_leitura, escrever_csv_atomico)
 
 class ProcessadorDadosSimulacao:
     def __init__(self):
         self.base_path = os.path.dirname(os.path.abspath(__file__))
         self.dados_simulacao_dir = os.path.normpath(os.path.join(self.base_path, '..', 'dados_simulacao'))
         self.log_file = os.path.join(self.dados_simulacao_dir, 'serial_output.log')
+        self.entradas = None  # caminhos/globs de logs a reprocessar (None = log_file)
         self.timestamp_execucao = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.espera_log = 2  # segundos para o Wokwi terminar de gravar o log
+        self.duplicatas_descartadas = 0
+        self._indice = None
+    
+    # Caminhos derivados de dados_simulacao_dir (que o benchmark redireciona após a construção)
+    @property
+    def arquivo_historico(self):
+        return os.path.join(self.dados_simulacao_dir, 'hermes_historico_completo.csv')
+    
+    @property
+    def journal(self):
+        return JournalIngestao(os.path.join(self.dados_simulacao_dir, ARQUIVO_JOURNAL))
+    
+    @property
+    def indice(self):
+        diretorio = os.path.join(self.dados_simulacao_dir, DIRETORIO_INDICE)
+        if self._indice is None or self._indice.diretorio != diretorio:
+            self._indice = IndiceDeduplicacao(diretorio)
+        return self._indice
+        
+    def arquivos_entrada(self):
+        """Logs a ler: ``entradas`` (caminhos, globs ou diretórios, comprimidos ou não) ou o serial_output.log"""
+        arquivos = []
+        for caminho in expandir_entradas(self.entradas or [self.log_file]):
+            if os.path.exists(caminho):
+                arquivos.append(caminho)
+            else:
+                print(f"[ERRO] Arquivo de log não encontrado: {caminho}")
+        if self.entradas and not arquivos:
+            print(f"[ERRO] Nenhum arquivo de log nas entradas: {', '.join(self.entradas)}")
+        return arquivos
+    
+    def extrair_entradas(self, ler_json=True, ler_binario=True):
+        """Extrai leituras JSON_DATA e quadros binários de todas as entradas em uma única passada.
+
+        Cada arquivo é descomprimido em fluxo e lido em blocos de ~8 MB; o
+        mesmo bloco alimenta o extrator de payloads JSON e o de quadros
+        binários, e cada bloco é decodificado de forma vetorizada antes do
+        próximo, sem materializar o log nem gravar a versão descomprimida.
+        Retorna (DataFrame JSON, DataFrame binário).
+        """
+        if self.entradas is None:
+            # Espera um pouco para garantir que o arquivo seja gravado
+            time.sleep(self.espera_log)
+        
+        timestamp_processamento = datetime.now().isoformat()
+        partes_json, partes_binario = [], []
+        erros_json = incompletos = 0
+        primeiro_erro = None
+        
+        def decodificar(brutos):
+            nonlocal erros_json, incompletos, primeiro_erro
+            payloads, erros, erro = decodificar_payloads(brutos)
+            METRICAS.contar('quadros_json', len(brutos))
+            erros_json += erros
+            primeiro_erro = primeiro_erro or erro
+            if payloads:
+                # Decodificação vetorizada por versão de firmware (esquema canônico)
+                with METRICAS.etapa('normalizar_esquema'):
+                    df, faltantes = REGISTRO_PADRAO.decodificar(payloads, self.timestamp_execucao, timestamp_processamento)
+                incompletos += faltantes
+                partes_json.append(df)
         
+        for caminho in self.arquivos_entrada():
+            # Canal de máquina (prefixo de tamanho) ou canal misto (linhas JSON_DATA)
+            extrator_json, extrator_binario = ExtratorPayloads(), ExtratorQuadros()
+            inicio = time.perf_counter()
+            try:
+                for bloco in ler_blocos(caminho):
+                    if ler_json:
+                        with METRICAS.etapa('decodificar_json'):
+                            decodificar(extrator_json.alimentar(bloco))
+                    if ler_binario:
+                        quadros = extrator_binario.alimentar(bloco)
+                        if len(quadros):
+                            partes_binario.append(quadros_para_dataframe(quadros, self.timestamp_execucao, timestamp_processamento))
+                            METRICAS.contar('quadros_binarios', len(quadros))
+                    # Latência por bloco de ~8 MB (leitura + descompressão + decodificação JSON e binária)
+                    fim = time.perf_counter()
+                    METRICAS.observar('bloco_entrada_segundos', fim - inicio)
+                    inicio = fim
+            except ERROS_DESCOMPRESSAO as e:
+                print(f"[AVISO] Leitura de {caminho} interrompida ({e}); leituras anteriores ao erro mantidas")
+            if ler_json:
+                decodificar(extrator_json.finalizar())
+                erros_json += extrator_json.descartados
+            METRICAS.contar('arquivos_lidos', 1)
+        METRICAS.contar('registros_incompletos', incompletos)
+        METRICAS.contar('erros_parse', erros_json)
+        
+        if erros_json or incompletos:
+            print(f"[AVISO] {erros_json} payloads JSON inválidos e {incompletos} registros incompletos descartados")
+            if primeiro_erro:
+                print(f"[AVISO] Primeiro erro: {primeiro_erro}")
+        
+        def juntar(partes):
+            return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=COLUNAS_CANONICAS)
+        return juntar(partes_json), juntar(partes_binario)
+    
     def extrair_dados_json(self):
         """Extrai e processa dados JSON do log da simulação"""
-        dados_processados = []
-        
-        # Espera um pouco para garantir que o arquivo seja gravado
-        time.sleep(2)
+        return self.extrair_entradas(ler_binario=False)[0]
+    
+    def extrair_quadros_binarios(self):
+        """Extrai quadros binários compactos (TelemetryFrameV1) do log"""
+        return self.extrair_entradas(ler_json=False)[1]
+    
+    def indice_deduplicacao(self):
+        """Índice de leituras já ingeridas, reconstruído se não refletir o histórico atual.
+
+        A assinatura (mtime, tamanho) do histórico gravada com o índice
+        detecta uma queda entre a gravação do histórico e a do índice, ou um
+        histórico alterado por fora; nesses casos as chaves são relidas do CSV.
+        """
+        assinatura = assinatura_arquivo(self.arquivo_historico)
+        if self.indice.assinatura() == assinatura:
+            return self.indice
         
-        if not os.path.exists(self.log_file):
-            print(f"[ERRO] Arquivo de log não encontrado: {self.log_file}")
-            return dados_processados
-            
-        pattern = re.compile(r"JSON_DATA:\s*({.*})")
-        
-        with open(self.log_file, 'r', encoding='utf-8') as f:
-            for linha in f:
-                match = pattern.search(linha)
-                if match:
-                    try:
-                        data_json = json.loads(match.group(1))
-                        
-                        # Estrutura dados para análise
-                        registro = {
-                            'timestamp_simulacao': data_json.get('timestamp'),
-                            'timestamp_processamento': datetime.now().isoformat(),
-                            'execucao_id': self.timestamp_execucao,
-                            'device_id': data_json.get('deviceId'),
-                            'reading_id': data_json.get('readingId'),
-                            'firmware_version': data_json.get('firmwareVersion'),
-                            
-                            # Dados dos sensores
-                            'temperatura': data_json['sensors']['temperature']['value'],
-                            'temperatura_media_movel': data_json['sensors']['temperature'].get('movingAverage'),
-                            'temperatura_status': data_json['sensors']['temperature']['status'],
-                            
-                            'umidade': data_json['sensors']['humidity']['value'],
-                            'umidade_media_movel': data_json['sensors']['humidity'].get('movingAverage'),
-                            'umidade_status': data_json['sensors']['humidity']['status'],
-                            
-                            'luminosidade': data_json['sensors']['lightLevel']['value'],
-                            'luminosidade_status': data_json['sensors']['lightLevel']['status'],
-                            
-                            'vibracao': data_json['sensors']['vibration']['value'],
-                            'vibracao_status': data_json['sensors']['vibration']['status'],
-                            
-                            # Análise preditiva
-                            'system_status': data_json['analysis']['systemStatus'],
-                            'risk_level': data_json['analysis']['riskLevel'],
-                            'next_maintenance': data_json['analysis']['nextMaintenance'],
-                            'status_detail': data_json['analysis'].get('statusDetail', ''),
-                            
-                            # Estatísticas operacionais
-                            'uptime': data_json['operationalStats']['uptime'],
-                            'total_readings': data_json['operationalStats']['totalReadings'],
-                            'avg_temperature': data_json['operationalStats']['avgTemperature'],
-                            'avg_humidity': data_json['operationalStats']['avgHumidity']
-                        }
-                        
-                        dados_processados.append(registro)
-                        
-                    except Exception as e:
-                        print(f"[AVISO] Erro ao processar JSON: {e} na linha: {linha.strip()}")
-                        continue
-        
-        return dados_processados
+        with METRICAS.etapa('reconstruir_indice_dedup'):
+            df_existente = pd.DataFrame(columns=COLUNAS_CHAVE)
+            if os.path.exists(self.arquivo_historico):
+                df_existente = pd.read_csv(self.arquivo_historico, usecols=COLUNAS_CHAVE)
+            chaves = chaves_leitura(df_existente)
+            self.indice.reconstruir(chaves)
+            self.indice.marcar(assinatura)
+        print(f"[HERMES] Índice de deduplicação reconstruído a partir do histórico ({len(chaves)} leituras)")
+        return self.indice
+    
+    def deduplicar(self, df):
+        """Descarta leituras já ingeridas ou repetidas no próprio lote; retorna (novas, chaves das novas)"""
+        with METRICAS.etapa('deduplicar'):
+            chaves = chaves_leitura(df)
+            novas = ~pd.Series(chaves).duplicated().to_numpy() & ~self.indice_deduplicacao().contem(chaves)
+        self.duplicatas_descartadas = int(len(df) - novas.sum())
+        METRICAS.contar('leituras_duplicadas', self.duplicatas_descartadas)
+        if self.duplicatas_descartadas:
+            print(f"[AVISO] {self.duplicatas_descartadas} leituras já ingeridas descartadas (device_id, reading_id, timestamp_simulacao)")
+        return df[novas].reset_index(drop=True), chaves[novas]
     
     def salvar_dados_estruturados(self, dados):
-        """Salva dados em CSV estruturado e datado"""
-        if not dados:
+        """Salva dados em CSV estruturado e datado.
+
+        Só leituras inéditas são gravadas, então reprocessar o mesmo log não
+        duplica o histórico. O lote é registrado no journal antes de qualquer
+        escrita; a substituição atômica do histórico é o ponto de commit e o
+        lote só é marcado como concluído depois dos arquivos derivados. O lote
+        é anexado ao histórico sem reler o CSV, e a versão colunar nova parte
+        da anterior mais o lote.
+        """
+        if dados is None or len(dados) == 0:
             print("[AVISO] Nenhum dado para salvar")
             return None
             
-        df = pd.DataFrame(dados)
+        df = dados if isinstance(dados, pd.DataFrame) else pd.DataFrame(dados)
+        df, chaves = self.deduplicar(df)
+        if len(df) == 0:
+            print("[AVISO] Nenhuma leitura nova: lote já ingerido anteriormente")
+            return None
+        
+        lote = self.timestamp_execucao
+        arquivo_execucao = os.path.join(self.dados_simulacao_dir, f"hermes_data_{lote}.csv")
+        self.journal.iniciar(lote, arquivos=[os.path.basename(arquivo_execucao)], linhas=len(df))
         
         # Arquivo específico desta execução
-        arquivo_execucao = os.path.join(self.dados_simulacao_dir, f"hermes_data_{self.timestamp_execucao}.csv")
-        df.to_csv(arquivo_execucao, index=False, encoding='utf-8')
+        with METRICAS.etapa('escrever_csv_execucao'):
+            escrever_csv_atomico(df, arquivo_execucao)
+        METRICAS.contar('linhas_escritas', len(df))
         print(f"[SUCESSO] Dados salvos em: {arquivo_execucao}")
         
-        # Arquivo histórico cumulativo
-        arquivo_historico = os.path.join(self.dados_simulacao_dir, "hermes_historico_completo.csv")
-        if os.path.exists(arquivo_historico):
-            # Anexa aos dados existentes
-            df_existente = pd.read_csv(arquivo_historico)
-            df_completo = pd.concat([df_existente, df], ignore_index=True)
-        else:
-            df_completo = df
-            
-        df_completo.to_csv(arquivo_historico, index=False, encoding='utf-8')
+        # Arquivo histórico cumulativo (substituição atômica = commit do lote)
+        arquivo_historico = self.arquivo_historico
+        origem_anterior = assinatura_arquivo(arquivo_historico)
+        with METRICAS.etapa('atualizar_historico'):
+            try:
+                anexar_csv_atomico(df, arquivo_historico)
+            except ValueError:
+                # Lote com colunas novas: regrava o histórico com o cabeçalho ampliado
+                escrever_csv_atomico(pd.concat([pd.read_csv(arquivo_historico), df], ignore_index=True),
+                                     arquivo_historico)
+        self.journal.confirmar(lote)
         print(f"[SUCESSO] Histórico atualizado: {arquivo_historico}")
         
-        # Gera resumo estatístico
-        self.gerar_resumo_estatistico(df)
+        # Índice de deduplicação (só as partições tocadas pelo lote)
+        with METRICAS.etapa('atualizar_indice_dedup'):
+            self.indice.registrar(chaves)
+            self.indice.marcar(assinatura_arquivo(arquivo_historico))
+        
+        # Publica a nova versão tipada para o dashboard (mapeada em memória)
+        with METRICAS.etapa('publicar_colunar'):
+            self.publicar_historico(self.historico_tipado(df, origem_anterior), arquivo_historico)
+        
+        self.gerar_derivados(df)
+        self.journal.concluir(lote, linhas=len(df))
         
         return arquivo_execucao
     
+    def gerar_derivados(self, df):
+        """Gera o resumo e os esboços da execução a partir das leituras do lote"""
+        # Gera resumo estatístico
+        with METRICAS.etapa('gerar_resumo_estatistico'):
+            self.gerar_resumo_estatistico(df)
+        
+        # Gera esboço mesclável para comparação entre execuções
+        with METRICAS.etapa('gerar_esboco_execucao'):
+            self.gerar_esboco_execucao(df)
+        
+        # Gera esboços por dispositivo e balde de tempo para consultas de percentis
+        with METRICAS.etapa('gerar_esbocos_por_balde'):
+            self.gerar_esbocos_por_balde(df)
+        
+        # Verifica lacunas, reinicializações, sensores travados e médias móveis
+        with METRICAS.etapa('avaliar_qualidade'):
+            self.gerar_relatorio_qualidade(df)
+        
+        # Compara a execução com os dados de treino do modelo salvo e atualiza o sinal de retreino
+        with METRICAS.etapa('monitorar_deriva'):
+            self.monitorar_deriva(df)
+    
+    def recuperar_ingestoes_pendentes(self):
+        """Conclui ou desfaz lotes interrompidos, conforme o journal.
+
+        Se o commit aconteceu (lote confirmado no journal ou execução já
+        presente no histórico, para uma queda logo após a substituição), o
+        armazém colunar e os arquivos derivados são refeitos a partir do CSV
+        da execução. Caso contrário, esse CSV é removido e o lote é marcado
+        como abortado. O índice de deduplicação se corrige sozinho pela
+        assinatura do histórico.
+        """
+        pendentes = self.journal.pendentes()
+        if not pendentes:
+            return 0
+        
+        execucoes = set()
+        if os.path.exists(self.arquivo_historico):
+            execucoes = set(pd.read_csv(self.arquivo_historico, usecols=['execucao_id'], dtype=str)['execucao_id'])
+        
+        for entrada in pendentes:
+            lote = str(entrada['lote'])
+            arquivos = [os.path.join(self.dados_simulacao_dir, arquivo) for arquivo in entrada.get('arquivos', [])]
+            if entrada['confirmado'] or lote in execucoes:
+                print(f"[HERMES] Concluindo lote interrompido após o commit: {lote}")
+                manifesto = ler_manifesto(diretorio_dataset(self.dados_simulacao_dir, 'historico'))
+                if manifesto is None or tuple(manifesto.get('origem') or ()) != assinatura_arquivo(self.arquivo_historico):
+                    self.publicar_historico(tipar_dataframe(pd.read_csv(self.arquivo_historico)), self.arquivo_historico)
+                processador = ProcessadorDadosSimulacao()
+                processador.dados_simulacao_dir = self.dados_simulacao_dir
+                processador.timestamp_execucao = lote
+                processador.gerar_derivados(pd.read_csv(arquivos[0]))
+                self.journal.concluir(lote, recuperado=True)
+            else:
+                print(f"[HERMES] Desfazendo lote interrompido antes do commit: {lote}")
+                for caminho in arquivos:
+                    if os.path.exists(caminho):
+                        os.remove(caminho)
+                self.journal.abortar(lote)
+        METRICAS.contar('lotes_recuperados', len(pendentes))
+        return len(pendentes)
+    
+    def historico_tipado(self, df, origem_anterior):
+        """Histórico completo no perfil tipado: a versão colunar publicada mais o lote ``df``.
+
+        Só quando a versão publicada corresponde ao CSV antes do lote
+        (``origem_anterior``); caso contrário o CSV inteiro é relido.
+        """
+        base = diretorio_dataset(self.dados_simulacao_dir, 'historico')
+        manifesto = ler_manifesto(base)
+        if manifesto is None or origem_anterior == (None, None) or tuple(manifesto.get('origem') or ()) != origem_anterior:
+            return tipar_dataframe(pd.read_csv(self.arquivo_historico))
+        anterior, _ = abrir_versao(base, manifesto)
+        return compactar_dataframe(pd.concat([anterior, tipar_dataframe(df)], ignore_index=True))
+    
+    def publicar_historico(self, df_tipado, arquivo_historico):
+        """Publica o histórico (perfil tipado) no armazém colunar versionado lido pelo dashboard"""
+        try:
+            manifesto = publicar_dataset(
+                self.dados_simulacao_dir, 'historico', df_tipado,
+                origem=assinatura_arquivo(arquivo_historico)
+            )
+        except (OSError, ValueError) as e:
+            print(f"[AVISO] Histórico não publicado no armazém colunar: {e}")
+            return None
+        print(f"[SUCESSO] Histórico publicado no armazém colunar: versão {manifesto['versao']}")
+        return manifesto
+    
     def gerar_resumo_estatistico(self, df):
         """Gera resumo estatístico da execução"""
         resumo = {
@@ -130,9 +333,9 @@ class ProcessadorDadosSimulacao:
             'status_normal': len(df[df['system_status'] == 'NORMAL']),
             'status_atencao': len(df[df['system_status'] == 'ATENÇÃO']),
             'status_critico': len(df[df['system_status'] == 'CRÍTICO']),
-            'alertas_temperatura': len(df[df['temperatura_status'] == 'ALERTA']),
-            'alertas_umidade': len(df[df['umidade_status'] == 'ALERTA']),
-            'alertas_vibracao': len(df[df['vibracao_status'] == 'ALERTA'])
+            'alertas_temperatura': int(sensor_em_alerta(df['temperatura_status']).sum()),
+            'alertas_umidade': int(sensor_em_alerta(df['umidade_status']).sum()),
+            'alertas_vibracao': int(sensor_em_alerta(df['vibracao_status']).sum())
         }
         
         # Salva resumo
@@ -153,27 +356,174 @@ class ProcessadorDadosSimulacao:
         print(f"🚨 Status CRÍTICO: {resumo['status_critico']} registros")
         print("="*60)
     
+    def gerar_relatorio_qualidade(self, df):
+        """Gera os indicadores de qualidade dos dados da execução"""
+        qualidade = dict(execucao_id=self.timestamp_execucao, timestamp_processamento=datetime.now().isoformat(),
+                         **avaliar_qualidade(df))
+        arquivo_qualidade = caminho_qualidade(self.dados_simulacao_dir, self.timestamp_execucao)
+        pd.DataFrame([qualidade]).to_csv(arquivo_qualidade, index=False, encoding='utf-8')
+        print(f"[SUCESSO] Qualidade dos dados salva: {arquivo_qualidade} (pontuação {qualidade.get('pontuacao_qualidade', 0):.1f})")
+        
+        problemas = {
+            'lacunas': qualidade.get('lacunas', 0),
+            'reinicializações': qualidade.get('reinicios', 0),
+            'leituras duplicadas': qualidade.get('duplicadas', 0),
+            'leituras com sensor travado': qualidade.get('leituras_travadas', 0),
+            'médias móveis divergentes': sum(v for k, v in qualidade.items() if k.startswith('media_movel_divergentes_'))
+        }
+        encontrados = [f"{quantidade} {nome}" for nome, quantidade in problemas.items() if quantidade]
+        if encontrados:
+            print(f"[AVISO] Qualidade: {', '.join(encontrados)}")
+        return arquivo_qualidade
+    
+    def monitorar_deriva(self, df):
+        """Avalia a deriva da execução em relação ao modelo salvo (nada a fazer sem modelo)"""
+        resultado = MonitorDeriva(self.dados_simulacao_dir).registrar(df, self.timestamp_execucao)
+        if resultado is None:
+            return None
+        entrada, motivos = resultado
+        psi = {f: v for f, v in entrada['psi'].items() if v is not None}
+        resumo = f"PSI máximo {max(psi.values()):.3f} ({max(psi, key=psi.get)})" if psi else "sem leituras de sensores"
+        if entrada.get('avaliadas'):
+            resumo += f", acurácia do modelo {entrada['acertos'] / entrada['avaliadas']:.1%}"
+        print(f"[SUCESSO] Deriva avaliada: {resumo}")
+        if motivos:
+            print(f"[AVISO] Retreino do modelo recomendado: {'; '.join(motivos)}")
+        return entrada
+    
+    def gerar_esboco_execucao(self, df):
+        """Gera esboço compacto (quantis, histogramas, contagens) da execução"""
+        esboco = EsbocoExecucao.de_dataframe(df, self.timestamp_execucao)
+        arquivo_esboco = caminho_esboco(self.dados_simulacao_dir, self.timestamp_execucao)
+        salvar_esboco(esboco, arquivo_esboco)
+        print(f"[SUCESSO] Esboço da execução salvo: {arquivo_esboco}")
+        return arquivo_esboco
+    
+    def gerar_esbocos_por_balde(self, df):
+        """Gera esboços de quantis e histogramas por dispositivo e balde de tempo"""
+        indice = EsbocosPorBalde(LARGURA_BALDE_MS).adicionar_dataframe(df, self.timestamp_execucao)
+        arquivo_baldes = caminho_baldes(self.dados_simulacao_dir, self.timestamp_execucao)
+        salvar_baldes(indice, arquivo_baldes)
+        print(f"[SUCESSO] Esboços por balde salvos: {arquivo_baldes} ({len(indice)} baldes)")
+        return arquivo_baldes
+    
+    def avaliar_qualidade_existentes(self):
+        """Gera o relatório de qualidade das execuções que ainda não têm um (hermes_data_<id>.csv)"""
+        avaliadas = 0
+        for arquivo in sorted(os.listdir(self.dados_simulacao_dir)):
+            if not (arquivo.startswith('hermes_data_') and arquivo.endswith('.csv')):
+                continue
+            execucao_id = arquivo[len('hermes_data_'):-len('.csv')]
+            if os.path.exists(caminho_qualidade(self.dados_simulacao_dir, execucao_id)):
+                continue
+            processador = ProcessadorDadosSimulacao()
+            processador.dados_simulacao_dir = self.dados_simulacao_dir
+            processador.timestamp_execucao = execucao_id
+            processador.gerar_relatorio_qualidade(pd.read_csv(os.path.join(self.dados_simulacao_dir, arquivo)))
+            avaliadas += 1
+        print(f"[HERMES] {avaliadas} execuções avaliadas")
+        return avaliadas
+    
+    def importar_csv_legados(self):
+        """Importa os CSVs legados (hermes_reply_data_*) para o esquema canônico.
+
+        Cada arquivo vira uma execução com o identificador do nome do arquivo;
+        execuções que já possuem hermes_data_<id>.csv (ou que a retenção já
+        moveu para o arquivo) não são reimportadas.
+        """
+        self.recuperar_ingestoes_pendentes()
+        catalogo = ler_catalogo(self.dados_simulacao_dir)  # execuções já movidas pela retenção
+        importados = 0
+        for arquivo in sorted(os.listdir(self.dados_simulacao_dir)):
+            if not (arquivo.startswith('hermes_reply_data_') and arquivo.endswith('.csv')):
+                continue
+            
+            execucao_id = execucao_do_arquivo(arquivo)
+            if (os.path.exists(os.path.join(self.dados_simulacao_dir, f"hermes_data_{execucao_id}.csv"))
+                    or execucao_id in catalogo):
+                continue
+            
+            try:
+                df = importar_csv_legado(os.path.join(self.dados_simulacao_dir, arquivo),
+                                         timestamp_processamento=datetime.now().isoformat())
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[AVISO] Não foi possível importar {arquivo}: {e}")
+                continue
+            
+            print(f"\n[HERMES] Importando CSV legado {arquivo} ({len(df)} registros)")
+            processador = ProcessadorDadosSimulacao()
+            processador.dados_simulacao_dir = self.dados_simulacao_dir
+            processador.timestamp_execucao = execucao_id
+            if processador.salvar_dados_estruturados(df):
+                importados += 1
+        
+        print(f"[HERMES] {importados} arquivos legados importados")
+        return importados
+    
     def processar_simulacao(self):
         """Método principal para processar dados da simulação"""
         print(f"\n[HERMES] Processando dados da simulação - {self.timestamp_execucao}")
+        self.recuperar_ingestoes_pendentes()
+        
+        # Extrai dados JSON (JSON_DATA) e quadros binários compactos numa única leitura das entradas
+        with METRICAS.etapa('extrair_entradas'):
+            dados, df_binario = self.extrair_entradas()
         
-        # Extrai dados JSON
-        dados = self.extrair_dados_json()
+        if len(df_binario):
+            print(f"[HERMES] {len(df_binario)} quadros binários decodificados")
+            # FORMAT_BOTH: a mesma leitura sai em JSON e em quadro, com millis() lidos em momentos diferentes
+            if len(dados):
+                chaves = ['device_id', 'reading_id']
+                repetidas = pd.MultiIndex.from_frame(df_binario[chaves].astype(str)).isin(
+                    pd.MultiIndex.from_frame(dados[chaves].astype(str)))
+                if repetidas.any():
+                    print(f"[HERMES] {int(repetidas.sum())} quadros binários já recebidos em JSON descartados")
+                    df_binario = df_binario[~repetidas]
+            dados = pd.concat([dados, df_binario], ignore_index=True)
         
-        if not dados:
+        if len(dados) == 0:
             print("[ERRO] Nenhum dado JSON válido encontrado no log!")
             return False
             
         # Salva dados estruturados
-        arquivo_salvo = self.salvar_dados_estruturados(dados)
+        with METRICAS.etapa('salvar_dados_estruturados'):
+            arquivo_salvo = self.salvar_dados_estruturados(dados)
         
         if arquivo_salvo:
             print(f"[HERMES] Processamento concluído com sucesso!")
             return True
+        elif self.duplicatas_descartadas == len(dados):
+            print("[HERMES] Log já processado: nenhuma alteração no histórico")
+            return True
         else:
             print("[ERRO] Falha no processamento dos dados!")
             return False
 
 if __name__ == "__main__":
     processador = ProcessadorDadosSimulacao()
-    processador.processar_simulacao() 
\ No newline at end of file
+    if '--metricas' in sys.argv:
+        METRICAS.ativar()
+    
+    # --entrada <caminho|glob|diretório> (repetível): reprocessa logs, inclusive arquivados em .gz/.xz/.zst
+    entradas = [sys.argv[i + 1] for i, argumento in enumerate(sys.argv[:-1]) if argumento == '--entrada']
+    if entradas:
+        processador.entradas = entradas
+    
+    # Com métricas, o textfile é regravado periodicamente enquanto a ingestão roda
+    arquivo_metricas = os.path.join(processador.dados_simulacao_dir, 'hermes_metricas.prom')
+    with METRICAS.exportacao_periodica(arquivo_metricas) if METRICAS.ativo else nullcontext():
+        if '--importar-legados' in sys.argv:
+            processador.importar_csv_legados()
+        elif '--avaliar-qualidade' in sys.argv:
+            processador.avaliar_qualidade_existentes()
+        else:
+            sucesso = processador.processar_simulacao()
+            if sucesso and '--relatorio' in sys.argv:
+                from gerar_relatorio import GeradorRelatorio
+                GeradorRelatorio().gerar()
+            if sucesso and '--retencao' in sys.argv:
+                GestorRetencao(processador.dados_simulacao_dir).aplicar()
+    
+    if METRICAS.ativo:
+        METRICAS.imprimir_resumo()
+        print(f"[SUCESSO] Métricas Prometheus salvas: {arquivo_metricas}")
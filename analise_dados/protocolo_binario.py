@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Protocolo Binário de Telemetria Hermes Reply
+Decodificador vetorizado do quadro compacto (TelemetryFrameV1) emitido pelo firmware
+"""
+
+import struct
+
+import numpy as np
+import pandas as pd
+
+from esquemas import COLUNAS_CANONICAS, STATUS_SENSOR_NORMAL
+
+# === LAYOUT DO QUADRO V1 (espelha TelemetryFrameV1 em arduino/src/main.cpp) ===
+MAGICO = b'\xa5\x5a'
+VERSAO_QUADRO = 1
+
+DTYPE_QUADRO_V1 = np.dtype([
+    ('magico', 'u1', (2,)),
+    ('versao', 'u1'),
+    ('tamanho', 'u1'),
+    ('device_id', 'S16'),
+    ('timestamp', '<u4'),
+    ('reading_id', '<u4'),
+    ('temperatura', '<f4'),
+    ('temperatura_media_movel', '<f4'),
+    ('umidade', '<f4'),
+    ('umidade_media_movel', '<f4'),
+    ('luminosidade', '<u2'),
+    ('vibracao', '<u2'),
+    ('system_status', 'u1'),
+    ('mascara_alertas', 'u1'),
+    ('firmware', 'u1', (3,)),
+    ('reservado', 'u1'),
+    ('uptime', '<u4'),
+    ('crc', '<u2')
+])
+TAMANHO_QUADRO_V1 = DTYPE_QUADRO_V1.itemsize  # 60 bytes
+
+# Codificação compacta usada pelo firmware
+STATUS_SISTEMA = np.array(['NORMAL', 'ATENÇÃO', 'CRÍTICO'], dtype=object)
+RISCO = np.array(['BAIXO', 'MÉDIO', 'ALTO'], dtype=object)
+PROXIMA_MANUTENCAO = np.array(['AGENDADA', '24H', 'IMEDIATA'], dtype=object)
+BITS_ALERTA = [(0x01, 'temperatura', 'TEMP'), (0x02, 'umidade', 'HUMID'),
+               (0x04, 'luminosidade', 'LIGHT'), (0x08, 'vibracao', 'VIB')]
+# statusDetail para cada uma das 16 combinações da máscara (mesma ordem do firmware)
+DETALHES_ALERTA = np.array(
+    [','.join(rotulo for bit, _, rotulo in BITS_ALERTA if mascara & bit) for mascara in range(16)],
+    dtype=object
+)
+
+
+def _tabela_crc16_ccitt():
+    """Tabela de 256 entradas do CRC16-CCITT (polinômio 0x1021)"""
+    tabela = np.zeros(256, dtype=np.uint16)
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        tabela[byte] = crc & 0xFFFF
+    return tabela
+
+
+TABELA_CRC16 = _tabela_crc16_ccitt()
+
+
+def crc16_ccitt(linhas):
+    """CRC16-CCITT (XModem, valor inicial 0) de cada linha de uma matriz de bytes.
+
+    O laço percorre apenas as colunas (bytes do quadro); todas as linhas
+    (quadros) são processadas juntas pelo numpy.
+    """
+    linhas = np.atleast_2d(linhas)
+    crc = np.zeros(linhas.shape[0], dtype=np.uint16)
+    for coluna in range(linhas.shape[1]):
+        indice = ((crc >> 8) ^ linhas[:, coluna]) & 0xFF
+        crc = (crc << 8) ^ TABELA_CRC16[indice]
+    return crc
+
+
+def codificar_quadro(device_id, timestamp, reading_id, temperatura, temperatura_media_movel,
+                     umidade, umidade_media_movel, luminosidade, vibracao, status=0,
+                     mascara_alertas=0, firmware=(1, 0, 0), uptime=None):
+    """Codifica um quadro V1 (usado em testes de bancada e geradores sintéticos)"""
+    corpo = struct.pack(
+        '<2sBB16sIIffffHHBB3sBI',
+        MAGICO, VERSAO_QUADRO, TAMANHO_QUADRO_V1,
+        device_id.encode('ascii')[:16],
+        timestamp, reading_id,
+        temperatura, temperatura_media_movel, umidade, umidade_media_movel,
+        luminosidade, vibracao, status, mascara_alertas,
+        bytes(firmware), 0,
+        timestamp if uptime is None else uptime
+    )
+    crc = int(crc16_ccitt(np.frombuffer(corpo, dtype=np.uint8))[0])
+    return corpo + struct.pack('<H', crc)
+
+
+def _localizar_quadros(buffer):
+    """Localiza e valida (CRC) os quadros V1 em um buffer de bytes.
+
+    Retorna um array estruturado com ``DTYPE_QUADRO_V1`` e a posição logo
+    após o último quadro. Quando o buffer é composto apenas por quadros
+    contíguos (os blocos de ``ler_blocos`` têm tamanho múltiplo do quadro),
+    a visão é criada sem cópia com ``numpy.frombuffer``; caso contrário
+    (quadros misturados com texto), os candidatos são encontrados por
+    comparação vetorizada do cabeçalho.
+    """
+    dados = np.frombuffer(buffer, dtype=np.uint8)
+    tamanho = TAMANHO_QUADRO_V1
+    vazio = np.empty(0, dtype=DTYPE_QUADRO_V1)
+
+    # Caminho rápido: fluxo contínuo só de quadros (canal de máquina)
+    if len(dados) and len(dados) % tamanho == 0:
+        quadros = np.frombuffer(buffer, dtype=DTYPE_QUADRO_V1)
+        cabecalho_ok = (
+            (quadros['magico'][:, 0] == 0xA5) & (quadros['magico'][:, 1] == 0x5A) &
+            (quadros['versao'] == VERSAO_QUADRO) & (quadros['tamanho'] == tamanho)
+        )
+        if cabecalho_ok.all():
+            linhas = dados.reshape(-1, tamanho)
+            crc_ok = crc16_ccitt(linhas[:, :-2]) == quadros['crc']
+            return (quadros if crc_ok.all() else quadros[crc_ok]), len(dados)
+
+    if len(dados) < tamanho:
+        return vazio, 0
+
+    # Caminho geral: procura o cabeçalho (mágico, versão, tamanho) em todas as posições
+    limite = len(dados) - tamanho + 1
+    candidatos = np.flatnonzero(
+        (dados[:limite] == 0xA5) & (dados[1:limite + 1] == 0x5A) &
+        (dados[2:limite + 2] == VERSAO_QUADRO) & (dados[3:limite + 3] == tamanho)
+    )
+    if len(candidatos) == 0:
+        return vazio, 0
+
+    linhas = dados[candidatos[:, None] + np.arange(tamanho)]
+    crc_recebido = linhas[:, -2].astype(np.uint16) | (linhas[:, -1].astype(np.uint16) << 8)
+    validos = crc16_ccitt(linhas[:, :-2]) == crc_recebido
+
+    # Descarta candidatos válidos que se sobrepõem ao quadro anterior
+    inicios = candidatos[validos]
+    linhas = linhas[validos]
+    if len(inicios) > 1:
+        sem_sobreposicao = np.r_[True, np.diff(inicios) >= tamanho]
+        inicios, linhas = inicios[sem_sobreposicao], linhas[sem_sobreposicao]
+    if len(inicios) == 0:
+        return vazio, 0
+
+    return np.ascontiguousarray(linhas).view(DTYPE_QUADRO_V1).ravel(), int(inicios[-1]) + tamanho
+
+
+class ExtratorQuadros:
+    """Localiza quadros V1 num fluxo entregue em blocos.
+
+    O final de cada bloco que ainda pode conter um quadro incompleto é
+    reaproveitado no início do bloco seguinte. Use uma instância por arquivo.
+    """
+
+    def __init__(self):
+        self.resto = b''
+
+    def alimentar(self, bloco):
+        """Retorna os quadros válidos completos disponíveis até este bloco"""
+        buffer = self.resto + bloco if self.resto else bloco
+        quadros, fim = _localizar_quadros(buffer)
+        self.resto = buffer[max(fim, len(buffer) - TAMANHO_QUADRO_V1 + 1):]
+        return quadros
+
+
+def _decodificar_categorias(valores, formatar):
+    """Formata apenas os valores distintos e expande pelos códigos (fatoração por hash)"""
+    if len(valores) == 0:
+        return np.array([], dtype=object)
+
+    # Cada linha de bytes vira uma chave inteira combinando as palavras de 64 bits
+    linhas = np.ascontiguousarray(valores).view(np.uint8).reshape(len(valores), -1)
+    largura = -(-linhas.shape[1] // 8) * 8
+    palavras = np.zeros((len(valores), largura), dtype=np.uint8)
+    palavras[:, :linhas.shape[1]] = linhas
+    palavras = palavras.view('<u8')
+
+    codigos = np.zeros(len(valores), dtype=np.int64)
+    for coluna in range(palavras.shape[1]):
+        codigos_coluna, distintos_coluna = pd.factorize(palavras[:, coluna])
+        codigos, _ = pd.factorize(codigos * len(distintos_coluna) + codigos_coluna)
+
+    primeiras = np.unique(codigos, return_index=True)[1]
+    rotulos = np.array([formatar(valores[i]) for i in primeiras], dtype=object)
+    return rotulos[codigos]
+
+
+def quadros_para_dataframe(quadros, execucao_id, timestamp_processamento=None):
+    """Converte quadros decodificados para as colunas do formato hermes_data (vetorizado)"""
+    status = quadros['system_status'].astype(np.int64).clip(0, 2)
+    mascara = quadros['mascara_alertas'] & 0x0F
+
+    df = pd.DataFrame({
+        'timestamp_simulacao': quadros['timestamp'].astype(np.int64),
+        'timestamp_processamento': timestamp_processamento or pd.Timestamp.now().isoformat(),
+        'execucao_id': execucao_id,
+        'device_id': _decodificar_categorias(quadros['device_id'], lambda v: v.decode('ascii').rstrip('\x00')),
+        'reading_id': quadros['reading_id'].astype(np.int64),
+        'firmware_version': _decodificar_categorias(quadros['firmware'], lambda v: '.'.join(map(str, v))),
+        'temperatura': np.round(quadros['temperatura'].astype(np.float64), 2),
+        'temperatura_media_movel': np.round(quadros['temperatura_media_movel'].astype(np.float64), 2),
+        'umidade': np.round(quadros['umidade'].astype(np.float64), 2),
+        'umidade_media_movel': np.round(quadros['umidade_media_movel'].astype(np.float64), 2),
+        'luminosidade': quadros['luminosidade'].astype(np.int64),
+        'vibracao': quadros['vibracao'].astype(np.int64),
+        'system_status': STATUS_SISTEMA[status],
+        'risk_level': RISCO[status],
+        'next_maintenance': PROXIMA_MANUTENCAO[status],
+        'status_detail': DETALHES_ALERTA[mascara],
+        'uptime': quadros['uptime'].astype(np.int64),
+        'total_readings': quadros['reading_id'].astype(np.int64),
+        # O quadro não traz as médias acumuladas de operationalStats (a média móvel é outra coisa)
+        'avg_temperature': np.nan,
+        'avg_humidity': np.nan,
+        'risk_score': np.nan
+    })
+
+    # Status por sensor derivados da máscara de alertas
+    for bit, sensor, _ in BITS_ALERTA:
+        df[f'{sensor}_status'] = np.where((mascara & bit) != 0, 'ALERTA', STATUS_SENSOR_NORMAL)
+
+    return df[COLUNAS_CANONICAS]
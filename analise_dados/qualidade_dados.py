@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Qualidade dos Dados Hermes Reply
+Lacunas, duplicatas, reinicializações, sensores travados e consistência da média móvel por execução
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from esbocos import SENSORES
+
+# Contrato do firmware (arduino/src/main.cpp)
+INTERVALO_LEITURA_MS = 5000  # READING_INTERVAL
+JANELA_MEDIA_MOVEL = 12  # MOVING_AVG_WINDOW
+
+# Intervalo acima de FATOR_LACUNA x READING_INTERVAL conta como lacuna
+FATOR_LACUNA = 1.5
+# Sequência de valores idênticos considerada sensor travado (1 minuto de leituras)
+LEITURAS_SENSOR_TRAVADO = 12
+# O firmware arredonda valor e média a 2 casas; diferenças até aqui são arredondamento
+TOLERANCIA_MEDIA_MOVEL = 0.02
+MEDIAS_MOVEIS = {'temperatura': 'temperatura_media_movel', 'umidade': 'umidade_media_movel'}
+PREFIXO_QUALIDADE = 'hermes_qualidade_'
+
+
+def caminho_qualidade(dados_path, execucao_id):
+    """Caminho do relatório de qualidade de uma execução (ao lado do hermes_resumo_*)"""
+    return os.path.join(dados_path, f'{PREFIXO_QUALIDADE}{execucao_id}.csv')
+
+
+def _numerico(df, coluna):
+    if coluna not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[coluna], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _retrocede(valores, novo_dispositivo):
+    """Contador que voltou a um valor menor no mesmo dispositivo (NaN não conta)"""
+    diferenca = np.diff(valores, prepend=np.nan)
+    return (diferenca < 0) & ~novo_dispositivo
+
+
+def _sequencias_iguais(valores, novo_segmento, minimo):
+    """Máscara das leituras em sequências de ao menos ``minimo`` valores idênticos consecutivos"""
+    muda = novo_segmento | (np.diff(valores, prepend=np.nan) != 0) | np.isnan(valores)
+    sequencia = np.cumsum(muda) - 1
+    tamanhos = np.bincount(sequencia)
+    return (tamanhos[sequencia] >= minimo) & ~np.isnan(valores)
+
+
+def _media_movel_firmware(valores, posicao, leituras_firmware, quebras):
+    """Média móvel como o firmware calcula: últimas min(12, leituras desde o boot) amostras.
+
+    Retorna a média e a máscara das leituras verificáveis: a janela inteira
+    precisa estar no mesmo segmento (mesmo dispositivo, sem reinicialização),
+    sem valores ausentes e sem ``quebras`` (lacunas ou duplicatas, em que o
+    firmware viu leituras diferentes das recebidas).
+    """
+    leituras = np.where(np.isnan(leituras_firmware), JANELA_MEDIA_MOVEL, np.maximum(leituras_firmware, 1))
+    janela = np.minimum(JANELA_MEDIA_MOVEL, leituras).astype('int64')
+    ausentes = np.isnan(valores)
+    soma = np.concatenate([[0.0], np.cumsum(np.where(ausentes, 0.0, valores))])
+    nulos = np.concatenate([[0], np.cumsum(ausentes)])
+    quebradas = np.concatenate([[0], np.cumsum(quebras)])
+
+    fim = np.arange(1, len(valores) + 1)
+    inicio = np.maximum(fim - janela, 0)
+    verificavel = (posicao + 1 >= janela) & (nulos[fim] == nulos[inicio])
+    # Quebras contam a partir da segunda leitura da janela (intervalo em relação à anterior)
+    verificavel &= quebradas[fim] == quebradas[np.minimum(inicio + 1, fim)]
+    media = (soma[fim] - soma[inicio]) / janela
+    return media, verificavel
+
+
+def avaliar_qualidade(df, intervalo_ms=INTERVALO_LEITURA_MS):
+    """Indicadores de qualidade de um lote de leituras (um dicionário, pronto para o CSV).
+
+    Primeiro as leituras de cada dispositivo são divididas em boots, na
+    ordem de chegada: um boot começa quando ``uptime`` ou ``total_readings``
+    volta atrás (no firmware 1.0.0 o próprio ``timestamp_simulacao`` é o
+    ``millis()`` desde o boot, então ordenar antes misturaria os boots).
+    Dentro de cada boot as leituras são ordenadas por ``timestamp_simulacao``
+    e todas as verificações são operações sobre arrays:
+
+    - reinicializações: o número de boots além do primeiro;
+    - lacunas: intervalos acima de ``FATOR_LACUNA`` x ``READING_INTERVAL``,
+      com a estimativa de leituras perdidas;
+    - duplicatas: mesmo dispositivo, boot e ``timestamp_simulacao``;
+    - sensores travados: ``LEITURAS_SENSOR_TRAVADO`` valores idênticos seguidos;
+    - média móvel: recalculada com a janela do firmware e comparada com as
+      colunas ``*_media_movel`` nas leituras cuja janela está completa.
+
+    A pontuação (0 a 100) é a média de completude, unicidade, vitalidade dos
+    sensores e consistência da média móvel.
+    """
+    total = len(df)
+    indicadores = {'total_registros': total}
+    if total == 0:
+        return indicadores
+
+    # Boots na ordem de chegada: contadores do firmware voltando atrás no mesmo dispositivo
+    dispositivos = pd.factorize(df['device_id'], use_na_sentinel=False)[0]
+    chegada = np.argsort(dispositivos, kind='stable')
+    novo_dispositivo = np.concatenate([[True], dispositivos[chegada][1:] != dispositivos[chegada][:-1]])
+    indicadores['dispositivos'] = int(novo_dispositivo.sum())
+    reinicio = _retrocede(_numerico(df, 'uptime')[chegada], novo_dispositivo) \
+        | _retrocede(_numerico(df, 'total_readings')[chegada], novo_dispositivo)
+    indicadores['reinicios'] = int(reinicio.sum())
+    boot = np.empty(total, dtype='int64')
+    boot[chegada] = np.cumsum(novo_dispositivo | reinicio)
+
+    # Segmentos contínuos (dispositivo + boot), ordenados pelo tempo dentro de cada um
+    tempos = _numerico(df, 'timestamp_simulacao')
+    ordem = np.lexsort((tempos, boot))
+    boot, tempos = boot[ordem], tempos[ordem]
+    novo_segmento = np.concatenate([[True], boot[1:] != boot[:-1]])
+    segmento = np.cumsum(novo_segmento) - 1
+    posicao = np.arange(total) - np.flatnonzero(novo_segmento)[segmento]
+    leituras_firmware = _numerico(df, 'total_readings')[ordem]
+
+    # Lacunas e duplicatas a partir dos intervalos entre leituras do mesmo boot
+    intervalos = np.where(novo_segmento, np.nan, np.diff(tempos, prepend=np.nan))
+    lacunas = intervalos > FATOR_LACUNA * intervalo_ms
+    perdidas = np.where(lacunas, np.rint(intervalos / intervalo_ms) - 1, 0)
+    duplicadas = intervalos == 0
+    indicadores['lacunas'] = int(lacunas.sum())
+    indicadores['leituras_perdidas'] = int(np.nansum(perdidas))
+    indicadores['maior_lacuna_ms'] = float(np.nanmax(intervalos[lacunas])) if lacunas.any() else 0.0
+    indicadores['duplicadas'] = int(duplicadas.sum())
+
+    travadas = np.zeros(total, dtype=bool)
+    for sensor in SENSORES:
+        travado = _sequencias_iguais(_numerico(df, sensor)[ordem], novo_segmento, LEITURAS_SENSOR_TRAVADO)
+        indicadores[f'travadas_{sensor}'] = int(travado.sum())
+        travadas |= travado
+    indicadores['leituras_travadas'] = int(travadas.sum())
+
+    # Média móvel recalculada e comparada com a informada pelo firmware
+    verificadas = divergentes = 0
+    for sensor, coluna_media in MEDIAS_MOVEIS.items():
+        media, verificavel = _media_movel_firmware(_numerico(df, sensor)[ordem], posicao, leituras_firmware,
+                                                   lacunas | duplicadas)
+        informada = _numerico(df, coluna_media)[ordem]
+        verificavel &= ~np.isnan(informada)
+        erro = np.abs(media - informada)[verificavel]
+        diverge = int((erro > TOLERANCIA_MEDIA_MOVEL).sum())
+        indicadores[f'media_movel_divergentes_{sensor}'] = diverge
+        indicadores[f'media_movel_erro_max_{sensor}'] = float(erro.max()) if len(erro) else 0.0
+        verificadas += int(verificavel.sum())
+        divergentes += diverge
+    indicadores['media_movel_verificadas'] = verificadas
+
+    indicadores['completude'] = total / (total + indicadores['leituras_perdidas'])
+    indicadores['unicidade'] = 1 - indicadores['duplicadas'] / total
+    indicadores['vitalidade_sensores'] = 1 - indicadores['leituras_travadas'] / total
+    indicadores['consistencia_media_movel'] = 1 - divergentes / verificadas if verificadas else 1.0
+    componentes = ['completude', 'unicidade', 'vitalidade_sensores', 'consistencia_media_movel']
+    indicadores['pontuacao_qualidade'] = round(100 * float(np.mean([indicadores[c] for c in componentes])), 1)
+    return indicadores
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Consulta de Percentis dos Sensores Hermes Reply
+Percentis aproximados por intervalo de tempo, dispositivo e execução a partir dos esboços por balde
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from esbocos import EsbocosPorBalde
+
+PREFIXO_BALDES = 'hermes_baldes_'
+LARGURA_BALDE_MS = 3_600_000  # 1 hora de timestamp_simulacao por balde
+
+
+def caminho_baldes(dados_path, execucao_id):
+    """Caminho do arquivo de baldes de uma execução"""
+    return os.path.join(dados_path, f'{PREFIXO_BALDES}{execucao_id}.json')
+
+
+def salvar_baldes(indice, caminho):
+    """Grava os baldes em JSON de forma atômica"""
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(indice.para_dict(), f, separators=(',', ':'))
+    os.replace(temporario, caminho)
+
+
+class ConsultaQuantis:
+    """Consulta p50/p95/p99 sobre os esboços por dispositivo, execução e balde de tempo.
+
+    O intervalo de tempo é resolvido na granularidade do balde: baldes que
+    tocam o intervalo entram inteiros no resultado. Execuções compactadas
+    pela retenção têm os baldes no JSON mensal de ``arquivo/esbocos/``.
+    """
+
+    def __init__(self, dados_path):
+        self.dados_path = dados_path
+        self._arquivos = {}
+        self._indice = None
+
+    def _carregar_execucao(self, execucao_id):
+        """Lê (ou gera a partir de hermes_data) os baldes de uma execução"""
+        caminho = caminho_baldes(self.dados_path, execucao_id)
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                return EsbocosPorBalde.de_dict(json.load(f))
+
+        arquivo_dados = os.path.join(self.dados_path, f'hermes_data_{execucao_id}.csv')
+        indice = EsbocosPorBalde(LARGURA_BALDE_MS).adicionar_dataframe(pd.read_csv(arquivo_dados), execucao_id)
+        salvar_baldes(indice, caminho)
+        return indice
+
+    def atualizar(self):
+        """Carrega baldes de execuções novas; execuções já lidas não são relidas"""
+        from retencao import ler_catalogo, ler_esbocos_arquivados  # retencao importa este módulo
+        arquivadas = [e for e in ler_catalogo(self.dados_path)
+                      if e not in self._arquivos and not os.path.exists(caminho_baldes(self.dados_path, e))]
+        carregadas = []
+        for execucao_id, conteudo in ler_esbocos_arquivados(self.dados_path, PREFIXO_BALDES, arquivadas).items():
+            try:
+                self._arquivos[execucao_id] = EsbocosPorBalde.de_dict(conteudo)
+                carregadas.append(execucao_id)
+            except (ValueError, KeyError) as e:
+                print(f"[AVISO] Baldes arquivados inválidos para {execucao_id}: {e}")
+
+        execucoes = set()
+        if os.path.exists(self.dados_path):
+            for arquivo in os.listdir(self.dados_path):
+                if arquivo.startswith(PREFIXO_BALDES) and arquivo.endswith('.json'):
+                    execucoes.add(arquivo[len(PREFIXO_BALDES):-len('.json')])
+                elif arquivo.startswith('hermes_data_') and arquivo.endswith('.csv'):
+                    execucoes.add(arquivo[len('hermes_data_'):-len('.csv')])
+
+        novas = sorted(execucoes - set(self._arquivos))
+        for execucao_id in novas:
+            try:
+                self._arquivos[execucao_id] = self._carregar_execucao(execucao_id)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[AVISO] Não foi possível carregar os baldes de {execucao_id}: {e}")
+
+        if novas or carregadas or self._indice is None:
+            self._indice = EsbocosPorBalde(LARGURA_BALDE_MS)
+            for indice in self._arquivos.values():
+                self._indice.mesclar(indice)
+        return self._indice
+
+    def percentis(self, sensor, quantis=(0.5, 0.95, 0.99), inicio_ms=None, fim_ms=None,
+                  dispositivos=None, execucoes=None):
+        """Percentis aproximados do sensor para os filtros informados"""
+        indice = self.atualizar()
+        posicoes = indice.selecionar(inicio_ms, fim_ms, dispositivos, execucoes)
+        esboco = indice.esboco_quantis(sensor, posicoes)
+        valores = esboco.quantil(np.asarray(quantis))
+        resultado = {f'p{q * 100:g}': float(v) for q, v in zip(quantis, valores)}
+        resultado['registros'] = int(esboco.contagem)
+        return resultado
+
+    def tabela_percentis(self, sensores, **filtros):
+        """Percentis de vários sensores em um DataFrame (uma linha por sensor)"""
+        linhas = [dict(sensor=sensor, **self.percentis(sensor, **filtros)) for sensor in sensores]
+        return pd.DataFrame(linhas)
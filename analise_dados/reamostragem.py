@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reamostragem da Frota Hermes Reply
+Relógios dos dispositivos num eixo comum, grade regular com agregação e preenchimento, e junções as-of vetorizadas
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from esbocos import SENSORES
+from esquemas import FIRMWARE_LEGADO
+from qualidade_dados import INTERVALO_LEITURA_MS
+
+# timestamp_simulacao é o millis() do firmware (desde o boot) ou, na simulação, já um instante Unix em ms
+INICIO_EPOCA_MS = 946_684_800_000  # 2000-01-01: relógios abaixo disto contam a partir do boot
+AGREGACOES = ('media', 'min', 'max', 'soma', 'contagem', 'ultima', 'instantanea')
+PREENCHIMENTOS = ('nenhum', 'anterior', 'linear')
+# O preenchimento não atravessa lacunas maiores que isto (12 leituras perdidas)
+LACUNA_MAXIMA_MS = 60_000
+# Células (dispositivos x instantes) por sensor: acima disso, aumente o passo ou filtre o período
+MAX_CELULAS = 50_000_000
+# Desvio robusto (mediana/MAD da frota no instante) a partir do qual um dispositivo é atípico
+LIMIAR_ATIPICO = 3.5
+STATUS_NORMAL = 'NORMAL'
+
+
+def tempos_ms(serie):
+    """Instantes como int64 em ms e a máscara dos válidos (datas, números ou texto numérico)"""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        validos = serie.notna().to_numpy()
+        return serie.to_numpy(dtype='datetime64[ms]').view('int64'), validos
+    valores = pd.to_numeric(serie, errors='coerce').to_numpy(dtype='float64')
+    validos = ~np.isnan(valores)
+    return np.where(validos, valores, 0).astype('int64'), validos
+
+
+def _quantis_ordenados(ordenada, validos, quantis):
+    """Quantis (interpolação linear, como ``np.percentile``) de cada coluna de uma matriz já ordenada no eixo 0.
+
+    ``np.sort`` deixa os NaN no fim da coluna, então os ``validos`` primeiros
+    valores são os presentes; coluna sem valor válido fica NaN.
+    """
+    ultimo = np.maximum(validos - 1, 0)
+    resultado = []
+    for quantil in quantis:
+        posicao = quantil * ultimo
+        abaixo = np.floor(posicao).astype('int64')
+        acima = np.minimum(abaixo + 1, ultimo)
+        inferior = np.take_along_axis(ordenada, abaixo[None, :], axis=0)[0]
+        superior = np.take_along_axis(ordenada, acima[None, :], axis=0)[0]
+        resultado.append(np.where(validos > 0, inferior + (superior - inferior) * (posicao - abaixo), np.nan))
+    return resultado
+
+
+def _mediana_mad(matriz):
+    """Mediana e MAD (escalado por 1.4826) de cada coluna, ignorando NaN, com ordenação em vez de ``np.nanmedian``"""
+    validos = (~np.isnan(matriz)).sum(axis=0)
+    mediana, = _quantis_ordenados(np.sort(matriz, axis=0), validos, [0.5])
+    mad, = _quantis_ordenados(np.sort(np.abs(matriz - mediana), axis=0), validos, [0.5])
+    return mediana, 1.4826 * mad
+
+
+def _retrocede(valores, novo_grupo):
+    """Contador que voltou a um valor menor no mesmo grupo, na ordem do log (NaN não conta)"""
+    return (np.diff(valores, prepend=np.nan) < 0) & ~novo_grupo
+
+
+def alinhar_relogios(df, intervalo_ms=INTERVALO_LEITURA_MS):
+    """Instante de cada leitura num relógio comum à frota: ``(tempos int64 em ms, validos)``, na ordem de ``df``.
+
+    Relógios já em época Unix são mantidos. Relógios contados desde o boot
+    (``millis()``) são divididos em segmentos por execução, dispositivo e
+    boot. Um boot começa quando ``timestamp_simulacao``, ``uptime`` ou
+    ``total_readings`` volta atrás na ordem do log. O último segmento de
+    cada execução e dispositivo termina no ``timestamp_processamento`` da
+    ingestão, e os anteriores são encadeados para trás, um intervalo de
+    leitura antes do início do seguinte. CSVs legados (``FIRMWARE_LEGADO``)
+    são importados muito depois da coleta, então terminam na data do
+    arquivo, codificada no ``execucao_id`` (AAAAMMDD_HHMMSS). Sem âncora, o
+    último segmento fica onde está.
+    """
+    tempos, validos = tempos_ms(df['timestamp_simulacao'])
+    total = len(df)
+    if total == 0:
+        return tempos, validos
+
+    dispositivos = pd.factorize(df['device_id'], use_na_sentinel=False)[0]
+    execucoes = pd.factorize(df['execucao_id'], use_na_sentinel=False)[0] if 'execucao_id' in df.columns \
+        else np.zeros(total, dtype='int64')
+    grupos = execucoes.astype('int64') * (dispositivos.max() + 1) + dispositivos
+    ordem = np.argsort(grupos, kind='stable')  # ordem do log dentro de cada grupo
+    grupos_ordem, tempos_ordem = grupos[ordem], np.where(validos, tempos, np.nan)[ordem]
+    novo_grupo = np.r_[True, grupos_ordem[1:] != grupos_ordem[:-1]]
+
+    reinicio = _retrocede(tempos_ordem, novo_grupo)
+    for contador in ('uptime', 'total_readings'):
+        if contador in df.columns:
+            reinicio |= _retrocede(pd.to_numeric(df[contador], errors='coerce').to_numpy(dtype='float64')[ordem],
+                                   novo_grupo)
+    segmento = np.cumsum(novo_grupo | reinicio) - 1
+
+    # Tabela de segmentos: grupo, primeiro e último instante
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        por_segmento = pd.DataFrame({'segmento': segmento, 'grupo': grupos_ordem, 'tempo': tempos_ordem}) \
+            .groupby('segmento', sort=True).agg(grupo=('grupo', 'first'), inicio=('tempo', 'min'), fim=('tempo', 'max'))
+    relativos = (por_segmento['fim'] < INICIO_EPOCA_MS).to_numpy()
+    if not relativos.any():
+        return tempos, validos
+
+    # Âncora por grupo: o fim do processamento da ingestão (ou o próprio fim do último segmento)
+    fins = por_segmento['fim'].to_numpy()
+    grupo_segmento = por_segmento['grupo'].to_numpy()
+    ultimo = np.r_[grupo_segmento[1:] != grupo_segmento[:-1], True]
+    ancora = pd.Series(fins[ultimo], index=grupo_segmento[ultimo])
+    if 'timestamp_processamento' in df.columns:
+        processamento = pd.to_datetime(df['timestamp_processamento'], errors='coerce')
+        processamento = pd.Series(processamento.to_numpy(dtype='datetime64[ms]').view('int64'), index=grupos) \
+            .where(processamento.notna().to_numpy())
+        ancora = processamento.groupby(level=0).max().reindex(ancora.index).fillna(ancora)
+    if 'firmware_version' in df.columns and 'execucao_id' in df.columns:
+        legado = (df['firmware_version'] == FIRMWARE_LEGADO).to_numpy(dtype=bool, na_value=False)
+        if legado.any():
+            data = pd.to_datetime(df['execucao_id'].astype(str).str[:15], format='%Y%m%d_%H%M%S', errors='coerce')
+            data_ms = pd.Series(data.to_numpy(dtype='datetime64[ms]').view('int64'), index=grupos) \
+                .where(legado & data.notna().to_numpy())
+            ancora = data_ms.groupby(level=0).max().reindex(ancora.index).fillna(ancora)
+
+    # Fim de cada segmento no relógio comum: âncora menos a duração dos segmentos seguintes do grupo
+    duracoes = np.nan_to_num(fins - por_segmento['inicio'].to_numpy()) + intervalo_ms
+    acumulado = np.cumsum(duracoes)
+    acumulado_ultimo = pd.Series(acumulado[ultimo], index=grupo_segmento[ultimo])
+    fim_comum = ancora.reindex(grupo_segmento).to_numpy() - (acumulado_ultimo.reindex(grupo_segmento).to_numpy() - acumulado)
+    deslocamento = np.where(relativos, fim_comum - fins, 0.0)
+
+    alinhados = np.empty(total, dtype='int64')
+    alinhados[ordem] = np.rint(np.nan_to_num(tempos_ordem + deslocamento[segmento])).astype('int64')
+    return np.where(validos, alinhados, tempos), validos
+
+
+def juntar_asof(tempos_esquerda, grupos_esquerda, tempos_direita, grupos_direita, tolerancia_ms=None,
+                direcao='anterior'):
+    """Para cada linha da esquerda, a posição da linha da direita do mesmo grupo mais próxima no tempo (-1 se nenhuma).
+
+    ``direcao`` é ``'anterior'`` (última em ou antes do instante),
+    ``'posterior'`` (primeira em ou depois) ou ``'proxima'``. Grupos são
+    códigos inteiros não negativos. Grupo e instante viram uma única chave
+    int64 ordenada, então a junção inteira é uma busca binária vetorizada,
+    sem laço por grupo. Nenhum dos lados precisa estar ordenado, e as
+    posições se referem à ordem original da direita.
+    """
+    tempos_esquerda = np.asarray(tempos_esquerda, dtype='int64')
+    tempos_direita = np.asarray(tempos_direita, dtype='int64')
+    grupos_esquerda = np.asarray(grupos_esquerda, dtype='int64')
+    grupos_direita = np.asarray(grupos_direita, dtype='int64')
+    if direcao not in ('anterior', 'posterior', 'proxima'):
+        raise ValueError(f"direção inválida: {direcao} (use anterior, posterior ou proxima)")
+    resultado = np.full(len(tempos_esquerda), -1, dtype='int64')
+    if len(tempos_esquerda) == 0 or len(tempos_direita) == 0:
+        return resultado
+
+    minimo = min(tempos_esquerda.min(), tempos_direita.min())
+    amplitude = int(max(tempos_esquerda.max(), tempos_direita.max()) - minimo) + 1
+    grupos = int(max(grupos_esquerda.max(), grupos_direita.max())) + 1
+    if amplitude * grupos >= 2 ** 62:
+        raise ValueError("período longo demais para a quantidade de grupos numa chave int64; divida a consulta")
+
+    ordem = np.lexsort((tempos_direita, grupos_direita))
+    chaves_direita = grupos_direita[ordem] * amplitude + (tempos_direita[ordem] - minimo)
+    chaves_esquerda = grupos_esquerda * amplitude + (tempos_esquerda - minimo)
+
+    # Candidata anterior (última chave <= esquerda) e posterior (primeira >= esquerda), ambas no mesmo grupo
+    anterior = np.searchsorted(chaves_direita, chaves_esquerda, 'right') - 1
+    posterior = np.searchsorted(chaves_direita, chaves_esquerda, 'left')
+    grupos_ordenados = grupos_direita[ordem]
+    tempos_ordenados = tempos_direita[ordem]
+    anterior_ok = (anterior >= 0) & (grupos_ordenados[np.maximum(anterior, 0)] == grupos_esquerda)
+    posterior_ok = (posterior < len(ordem)) & (grupos_ordenados[np.minimum(posterior, len(ordem) - 1)] == grupos_esquerda)
+    distancia_anterior = np.where(anterior_ok, tempos_esquerda - tempos_ordenados[np.maximum(anterior, 0)], np.iinfo('int64').max)
+    distancia_posterior = np.where(posterior_ok, tempos_ordenados[np.minimum(posterior, len(ordem) - 1)] - tempos_esquerda,
+                                   np.iinfo('int64').max)
+
+    if direcao == 'anterior':
+        escolhida, distancia, encontrada = anterior, distancia_anterior, anterior_ok
+    elif direcao == 'posterior':
+        escolhida, distancia, encontrada = posterior, distancia_posterior, posterior_ok
+    else:
+        usar_posterior = distancia_posterior < distancia_anterior
+        escolhida = np.where(usar_posterior, posterior, anterior)
+        distancia = np.minimum(distancia_anterior, distancia_posterior)
+        encontrada = anterior_ok | posterior_ok
+    if tolerancia_ms is not None:
+        encontrada &= distancia <= tolerancia_ms
+    resultado[encontrada] = ordem[escolhida[encontrada]]
+    return resultado
+
+
+def preencher_lacunas(valores, passo_ms, metodo='anterior', lacuna_maxima_ms=LACUNA_MAXIMA_MS):
+    """Preenche NaN ao longo do tempo (eixo 1) de uma matriz dispositivos x instantes.
+
+    ``'anterior'`` repete o último valor e ``'linear'`` interpola entre os
+    vizinhos. Só são preenchidas lacunas cujas leituras reais nas bordas
+    distam no máximo ``lacuna_maxima_ms``. Antes da primeira leitura de um
+    dispositivo (ou depois da última, no linear), nada é inventado.
+    """
+    if metodo in (None, 'nenhum'):
+        return valores
+    if metodo not in PREENCHIMENTOS:
+        raise ValueError(f"preenchimento inválido: {metodo} (use {', '.join(PREENCHIMENTOS)})")
+    presentes = ~np.isnan(valores)
+    colunas = np.arange(valores.shape[1])
+    linhas = np.arange(valores.shape[0])[:, None]
+    anterior = np.maximum.accumulate(np.where(presentes, colunas, -1), axis=1)
+    limite = lacuna_maxima_ms // passo_ms
+
+    if metodo == 'anterior':
+        preenchivel = ~presentes & (anterior >= 0) & (colunas - anterior <= limite)
+        return np.where(preenchivel, valores[linhas, np.maximum(anterior, 0)], valores)
+
+    largura = valores.shape[1]
+    posterior = np.minimum.accumulate(np.where(presentes, colunas, largura)[:, ::-1], axis=1)[:, ::-1]
+    preenchivel = ~presentes & (anterior >= 0) & (posterior < largura) & (posterior - anterior <= limite)
+    esquerda = valores[linhas, np.maximum(anterior, 0)]
+    direita = valores[linhas, np.minimum(posterior, largura - 1)]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fracao = (colunas - anterior) / (posterior - anterior)
+    return np.where(preenchivel, esquerda + (direita - esquerda) * fracao, valores)
+
+
+class FrotaAlinhada:
+    """Sensores de todos os dispositivos numa grade comum: uma matriz dispositivos x instantes por sensor.
+
+    ``leituras`` conta as leituras reais em cada célula e ``alertas`` as
+    leituras com status diferente de NORMAL. As células preenchidas por
+    ``preencher_lacunas`` têm valor, mas zero leituras.
+    """
+
+    def __init__(self, dispositivos, instantes_ms, passo_ms, valores, leituras, alertas):
+        self.dispositivos = np.asarray(dispositivos)
+        self.instantes_ms = instantes_ms
+        self.passo_ms = passo_ms
+        self.valores = valores
+        self.leituras = leituras
+        self.alertas = alertas
+
+    @property
+    def instantes(self):
+        return pd.to_datetime(self.instantes_ms, unit='ms')
+
+    def para_dataframe(self):
+        """Formato longo (dispositivo, instante), só com células que têm algum valor"""
+        ocupadas = np.zeros(self.leituras.shape, dtype=bool)
+        for matriz in self.valores.values():
+            ocupadas |= ~np.isnan(matriz)
+        linhas, colunas = np.nonzero(ocupadas)
+        df = pd.DataFrame({
+            'device_id': self.dispositivos[linhas],
+            'instante': pd.to_datetime(self.instantes_ms[colunas], unit='ms'),
+            'leituras': self.leituras[linhas, colunas],
+            'alertas': self.alertas[linhas, colunas]
+        })
+        for sensor, matriz in self.valores.items():
+            df[sensor] = matriz[linhas, colunas]
+        return df
+
+    def desvio_robusto(self, sensor):
+        """Desvio de cada dispositivo em relação à frota no mesmo instante: (x - mediana) / (1.4826 · MAD)"""
+        matriz = self.valores[sensor]
+        mediana, mad = _mediana_mad(matriz)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (matriz - mediana) / np.where(mad > 0, mad, np.nan)
+
+    def colunas_ocupadas(self):
+        """Índices dos instantes com alguma leitura ou valor preenchido em algum dispositivo"""
+        ocupadas = self.leituras.sum(axis=0) > 0
+        for matriz in self.valores.values():
+            ocupadas = ocupadas | ~np.isnan(matriz).all(axis=0)
+        return np.flatnonzero(ocupadas)
+
+    def caracteristicas_frota(self, limiar_atipico=LIMIAR_ATIPICO):
+        """Uma linha por instante ocupado: dispositivos ativos, alertas e estatísticas de cada sensor na frota.
+
+        Instantes sem nenhum dispositivo ficam de fora (numa grade longa são
+        quase todos). Percentis, mediana e MAD saem de uma ordenação por
+        coluna com a contagem de valores válidos, sem ``np.nanpercentile``.
+        """
+        colunas = self.colunas_ocupadas()
+        leituras = self.leituras[:, colunas]
+        caracteristicas = {
+            'instante': pd.to_datetime(self.instantes_ms[colunas], unit='ms'),
+            'dispositivos_ativos': (leituras > 0).sum(axis=0),
+            'leituras': leituras.sum(axis=0),
+            'alertas': self.alertas[:, colunas].sum(axis=0)
+        }
+        for sensor, matriz in self.valores.items():
+            matriz = matriz[:, colunas]
+            validos = (~np.isnan(matriz)).sum(axis=0)
+            ordenada = np.sort(matriz, axis=0)
+            p10, mediana, p90 = _quantis_ordenados(ordenada, validos, [0.1, 0.5, 0.9])
+            mad, = _quantis_ordenados(np.sort(np.abs(matriz - mediana), axis=0), validos, [0.5])
+            mad = 1.4826 * mad
+            with np.errstate(invalid='ignore', divide='ignore'):
+                media = np.nansum(matriz, axis=0) / validos
+                desvio = np.sqrt(np.nansum((matriz - media) ** 2, axis=0) / validos)
+                robusto = np.abs(matriz - mediana) / np.where(mad > 0, mad, np.nan)
+            caracteristicas[f'{sensor}_media'] = media
+            caracteristicas[f'{sensor}_desvio'] = desvio
+            caracteristicas[f'{sensor}_min'], = _quantis_ordenados(ordenada, validos, [0.0])
+            caracteristicas[f'{sensor}_p10'] = p10
+            caracteristicas[f'{sensor}_mediana'] = mediana
+            caracteristicas[f'{sensor}_p90'] = p90
+            caracteristicas[f'{sensor}_max'], = _quantis_ordenados(ordenada, validos, [1.0])
+            caracteristicas[f'{sensor}_atipicos'] = (robusto > limiar_atipico).sum(axis=0)
+        return pd.DataFrame(caracteristicas)
+
+
+def reamostrar(df, passo_ms, agregacao='media', preenchimento='nenhum', lacuna_maxima_ms=LACUNA_MAXIMA_MS,
+               sensores=SENSORES, inicio_ms=None, fim_ms=None, periodo_ms=None):
+    """Alinha todos os dispositivos numa grade de ``passo_ms``, numa única passada vetorizada.
+
+    Os relógios passam primeiro por ``alinhar_relogios``. Com
+    ``agregacao='instantanea'``, cada célula recebe a última leitura em ou
+    antes do instante da grade (junção as-of, tolerância de um passo). As
+    demais agregações (média, mín., máx., soma, contagem, última) usam as
+    leituras de ``[instante, instante + passo)``. ``inicio_ms`` e ``fim_ms``
+    (no relógio comum) limitam a grade; sem ``inicio_ms``, ``periodo_ms``
+    limita a grade aos últimos ``periodo_ms`` até ``fim_ms`` (ou até a
+    última leitura).
+    """
+    if agregacao not in AGREGACOES:
+        raise ValueError(f"agregação inválida: {agregacao} (use {', '.join(AGREGACOES)})")
+    if passo_ms <= 0:
+        raise ValueError("o passo deve ser positivo")
+
+    tempos, validos = alinhar_relogios(df)
+    codigos, dispositivos = pd.factorize(df['device_id'], use_na_sentinel=False)
+    if inicio_ms is None and periodo_ms is not None and validos.any():
+        inicio_ms = (int(tempos[validos].max()) + 1 if fim_ms is None else int(fim_ms)) - periodo_ms
+    if inicio_ms is not None:
+        validos = validos & (tempos >= inicio_ms)
+    if fim_ms is not None:
+        validos = validos & (tempos < fim_ms)
+    posicoes = np.flatnonzero(validos)
+    tempos, codigos = tempos[posicoes], codigos[posicoes]
+
+    if len(posicoes):
+        primeiro = (int(tempos.min()) if inicio_ms is None else int(inicio_ms)) // passo_ms * passo_ms
+        ultimo = int(tempos.max()) if fim_ms is None else int(fim_ms) - 1
+        if agregacao == 'instantanea' and fim_ms is None:
+            ultimo += passo_ms - 1  # um instante da grade depois da última leitura, para que ela apareça
+        forma = (len(dispositivos), max(0, (ultimo - primeiro) // passo_ms + 1))
+    else:
+        forma = (len(dispositivos), 0)
+    # Verificado antes de criar a grade: um período longo com passo curto não chega a alocar nada
+    if forma[0] * forma[1] > MAX_CELULAS:
+        raise ValueError(f"{forma[0]:,} dispositivos x {forma[1]:,} instantes excede {MAX_CELULAS:,} células; "
+                         f"aumente o passo ou limite o período")
+    instantes = primeiro + passo_ms * np.arange(forma[1], dtype='int64') if forma[1] else np.empty(0, dtype='int64')
+
+    alertas_leitura = np.zeros(len(posicoes), dtype=bool)
+    if 'system_status' in df.columns:
+        status = df['system_status'].iloc[posicoes]
+        alertas_leitura = (status.notna() & (status.astype(str) != STATUS_NORMAL)).to_numpy()
+    colunas_sensores = {s: pd.to_numeric(df[s], errors='coerce').to_numpy(dtype='float64')[posicoes]
+                        for s in sensores if s in df.columns}
+
+    celula = codigos.astype('int64') * forma[1] + (tempos - (instantes[0] if len(instantes) else 0)) // passo_ms
+    total_celulas = forma[0] * forma[1]
+    leituras = np.bincount(celula, minlength=total_celulas).reshape(forma)
+    alertas = np.bincount(celula, weights=alertas_leitura, minlength=total_celulas).astype('int64').reshape(forma)
+
+    valores = {}
+    if agregacao == 'instantanea':
+        # Junção as-of: cada célula da grade com a última leitura do dispositivo até o seu instante
+        grupos_grade = np.repeat(np.arange(forma[0]), forma[1])
+        instantes_grade = np.tile(instantes, forma[0])
+        origem = juntar_asof(instantes_grade, grupos_grade, tempos, codigos, tolerancia_ms=passo_ms)
+        for sensor, coluna in colunas_sensores.items():
+            valores[sensor] = np.where(origem >= 0, coluna[np.maximum(origem, 0)], np.nan).reshape(forma)
+    else:
+        for sensor, coluna in colunas_sensores.items():
+            valores[sensor] = _agregar_celulas(coluna, celula, tempos, total_celulas, agregacao).reshape(forma)
+
+    for sensor in valores:
+        valores[sensor] = preencher_lacunas(valores[sensor], passo_ms, preenchimento, lacuna_maxima_ms)
+    return FrotaAlinhada(dispositivos.astype(str), instantes, passo_ms, valores, leituras, alertas)
+
+
+def _agregar_celulas(valores, celula, tempos, total_celulas, agregacao):
+    """Agrega as leituras de cada célula (NaN ignorados; célula sem leitura válida fica NaN)"""
+    presentes = ~np.isnan(valores)
+    valores, celula, tempos = valores[presentes], celula[presentes], tempos[presentes]
+    contagem = np.bincount(celula, minlength=total_celulas)
+    if agregacao == 'contagem':
+        return contagem.astype('float64')
+
+    resultado = np.full(total_celulas, np.nan)
+    if agregacao in ('media', 'soma'):
+        soma = np.bincount(celula, weights=valores, minlength=total_celulas)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            resultado = soma / contagem if agregacao == 'media' else np.where(contagem > 0, soma, np.nan)
+    elif agregacao in ('min', 'max'):
+        funcao = np.fmin if agregacao == 'min' else np.fmax
+        funcao.at(resultado, celula, valores)
+    else:  # ultima: em ordem de tempo, a última atribuição de cada célula prevalece
+        ordem = np.lexsort((tempos, celula))
+        resultado[celula[ordem]] = valores[ordem]
+    return resultado
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Renderização por Seções do Dashboard Hermes Reply
+Cache de figuras por impressão digital dos dados e filtros, com seções sob demanda
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from perfilamento import PERFIL_INATIVO
+
+
+def impressao_digital(*partes):
+    """Calcula uma impressão digital estável para dados e parâmetros de uma seção.
+
+    Máscaras booleanas são compactadas em bits antes do hash, então filtrar
+    milhões de linhas custa apenas alguns kilobytes de hashing. DataFrames e
+    Series usam o hash vetorizado do pandas; demais valores usam ``repr``.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for parte in partes:
+        if isinstance(parte, np.ndarray):
+            dados = np.packbits(parte) if parte.dtype == bool else np.ascontiguousarray(parte)
+            h.update(str(parte.shape).encode())
+            h.update(dados.tobytes())
+        elif isinstance(parte, (pd.DataFrame, pd.Series)):
+            h.update(pd.util.hash_pandas_object(parte, index=False).to_numpy().tobytes())
+        else:
+            h.update(repr(parte).encode('utf-8'))
+        h.update(b'|')
+    return h.hexdigest()
+
+
+class CacheSecoes:
+    """Cache LRU de figuras por seção, chaveado pela impressão digital das entradas.
+
+    ``perfil`` recebe cada acerto e cada construção (com seu tempo) quando o
+    perfil de renderização do dashboard está ligado.
+    """
+
+    def __init__(self, max_itens=48):
+        self.max_itens = max_itens
+        self.itens = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+        self.perfil = PERFIL_INATIVO
+
+    def obter(self, secao, impressao, construir):
+        """Retorna a figura em cache ou a constrói quando as entradas mudaram"""
+        chave = (secao, impressao)
+        if chave in self.itens:
+            self.itens.move_to_end(chave)
+            self.acertos += 1
+            self.perfil.registrar_cache(secao, True)
+            return self.itens[chave]
+
+        self.falhas += 1
+        inicio = time.perf_counter()
+        resultado = construir()
+        self.perfil.registrar_cache(secao, False, (time.perf_counter() - inicio) * 1000)
+        self.itens[chave] = resultado
+        while len(self.itens) > self.max_itens:
+            self.itens.popitem(last=False)
+        return resultado
+
+    def limpar(self):
+        """Descarta todas as figuras em cache"""
+        self.itens.clear()
+
+
+class RenderizadorSecoes:
+    """Executa seções do dashboard apenas quando visíveis, reaproveitando figuras em cache"""
+
+    def __init__(self, cache, secoes_visiveis):
+        self.cache = cache
+        self.secoes_visiveis = set(secoes_visiveis)
+
+    def visivel(self, secao):
+        """Indica se a seção foi selecionada para exibição"""
+        return secao in self.secoes_visiveis
+
+    def figura(self, secao, impressao, construir):
+        """Obtém a figura da seção (em cache ou recém-construída)"""
+        return self.cache.obter(secao, impressao, construir)
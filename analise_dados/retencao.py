@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Retenção em Camadas Hermes Reply
+Compactação dos arquivos por execução em partições mensais comprimidas, agregados horários dos dados antigos e arquivamento do log serial
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from armazem_colunar import assinatura_arquivo, publicar_dataset
+from comparacao_execucoes import PREFIXO_ESBOCO, caminho_esboco, salvar_esboco
+from esbocos import SENSORES, EsbocoExecucao, EsbocosPorBalde
+from esquemas import COLUNAS_CANONICAS, compactar_dataframe, tipar_dataframe
+from idempotencia import ARQUIVO_JOURNAL, DIRETORIO_INDICE, IndiceDeduplicacao, JournalIngestao, escrever_atomico
+from qualidade_dados import PREFIXO_QUALIDADE
+from quantis_sensores import LARGURA_BALDE_MS, PREFIXO_BALDES, caminho_baldes, salvar_baldes
+
+try:
+    # Opcional: zstd comprime melhor e mais rápido que gzip; sem ele só gzip está disponível
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DIRETORIO_ARQUIVO = 'arquivo'
+ARQUIVO_CATALOGO = 'catalogo.json'
+DIAS_COMPACTAR = 7  # execuções mais antigas saem de dados_simulacao/ para as partições mensais
+DIAS_BRUTOS = 90  # leituras mais antigas viram agregados horários
+LARGURA_AGREGADO_MS = 3_600_000
+IDADE_MIN_LOG_S = 300  # o log só é arquivado parado há pelo menos 5 minutos
+EXTENSOES = {'gzip': '.gz', 'zstd': '.zst'}
+CAMADA_COMPACTADA = 'compactada'
+CAMADA_AGREGADA = 'agregada'
+PREFIXOS_POR_EXECUCAO = {'hermes_resumo_': 'hermes_resumo.csv', PREFIXO_QUALIDADE: 'hermes_qualidade.csv'}
+PREFIXOS_ESBOCOS = (PREFIXO_ESBOCO, PREFIXO_BALDES)  # um JSON por execução, arquivados por mês em arquivo/esbocos/
+STATUS_AGREGADOS = {'NORMAL': 'status_normal', 'ATENÇÃO': 'status_atencao', 'CRÍTICO': 'status_critico'}
+
+
+def compressoes_disponiveis():
+    """Formatos de compressão utilizáveis neste ambiente"""
+    return ['gzip', 'zstd'] if zstandard is not None else ['gzip']
+
+
+def data_execucao(execucao_id):
+    """Data de uma execução pelo identificador (AAAAMMDD_HHMMSS); None se não seguir o padrão"""
+    try:
+        return datetime.strptime(str(execucao_id)[:15], '%Y%m%d_%H%M%S')
+    except ValueError:
+        return None
+
+
+def diretorio_arquivo(dados_path):
+    return os.path.join(dados_path, DIRETORIO_ARQUIVO)
+
+
+def ler_catalogo(dados_path):
+    """Execuções que saíram de dados_simulacao/: {execucao_id: {'camada', 'particao', 'registros'}}"""
+    try:
+        with open(os.path.join(diretorio_arquivo(dados_path), ARQUIVO_CATALOGO), encoding='utf-8') as f:
+            return json.load(f)['execucoes']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def gravar_catalogo(dados_path, execucoes):
+    os.makedirs(diretorio_arquivo(dados_path), exist_ok=True)
+    conteudo = json.dumps({'versao': 1, 'execucoes': execucoes}, ensure_ascii=False, indent=1, sort_keys=True)
+    escrever_atomico(os.path.join(diretorio_arquivo(dados_path), ARQUIVO_CATALOGO),
+                     lambda f: f.write(conteudo.encode('utf-8')))
+
+
+def localizar_particao(caminho_base):
+    """Arquivo existente de uma partição (``<base>.gz`` ou ``<base>.zst``), ou None"""
+    for extensao in EXTENSOES.values():
+        if os.path.exists(caminho_base + extensao):
+            return caminho_base + extensao
+    return None
+
+
+def ler_particao(caminho_base, **kwargs):
+    """Conteúdo de uma partição comprimida (vazio se ela não existir)"""
+    caminho = localizar_particao(caminho_base)
+    if caminho is None:
+        return pd.DataFrame()
+    return pd.read_csv(caminho, dtype={'execucao_id': str}, **kwargs)
+
+
+def gravar_particao(caminho_base, df, compressao):
+    """Regrava a partição de forma atômica no formato pedido; partição vazia é removida"""
+    anterior = localizar_particao(caminho_base)
+    caminho = caminho_base + EXTENSOES[compressao]
+    if len(df):
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        opcoes = {'method': 'gzip', 'mtime': 0} if compressao == 'gzip' else {'method': 'zstd'}
+        escrever_atomico(caminho, lambda f: df.to_csv(f, index=False, encoding='utf-8', compression=opcoes))
+    if anterior is not None and (anterior != caminho or not len(df)):
+        os.remove(anterior)
+    return caminho if len(df) else None
+
+
+def substituir_execucoes(existente, novo, execucoes):
+    """Partição com as linhas de ``execucoes`` trocadas por ``novo`` (regravar a mesma execução é idempotente)"""
+    if len(existente) and 'execucao_id' in existente.columns:
+        existente = existente[~existente['execucao_id'].isin(execucoes)]
+    partes = [df for df in (existente, novo) if len(df)]
+    return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+
+
+def agregar_leituras(df, largura_ms=LARGURA_AGREGADO_MS):
+    """Agregado por execução, dispositivo e janela de tempo: leituras, média/mín/máx dos sensores e contagem de status"""
+    df = df.assign(
+        balde_ms=pd.to_numeric(df['timestamp_simulacao'], errors='coerce') // largura_ms * largura_ms,
+        device_id=df['device_id'].fillna('DESCONHECIDO')
+    )
+    for sensor in SENSORES:
+        df[sensor] = pd.to_numeric(df[sensor], errors='coerce')
+    grupos = df.groupby(['execucao_id', 'device_id', 'balde_ms'], sort=True)
+    agregado = grupos.agg(
+        leituras=('timestamp_simulacao', 'size'),
+        firmware_version=('firmware_version', 'first'),
+        **{f'{sensor}_{funcao}': (sensor, funcao) for sensor in SENSORES for funcao in ('mean', 'min', 'max')}
+    )
+    agregado.columns = [c.replace('_mean', '_media') for c in agregado.columns]
+    status = df['system_status'].replace({'ATENCAO': 'ATENÇÃO', 'CRITICO': 'CRÍTICO'})
+    contagens = pd.crosstab([df['execucao_id'], df['device_id'], df['balde_ms']], status)
+    for valor, coluna in STATUS_AGREGADOS.items():
+        agregado[coluna] = contagens[valor].reindex(agregado.index, fill_value=0) if valor in contagens else 0
+    return agregado.reset_index()
+
+
+def agregado_como_leituras(df, colunas=COLUNAS_CANONICAS):
+    """Converte agregados para o esquema das leituras: uma linha por janela, sensores pela média.
+
+    ``system_status`` é o status mais frequente da janela e a coluna extra
+    ``leituras`` informa quantas leituras cada linha representa.
+    """
+    status = df[list(STATUS_AGREGADOS.values())].to_numpy()
+    leituras = pd.DataFrame({
+        'timestamp_simulacao': df['balde_ms'],
+        'execucao_id': df['execucao_id'],
+        'device_id': df['device_id'],
+        'firmware_version': df['firmware_version'],
+        'system_status': np.array(list(STATUS_AGREGADOS), dtype=object)[status.argmax(axis=1)] if len(df) else [],
+        **{sensor: df[f'{sensor}_media'] for sensor in SENSORES}
+    })
+    tipado = tipar_dataframe(leituras, colunas)
+    tipado['leituras'] = df['leituras'].to_numpy()
+    tipado.attrs['camada'] = CAMADA_AGREGADA
+    return tipado
+
+
+def ler_execucao_arquivada(dados_path, execucao_id, colunas=COLUNAS_CANONICAS):
+    """Leituras de uma execução que saiu de dados_simulacao/ (brutas ou agregadas, conforme a camada)"""
+    entrada = ler_catalogo(dados_path).get(execucao_id)
+    if entrada is None:
+        return None
+    df = ler_particao(os.path.join(diretorio_arquivo(dados_path), entrada['particao']))
+    if not len(df):
+        return None
+    df = df[df['execucao_id'] == execucao_id]
+    if entrada['camada'] == CAMADA_AGREGADA:
+        return agregado_como_leituras(df.reset_index(drop=True), colunas)
+    tipado = tipar_dataframe(df, colunas)
+    tipado.attrs['camada'] = CAMADA_COMPACTADA
+    return tipado
+
+
+def ler_agregados(dados_path, colunas=COLUNAS_CANONICAS):
+    """Todas as execuções já agregadas pela retenção, no esquema das leituras (None se não houver).
+
+    São as execuções que saíram do histórico bruto; ``juntar_agregados`` as
+    devolve aos leitores do histórico.
+    """
+    catalogo = ler_catalogo(dados_path)
+    por_particao = {}
+    for execucao_id, entrada in catalogo.items():
+        if entrada['camada'] == CAMADA_AGREGADA:
+            por_particao.setdefault(entrada['particao'], []).append(execucao_id)
+    partes = []
+    for particao, execucoes in sorted(por_particao.items()):
+        df = ler_particao(os.path.join(diretorio_arquivo(dados_path), particao))
+        if len(df):
+            partes.append(df[df['execucao_id'].isin(execucoes)])
+    partes = [parte for parte in partes if len(parte)]
+    if not partes:
+        return None
+    return agregado_como_leituras(pd.concat(partes, ignore_index=True), colunas)
+
+
+def juntar_agregados(brutas, agregadas):
+    """Histórico bruto seguido das execuções agregadas.
+
+    A coluna ``leituras`` só existe quando há agregados: é o total de
+    leituras de cada janela agregada e fica vazia nas linhas brutas.
+    """
+    if agregadas is None or not len(agregadas):
+        return brutas
+    juntas = pd.concat([brutas, agregadas[[c for c in brutas.columns if c in agregadas.columns] + ['leituras']]],
+                       ignore_index=True)
+    return compactar_dataframe(juntas)
+
+
+def pesos_leituras(df):
+    """Quantas leituras cada linha representa (1 nas brutas, o total da janela nas agregadas)"""
+    if 'leituras' not in df.columns:
+        return pd.Series(1, index=df.index)
+    return df['leituras'].fillna(1)
+
+
+def somente_brutas(df):
+    """Só as leituras individuais: análises que dependem da cadência de 5 s não usam janelas agregadas"""
+    return df[df['leituras'].isna()] if 'leituras' in df.columns else df
+
+
+def assinatura_catalogo(dados_path):
+    """Versão do catálogo do arquivo: muda a cada execução compactada ou agregada pela retenção"""
+    return assinatura_arquivo(os.path.join(diretorio_arquivo(dados_path), ARQUIVO_CATALOGO))
+
+
+def assinatura_execucao(dados_path, execucao_id):
+    """Versão dos dados de uma execução, em qualquer camada (chave de cache dos leitores)"""
+    arquivo = os.path.join(dados_path, f'hermes_data_{execucao_id}.csv')
+    if os.path.exists(arquivo):
+        return assinatura_arquivo(arquivo)
+    entrada = ler_catalogo(dados_path).get(execucao_id)
+    if entrada is None:
+        return (None, None)
+    return (entrada['camada'],) + assinatura_arquivo(
+        localizar_particao(os.path.join(diretorio_arquivo(dados_path), entrada['particao'])) or '')
+
+
+def caminho_esbocos_arquivados(dados_path, prefixo, mes):
+    """Base (sem extensão) do JSON mensal com os esboços ou baldes arquivados, indexados por execucao_id"""
+    return os.path.join(diretorio_arquivo(dados_path), 'esbocos', f'{prefixo}{mes}.json')
+
+
+def ler_json_arquivado(caminho_base):
+    """Conteúdo de um JSON comprimido do arquivo (vazio se ele não existir)"""
+    caminho = localizar_particao(caminho_base)
+    if caminho is None:
+        return {}
+    with open(caminho, 'rb') as f:
+        conteudo = f.read()
+    if caminho.endswith(EXTENSOES['zstd']):
+        conteudo = zstandard.ZstdDecompressor().decompress(conteudo)
+    else:
+        conteudo = gzip.decompress(conteudo)
+    return json.loads(conteudo.decode('utf-8'))
+
+
+def gravar_json_arquivado(caminho_base, conteudo, compressao):
+    """Regrava um JSON comprimido do arquivo de forma atômica no formato pedido"""
+    dados = json.dumps(conteudo, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    dados = zstandard.ZstdCompressor().compress(dados) if compressao == 'zstd' else gzip.compress(dados, mtime=0)
+    anterior = localizar_particao(caminho_base)
+    caminho = caminho_base + EXTENSOES[compressao]
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    escrever_atomico(caminho, lambda f: f.write(dados))
+    if anterior is not None and anterior != caminho:
+        os.remove(anterior)
+    return caminho
+
+
+def ler_esbocos_arquivados(dados_path, prefixo, execucoes=None):
+    """Esboços (``PREFIXO_ESBOCO``) ou baldes (``PREFIXO_BALDES``) das execuções que saíram de dados_simulacao/.
+
+    Devolve ``{execucao_id: dict}`` só com as execuções encontradas; cada
+    JSON mensal é lido uma vez, com o mês de cada execução tirado do catálogo.
+    """
+    catalogo = ler_catalogo(dados_path)
+    por_mes = {}
+    for execucao_id in (catalogo if execucoes is None else execucoes):
+        entrada = catalogo.get(execucao_id)
+        if entrada is not None and entrada.get('data'):
+            por_mes.setdefault(datetime.fromisoformat(entrada['data']).strftime('%Y%m'), []).append(execucao_id)
+    encontrados = {}
+    for mes, ids in sorted(por_mes.items()):
+        arquivados = ler_json_arquivado(caminho_esbocos_arquivados(dados_path, prefixo, mes))
+        encontrados.update({execucao_id: arquivados[execucao_id] for execucao_id in ids if execucao_id in arquivados})
+    return encontrados
+
+
+def ler_tabela_arquivada(dados_path, prefixo):
+    """Linhas por execução (resumos, qualidade) já movidas para a tabela comprimida do arquivo"""
+    nome = PREFIXOS_POR_EXECUCAO.get(prefixo)
+    if nome is None:
+        return pd.DataFrame()
+    return ler_particao(os.path.join(diretorio_arquivo(dados_path), nome))
+
+
+def uso_disco(dados_path):
+    """Bytes e arquivos por camada: dados_simulacao/ (quente) e arquivo/ (compactada, agregada, logs)"""
+    uso = {}
+    for raiz, diretorios, arquivos in os.walk(dados_path):
+        relativo = os.path.relpath(raiz, dados_path).split(os.sep)
+        camada = 'quente' if relativo == ['.'] else '/'.join(relativo[:2])
+        atual = uso.setdefault(camada, {'bytes': 0, 'arquivos': 0})
+        for arquivo in arquivos:
+            atual['bytes'] += os.path.getsize(os.path.join(raiz, arquivo))
+            atual['arquivos'] += 1
+    return uso
+
+
+class GestorRetencao:
+    """Job de retenção dos dados de dados_simulacao/.
+
+    - execuções com mais de ``dias_compactar`` dias: ``hermes_data_<id>``
+      vai para a partição mensal comprimida ``arquivo/brutos/``, e
+      ``hermes_resumo_<id>``/``hermes_qualidade_<id>`` para tabelas únicas
+      comprimidas em ``arquivo/``;
+    - execuções com mais de ``dias_brutos`` dias: as leituras viram
+      agregados horários por dispositivo em ``arquivo/agregados/`` e saem do
+      histórico e das partições brutas;
+    - ``serial_output.log`` já ingerido e parado é arquivado comprimido em
+      ``arquivo/logs/``.
+
+    ``arquivo/catalogo.json`` diz em que camada está cada execução. Cada
+    passo grava o destino de forma atômica e atualiza o catálogo antes de
+    apagar a origem; repetir o job após uma queda refaz o passo sem
+    duplicar linhas. Esboços e baldes de quantis são gerados antes da
+    compactação (depois dela não haveria leituras brutas para gerá-los) e
+    saem de dados_simulacao/ para um JSON comprimido por mês em
+    ``arquivo/esbocos/``, de onde comparações e percentis continuam lendo.
+    """
+
+    def __init__(self, dados_path, dias_compactar=DIAS_COMPACTAR, dias_brutos=DIAS_BRUTOS, compressao='gzip',
+                 agora=None):
+        if compressao not in compressoes_disponiveis():
+            raise ValueError(f"Compressão indisponível: {compressao} (instale 'zstandard' para zstd)")
+        self.dados_path = dados_path
+        self.dias_compactar = dias_compactar
+        self.dias_brutos = dias_brutos
+        self.compressao = compressao
+        self.agora = agora or datetime.now()
+        self.arquivo_historico = os.path.join(dados_path, 'hermes_historico_completo.csv')
+
+    def _caminho(self, *partes):
+        return os.path.join(diretorio_arquivo(self.dados_path), *partes)
+
+    def _arquivo_execucao(self, execucao_id):
+        return os.path.join(self.dados_path, f'hermes_data_{execucao_id}.csv')
+
+    def _data(self, execucao_id, catalogo=None):
+        """Data da execução pelo identificador; sem o padrão, a do catálogo ou a do arquivo da execução"""
+        data = data_execucao(execucao_id)
+        entrada = (catalogo or {}).get(execucao_id, {})
+        if data is None and entrada.get('data'):
+            data = datetime.fromisoformat(entrada['data'])
+        if data is None and os.path.exists(self._arquivo_execucao(execucao_id)):
+            data = datetime.fromtimestamp(os.path.getmtime(self._arquivo_execucao(execucao_id)))
+        return data
+
+    def _ler_historico(self):
+        if not os.path.exists(self.arquivo_historico):
+            return pd.DataFrame(columns=COLUNAS_CANONICAS)
+        return pd.read_csv(self.arquivo_historico, dtype={'execucao_id': str})
+
+    def planejar(self):
+        """Execuções a compactar e a agregar, conforme a data de cada uma"""
+        catalogo = ler_catalogo(self.dados_path)
+        quentes = {arquivo[len('hermes_data_'):-len('.csv')] for arquivo in os.listdir(self.dados_path)
+                   if arquivo.startswith('hermes_data_') and arquivo.endswith('.csv')}
+        no_historico = set()
+        if os.path.exists(self.arquivo_historico):
+            no_historico = set(pd.read_csv(self.arquivo_historico, usecols=['execucao_id'], dtype=str)['execucao_id'])
+
+        limite_compactar = self.agora - timedelta(days=self.dias_compactar)
+        limite_brutos = self.agora - timedelta(days=self.dias_brutos)
+        plano = {'compactar': [], 'agregar': []}
+        for execucao_id in sorted(quentes | no_historico | set(catalogo)):
+            data = self._data(execucao_id, catalogo)
+            camada = catalogo.get(execucao_id, {}).get('camada')
+            if data is None:
+                continue
+            if data < limite_brutos and (camada != CAMADA_AGREGADA or execucao_id in quentes | no_historico):
+                plano['agregar'].append(execucao_id)
+            elif data < limite_compactar and execucao_id in quentes:
+                plano['compactar'].append(execucao_id)
+        return plano
+
+    def _leituras_brutas(self, execucao_id, historico=None):
+        """Leituras de uma execução na camada em que estiverem (arquivo da execução, partição ou histórico)"""
+        if os.path.exists(self._arquivo_execucao(execucao_id)):
+            return pd.read_csv(self._arquivo_execucao(execucao_id), dtype={'execucao_id': str})
+        entrada = ler_catalogo(self.dados_path).get(execucao_id)
+        if entrada is not None and entrada['camada'] == CAMADA_COMPACTADA:
+            df = ler_particao(self._caminho(entrada['particao']))
+            return df[df['execucao_id'] == execucao_id]
+        if historico is not None:
+            return historico[historico['execucao_id'] == execucao_id]
+        return pd.DataFrame()
+
+    def _esbocos_arquivados(self, execucoes):
+        """Execuções com esboço e com baldes já no arquivo mensal, por prefixo"""
+        return {prefixo: set(ler_esbocos_arquivados(self.dados_path, prefixo, execucoes)) for prefixo in PREFIXOS_ESBOCOS}
+
+    def _garantir_esbocos(self, execucao_id, df, arquivados):
+        """Gera esboço e baldes da execução se faltarem (depois dos brutos saírem, não haveria de onde gerá-los)"""
+        if not os.path.exists(caminho_esboco(self.dados_path, execucao_id)) \
+                and execucao_id not in arquivados[PREFIXO_ESBOCO]:
+            salvar_esboco(EsbocoExecucao.de_dataframe(df, execucao_id), caminho_esboco(self.dados_path, execucao_id))
+        if not os.path.exists(caminho_baldes(self.dados_path, execucao_id)) \
+                and execucao_id not in arquivados[PREFIXO_BALDES]:
+            indice = EsbocosPorBalde(LARGURA_BALDE_MS).adicionar_dataframe(df, execucao_id)
+            salvar_baldes(indice, caminho_baldes(self.dados_path, execucao_id))
+
+    def _arquivar_esbocos(self, execucoes, catalogo):
+        """Move hermes_esboco_<id>.json e hermes_baldes_<id>.json para o JSON mensal de cada um em arquivo/esbocos/"""
+        removiveis = []
+        for prefixo in PREFIXOS_ESBOCOS:
+            por_mes = {}
+            for execucao_id in execucoes:
+                caminho = os.path.join(self.dados_path, f'{prefixo}{execucao_id}.json')
+                if os.path.exists(caminho):
+                    mes = self._data(execucao_id, catalogo).strftime('%Y%m')
+                    por_mes.setdefault(mes, []).append((execucao_id, caminho))
+            for mes, itens in sorted(por_mes.items()):
+                base = caminho_esbocos_arquivados(self.dados_path, prefixo, mes)
+                arquivados = ler_json_arquivado(base)
+                for execucao_id, caminho in itens:
+                    with open(caminho, encoding='utf-8') as f:
+                        arquivados[execucao_id] = json.load(f)
+                    removiveis.append(caminho)
+                gravar_json_arquivado(base, arquivados, self.compressao)
+        return removiveis
+
+    def _arquivar_linhas_por_execucao(self, execucoes):
+        """Move hermes_resumo_<id> e hermes_qualidade_<id> para as tabelas comprimidas do arquivo"""
+        removiveis = []
+        for prefixo, nome in PREFIXOS_POR_EXECUCAO.items():
+            linhas, ids = [], []
+            for execucao_id in execucoes:
+                caminho = os.path.join(self.dados_path, f'{prefixo}{execucao_id}.csv')
+                if os.path.exists(caminho):
+                    linhas.append(pd.read_csv(caminho, dtype={'execucao_id': str}))
+                    ids.append(execucao_id)
+                    removiveis.append(caminho)
+            if linhas:
+                tabela = substituir_execucoes(ler_particao(self._caminho(nome)), pd.concat(linhas, ignore_index=True), ids)
+                gravar_particao(self._caminho(nome), tabela, self.compressao)
+        return removiveis
+
+    def _entrada(self, camada, particao, execucao_id, df, catalogo):
+        return {'camada': camada, 'particao': particao, 'registros': len(df),
+                'data': self._data(execucao_id, catalogo).isoformat(timespec='seconds')}
+
+    def compactar(self, execucoes):
+        """Junta os arquivos por execução nas partições mensais comprimidas"""
+        catalogo = ler_catalogo(self.dados_path)
+        arquivados = self._esbocos_arquivados(execucoes)
+        por_mes = {}
+        for execucao_id in execucoes:
+            por_mes.setdefault(self._data(execucao_id, catalogo).strftime('%Y%m'), []).append(execucao_id)
+
+        for mes, ids in sorted(por_mes.items()):
+            particao = os.path.join('brutos', f'hermes_dados_{mes}.csv')
+            novos = []
+            for execucao_id in ids:
+                df = self._leituras_brutas(execucao_id)
+                self._garantir_esbocos(execucao_id, df, arquivados)
+                novos.append(df)
+                catalogo[execucao_id] = self._entrada(CAMADA_COMPACTADA, particao, execucao_id, df, catalogo)
+            conteudo = substituir_execucoes(ler_particao(self._caminho(particao)), pd.concat(novos, ignore_index=True), ids)
+            gravar_particao(self._caminho(particao), conteudo, self.compressao)
+            print(f"[SUCESSO] {len(ids)} execuções compactadas em {particao}{EXTENSOES[self.compressao]}")
+
+        removiveis = self._arquivar_linhas_por_execucao(execucoes) + self._arquivar_esbocos(execucoes, catalogo)
+        gravar_catalogo(self.dados_path, catalogo)
+        for caminho in removiveis + [self._arquivo_execucao(e) for e in execucoes]:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+        return len(execucoes)
+
+    def agregar(self, execucoes):
+        """Troca as leituras brutas das execuções antigas por agregados horários em todas as camadas"""
+        if not execucoes:
+            return 0
+        catalogo = ler_catalogo(self.dados_path)
+        historico = self._ler_historico()
+        particoes_brutas = {catalogo[e]['particao'] for e in execucoes
+                            if catalogo.get(e, {}).get('camada') == CAMADA_COMPACTADA}
+        arquivados = self._esbocos_arquivados(execucoes)
+
+        por_mes = {}
+        for execucao_id in execucoes:
+            por_mes.setdefault(self._data(execucao_id, catalogo).strftime('%Y%m'), []).append(execucao_id)
+        for mes, ids in sorted(por_mes.items()):
+            particao = os.path.join('agregados', f'hermes_agregado_{mes}.csv')
+            agregados = []
+            for execucao_id in ids:
+                brutas = self._leituras_brutas(execucao_id, historico)
+                if not len(brutas):
+                    continue  # já agregada numa execução anterior do job
+                self._garantir_esbocos(execucao_id, brutas, arquivados)
+                agregados.append(agregar_leituras(brutas))
+                catalogo[execucao_id] = self._entrada(CAMADA_AGREGADA, particao, execucao_id, brutas, catalogo)
+            if agregados:
+                conteudo = substituir_execucoes(ler_particao(self._caminho(particao)),
+                                                pd.concat(agregados, ignore_index=True), ids)
+                gravar_particao(self._caminho(particao), conteudo, self.compressao)
+                print(f"[SUCESSO] {len(agregados)} execuções agregadas em {particao}{EXTENSOES[self.compressao]}")
+
+        removiveis = self._arquivar_linhas_por_execucao(execucoes) + self._arquivar_esbocos(execucoes, catalogo)
+        gravar_catalogo(self.dados_path, catalogo)
+
+        # Brutos saem do histórico, das partições e dos arquivos por execução
+        restante = historico[~historico['execucao_id'].isin(execucoes)]
+        if len(restante) < len(historico):
+            self._regravar_historico(restante)
+        for particao in sorted(particoes_brutas):
+            df = ler_particao(self._caminho(particao))
+            gravar_particao(self._caminho(particao), df[~df['execucao_id'].isin(execucoes)], self.compressao)
+        for caminho in removiveis + [self._arquivo_execucao(e) for e in execucoes]:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+        return len(execucoes)
+
+    def _regravar_historico(self, restante):
+        """Regrava o histórico sem as execuções agregadas, mantendo índice de deduplicação e armazém colunar em dia"""
+        indice = IndiceDeduplicacao(os.path.join(self.dados_path, DIRETORIO_INDICE))
+        indice_em_dia = indice.assinatura() == assinatura_arquivo(self.arquivo_historico)
+        escrever_atomico(self.arquivo_historico, lambda f: restante.to_csv(f, index=False, encoding='utf-8'))
+        nova = assinatura_arquivo(self.arquivo_historico)
+        if indice_em_dia:
+            # As chaves das leituras agregadas continuam no índice: reprocessar um log antigo não as traz de volta
+            indice.marcar(nova)
+        print(f"[SUCESSO] Histórico com {len(restante):,} leituras brutas: {self.arquivo_historico}")
+        try:
+            publicar_dataset(self.dados_path, 'historico', tipar_dataframe(restante), origem=nova)
+        except (OSError, ValueError) as e:
+            print(f"[AVISO] Histórico não publicado no armazém colunar: {e}")
+
+    def arquivar_log(self, caminho_log=None):
+        """Comprime o log serial em arquivo/logs/ se ele já foi ingerido e não está sendo gravado"""
+        caminho_log = caminho_log or os.path.join(self.dados_path, 'serial_output.log')
+        if not os.path.exists(caminho_log) or os.path.getsize(caminho_log) == 0:
+            return None
+        modificado = os.path.getmtime(caminho_log)
+        if self.agora.timestamp() - modificado < IDADE_MIN_LOG_S:
+            print("[AVISO] Log serial modificado recentemente: arquivamento adiado")
+            return None
+        concluidos = [entrada['momento'] for entrada in JournalIngestao(os.path.join(self.dados_path, ARQUIVO_JOURNAL)).entradas()
+                      if entrada.get('estado') == 'concluido']
+        if not concluidos or datetime.fromisoformat(max(concluidos)).timestamp() < modificado:
+            print("[AVISO] Log serial ainda não ingerido: arquivamento adiado")
+            return None
+
+        nome = os.path.basename(caminho_log).rsplit('.', 1)[0]
+        destino = self._caminho('logs', f"{nome}_{datetime.fromtimestamp(modificado):%Y%m%d_%H%M%S}.log"
+                                         f"{EXTENSOES[self.compressao]}")
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+
+        def comprimir(f):
+            with open(caminho_log, 'rb') as origem:
+                if self.compressao == 'zstd':
+                    with zstandard.ZstdCompressor().stream_writer(f, closefd=False) as saida:
+                        shutil.copyfileobj(origem, saida)
+                else:
+                    with gzip.GzipFile(fileobj=f, mode='wb', mtime=0) as saida:
+                        shutil.copyfileobj(origem, saida)
+
+        escrever_atomico(destino, comprimir)
+        os.remove(caminho_log)
+        print(f"[SUCESSO] Log serial arquivado: {destino}")
+        return destino
+
+    def arquivar_esbocos_restantes(self):
+        """Arquiva esboços e baldes que ficaram em dados_simulacao/ de execuções já fora dele"""
+        catalogo = ler_catalogo(self.dados_path)
+        removiveis = self._arquivar_esbocos(sorted(catalogo), catalogo)
+        for caminho in removiveis:
+            os.remove(caminho)
+        if removiveis:
+            print(f"[SUCESSO] {len(removiveis)} esboços e baldes movidos para {self._caminho('esbocos')}")
+        return len(removiveis)
+
+    def aplicar(self, simular=False, arquivar_log=True):
+        """Executa o plano de retenção; retorna o plano e o uso de disco antes e depois"""
+        antes = uso_disco(self.dados_path)
+        plano = self.planejar()
+        print(f"[HERMES] Retenção: {len(plano['compactar'])} execuções a compactar, "
+              f"{len(plano['agregar'])} a agregar (compactar > {self.dias_compactar} dias, brutos até {self.dias_brutos} dias)")
+        if not simular:
+            self.agregar(plano['agregar'])
+            self.compactar(plano['compactar'])
+            self.arquivar_esbocos_restantes()
+            if arquivar_log:
+                self.arquivar_log()
+        depois = uso_disco(self.dados_path)
+        total_antes = sum(c['bytes'] for c in antes.values())
+        total_depois = sum(c['bytes'] for c in depois.values())
+        print(f"[HERMES] Disco: {total_antes / 1024:,.0f} KB → {total_depois / 1024:,.0f} KB "
+              f"({antes.get('quente', {}).get('arquivos', 0)} → {depois.get('quente', {}).get('arquivos', 0)} "
+              f"arquivos em dados_simulacao/)")
+        return {'plano': plano, 'antes': antes, 'depois': depois}
+
+
+def main():
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Retenção em camadas dos dados da simulação Hermes Reply')
+    parser.add_argument('--dias-compactar', type=float, default=DIAS_COMPACTAR,
+                        help='execuções mais antigas vão para as partições mensais comprimidas')
+    parser.add_argument('--dias-brutos', type=float, default=DIAS_BRUTOS,
+                        help='leituras mais antigas viram agregados horários')
+    parser.add_argument('--compressao', choices=list(EXTENSOES), default='gzip')
+    parser.add_argument('--sem-log', action='store_true', help='não arquiva o serial_output.log')
+    parser.add_argument('--simular', action='store_true', help='só mostra o plano, sem alterar arquivos')
+    parser.add_argument('--dados', default=os.path.normpath(os.path.join(base_path, '..', 'dados_simulacao')))
+    args = parser.parse_args()
+
+    if args.dias_brutos < args.dias_compactar:
+        parser.error('--dias-brutos deve ser maior ou igual a --dias-compactar')
+    try:
+        gestor = GestorRetencao(args.dados, args.dias_compactar, args.dias_brutos, args.compressao)
+    except ValueError as e:
+        parser.error(str(e))
+    resultado = gestor.aplicar(simular=args.simular, arquivar_log=not args.sem_log)
+    for acao, execucoes in resultado['plano'].items():
+        if execucoes:
+            print(f"  {acao}: {', '.join(execucoes)}")
+
+
+if __name__ == "__main__":
+    main()
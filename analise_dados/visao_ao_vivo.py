@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Visão ao Vivo Hermes Reply
+Painel reexecutado por fragmento a cada intervalo com o delta do log serial
+"""
+
+import os
+
+import streamlit as st
+from esbocos import SENSORES
+from ao_vivo import FeedAoVivo
+from painel_comum import exibir_grafico, exibir_metricas_principais, exibir_resumo_inteligente
+
+def construir_grafico_ao_vivo(df):
+    """Constrói os quatro sensores da janela ao vivo, uma linha por dispositivo"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('🌡️ Temperatura', '💧 Umidade', '💡 Luminosidade', '📳 Vibração')
+    )
+    cores = px.colors.qualitative.Plotly
+    for indice, (dispositivo, df_dispositivo) in enumerate(df.groupby('device_id', sort=True)):
+        cor = cores[indice % len(cores)]
+        for posicao, sensor in enumerate(SENSORES):
+            fig.add_trace(
+                go.Scatter(
+                    x=df_dispositivo['timestamp_simulacao'],
+                    y=df_dispositivo[sensor],
+                    name=str(dispositivo),
+                    legendgroup=str(dispositivo),
+                    showlegend=posicao == 0,
+                    line=dict(color=cor, width=2)
+                ),
+                row=posicao // 2 + 1, col=posicao % 2 + 1
+            )
+    
+    fig.update_layout(
+        height=600,
+        title_text="📡 Janela ao Vivo por Dispositivo",
+        title_font_size=20,
+        uirevision='ao_vivo',  # mantém zoom e legenda entre atualizações
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    fig.update_xaxes(gridcolor='rgba(128,128,128,0.2)', showgrid=True)
+    fig.update_yaxes(gridcolor='rgba(128,128,128,0.2)', showgrid=True)
+    return fig
+
+@st.cache_resource
+def obter_feed_ao_vivo(caminho_log):
+    """Feed de leituras novas compartilhado pelas sessões (o log é lido uma vez por atualização)"""
+    return FeedAoVivo(caminho_log)
+
+def exibir_painel_ao_vivo(feed):
+    """Aplica o delta do feed e exibe métricas, contadores de status e a janela por dispositivo"""
+    epoca, seq = feed.sondar()
+    metricas, resumo, df_janela = feed.derivado(
+        'painel', lambda janela: (janela.metricas_principais(), janela.resumo_inteligente(), janela.dataframe())
+    )
+    
+    if not metricas['total_registros']:
+        st.info("ℹ️ Aguardando leituras da simulação em dados_simulacao/serial_output.log...")
+        return
+    
+    # Contagens exibidas na atualização anterior desta sessão, para mostrar só o delta
+    anterior = st.session_state.get('ao_vivo_anterior')
+    if anterior is None or anterior['epoca'] != epoca:
+        anterior = {'epoca': epoca, 'seq': seq, 'status': {}}
+    novas = seq - anterior['seq']
+    
+    exibir_metricas_principais(df_janela, metricas)
+    exibir_resumo_inteligente(df_janela, resumo)
+    
+    status_counts = resumo['status_counts']
+    colunas = st.columns(max(1, len(status_counts)))
+    for coluna, (status, contagem) in zip(colunas, status_counts.items()):
+        with coluna:
+            st.metric(f"🚦 {status}", f"{int(contagem):,}", delta=int(contagem) - anterior['status'].get(status, int(contagem)) or None)
+    
+    fig = feed.derivado('grafico', lambda janela: construir_grafico_ao_vivo(df_janela))
+    exibir_grafico(fig, 'ao_vivo')
+    
+    ultima = feed.ultima_leitura.strftime('%H:%M:%S') if feed.ultima_leitura else '-'
+    st.caption(
+        f"{novas:,} leituras novas desde a última atualização · última às {ultima} · "
+        f"janela de {feed.capacidade:,} leituras por dispositivo ({df_janela['device_id'].nunique()} dispositivos)"
+    )
+    st.session_state.ao_vivo_anterior = {'epoca': epoca, 'seq': seq, 'status': {s: int(c) for s, c in status_counts.items()}}
+
+def exibir_modo(analytics, perfil):
+    """Modo ao vivo: o painel é reexecutado sozinho a cada intervalo, sem recarregar a página"""
+    st.markdown("## 📡 Monitoramento ao Vivo")
+    intervalo = st.sidebar.select_slider(
+        "⏱️ Atualizar a cada",
+        options=[1, 2, 5, 10, 30],
+        value=2,
+        format_func=lambda segundos: f"{segundos}s",
+        help="Cada atualização aplica apenas as leituras novas do log serial"
+    )
+    feed = obter_feed_ao_vivo(os.path.join(analytics.dados_path, 'serial_output.log'))
+    
+    fragmento = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+    if fragmento is not None:
+        fragmento(exibir_painel_ao_vivo, run_every=intervalo)(feed)
+    else:
+        # Streamlit sem fragmentos: atualização manual
+        exibir_painel_ao_vivo(feed)
+        st.button("🔄 Atualizar")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Visão de Execução Específica Hermes Reply
+Painel dos quatro sensores e timeline de status de uma execução
+"""
+
+import streamlit as st
+from renderizacao import impressao_digital
+from painel_comum import CORES_TEMA, exibir_grafico, obter_cache_secoes
+
+def construir_painel_execucao(df):
+    """Constrói painel com os quatro sensores ao longo da execução"""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('🌡️ Temperatura', '💧 Umidade', '💡 Luminosidade', '📳 Vibração'),
+        vertical_spacing=0.1,
+        horizontal_spacing=0.1
+    )
+    
+    # Cores modernas para cada sensor
+    cores = [CORES_TEMA['primaria'], CORES_TEMA['secundaria'], CORES_TEMA['sucesso'], CORES_TEMA['alerta']]
+    
+    fig.add_trace(
+        go.Scatter(
+            x=df['timestamp_simulacao'], 
+            y=df['temperatura'], 
+            name='Temperatura',
+            line=dict(color=cores[0], width=3)
+        ),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=df['timestamp_simulacao'], 
+            y=df['umidade'], 
+            name='Umidade',
+            line=dict(color=cores[1], width=3)
+        ),
+        row=1, col=2
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=df['timestamp_simulacao'], 
+            y=df['luminosidade'], 
+            name='Luminosidade',
+            line=dict(color=cores[2], width=3)
+        ),
+        row=2, col=1
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=df['timestamp_simulacao'], 
+            y=df['vibracao'], 
+            name='Vibração',
+            line=dict(color=cores[3], width=3)
+        ),
+        row=2, col=2
+    )
+    
+    fig.update_layout(
+        height=600, 
+        title_text="📊 Sensores ao Longo da Execução",
+        title_font_size=20,
+        showlegend=False,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    
+    # Atualizar eixos X para todas as subplots
+    for i in range(1, 3):
+        for j in range(1, 3):
+            fig.update_xaxes(
+                gridcolor='rgba(128,128,128,0.2)',
+                showgrid=True,
+                row=i, col=j
+            )
+            fig.update_yaxes(
+                gridcolor='rgba(128,128,128,0.2)',
+                showgrid=True,
+                row=i, col=j
+            )
+    
+    return fig
+
+def construir_timeline_status(df):
+    """Constrói timeline de evolução do status do sistema"""
+    import plotly.express as px
+
+    fig_status = px.scatter(
+        df, 
+        x='timestamp_simulacao', 
+        y='system_status',
+        color='system_status',
+        title="📈 Evolução do Status do Sistema",
+        color_discrete_map={
+            'NORMAL': '#2ecc71',
+            'ATENÇÃO': '#f39c12', 
+            'ATENCAO': '#f39c12',
+            'CRÍTICO': '#e74c3c',
+            'CRITICO': '#e74c3c'
+        }
+    )
+    fig_status.update_layout(
+        title_font_size=20,
+        font=dict(family="Arial, sans-serif", size=12),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    fig_status.update_xaxes(gridcolor='rgba(128,128,128,0.2)', showgrid=True)
+    fig_status.update_yaxes(gridcolor='rgba(128,128,128,0.2)', showgrid=True)
+    return fig_status
+
+def exibir_modo(analytics, perfil):
+    """Modo Execução Específica: métricas, sensores e status da execução selecionada"""
+    execucoes = analytics.listar_execucoes_disponiveis()
+    
+    if execucoes:
+        execucao_selecionada = st.sidebar.selectbox(
+            "📅 Selecionar Execução", 
+            execucoes,
+            help="Escolha uma execução específica para análise detalhada"
+        )
+        
+        df = perfil.medir('carregar_execucao_especifica', analytics.carregar_execucao_especifica, execucao_selecionada)
+        
+        if df is not None:
+            st.success(f"✅ Execução {execucao_selecionada} carregada: {len(df):,} registros")
+            
+            # Métricas da execução
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric("📊 Registros", f"{len(df):,}")
+            with col2:
+                duracao = (df['timestamp_simulacao'].max() - df['timestamp_simulacao'].min()).total_seconds()
+                st.metric("⏱️ Duração", f"{duracao:.1f}s")
+            with col3:
+                st.metric("🌡️ Temp. Média", f"{df['temperatura'].mean():.1f}°C")
+            with col4:
+                st.metric("💧 Umidade Média", f"{df['umidade'].mean():.1f}%")
+            
+            # Análise da execução
+            st.markdown("## 📈 Análise da Execução")
+            impressao_execucao = impressao_digital(execucao_selecionada, df)
+            
+            fig = obter_cache_secoes().obter(
+                'painel_execucao', impressao_execucao,
+                lambda: construir_painel_execucao(df)
+            )
+            exibir_grafico(fig, 'painel_execucao')
+            
+            # Timeline de status
+            st.markdown("## 🚨 Timeline de Status")
+            fig_status = obter_cache_secoes().obter(
+                'timeline_status', impressao_execucao,
+                lambda: construir_timeline_status(df)
+            )
+            exibir_grafico(fig_status, 'timeline_status')
+            
+            # Dados da execução
+            with st.expander("📋 Dados da Execução", expanded=False):
+                st.dataframe(df, use_container_width=True)
+    else:
+        st.warning("⚠️ Nenhuma execução encontrada. Execute uma simulação primeiro.")
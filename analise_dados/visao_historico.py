@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Visão de Dados Históricos Hermes Reply
+Filtros, análise temporal, percentis, status e explorador paginado do histórico completo
+"""
+
+import importlib
+
+import streamlit as st
+import numpy as np
+import pandas as pd
+from renderizacao import impressao_digital
+from esbocos import SENSORES
+from quantis_sensores import ConsultaQuantis
+from qualidade_dados import INTERVALO_LEITURA_MS
+from correlacao_sensores import SEPARACAO_MAXIMA, MotorCorrelacao, amostrar_quadros
+from retencao import pesos_leituras, somente_brutas
+from painel_comum import (
+    CORES_TEMA, exibir_alerta_cognitivo, exibir_grafico, exibir_metricas_principais,
+    exibir_resumo_inteligente, obter_renderizador
+)
+
+# === SEÇÕES DO MODO HISTÓRICO (renderizadas sob demanda) ===
+SECOES_HISTORICO = ["📈 Análise Temporal", "📐 Percentis dos Sensores", "🚨 Análise de Status",
+                    "🔗 Correlações entre Sensores", "🤖 Machine Learning"]
+
+def construir_grafico_sensor(analytics, df, coluna, titulo, cor):
+    """Constrói gráfico temporal de um sensor"""
+    fig = analytics.criar_grafico_moderno(
+        df, 
+        'timestamp_simulacao', 
+        coluna,
+        tipo='line',
+        titulo=titulo
+    )
+    if 'execucao_id' in df.columns:
+        fig.update_traces(line=dict(color=cor))
+    return fig
+
+def construir_grafico_status(df):
+    """Constrói gráfico de pizza da distribuição de status"""
+    import plotly.express as px
+
+    # Categorias sem leituras no filtro ficam fora da pizza; janelas agregadas pesam pelo total de leituras
+    status_counts = pesos_leituras(df).groupby(df['system_status'], observed=True).sum()
+    status_counts = status_counts[status_counts > 0]
+    fig_status = px.pie(
+        values=status_counts.values,
+        names=status_counts.index,
+        title="📊 Distribuição de Status",
+        color_discrete_sequence=['#2ecc71', '#f39c12', '#e74c3c']
+    )
+    fig_status.update_layout(
+        title_font_size=20,
+        font=dict(family="Arial, sans-serif", size=12),
+        showlegend=True
+    )
+    return fig_status
+
+def construir_matriz_correlacao(df):
+    """Constrói heatmap da matriz de correlação dos sensores"""
+    import plotly.express as px
+
+    numeric_cols = ['temperatura', 'umidade', 'luminosidade', 'vibracao']
+    corr_matrix = df[numeric_cols].corr()
+    
+    fig_corr = px.imshow(
+        corr_matrix,
+        title="🔗 Matriz de Correlação dos Sensores",
+        color_continuous_scale="RdBu",
+        aspect="auto"
+    )
+    fig_corr.update_layout(
+        title_font_size=20,
+        font=dict(family="Arial, sans-serif", size=12)
+    )
+    return fig_corr
+
+def construir_animacao_correlacao(correlacoes, rotulos, titulo, rotulo_quadro, inicial=0):
+    """Heatmap animado de uma pilha de matrizes de correlação (um quadro por defasagem ou janela)"""
+    import plotly.express as px
+
+    fig = px.imshow(
+        correlacoes,
+        animation_frame=0,
+        x=SENSORES,
+        y=SENSORES,
+        zmin=-1,
+        zmax=1,
+        color_continuous_scale="RdBu_r",
+        text_auto='.2f',
+        aspect="auto",
+        title=titulo
+    )
+    # Rótulos do controle deslizante com a defasagem/instante de cada quadro, começando no quadro inicial
+    passos = fig.layout.sliders[0].steps
+    for passo, rotulo in zip(passos, rotulos):
+        passo.label = rotulo
+    fig.layout.sliders[0].currentvalue.prefix = f"{rotulo_quadro}: "
+    fig.layout.sliders[0].active = inicial
+    fig.data[0].z = fig.frames[inicial].data[0].z
+    fig.update_layout(
+        title_font_size=20,
+        font=dict(family="Arial, sans-serif", size=12)
+    )
+    return fig
+
+def construir_animacao_defasagem(motor, max_defasagem, dispositivo):
+    """Heatmap animado da correlação cruzada: quadro k mostra corr(linha(t), coluna(t + k))"""
+    resultado = motor.defasada(max_defasagem, dispositivo)
+    zero = len(resultado['defasagens']) // 2
+    quadros = amostrar_quadros(len(resultado['defasagens']), incluir=zero)
+    segundos = resultado['defasagens'][quadros] * motor.intervalo_ms / 1000
+    return construir_animacao_correlacao(
+        resultado['correlacoes'][quadros],
+        [f"{s:+.0f}s" for s in segundos],
+        "⏱️ Correlação Defasada entre Sensores",
+        "Defasagem",
+        inicial=int(np.searchsorted(quadros, zero))
+    )
+
+def construir_animacao_movel(motor, dispositivo, janela):
+    """Heatmap animado da correlação em janelas móveis ao longo do tempo"""
+    resultado = motor.movel(dispositivo, janela)
+    return construir_animacao_correlacao(
+        resultado['correlacoes'],
+        [instante.strftime('%d/%m %H:%M:%S') for instante in resultado['instantes']],
+        f"🎞️ Correlação Móvel ({janela} leituras) — {dispositivo}",
+        "Fim da janela"
+    )
+
+def construir_evolucao_pares(motor, dispositivo, janela):
+    """Linhas da correlação móvel de cada par de sensores ao longo do tempo"""
+    import plotly.express as px
+
+    resultado = motor.movel(dispositivo, janela)
+    pares = {}
+    for i in range(len(SENSORES)):
+        for j in range(i + 1, len(SENSORES)):
+            pares[f"{SENSORES[i]} × {SENSORES[j]}"] = resultado['correlacoes'][:, i, j]
+    df_pares = pd.DataFrame(pares, index=resultado['instantes']).rename_axis('instante').reset_index()
+    fig = px.line(
+        df_pares.melt(id_vars='instante', var_name='par', value_name='correlacao'),
+        x='instante',
+        y='correlacao',
+        color='par',
+        title="📉 Correlação Móvel por Par de Sensores"
+    )
+    fig.update_yaxes(range=[-1, 1])
+    fig.update_layout(
+        title_font_size=20,
+        font=dict(family="Arial, sans-serif", size=12)
+    )
+    return fig
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def obter_motor_correlacao(impressao, _df):
+    """Motor de correlação compartilhado pelas sessões e reruns com o mesmo filtro (resultados memorizados)"""
+    return MotorCorrelacao(_df)
+
+def exibir_correlacoes_sensores(df, impressao, renderizador):
+    """Exibe correlações defasadas e móveis entre os sensores, por dispositivo"""
+    st.markdown("## 🔗 Correlações entre Sensores")
+    
+    motor = obter_motor_correlacao(impressao, df)
+    if not motor.dispositivos:
+        st.info("Sem leituras no filtro atual para calcular correlações.")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        opcoes = ["Todos (dentro de cada dispositivo)"] + motor.dispositivos
+        escolha = st.selectbox("📟 Dispositivo", opcoes, key="correlacao_dispositivo")
+        dispositivo = None if escolha == opcoes[0] else escolha
+    with col2:
+        max_defasagem = st.slider(
+            "⏱️ Defasagem máxima (leituras)", 1, SEPARACAO_MAXIMA - 1, 60,
+            key="correlacao_defasagem",
+            help=f"Uma leitura a cada {INTERVALO_LEITURA_MS // 1000}s"
+        )
+    with col3:
+        janela = st.slider(
+            "🪟 Janela móvel (leituras)", 10, SEPARACAO_MAXIMA, 120,
+            key="correlacao_janela",
+            help="Só vale para um dispositivo específico"
+        )
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig_defasagem = renderizador.figura(
+            'correlacao_defasada', impressao_digital(impressao, dispositivo, max_defasagem),
+            lambda: construir_animacao_defasagem(motor, max_defasagem, dispositivo)
+        )
+        exibir_grafico(fig_defasagem, 'correlacao_defasada')
+    
+    with col2:
+        picos = motor.picos_defasagem(max_defasagem, dispositivo)
+        st.dataframe(picos.round(3), use_container_width=True, hide_index=True)
+        st.caption(
+            "Defasagem de maior |correlação| por par: positiva indica que sensor_a antecede sensor_b. "
+            "Lacunas longas e trocas de dispositivo nunca entram no mesmo par de leituras."
+        )
+    
+    if dispositivo is None:
+        st.caption("Selecione um dispositivo para ver a correlação móvel ao longo do tempo.")
+        return
+    
+    if len(motor.movel(dispositivo, janela)['instantes']) == 0:
+        st.info(f"{dispositivo} não tem janelas de {janela} leituras com dados suficientes para a correlação móvel.")
+        return
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig_movel = renderizador.figura(
+            'correlacao_movel', impressao_digital(impressao, dispositivo, janela),
+            lambda: construir_animacao_movel(motor, dispositivo, janela)
+        )
+        exibir_grafico(fig_movel, 'correlacao_movel')
+    
+    with col2:
+        fig_pares = renderizador.figura(
+            'correlacao_pares', impressao_digital(impressao, dispositivo, janela),
+            lambda: construir_evolucao_pares(motor, dispositivo, janela)
+        )
+        exibir_grafico(fig_pares, 'correlacao_pares')
+
+@st.cache_resource
+def obter_consulta_quantis(dados_path):
+    """Consulta de percentis compartilhada pelas sessões"""
+    return ConsultaQuantis(dados_path)
+
+def exibir_percentis_sensores(analytics, df, execucoes_selecionadas, data_range):
+    """Exibe p50/p95/p99 dos sensores para o período, execuções e dispositivos selecionados"""
+    st.markdown("## 📐 Percentis dos Sensores")
+    
+    dispositivos = st.multiselect(
+        "📟 Dispositivos",
+        sorted(df['device_id'].dropna().unique()),
+        help="Vazio considera todos os dispositivos"
+    )
+    
+    filtros = {
+        'execucoes': list(execucoes_selecionadas) or None,
+        'dispositivos': dispositivos or None
+    }
+    if len(data_range) == 2:
+        filtros['inicio_ms'] = pd.Timestamp(data_range[0]).value // 10**6
+        filtros['fim_ms'] = (pd.Timestamp(data_range[1]) + pd.Timedelta(days=1)).value // 10**6 - 1
+    
+    tabela = obter_consulta_quantis(analytics.dados_path).tabela_percentis(SENSORES, **filtros)
+    st.dataframe(tabela, use_container_width=True, hide_index=True)
+    st.caption("Percentis aproximados (t-digest) por balde de 1h; o filtro de status não se aplica a esta tabela.")
+
+def exibir_dados_paginados(consulta, mascara):
+    """Exibe explorador paginado que busca apenas a página visível"""
+    # Carregamento sob demanda: nada é serializado enquanto a tabela não for aberta
+    if not st.toggle("📂 Carregar tabela", key="carregar_dados_detalhados",
+                     help="Busca somente a página visível dos dados filtrados"):
+        st.caption(f"{consulta.contar(mascara):,} registros disponíveis")
+        return
+    
+    col1, col2, col3 = st.columns([1, 1, 2])
+    
+    with col1:
+        tamanho_pagina = st.selectbox("Linhas por página", [50, 100, 250, 500], key="tamanho_pagina_dados")
+    with col2:
+        ordem = st.selectbox("Ordem", ["⬇️ Mais recentes", "⬆️ Mais antigos"], key="ordem_dados")
+    
+    total_paginas = consulta.total_paginas(tamanho_pagina, mascara)
+    
+    with col3:
+        pagina = st.number_input(
+            f"Página (de {total_paginas:,})",
+            min_value=1,
+            max_value=total_paginas,
+            value=1,
+            step=1,
+            key="pagina_dados"
+        )
+    
+    df_pagina = consulta.obter_pagina(
+        int(pagina),
+        tamanho_pagina,
+        mascara=mascara,
+        ascendente=(ordem == "⬆️ Mais antigos")
+    )
+    st.dataframe(df_pagina, use_container_width=True, hide_index=True)
+    st.caption(f"Página {int(pagina):,} de {total_paginas:,} · {consulta.contar(mascara):,} registros filtrados")
+
+def exibir_modo(analytics, perfil):
+    """Modo Dados Históricos Completos: filtros na barra lateral e seções sob demanda"""
+    df = perfil.medir('carregar_dados_historicos', analytics.carregar_dados_historicos)
+    if df is not None and not len(df):
+        st.info("ℹ️ Nenhuma leitura no histórico. Execute uma simulação primeiro.")
+        return
+    
+    if df is not None:
+        exibir_alerta_cognitivo("success", "Dados Carregados", 
+            f"Sistema carregou {len(df):,} registros de {df['execucao_id'].nunique()} execuções com sucesso")
+        if 'leituras' in df.columns:
+            agregadas = df.loc[df['leituras'].notna(), 'execucao_id'].nunique()
+            st.caption(f"ℹ️ {agregadas} execuções antigas foram agregadas pela retenção e entram como médias horárias "
+                       "por dispositivo. Correlações e Machine Learning usam só as leituras brutas.")
+        
+        # Resumo inteligente para reduzir carga cognitiva
+        with perfil.etapa('resumo_inteligente'):
+            exibir_resumo_inteligente(df)
+        
+        # Filtros avançados
+        with st.sidebar.expander("🔧 Filtros Avançados", expanded=True):
+            execucoes_disponiveis = df['execucao_id'].unique().tolist()
+            execucoes_selecionadas = st.multiselect(
+                "📅 Execuções",
+                execucoes_disponiveis,
+                default=execucoes_disponiveis[-3:] if len(execucoes_disponiveis) > 3 else execucoes_disponiveis,
+                help="Selecione as execuções para análise"
+            )
+            
+            status_selecionados = st.multiselect(
+                "🚨 Status do Sistema",
+                df['system_status'].unique().tolist(),
+                default=df['system_status'].unique().tolist(),
+                help="Filtre por status específicos"
+            )
+            
+            # Filtro de data
+            data_min = df['timestamp_simulacao'].min().date()
+            data_max = df['timestamp_simulacao'].max().date()
+            data_range = st.date_input(
+                "📅 Período",
+                value=(data_min, data_max),
+                min_value=data_min,
+                max_value=data_max,
+                help="Selecione o período para análise"
+            )
+        
+        # Aplicar filtros (máscara vetorizada do motor de consulta)
+        with perfil.etapa('indexar_consulta', 'filtro'):
+            consulta = analytics.obter_consulta_historico(df)
+        with perfil.etapa('filtrar_dados', 'filtro') as registro:
+            mascara_filtros = consulta.criar_mascara(
+                execucoes=execucoes_selecionadas,
+                status=status_selecionados,
+                periodo=data_range
+            )
+            df_filtrado = df[mascara_filtros]
+            df_brutas = somente_brutas(df_filtrado)
+            registro['linhas'] = len(df_filtrado)
+        
+        # Métricas principais
+        with perfil.etapa('metricas_principais'):
+            exibir_metricas_principais(df_filtrado)
+        
+        # Seções renderizadas sob demanda, com figuras em cache por impressão digital
+        with perfil.etapa('impressao_filtros', 'filtro'):
+            impressao_filtros = impressao_digital(consulta.assinatura, mascara_filtros)
+        renderizador = obter_renderizador(SECOES_HISTORICO)
+        
+        # Análise temporal
+        if renderizador.visivel("📈 Análise Temporal"):
+            st.markdown("## 📈 Análise Temporal dos Sensores")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                fig_temp = renderizador.figura(
+                    'temperatura', impressao_filtros,
+                    lambda: construir_grafico_sensor(
+                        analytics, df_filtrado, 'temperatura',
+                        "🌡️ Temperatura ao Longo do Tempo", CORES_TEMA['primaria']
+                    )
+                )
+                exibir_grafico(fig_temp, 'temperatura')
+            
+            with col2:
+                fig_umidade = renderizador.figura(
+                    'umidade', impressao_filtros,
+                    lambda: construir_grafico_sensor(
+                        analytics, df_filtrado, 'umidade',
+                        "💧 Umidade ao Longo do Tempo", CORES_TEMA['secundaria']
+                    )
+                )
+                exibir_grafico(fig_umidade, 'umidade')
+        
+        # Percentis dos sensores (esboços por balde, sem reler dados brutos)
+        if renderizador.visivel("📐 Percentis dos Sensores"):
+            with perfil.etapa('percentis_sensores'):
+                exibir_percentis_sensores(analytics, df, execucoes_selecionadas, data_range)
+        
+        # Análise de status
+        if renderizador.visivel("🚨 Análise de Status"):
+            st.markdown("## 🚨 Análise de Status do Sistema")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                fig_status = renderizador.figura(
+                    'status', impressao_filtros,
+                    lambda: construir_grafico_status(df_filtrado)
+                )
+                exibir_grafico(fig_status, 'status')
+            
+            with col2:
+                fig_corr = renderizador.figura(
+                    'correlacao', impressao_filtros,
+                    lambda: construir_matriz_correlacao(df_brutas)
+                )
+                exibir_grafico(fig_corr, 'correlacao')
+        
+        # Correlações móveis e defasadas entre sensores
+        if renderizador.visivel("🔗 Correlações entre Sensores"):
+            with perfil.etapa('correlacoes_sensores'):
+                if len(df_brutas):
+                    exibir_correlacoes_sensores(df_brutas, impressao_filtros, renderizador)
+                else:
+                    st.info("ℹ️ Só há execuções agregadas no filtro: as correlações precisam das leituras brutas")
+        
+        # Machine Learning Section
+        if renderizador.visivel("🤖 Machine Learning"):
+            # Módulo de ML (e o scikit-learn) só é importado quando a seção está visível
+            with perfil.etapa('importar_visao_ml', 'carga'):
+                visao_ml = importlib.import_module('visao_ml')
+            with perfil.etapa('machine_learning'):
+                if len(df_brutas):
+                    visao_ml.exibir_secao_ml(analytics, df_brutas, renderizador, impressao_filtros)
+                else:
+                    st.info("ℹ️ Só há execuções agregadas no filtro: o modelo é treinado com leituras brutas")
+        
+        # Dados detalhados
+        with st.expander("📋 Dados Detalhados", expanded=False):
+            with perfil.etapa('dados_paginados'):
+                exibir_dados_paginados(consulta, mascara_filtros)
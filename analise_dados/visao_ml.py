@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Visão de Machine Learning Hermes Reply
+Treino do modelo de predição de status e resultados (importada só quando a seção está visível)
+"""
+
+import streamlit as st
+import numpy as np
+import pandas as pd
+from renderizacao import impressao_digital
+from hermes_analytics import FEATURES_MODELO
+from explicabilidade_modelo import explicacao_leitura, explicar_modelo
+from monitor_deriva import JANELA_EXECUCOES, PSI_MODERADO, PSI_SIGNIFICATIVO, tabela_execucoes
+from painel_comum import exibir_alerta_cognitivo, exibir_grafico, exibir_indicador_progresso
+
+# Leituras oferecidas no seletor de justificativas (as mais recentes)
+MAX_OPCOES_LEITURA = 200
+
+def construir_grafico_importancia(feature_importance):
+    """Constrói gráfico de barras da importância das features"""
+    import plotly.express as px
+
+    importance_df = pd.DataFrame(
+        list(feature_importance.items()),
+        columns=['Sensor', 'Importância']
+    ).sort_values('Importância', ascending=True)
+    
+    fig_importance = px.bar(
+        importance_df,
+        x='Importância',
+        y='Sensor',
+        orientation='h',
+        title="🎯 Importância dos Sensores",
+        color='Importância',
+        color_continuous_scale='viridis'
+    )
+    fig_importance.update_layout(
+        title_font_size=18,
+        font=dict(family="Arial, sans-serif", size=12),
+        showlegend=False
+    )
+    return fig_importance
+
+def construir_grafico_permutacao(permutacao):
+    """Constrói gráfico de barras da queda de acurácia ao embaralhar cada sensor"""
+    import plotly.express as px
+
+    fig = px.bar(
+        permutacao.sort_values('queda_acuracia'),
+        x='queda_acuracia',
+        y='feature',
+        error_x='desvio',
+        orientation='h',
+        title="🔀 Importância por Permutação",
+        labels={'queda_acuracia': 'Queda de acurácia', 'feature': 'Sensor'}
+    )
+    fig.update_layout(
+        title_font_size=18,
+        font=dict(family="Arial, sans-serif", size=12)
+    )
+    return fig
+
+def construir_grafico_atribuicao_media(atribuicao_media):
+    """Constrói barras agrupadas da atribuição média absoluta de cada sensor por classe"""
+    import plotly.express as px
+
+    df_atribuicao = atribuicao_media.rename_axis('Sensor').reset_index().melt(
+        id_vars='Sensor', var_name='Classe', value_name='Atribuição média |Δp|'
+    )
+    fig = px.bar(
+        df_atribuicao,
+        x='Sensor',
+        y='Atribuição média |Δp|',
+        color='Classe',
+        barmode='group',
+        title="🧩 Atribuição Média por Classe",
+        color_discrete_sequence=['#f39c12', '#e74c3c', '#2ecc71']
+    )
+    fig.update_layout(
+        title_font_size=18,
+        font=dict(family="Arial, sans-serif", size=12)
+    )
+    return fig
+
+def construir_grafico_leitura(tabela, classe):
+    """Constrói barras da contribuição de cada sensor para a probabilidade da classe prevista"""
+    import plotly.express as px
+
+    fig = px.bar(
+        tabela.iloc[::-1],
+        x='atribuicao',
+        y='feature',
+        orientation='h',
+        color='atribuicao',
+        color_continuous_scale='RdBu_r',
+        color_continuous_midpoint=0,
+        hover_data=['valor'],
+        title=f"🧾 Por que {classe}?",
+        labels={'atribuicao': f'Contribuição para P({classe})', 'feature': 'Sensor'}
+    )
+    fig.update_layout(
+        title_font_size=18,
+        font=dict(family="Arial, sans-serif", size=12),
+        coloraxis_showscale=False
+    )
+    return fig
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def obter_explicacoes(versao_modelo, impressao_dados, _modelo, _classes, _df):
+    """Explicações compartilhadas pelas sessões e reruns: recalculadas só com outro modelo ou outros dados"""
+    return explicar_modelo(_modelo, _classes, _df, FEATURES_MODELO)
+
+def exibir_explicabilidade(df_filtrado, renderizador, impressao):
+    """Exibe importância por permutação e a justificativa de cada previsão recente"""
+    st.markdown("### 🔍 Explicabilidade do Modelo")
+    
+    if not st.toggle("🧮 Calcular explicações", key="calcular_explicacoes",
+                     help="Importância por permutação e atribuição por leitura, em cache para este modelo e filtro"):
+        st.caption("Explica as leituras mais recentes do filtro atual e quanto cada sensor pesa nas previsões.")
+        return
+    
+    versao = st.session_state.metricas_modelo.get('versao')
+    with st.spinner("🔄 Calculando explicações do modelo..."):
+        explicacoes = obter_explicacoes(
+            versao, impressao, st.session_state.modelo, list(st.session_state.label_encoder.classes_), df_filtrado
+        )
+    impressao_explicacoes = impressao_digital(versao, impressao)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if explicacoes['permutacao'] is not None:
+            fig_permutacao = renderizador.figura(
+                'importancia_permutacao', impressao_explicacoes,
+                lambda: construir_grafico_permutacao(explicacoes['permutacao'])
+            )
+            exibir_grafico(fig_permutacao, 'importancia_permutacao')
+    
+    with col2:
+        fig_atribuicao = renderizador.figura(
+            'atribuicao_media', impressao_explicacoes,
+            lambda: construir_grafico_atribuicao_media(explicacoes['atribuicao_media'])
+        )
+        exibir_grafico(fig_atribuicao, 'atribuicao_media')
+    
+    # Justificativa de uma previsão: alertas previstos primeiro, mais recentes no topo
+    leituras = explicacoes['leituras']
+    previstos = explicacoes['previstos']
+    alertas = np.flatnonzero(previstos != 'NORMAL')
+    posicoes = (alertas if len(alertas) else np.arange(len(previstos)))[::-1][:MAX_OPCOES_LEITURA]
+    if len(posicoes) == 0:
+        return
+    
+    def rotulo(posicao):
+        leitura = leituras.iloc[posicao]
+        partes = [str(leitura.get('device_id', '')), str(leitura.get('timestamp_simulacao', ''))[:19],
+                  f"previsto {previstos[posicao]}"]
+        if 'system_status' in leitura:
+            partes.append(f"firmware {leitura['system_status']}")
+        return " · ".join(partes)
+    
+    posicao = st.selectbox("🧾 Leitura a justificar", posicoes, format_func=rotulo, key="leitura_explicada")
+    classe = previstos[posicao]
+    tabela = explicacao_leitura(explicacoes, posicao)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        exibir_grafico(construir_grafico_leitura(tabela, classe), 'explicacao_leitura')
+    
+    with col2:
+        coluna = explicacoes['classes'].index(classe)
+        st.dataframe(tabela.round(4), use_container_width=True, hide_index=True)
+        st.caption(
+            f"P({classe}) parte de {explicacoes['vies'][coluna]:.1%} (média do treino) e chega a "
+            f"{explicacoes['probabilidades'][posicao, coluna]:.1%} somando a contribuição de cada sensor "
+            "ao longo dos caminhos de decisão das árvores."
+        )
+
+def exibir_secao_ml(analytics, df_filtrado, renderizador, impressao=None):
+    """Exibe a seção de Machine Learning (treino, resultados, explicações e deriva do modelo)"""
+    st.markdown("## 🤖 Análise de Machine Learning")
+    
+    col1, col2 = st.columns([1, 3])
+    
+    with col1:
+        if st.button("🚀 Treinar Modelo de Predição", help="Treina um modelo RandomForest para predição de status"):
+            exibir_indicador_progresso()
+            with st.spinner("🔄 Treinando modelo de Machine Learning..."):
+                sucesso = analytics.criar_modelo_ml(df_filtrado)
+                
+                if sucesso:
+                    exibir_alerta_cognitivo("success", "Modelo Treinado", 
+                        "Modelo RandomForest treinado com sucesso e pronto para predições!")
+                    st.balloons()
+                else:
+                    exibir_alerta_cognitivo("error", "Falha no Treinamento", 
+                        "Não foi possível treinar o modelo. Verifique se há dados suficientes e classes balanceadas.")
+    
+    with col2:
+        if st.session_state.modelo_treinado and st.session_state.metricas_modelo:
+            st.info("ℹ️ Modelo treinado e pronto para uso!")
+    
+    # Exibir resultados do modelo se disponível
+    if st.session_state.modelo_treinado and st.session_state.metricas_modelo:
+        st.markdown("### 📊 Resultados do Modelo")
+        
+        metricas = st.session_state.metricas_modelo
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric(
+                "🎯 Acurácia do Modelo", 
+                f"{metricas['accuracy']:.2%}",
+                help="Percentual de predições corretas"
+            )
+        
+        with col2:
+            st.metric(
+                "📊 Amostras de Treino", 
+                f"{metricas['n_samples']:,}",
+                help="Número total de amostras utilizadas"
+            )
+        
+        with col3:
+            st.metric(
+                "🔧 Features Utilizadas", 
+                metricas['n_features'],
+                help="Número de características dos sensores"
+            )
+        
+        # Gráfico de importância das features
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig_importance = renderizador.figura(
+                'importancia_features',
+                impressao_digital(sorted(metricas['feature_importance'].items())),
+                lambda: construir_grafico_importancia(metricas['feature_importance'])
+            )
+            exibir_grafico(fig_importance, 'importancia_features')
+        
+        with col2:
+            st.markdown("#### 📈 Relatório de Classificação")
+            
+            for classe, metricas_classe in metricas['classification_report'].items():
+                if isinstance(metricas_classe, dict) and classe not in ['accuracy', 'macro avg', 'weighted avg']:
+                    with st.expander(f"📋 Classe: {classe}"):
+                        col_a, col_b, col_c = st.columns(3)
+                        with col_a:
+                            st.metric("Precisão", f"{metricas_classe.get('precision', 0):.2%}")
+                        with col_b:
+                            st.metric("Recall", f"{metricas_classe.get('recall', 0):.2%}")
+                        with col_c:
+                            st.metric("F1-Score", f"{metricas_classe.get('f1-score', 0):.2%}")
+
+        
+        exibir_explicabilidade(df_filtrado, renderizador, impressao or impressao_digital(df_filtrado))
+    
+    exibir_monitor_deriva(analytics)
+
+def exibir_monitor_deriva(analytics):
+    """Exibe a deriva das execuções ingeridas em relação ao modelo salvo e o sinal de retreino"""
+    estado = analytics.carregar_estado_deriva()
+    if not estado or not estado.get('execucoes'):
+        return
+    
+    st.markdown("### 🧭 Deriva em Relação ao Modelo Salvo")
+    
+    tabela = tabela_execucoes(estado)
+    ultima = tabela.iloc[-1]
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("📏 PSI Máximo (última execução)", f"{ultima['psi_max']:.3f}",
+                  help=f"Acima de {PSI_MODERADO} a distribuição já mudou; acima de {PSI_SIGNIFICATIVO} a mudança é significativa")
+    with col2:
+        acuracia = estado['execucoes'][-1].get('acuracia_movel')
+        st.metric(
+            f"🎯 Acurácia Móvel ({JANELA_EXECUCOES} execuções)",
+            "—" if acuracia is None else f"{acuracia:.2%}",
+            delta=None if acuracia is None else f"{acuracia - estado['acuracia_treino']:+.2%}",
+            help="Predições do modelo salvo contra o status do firmware, comparadas à acurácia de teste do treino"
+        )
+    with col3:
+        st.metric("🗂️ Execuções Avaliadas", f"{len(tabela):,}")
+    
+    if estado['retreinar']:
+        exibir_alerta_cognitivo("warning", "Retreino Recomendado", "; ".join(estado['motivos']))
+    
+    st.dataframe(tabela.tail(20).iloc[::-1].round(3), use_container_width=True, hide_index=True)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Painel de Perfil do Dashboard Hermes Reply
+Trace da execução, regressões e candidatas a cache (importado só com o perfil ligado)
+"""
+
+import os
+
+import streamlit as st
+import pandas as pd
+from perfilamento import ARQUIVO_TRACES, candidatas_cache, carregar_traces, detectar_regressoes, salvar_trace
+
+def exibir_painel_perfil(analytics, perfil):
+    """Grava o trace da execução e exibe o detalhamento por etapa na barra lateral"""
+    caminho = os.path.join(analytics.dados_path, ARQUIVO_TRACES)
+    trace = perfil.trace()
+    anteriores = carregar_traces(caminho, limite=200)
+    try:
+        salvar_trace(trace, caminho)
+    except OSError as e:
+        st.sidebar.warning(f"⚠️ Não foi possível gravar o trace: {e}")
+    
+    with st.sidebar.expander("⏱️ Perfil desta Execução", expanded=True):
+        st.metric("Tempo total do script", f"{trace['total_ms']:,.0f} ms")
+        etapas = pd.DataFrame(trace['etapas']).reindex(columns=['nome', 'tipo', 'ms', 'linhas', 'bytes', 'cache'])
+        if etapas.empty:
+            st.caption("Nenhuma etapa medida.")
+            return
+        etapas['kb'] = (etapas['bytes'] / 1024).round(1)
+        st.dataframe(
+            etapas.drop(columns='bytes').sort_values('ms', ascending=False),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        regressoes = detectar_regressoes(trace, anteriores)
+        if not regressoes.empty:
+            st.markdown("**🚨 Mais lentas que a mediana recente**")
+            st.dataframe(regressoes.round(2), use_container_width=True, hide_index=True)
+        
+        candidatas = candidatas_cache(anteriores + [trace])
+        if not candidatas.empty:
+            st.markdown("**🧊 Candidatas a cache**")
+            st.dataframe(candidatas.round(1), use_container_width=True, hide_index=True)
+        st.caption(f"Traces em {ARQUIVO_TRACES} · resumo: python analise_dados/perfilamento.py")
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Visão de Resumos Estatísticos Hermes Reply
+Evolução entre execuções, comparação por esboços e qualidade dos dados
+"""
+
+import streamlit as st
+from renderizacao import impressao_digital
+from comparacao_execucoes import ComparadorExecucoes
+from esbocos import SENSORES
+from painel_comum import CORES_TEMA, exibir_grafico, obter_cache_secoes
+
+def construir_evolucao_temperatura(df_resumos):
+    """Constrói gráfico da evolução da temperatura média por execução"""
+    import plotly.express as px
+
+    fig_temp_evolucao = px.line(
+        df_resumos,
+        x='execucao_id',
+        y='temp_media',
+        title="🌡️ Evolução da Temperatura Média",
+        markers=True
+    )
+    fig_temp_evolucao.update_layout(
+        title_font_size=18,
+        font=dict(family="Arial, sans-serif", size=12),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis_tickangle=45
+    )
+    fig_temp_evolucao.update_traces(line=dict(color=CORES_TEMA['primaria'], width=3))
+    fig_temp_evolucao.update_xaxes(gridcolor='rgba(128,128,128,0.2)', showgrid=True)
+    fig_temp_evolucao.update_yaxes(gridcolor='rgba(128,128,128,0.2)', showgrid=True)
+    return fig_temp_evolucao
+
+def construir_evolucao_status(df_resumos, status_cols):
+    """Constrói gráfico da distribuição de status por execução"""
+    import plotly.express as px
+
+    fig_status_evolucao = px.bar(
+        df_resumos,
+        x='execucao_id',
+        y=status_cols,
+        title="📊 Distribuição de Status por Execução",
+        color_discrete_sequence=['#2ecc71', '#f39c12', '#e74c3c']
+    )
+    fig_status_evolucao.update_layout(
+        title_font_size=18,
+        font=dict(family="Arial, sans-serif", size=12),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis_tickangle=45
+    )
+    fig_status_evolucao.update_xaxes(gridcolor='rgba(128,128,128,0.2)', showgrid=True)
+    fig_status_evolucao.update_yaxes(gridcolor='rgba(128,128,128,0.2)', showgrid=True)
+    return fig_status_evolucao
+
+@st.cache_resource
+def obter_comparador(dados_path):
+    """Motor de comparação compartilhado pelas sessões (esboços são imutáveis por execução)"""
+    return ComparadorExecucoes(dados_path)
+
+def construir_comparacao_percentis(df_percentis, sensor):
+    """Constrói gráfico de barras agrupadas com os percentis por execução"""
+    import plotly.express as px
+
+    colunas_percentis = [c for c in df_percentis.columns if c.startswith('p')]
+    fig = px.bar(
+        df_percentis,
+        x='execucao_id',
+        y=colunas_percentis,
+        barmode='group',
+        title=f"📐 Percentis de {sensor} por Execução",
+        color_discrete_sequence=[CORES_TEMA['primaria'], CORES_TEMA['secundaria'], CORES_TEMA['alerta']]
+    )
+    fig.update_layout(
+        title_font_size=18,
+        font=dict(family="Arial, sans-serif", size=12),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis_tickangle=45
+    )
+    return fig
+
+def construir_comparacao_distribuicoes(df_distribuicoes, sensor):
+    """Constrói curvas de densidade do sensor sobrepostas por execução"""
+    import plotly.express as px
+
+    df_visivel = df_distribuicoes[df_distribuicoes.groupby('faixa_centro')['densidade'].transform('max') > 0]
+    fig = px.line(
+        df_visivel,
+        x='faixa_centro',
+        y='densidade',
+        color='execucao_id',
+        line_shape='hvh',
+        title=f"📊 Distribuição de {sensor} por Execução"
+    )
+    fig.update_layout(
+        title_font_size=18,
+        font=dict(family="Arial, sans-serif", size=12),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    fig.update_xaxes(gridcolor='rgba(128,128,128,0.2)', showgrid=True)
+    fig.update_yaxes(gridcolor='rgba(128,128,128,0.2)', showgrid=True, tickformat='.0%')
+    return fig
+
+def exibir_comparacao_execucoes(analytics):
+    """Exibe comparação de distribuições e alertas entre execuções a partir dos esboços"""
+    st.markdown("## 🔬 Comparação entre Execuções")
+    
+    comparador = obter_comparador(analytics.dados_path)
+    execucoes = comparador.listar_execucoes()
+    if not execucoes:
+        st.info("ℹ️ Nenhuma execução disponível para comparação")
+        return
+    
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        selecionadas = st.multiselect(
+            "📅 Execuções para comparar",
+            execucoes,
+            default=execucoes[-5:],
+            help="Compara percentis e distribuições a partir dos esboços de cada execução"
+        )
+    with col2:
+        sensor = st.selectbox("📡 Sensor", SENSORES, key="sensor_comparacao")
+    
+    if not selecionadas:
+        return
+    
+    impressao = impressao_digital(tuple(selecionadas), sensor)
+    df_percentis = comparador.tabela_percentis(sensor, selecionadas)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig_percentis = obter_cache_secoes().obter(
+            'comparacao_percentis', impressao,
+            lambda: construir_comparacao_percentis(df_percentis, sensor)
+        )
+        exibir_grafico(fig_percentis, 'comparacao_percentis')
+    
+    with col2:
+        fig_distribuicoes = obter_cache_secoes().obter(
+            'comparacao_distribuicoes', impressao,
+            lambda: construir_comparacao_distribuicoes(comparador.distribuicoes(sensor, selecionadas), sensor)
+        )
+        exibir_grafico(fig_distribuicoes, 'comparacao_distribuicoes')
+    
+    with st.expander("🚨 Taxas de Alerta por Execução", expanded=False):
+        st.dataframe(
+            comparador.taxas_alerta(selecionadas).merge(df_percentis, on='execucao_id'),
+            use_container_width=True,
+            hide_index=True
+        )
+
+def construir_pontuacao_qualidade(df_qualidade):
+    """Constrói gráfico da pontuação de qualidade dos dados por execução"""
+    import plotly.express as px
+
+    fig_qualidade = px.bar(
+        df_qualidade,
+        x='execucao_id',
+        y='pontuacao_qualidade',
+        title="🧪 Pontuação de Qualidade dos Dados",
+        range_y=[0, 100]
+    )
+    fig_qualidade.update_layout(
+        title_font_size=18,
+        font=dict(family="Arial, sans-serif", size=12),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis_tickangle=45
+    )
+    fig_qualidade.update_traces(marker_color=CORES_TEMA['primaria'])
+    fig_qualidade.update_yaxes(gridcolor='rgba(128,128,128,0.2)', showgrid=True)
+    return fig_qualidade
+
+def exibir_qualidade_dados(analytics):
+    """Exibe lacunas, reinicializações, sensores travados e consistência da média móvel por execução"""
+    df_qualidade = analytics.carregar_qualidade_execucoes()
+    if df_qualidade is None:
+        st.info("ℹ️ Sem relatórios de qualidade. Gere-os com `python analise_dados/processar_dados_simulacao.py --avaliar-qualidade`")
+        return
+    
+    st.markdown("## 🧪 Qualidade dos Dados")
+    df_qualidade = df_qualidade.sort_values('execucao_id')
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("🏅 Pontuação Média", f"{df_qualidade['pontuacao_qualidade'].mean():.1f}")
+    with col2:
+        st.metric("🕳️ Leituras Perdidas", f"{int(df_qualidade['leituras_perdidas'].sum()):,}")
+    with col3:
+        st.metric("🔁 Reinicializações", f"{int(df_qualidade['reinicios'].sum()):,}")
+    with col4:
+        st.metric("🧊 Leituras Travadas", f"{int(df_qualidade['leituras_travadas'].sum()):,}")
+    
+    fig_qualidade = obter_cache_secoes().obter(
+        'pontuacao_qualidade', impressao_digital(df_qualidade),
+        lambda: construir_pontuacao_qualidade(df_qualidade)
+    )
+    exibir_grafico(fig_qualidade, 'pontuacao_qualidade')
+    
+    with st.expander("🧪 Indicadores de Qualidade por Execução", expanded=False):
+        st.dataframe(df_qualidade, use_container_width=True, hide_index=True)
+
+def exibir_modo(analytics, perfil):
+    """Modo Resumos Estatísticos: evolução, comparação e qualidade por execução"""
+    df_resumos = perfil.medir('carregar_resumos_estatisticos', analytics.carregar_resumos_estatisticos)
+    
+    if df_resumos is not None:
+        st.success(f"✅ {len(df_resumos):,} resumos estatísticos carregados")
+        
+        # Métricas gerais
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("🔄 Total de Execuções", f"{len(df_resumos):,}")
+        with col2:
+            st.metric("📊 Total de Registros", f"{df_resumos['total_registros'].sum():,}")
+        with col3:
+            st.metric("🌡️ Temp. Média Geral", f"{df_resumos['temp_media'].mean():.1f}°C")
+        with col4:
+            st.metric("💧 Umidade Média Geral", f"{df_resumos['umidade_media'].mean():.1f}%")
+        
+        # Evolução das execuções
+        # Evolução das execuções
+        st.markdown("## 📈 Evolução das Execuções")
+        impressao_resumos = impressao_digital(df_resumos)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig_temp_evolucao = obter_cache_secoes().obter(
+                'evolucao_temperatura', impressao_resumos,
+                lambda: construir_evolucao_temperatura(df_resumos)
+            )
+            exibir_grafico(fig_temp_evolucao, 'evolucao_temperatura')
+        
+        with col2:
+            # Verificar se as colunas existem
+            status_cols = []
+            for col in ['status_normal', 'status_atencao', 'status_critico']:
+                if col in df_resumos.columns:
+                    status_cols.append(col)
+            
+            if status_cols:
+                fig_status_evolucao = obter_cache_secoes().obter(
+                    'evolucao_status', impressao_resumos,
+                    lambda: construir_evolucao_status(df_resumos, status_cols)
+                )
+                exibir_grafico(fig_status_evolucao, 'evolucao_status')
+            else:
+                st.info("ℹ️ Dados de status não disponíveis nos resumos")
+        
+        # Comparação entre execuções via esboços
+        with perfil.etapa('comparacao_execucoes'):
+            exibir_comparacao_execucoes(analytics)
+        
+        # Qualidade dos dados por execução
+        with perfil.etapa('qualidade_dados'):
+            exibir_qualidade_dados(analytics)
+        
+        # Resumos detalhados
+        with st.expander("📋 Resumos Detalhados", expanded=False):
+            st.dataframe(
+                df_resumos.sort_values('execucao_id', ascending=False),
+                use_container_width=True
+            )
+    else:
+        st.warning("⚠️ Nenhum resumo estatístico encontrado. Execute uma simulação primeiro.")
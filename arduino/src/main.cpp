@@ -8,6 +8,40 @@
 // === CONFIGURAÇÕES DO SISTEMA HERMES REPLY ===
 #define DEVICE_ID "HR-PRED-MAINT-01"
 #define FIRMWARE_VERSION "1.0.0"
+#define FIRMWARE_VERSION_MAJOR 1
+#define FIRMWARE_VERSION_MINOR 0
+#define FIRMWARE_VERSION_PATCH 0
+
+// === FORMATO DE TELEMETRIA ===
+// FORMAT_JSON: linhas "JSON_DATA:" (padrão, compatível com o pipeline atual)
+// FORMAT_BINARY: quadro binário compacto de 60 bytes com CRC16
+// FORMAT_BOTH: envia os dois (útil durante a migração do pipeline)
+#define FORMAT_JSON 0
+#define FORMAT_BINARY 1
+#define FORMAT_BOTH 2
+#ifndef TELEMETRY_FORMAT
+#define TELEMETRY_FORMAT FORMAT_JSON
+#endif
+
+// === CANAIS DA SERIAL ===
+// CHANNEL_MIXED: saída atual, molduras de monitoramento intercaladas com JSON_DATA
+// CHANNEL_MACHINE: canal de máquina limpo, apenas quadros de dados na Serial
+#define CHANNEL_MIXED 0
+#define CHANNEL_MACHINE 1
+#ifndef TELEMETRY_CHANNEL
+#define TELEMETRY_CHANNEL CHANNEL_MIXED
+#endif
+
+// No canal de máquina, cada JSON é enviado como "@LLLL:{...}" (LLLL = tamanho em hex)
+#ifndef TELEMETRY_LENGTH_PREFIX
+#define TELEMETRY_LENGTH_PREFIX 1
+#endif
+
+// Canal humano: a própria Serial no modo misto; no modo de máquina é opcional
+// e pode ir para outra UART com -D HUMAN_CHANNEL=Serial1 (desativado por padrão)
+#if TELEMETRY_CHANNEL == CHANNEL_MIXED && !defined(HUMAN_CHANNEL)
+#define HUMAN_CHANNEL Serial
+#endif
 
 // === MAPEAMENTO DE PINOS ===
 #define DHT_PIN 27
@@ -51,16 +85,61 @@ int maxBlinks = 0;
 unsigned long blinkInterval = 0;
 char currentLedStatus[10] = "NORMAL";
 
+// === QUADRO BINÁRIO DE TELEMETRIA (versão 1, little-endian, 60 bytes) ===
+// Layout espelhado em analise_dados/protocolo_binario.py (DTYPE_QUADRO_V1)
+#define FRAME_MAGIC_0 0xA5
+#define FRAME_MAGIC_1 0x5A
+#define FRAME_VERSION 1
+
+#define ALERT_BIT_TEMP  0x01
+#define ALERT_BIT_HUMID 0x02
+#define ALERT_BIT_LIGHT 0x04
+#define ALERT_BIT_VIB   0x08
+
+struct __attribute__((packed)) TelemetryFrameV1 {
+  uint8_t magic[2];          // 0xA5 0x5A
+  uint8_t version;           // FRAME_VERSION
+  uint8_t length;            // sizeof(TelemetryFrameV1)
+  char deviceId[16];         // DEVICE_ID sem terminador quando ocupa 16 bytes
+  uint32_t timestamp;        // millis()
+  uint32_t readingId;
+  float temperature;
+  float movingAvgTemp;
+  float humidity;
+  float movingAvgHum;
+  uint16_t light;
+  uint16_t vibration;
+  uint8_t systemStatus;      // 0 NORMAL, 1 ATENÇÃO, 2 CRÍTICO
+  uint8_t alertMask;         // ALERT_BIT_*
+  uint8_t firmware[3];       // major, minor, patch
+  uint8_t reserved;
+  uint32_t uptime;
+  uint16_t crc;              // CRC16-CCITT (XModem) dos bytes anteriores
+};
+
+static_assert(sizeof(TelemetryFrameV1) == 60, "TelemetryFrameV1 deve ter 60 bytes");
+
+TelemetryFrameV1 telemetryFrame;
+
 // === PROTÓTIPOS DAS FUNÇÕES ===
 void printSystemInfo();
 void analyzeSystemHealth(float temp, float humidity, int light, int vibration, char* statusResult, char* alertsResult);
 void buildTelemetryJson(float temp, float humidity, int light, int vibration, const char* status, float movAvgTemp, float movAvgHum);
 void sendTelemetryData();
+void sendMachineRecord();
+void printReadingHeader();
+void printReadingDetails();
+void buildTelemetryFrame(float temp, float humidity, int light, int vibration, const char* status, float movAvgTemp, float movAvgHum);
+void sendTelemetryFrame();
+uint16_t crc16Ccitt(const uint8_t* data, size_t length);
 void configureLedPattern(const char* newStatus);
 void handleLedBlinking();
 
 void setup() {
   Serial.begin(115200);
+#if TELEMETRY_CHANNEL == CHANNEL_MACHINE && defined(HUMAN_CHANNEL)
+  HUMAN_CHANNEL.begin(115200);
+#endif
   
   // Configuração dos pinos
   pinMode(LED_STATUS_PIN, OUTPUT);
@@ -75,10 +154,12 @@ void setup() {
   delay(1000);
   digitalWrite(LED_STATUS_PIN, LOW);
   
+#ifdef HUMAN_CHANNEL
   printSystemInfo();
   
-  Serial.println("=== SISTEMA INICIADO - AGUARDANDO PRIMEIRA LEITURA ===");
-  Serial.println();
+  HUMAN_CHANNEL.println("=== SISTEMA INICIADO - AGUARDANDO PRIMEIRA LEITURA ===");
+  HUMAN_CHANNEL.println();
+#endif
 }
 
 void loop() {
@@ -132,11 +213,19 @@ void loop() {
     char alerts[20];        // Buffer para alertas
     analyzeSystemHealth(temperature, humidity, lightLevel, vibrationLevel, systemStatus, alerts);
     
+#if TELEMETRY_FORMAT != FORMAT_BINARY
     // Monta JSON de telemetria (inclui médias móveis)
     buildTelemetryJson(temperature, humidity, lightLevel, vibrationLevel, systemStatus, movingAvgTemp, movingAvgHum);
     
     // Envia dados via Serial
     sendTelemetryData();
+#endif
+
+#if TELEMETRY_FORMAT != FORMAT_JSON
+    // Quadro binário compacto (60 bytes contra ~700 do JSON)
+    buildTelemetryFrame(temperature, humidity, lightLevel, vibrationLevel, systemStatus, movingAvgTemp, movingAvgHum);
+    sendTelemetryFrame();
+#endif
     
     // Atualiza LED de status (não-bloqueante)
     configureLedPattern(systemStatus);
@@ -150,21 +239,23 @@ void loop() {
   delay(100); // Pequeno delay para estabilidade
 }
 
+#ifdef HUMAN_CHANNEL
 void printSystemInfo() {
-  Serial.println("╔══════════════════════════════════════════════════════════╗");
-  Serial.println("║            HERMES REPLY - MANUTENÇÃO PREDITIVA        ║");
-  Serial.println("║                 Monitoramento IoT Industrial                ║");
-  Serial.println("╠══════════════════════════════════════════════════════════╣");
-  Serial.print("║ ID do Dispositivo: ");
-  Serial.print(DEVICE_ID);
-  Serial.print(" | Firmware: ");
-  Serial.print(FIRMWARE_VERSION);
-  Serial.println("           ║");
-  Serial.println("║ Sensores: DHT22, LDR, Vibração, LED de Status              ║");
-  Serial.println("║ Frequência de Leitura: 5s | Formato: JSON | Análise: Preditiva     ║");
-  Serial.println("╚══════════════════════════════════════════════════════════╝");
-  Serial.println();
+  HUMAN_CHANNEL.println("╔══════════════════════════════════════════════════════════╗");
+  HUMAN_CHANNEL.println("║            HERMES REPLY - MANUTENÇÃO PREDITIVA        ║");
+  HUMAN_CHANNEL.println("║                 Monitoramento IoT Industrial                ║");
+  HUMAN_CHANNEL.println("╠══════════════════════════════════════════════════════════╣");
+  HUMAN_CHANNEL.print("║ ID do Dispositivo: ");
+  HUMAN_CHANNEL.print(DEVICE_ID);
+  HUMAN_CHANNEL.print(" | Firmware: ");
+  HUMAN_CHANNEL.print(FIRMWARE_VERSION);
+  HUMAN_CHANNEL.println("           ║");
+  HUMAN_CHANNEL.println("║ Sensores: DHT22, LDR, Vibração, LED de Status              ║");
+  HUMAN_CHANNEL.println("║ Frequência de Leitura: 5s | Formato: JSON | Análise: Preditiva     ║");
+  HUMAN_CHANNEL.println("╚══════════════════════════════════════════════════════════╝");
+  HUMAN_CHANNEL.println();
 }
+#endif
 
 // === CAPA-FW-001: FUNÇÃO SEM String ===
 void analyzeSystemHealth(float temp, float humidity, int light, int vibration, char* statusResult, char* alertsResult) {
@@ -268,42 +359,126 @@ void buildTelemetryJson(float temp, float humidity, int light, int vibration, co
 }
 
 void sendTelemetryData() {
-  Serial.println("┌─────────────────────────────────────────────────────────────┐");
-  Serial.print("│ LEITURA #");
-  Serial.print(readingCount);
-  Serial.print(" | ");
-  Serial.print(millis()/1000);
-  Serial.println("s de funcionamento                               │");
-  Serial.println("├─────────────────────────────────────────────────────────────┤");
+#if TELEMETRY_CHANNEL == CHANNEL_MACHINE
+  // Canal de máquina: só o quadro de dados; o resumo humano vai para o canal opcional
+  sendMachineRecord();
+#ifdef HUMAN_CHANNEL
+  printReadingHeader();
+  printReadingDetails();
+#endif
+#else
+  printReadingHeader();
   
   // Saída JSON para análise
   Serial.print("JSON_DATA: ");
   serializeJson(telemetryData, Serial);
   Serial.println();
   
-  // Saída humanizada para monitoramento
-  Serial.print("│ Temp: ");
-  Serial.print(telemetryData["sensors"]["temperature"]["value"].as<float>(), 1);
-  Serial.print("°C | Umidade: ");
-  Serial.print(telemetryData["sensors"]["humidity"]["value"].as<float>(), 1);
-  Serial.print("% | Luz: ");
-  Serial.print(telemetryData["sensors"]["lightLevel"]["value"].as<int>());
-  Serial.print(" | Vib: ");
-  Serial.print(telemetryData["sensors"]["vibration"]["value"].as<int>());
-  Serial.println(" │");
-  
-  Serial.print("│ STATUS: ");
-  Serial.print(telemetryData["analysis"]["systemStatus"].as<String>());
-  Serial.print(" | RISCO: ");
-  Serial.print(telemetryData["analysis"]["riskLevel"].as<String>());
-  Serial.print(" | MANUTENÇÃO: ");
-  Serial.print(telemetryData["analysis"]["nextMaintenance"].as<String>());
-  Serial.println("     │");
-  
-  Serial.println("└─────────────────────────────────────────────────────────────┘");
+  printReadingDetails();
+#endif
+}
+
+void sendMachineRecord() {
+#if TELEMETRY_LENGTH_PREFIX
+  // Prefixo de tamanho: o leitor salta direto para o próximo quadro, sem varrer linhas
+  char prefix[8];
+  snprintf(prefix, sizeof(prefix), "@%04X:", (unsigned int)measureJson(telemetryData));
+  Serial.print(prefix);
+#else
+  Serial.print("JSON_DATA: ");
+#endif
+  serializeJson(telemetryData, Serial);
   Serial.println();
 }
 
+#ifdef HUMAN_CHANNEL
+void printReadingHeader() {
+  HUMAN_CHANNEL.println("┌─────────────────────────────────────────────────────────────┐");
+  HUMAN_CHANNEL.print("│ LEITURA #");
+  HUMAN_CHANNEL.print(readingCount);
+  HUMAN_CHANNEL.print(" | ");
+  HUMAN_CHANNEL.print(millis()/1000);
+  HUMAN_CHANNEL.println("s de funcionamento                               │");
+  HUMAN_CHANNEL.println("├─────────────────────────────────────────────────────────────┤");
+}
+
+void printReadingDetails() {
+  // Saída humanizada para monitoramento
+  HUMAN_CHANNEL.print("│ Temp: ");
+  HUMAN_CHANNEL.print(telemetryData["sensors"]["temperature"]["value"].as<float>(), 1);
+  HUMAN_CHANNEL.print("°C | Umidade: ");
+  HUMAN_CHANNEL.print(telemetryData["sensors"]["humidity"]["value"].as<float>(), 1);
+  HUMAN_CHANNEL.print("% | Luz: ");
+  HUMAN_CHANNEL.print(telemetryData["sensors"]["lightLevel"]["value"].as<int>());
+  HUMAN_CHANNEL.print(" | Vib: ");
+  HUMAN_CHANNEL.print(telemetryData["sensors"]["vibration"]["value"].as<int>());
+  HUMAN_CHANNEL.println(" │");
+  
+  HUMAN_CHANNEL.print("│ STATUS: ");
+  HUMAN_CHANNEL.print(telemetryData["analysis"]["systemStatus"].as<String>());
+  HUMAN_CHANNEL.print(" | RISCO: ");
+  HUMAN_CHANNEL.print(telemetryData["analysis"]["riskLevel"].as<String>());
+  HUMAN_CHANNEL.print(" | MANUTENÇÃO: ");
+  HUMAN_CHANNEL.print(telemetryData["analysis"]["nextMaintenance"].as<String>());
+  HUMAN_CHANNEL.println("     │");
+  
+  HUMAN_CHANNEL.println("└─────────────────────────────────────────────────────────────┘");
+  HUMAN_CHANNEL.println();
+}
+#endif
+
+// === QUADRO BINÁRIO DE TELEMETRIA ===
+uint16_t crc16Ccitt(const uint8_t* data, size_t length) {
+  uint16_t crc = 0x0000;
+  for (size_t i = 0; i < length; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (uint8_t bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+    }
+  }
+  return crc;
+}
+
+void buildTelemetryFrame(float temp, float humidity, int light, int vibration, const char* status, float movAvgTemp, float movAvgHum) {
+  memset(&telemetryFrame, 0, sizeof(telemetryFrame));
+  
+  telemetryFrame.magic[0] = FRAME_MAGIC_0;
+  telemetryFrame.magic[1] = FRAME_MAGIC_1;
+  telemetryFrame.version = FRAME_VERSION;
+  telemetryFrame.length = sizeof(TelemetryFrameV1);
+  strncpy(telemetryFrame.deviceId, DEVICE_ID, sizeof(telemetryFrame.deviceId));
+  
+  telemetryFrame.timestamp = millis();
+  telemetryFrame.readingId = readingCount;
+  telemetryFrame.temperature = temp;
+  telemetryFrame.movingAvgTemp = movAvgTemp;
+  telemetryFrame.humidity = humidity;
+  telemetryFrame.movingAvgHum = movAvgHum;
+  telemetryFrame.light = (uint16_t)light;
+  telemetryFrame.vibration = (uint16_t)vibration;
+  
+  // Mesmas regras de buildTelemetryJson, codificadas como enum e máscara de bits
+  if (strcmp(status, "CRÍTICO") == 0) telemetryFrame.systemStatus = 2;
+  else if (strcmp(status, "ATENÇÃO") == 0) telemetryFrame.systemStatus = 1;
+  else telemetryFrame.systemStatus = 0;
+  
+  if (temp < TEMP_MIN_NORMAL || temp > TEMP_MAX_NORMAL) telemetryFrame.alertMask |= ALERT_BIT_TEMP;
+  if (humidity < HUMIDITY_MIN_NORMAL || humidity > HUMIDITY_MAX_NORMAL) telemetryFrame.alertMask |= ALERT_BIT_HUMID;
+  if (light < LIGHT_MIN_NORMAL || light > LIGHT_MAX_NORMAL) telemetryFrame.alertMask |= ALERT_BIT_LIGHT;
+  if (vibration > VIBRATION_MAX_NORMAL) telemetryFrame.alertMask |= ALERT_BIT_VIB;
+  
+  telemetryFrame.firmware[0] = FIRMWARE_VERSION_MAJOR;
+  telemetryFrame.firmware[1] = FIRMWARE_VERSION_MINOR;
+  telemetryFrame.firmware[2] = FIRMWARE_VERSION_PATCH;
+  telemetryFrame.uptime = millis();
+  
+  telemetryFrame.crc = crc16Ccitt((const uint8_t*)&telemetryFrame, sizeof(TelemetryFrameV1) - sizeof(uint16_t));
+}
+
+void sendTelemetryFrame() {
+  Serial.write((const uint8_t*)&telemetryFrame, sizeof(TelemetryFrameV1));
+}
+
 // === CAPA-FW-003: LED NÃO-BLOQUEANTE ===
 void configureLedPattern(const char* newStatus) {
   if (strcmp(currentLedStatus, newStatus) != 0) {
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+Regressão: monitor_deriva --execucao reavalia uma execução já compactada pela retenção
+"""
+
+import os
+import sys
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'analise_dados'))
+
+import monitor_deriva  # noqa: E402
+from benchmark import GeradorTelemetriaSintetica  # noqa: E402
+from esquemas import tipar_dataframe  # noqa: E402
+from hermes_analytics import HermesAnalytics  # noqa: E402
+from retencao import GestorRetencao  # noqa: E402
+
+EXECUCAO = '20250103_100000'
+LEITURAS = 200
+
+
+def test_deriva_de_execucao_compactada(tmp_path, monkeypatch):
+    df = next(GeradorTelemetriaSintetica(LEITURAS).blocos(EXECUCAO))
+    df.to_csv(tmp_path / f'hermes_data_{EXECUCAO}.csv', index=False)
+    assert HermesAnalytics(dados_path=str(tmp_path), notificar=lambda *_: None).criar_modelo_ml(tipar_dataframe(df))
+
+    GestorRetencao(str(tmp_path), dias_compactar=7, dias_brutos=365, agora=datetime(2025, 3, 1)).aplicar(arquivar_log=False)
+    assert not os.path.exists(tmp_path / f'hermes_data_{EXECUCAO}.csv')
+
+    monkeypatch.setattr(sys, 'argv', ['monitor_deriva.py', '--dados', str(tmp_path), '--execucao', EXECUCAO])
+    monitor_deriva.main()
+
+    execucoes = monitor_deriva.MonitorDeriva(str(tmp_path)).carregar_estado()['execucoes']
+    assert [(e['execucao_id'], e['leituras']) for e in execucoes] == [(EXECUCAO, LEITURAS)]
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Regressão: CSVs legados sem device_id e com relógio desde o boot não colidem na deduplicação
+"""
+
+import os
+import shutil
+import sys
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'analise_dados'))
+
+from processar_dados_simulacao import ProcessadorDadosSimulacao  # noqa: E402
+
+ARQUIVOS_LEGADOS = ['hermes_reply_data_20250613_123249.csv', 'hermes_reply_data_20250613_124210.csv']
+
+
+def test_importa_os_dois_legados_sem_descartar_leituras(tmp_path):
+    for arquivo in ARQUIVOS_LEGADOS:
+        shutil.copy(os.path.join(RAIZ, 'dados_simulacao', arquivo), tmp_path / arquivo)
+
+    processador = ProcessadorDadosSimulacao()
+    processador.dados_simulacao_dir = str(tmp_path)
+    assert processador.importar_csv_legados() == 2
+
+    historico = pd.read_csv(tmp_path / 'hermes_historico_completo.csv')
+    assert len(historico) == 98
+    assert sorted(historico['device_id'].unique()) == ['LEGADO_20250613_123249', 'LEGADO_20250613_124210']
+
+    # Reimportar não duplica
+    assert processador.importar_csv_legados() == 0
+    assert len(pd.read_csv(tmp_path / 'hermes_historico_completo.csv')) == 98
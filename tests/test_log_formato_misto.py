@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Regressão: no FORMAT_BOTH cada leitura sai em JSON e em quadro binário e entra uma única vez no histórico
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'analise_dados'))
+
+from benchmark import COLUNAS_PAYLOAD, MODELO_PAYLOAD, GeradorTelemetriaSintetica  # noqa: E402
+from processar_dados_simulacao import ProcessadorDadosSimulacao  # noqa: E402
+from protocolo_binario import codificar_quadro  # noqa: E402
+
+LEITURAS = 20
+
+
+def test_log_misto_json_e_binario_nao_duplica_leituras(tmp_path):
+    df = next(GeradorTelemetriaSintetica(LEITURAS).blocos())
+    df['device_id'] = 'HERMES_ESP32_001'  # o quadro guarda até 16 caracteres
+    log = tmp_path / 'serial_output.log'
+    with open(log, 'wb') as f:
+        for campos in zip(*(df[coluna].tolist() for coluna in COLUNAS_PAYLOAD)):
+            f.write(b'JSON_DATA: ' + (MODELO_PAYLOAD % campos).encode('utf-8') + b'\n')
+            linha = dict(zip(COLUNAS_PAYLOAD, campos))
+            # O quadro lê millis() de novo depois de enviar o JSON
+            f.write(codificar_quadro(linha['device_id'], int(linha['timestamp_simulacao']) + 7, int(linha['reading_id']),
+                                     linha['temperatura'], linha['temperatura_media_movel'], linha['umidade'],
+                                     linha['umidade_media_movel'], int(linha['luminosidade']), int(linha['vibracao'])))
+
+    processador = ProcessadorDadosSimulacao()
+    processador.dados_simulacao_dir = str(tmp_path)
+    processador.entradas = [str(log)]
+    assert processador.processar_simulacao()
+
+    historico = pd.read_csv(tmp_path / 'hermes_historico_completo.csv')
+    assert len(historico) == LEITURAS
+    assert historico['reading_id'].is_unique
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Regressão: reinicialização no meio da execução com relógio desde o boot (firmware 1.0.0)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'analise_dados'))
+
+from qualidade_dados import INTERVALO_LEITURA_MS, JANELA_MEDIA_MOVEL, avaliar_qualidade  # noqa: E402
+
+LEITURAS_POR_BOOT = 20
+
+
+def boot(temperaturas):
+    """Leituras de um boot como o firmware 1.0.0 as envia: millis() desde o boot e média móvel de 12"""
+    contagem = np.arange(1, len(temperaturas) + 1)
+    medias = pd.Series(temperaturas).rolling(JANELA_MEDIA_MOVEL, min_periods=1).mean().round(2)
+    return pd.DataFrame({
+        'device_id': 'HERMES_ESP32_001',
+        'timestamp_simulacao': contagem * INTERVALO_LEITURA_MS,
+        'uptime': contagem * INTERVALO_LEITURA_MS,
+        'total_readings': contagem,
+        'temperatura': temperaturas,
+        'temperatura_media_movel': medias
+    })
+
+
+def test_reinicio_separa_os_boots_antes_de_ordenar():
+    rng = np.random.default_rng(7)
+    df = pd.concat([boot(np.round(rng.normal(25, 2, LEITURAS_POR_BOOT), 2)),
+                    boot(np.round(rng.normal(30, 2, LEITURAS_POR_BOOT), 2))], ignore_index=True)
+
+    indicadores = avaliar_qualidade(df)
+    assert indicadores['reinicios'] == 1
+    assert indicadores['duplicadas'] == 0
+    assert indicadores['lacunas'] == 0
+    assert indicadores['media_movel_verificadas'] > 0
+    assert indicadores['consistencia_media_movel'] == 1.0
+    assert indicadores['pontuacao_qualidade'] == 100.0
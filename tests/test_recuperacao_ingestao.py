@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Regressão: a recuperação de um lote interrompido grava os derivados no diretório recuperado
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'analise_dados'))
+
+from comparacao_execucoes import caminho_esboco  # noqa: E402
+from processar_dados_simulacao import ProcessadorDadosSimulacao  # noqa: E402
+from qualidade_dados import caminho_qualidade  # noqa: E402
+from quantis_sensores import caminho_baldes  # noqa: E402
+
+LOTE = '20991231_235959'
+
+
+def derivados(diretorio):
+    return [
+        os.path.join(diretorio, f'hermes_resumo_{LOTE}.csv'),
+        caminho_esboco(diretorio, LOTE),
+        caminho_baldes(diretorio, LOTE),
+        caminho_qualidade(diretorio, LOTE)
+    ]
+
+
+def test_recupera_lote_confirmado_no_diretorio_redirecionado(tmp_path):
+    df = pd.read_csv(os.path.join(RAIZ, 'dados_simulacao', 'hermes_data_20250613_151339.csv'))
+    df['execucao_id'] = LOTE
+    df.to_csv(tmp_path / f'hermes_data_{LOTE}.csv', index=False)
+    df.to_csv(tmp_path / 'hermes_historico_completo.csv', index=False)
+
+    processador = ProcessadorDadosSimulacao()
+    processador.dados_simulacao_dir = str(tmp_path)
+    processador.journal.iniciar(LOTE, arquivos=[f'hermes_data_{LOTE}.csv'], linhas=len(df))
+    processador.journal.confirmar(LOTE)
+
+    assert processador.recuperar_ingestoes_pendentes() == 1
+    assert not processador.journal.pendentes()
+    for caminho in derivados(str(tmp_path)):
+        assert os.path.exists(caminho), caminho
+    for caminho in derivados(os.path.join(RAIZ, 'dados_simulacao')):
+        assert not os.path.exists(caminho), caminho
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Regressão: a compactação leva esboços e baldes para o arquivo mensal e comparações e percentis continuam lendo de lá
+"""
+
+import os
+import sys
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'analise_dados'))
+
+from benchmark import GeradorTelemetriaSintetica  # noqa: E402
+from comparacao_execucoes import ComparadorExecucoes, caminho_esboco  # noqa: E402
+from quantis_sensores import ConsultaQuantis, caminho_baldes  # noqa: E402
+from retencao import GestorRetencao, ler_catalogo  # noqa: E402
+
+EXECUCOES = ['20250103_100000', '20250117_100000']
+LEITURAS = 30
+
+
+def test_compactacao_arquiva_esbocos_e_baldes(tmp_path):
+    for execucao_id in EXECUCOES:
+        df = next(GeradorTelemetriaSintetica(LEITURAS).blocos(execucao_id))
+        df.to_csv(tmp_path / f'hermes_data_{execucao_id}.csv', index=False)
+
+    gestor = GestorRetencao(str(tmp_path), dias_compactar=7, dias_brutos=365, agora=datetime(2025, 3, 1))
+    gestor.aplicar(arquivar_log=False)
+
+    assert set(ler_catalogo(str(tmp_path))) == set(EXECUCOES)
+    assert not [nome for nome in os.listdir(tmp_path) if nome.endswith('.json')]
+    assert sorted(os.listdir(tmp_path / 'arquivo' / 'esbocos')) == ['hermes_baldes_202501.json.gz',
+                                                                    'hermes_esboco_202501.json.gz']
+
+    comparador = ComparadorExecucoes(str(tmp_path))
+    assert comparador.listar_execucoes() == EXECUCOES
+    assert [esboco.registros for esboco in comparador.obter_esbocos().values()] == [LEITURAS] * len(EXECUCOES)
+    assert ConsultaQuantis(str(tmp_path)).percentis('temperatura')['registros'] == LEITURAS * len(EXECUCOES)
+
+    # Uma nova aplicação não traz os arquivos por execução de volta
+    gestor.aplicar(arquivar_log=False)
+    for execucao_id in EXECUCOES:
+        assert not os.path.exists(caminho_esboco(str(tmp_path), execucao_id))
+        assert not os.path.exists(caminho_baldes(str(tmp_path), execucao_id))